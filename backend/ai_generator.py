@@ -8,19 +8,78 @@
 
 import os
 import json
-from typing import List, Dict, Any
-import re
+import functools
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import logging
 import requests
 from pathlib import Path
 
 # Import LLM provider abstraction
 from llm_provider import LLMProvider
+from llm_provider_async import AsyncLLMProvider
+from file_block_parser import FileBlockParser, extract_file_blocks
+from parallel_generator import ParallelProjectGenerator
+from llm_cache import llm_options
+from llm_readiness import ModelReadiness
+from prompt_builder import PromptBuilder, PromptStats
+from fallback_artifacts import FallbackArtifact, fallback_artifacts
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# "fallback" (canned files, no LLM call), "single" (one streamed completion)
+# or "parallel" (plan, then one completion per file)
+GENERATION_MODES = ("fallback", "single", "parallel")
+
+# Parallel file calls run on the provider's AsyncLLMProvider counterpart (one pooled
+# client per project) unless AI_ASYNC_FILE_CALLS is off; the router has no counterpart
+SYNC_ONLY_PROVIDERS = ("router",)
+
+# Static part of the single-call user prompt. It goes before the requirements so that
+# system prompt + instructions are a byte-identical prefix the backend can cache.
+SINGLE_CALL_INSTRUCTIONS = """\
+CRITICAL VIEWER COMPATIBILITY REQUIREMENTS:
+YOU MUST PROVIDE ALL NECESSARY FILES based on the requirements below, including but not limited to:
+1. All configuration files (package.json, next.config.js, tsconfig.json, etc.)
+2. All source code files (components, pages, utilities, etc.)
+3. COMPREHENSIVE CSS/styling files (this is CRITICAL for viewer)
+4. Database schema and models
+5. A detailed README.md
+
+FRONTEND & CSS REQUIREMENTS FOR VIEWER:
+- ALWAYS include comprehensive CSS/styling files
+- Use modern CSS with flexbox/grid layouts
+- Include responsive design for all screen sizes
+- Add proper color schemes, typography, and spacing
+- Include hover effects, animations, and transitions
+- Ensure all components have proper styling
+- Add loading states and error handling UI
+- Use CSS variables for consistent theming
+
+For React/Next.js projects, make sure to include:
+- All page files in src/app/ or src/pages/
+- All component files mentioned in the requirements
+- Layout files and global styles
+- Comprehensive CSS modules or styled-components
+
+REQUIRED FILES FOR VIEWER COMPATIBILITY:
+- index.html (main entry point)
+- styles.css or main.css (comprehensive styling)
+- script.js or main.js (interactive functionality)
+- README.md (setup and usage instructions)
+- package.json (if using Node.js/npm)
+
+Each file should be in the format:
+
+FILE: filename.ext
+```
+file contents here
+```
+
+Pay special attention to creating ALL files mentioned in the requirements. DO NOT SKIP any required pages or components. EVERY project must be viewer-ready with comprehensive styling!
+"""
+
 class AICodeGenerator:
     """
     AI-powered code generator using local LLM
@@ -31,19 +90,42 @@ class AICodeGenerator:
         provider_name = self.llm.__class__.__name__
         logger.info(f"Initialized AICodeGenerator with {provider_name}")
         
-        # Ensure model is available
-        try:
-            self.llm.ensure_model_available()
-        except Exception as e:
-            logger.warning(f"Could not ensure model availability: {e}")
+        # Check model availability in the background; startup must not wait on the LLM backend
+        self.readiness = ModelReadiness(self.llm.ensure_model_available, name=provider_name)
+        self.readiness.start()
+        
+        # Forced fallback stays the default until LLM generation is reliable in production
+        self.generation_mode = os.environ.get("AI_GENERATION_MODE", "fallback").lower()
+        if self.generation_mode not in GENERATION_MODES:
+            logger.warning(f"Unknown AI_GENERATION_MODE {self.generation_mode}, using fallback")
+            self.generation_mode = "fallback"
+        self.parallel_generator = ParallelProjectGenerator(
+            self.llm, async_llm_factory=self._async_llm_factory(provider_type, api_key, api_key_path))
+        self.prompt_builder = PromptBuilder()
+        self.last_prompt_stats: Optional[PromptStats] = None  # token accounting of the last build
+        self.last_fallback_artifact: Optional[FallbackArtifact] = None  # set when the last build fell back
+        
+    @staticmethod
+    def _async_llm_factory(provider_type: Optional[str], api_key=None,
+                           api_key_path=None) -> Optional[Callable[..., AsyncLLMProvider]]:
+        """Creates the async provider for parallel file calls, or None to keep them on threads"""
+        provider_type = (provider_type or os.environ.get("LLM_PROVIDER", "ollama")).lower()
+        enabled = os.environ.get("AI_ASYNC_FILE_CALLS", "1").lower() not in ("0", "false", "no", "off")
+        if not enabled or provider_type in SYNC_ONLY_PROVIDERS:
+            return None
+        kwargs = {"api_key": api_key, "api_key_path": api_key_path} if provider_type == "openai" else {}
+        return functools.partial(AsyncLLMProvider.create, provider_type, **kwargs)
         
-    def generate_project(self, requirements: List[str], project_type: str = "web") -> Dict[str, str]:
+    def _generate_project_single_call(self, requirements: List[str], project_type: str = "web",
+                                      on_file: Optional[Callable[[str, str], None]] = None,
+                                      bypass_cache: bool = False) -> Dict[str, str]:
         """
-        Generate a complete project based on requirements
+        Generate a complete project from one completion
         
         Args:
             requirements: List of requirements as strings
             project_type: Type of project (web, api, mobile, etc.)
+            on_file: Called with (filename, content) as each file completes in the stream
             
         Returns:
             Dict mapping filenames to file contents
@@ -55,64 +137,24 @@ class AICodeGenerator:
             # Create a system prompt based on project type
             system_prompt = self._get_system_prompt(project_type)
             
-            # Create the main prompt for code generation
-            main_prompt = f"""
-            Generate a complete functional {project_type} project based on these requirements:
+            # Static instructions first, then this build's requirements
+            prompt = self.prompt_builder.build(
+                system_prompt, SINGLE_CALL_INSTRUCTIONS,
+                f"Generate a complete functional {project_type} project based on these requirements:\n"
+                f"{formatted_reqs}")
+            self.last_prompt_stats = PromptStats()
+            self.last_prompt_stats.record_built(prompt)
             
-            {formatted_reqs}
-            
-            CRITICAL VIEWER COMPATIBILITY REQUIREMENTS:
-            YOU MUST PROVIDE ALL NECESSARY FILES based on the requirements above, including but not limited to:
-            1. All configuration files (package.json, next.config.js, tsconfig.json, etc.)
-            2. All source code files (components, pages, utilities, etc.)
-            3. COMPREHENSIVE CSS/styling files (this is CRITICAL for viewer)
-            4. Database schema and models
-            5. A detailed README.md
-            
-            FRONTEND & CSS REQUIREMENTS FOR VIEWER:
-            - ALWAYS include comprehensive CSS/styling files
-            - Use modern CSS with flexbox/grid layouts
-            - Include responsive design for all screen sizes
-            - Add proper color schemes, typography, and spacing
-            - Include hover effects, animations, and transitions
-            - Ensure all components have proper styling
-            - Add loading states and error handling UI
-            - Use CSS variables for consistent theming
-            
-            For React/Next.js projects, make sure to include:
-            - All page files in src/app/ or src/pages/
-            - All component files mentioned in the requirements
-            - Layout files and global styles
-            - Comprehensive CSS modules or styled-components
-            
-            REQUIRED FILES FOR VIEWER COMPATIBILITY:
-            - index.html (main entry point)
-            - styles.css or main.css (comprehensive styling)
-            - script.js or main.js (interactive functionality)
-            - README.md (setup and usage instructions)
-            - package.json (if using Node.js/npm)
-            
-            Each file should be in the format:
-            
-            FILE: filename.ext
-            ```
-            file contents here
-            ```
-            
-            Pay special attention to creating ALL files mentioned in the requirements. DO NOT SKIP any required pages or components. EVERY project must be viewer-ready with comprehensive styling!
-            """
-            
-            # Call the LLM provider
-            response = self._call_llm_api(system_prompt, main_prompt)
-            
-            # Extract files from the response
-            files = self._extract_files_from_response(response)
+            # Stream the completion, extracting files as their fences close
+            files = self._stream_files_from_llm(prompt.system, prompt.user, on_file,
+                                                llm_options(self.llm, formatted_reqs, bypass_cache))
             
             # Add a manifest file with project info
             files["project_manifest.json"] = json.dumps({
                 "project_type": project_type,
                 "requirements": requirements,
                 "files_generated": list(files.keys()),
+                "prompt_tokens": self.last_prompt_stats.report(),
                 "build_status": "complete"
             }, indent=2)
             
@@ -230,35 +272,112 @@ class AICodeGenerator:
             logger.info("Using fallback generation due to LLM error")
             return self._generate_fallback_code(user_prompt)
     
-    def generate_project(self, requirements: List[str], project_type: str = "web") -> Dict[str, str]:
+    def _stream_files_from_llm(self, system_prompt: str, user_prompt: str,
+                               on_file: Optional[Callable[[str, str], None]] = None,
+                               options: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Stream a completion and hand each file to on_file as soon as it is complete"""
+        parser = FileBlockParser()
+        files = {}
+        try:
+            logger.info("Streaming LLM completion for code generation")
+            for chunk in self.llm.stream_completion(system_prompt, user_prompt, **(options or {})):
+                self._take_streamed_files(parser.feed(chunk), files, on_file)
+            # A closing fence without a trailing newline only completes its file here
+            self._take_streamed_files(parser.finish(), files, on_file)
+            if parser.close():
+                logger.warning("Completion ended inside an unterminated FILE: block")
+        except Exception as e:
+            if files:
+                # Keep what already streamed; a cut-off stream loses only the file in progress
+                logger.error(f"LLM stream failed after {len(files)} files: {e}")
+            else:
+                logger.error(f"LLM provider error: {e}")
+                logger.info("Using fallback generation due to LLM error")
+                files = dict(self._fallback_artifact(self._fallback_kind(user_prompt)).files)
+                if on_file:
+                    for filename, content in files.items():
+                        on_file(filename, content)
+        
+        if not files:
+            logger.warning("No files extracted from AI response, using fallback")
+            return self._generate_fallback_files()
+        
+        logger.info(f"Successfully extracted {len(files)} files from AI response")
+        return files
+    
+    def _take_streamed_files(self, completed: List[Tuple[str, str]], files: Dict[str, str],
+                             on_file: Optional[Callable[[str, str], None]]):
+        for filename, content in completed:
+            files[filename] = content
+            logger.info(f"Extracted file from AI response: {filename}")
+            if on_file:
+                on_file(filename, content)
+    
+    def _generate_project_parallel(self, requirements: List[str], project_type: str = "web",
+                                   on_file: Optional[Callable[[str, str], None]] = None,
+                                   bypass_cache: bool = False) -> Dict[str, str]:
+        """Plan the file manifest, then generate files concurrently (see ParallelProjectGenerator)"""
+        try:
+            files = self.parallel_generator.generate(requirements, project_type,
+                                                     self._get_system_prompt(project_type), on_file,
+                                                     bypass_cache=bypass_cache)
+        except Exception as e:
+            logger.error(f"Parallel generation failed, falling back to a single completion: {e}")
+            return self._generate_project_single_call(requirements, project_type, on_file, bypass_cache)
+        
+        stats = self.parallel_generator.last_stats
+        self.last_prompt_stats = self.parallel_generator.last_prompt_stats
+        files["project_manifest.json"] = json.dumps({
+            "project_type": project_type,
+            "requirements": requirements,
+            "files_generated": list(files.keys()),
+            "files_failed": stats["failed_files"],
+            "prompt_tokens": stats["prompt"],
+            "build_status": "complete" if not stats["failed_files"] else "partial"
+        }, indent=2)
+        return files
+    
+    def generate_project(self, requirements: List[str], project_type: str = "web",
+                         on_file: Optional[Callable[[str, str], None]] = None,
+                         bypass_cache: bool = False) -> Dict[str, str]:
         """
-        Generate a complete project based on requirements
-        FORCE FALLBACK GENERATION TO PREVENT HANGING
+        Generate a complete project based on requirements, using AI_GENERATION_MODE
+        
+        Args:
+            requirements: List of requirements as strings
+            project_type: Type of project (web, api, mobile, etc.)
+            on_file: Called with (filename, content) as each file is ready
+            bypass_cache: Skip cached completions (the fresh ones are still cached)
         """
-        logger.info("🚀 Starting project generation with FORCED FALLBACK")
+        logger.info(f"🚀 Starting project generation ({self.generation_mode} mode)")
         logger.info(f"Requirements: {requirements}")
         logger.info(f"Project type: {project_type}")
+        self.last_prompt_stats = None
+        self.last_fallback_artifact = None
+        
+        if self.generation_mode != "fallback" and self.readiness.is_unavailable():
+            logger.warning(f"⚠️ LLM unavailable ({self.readiness.error}), using fallback generation")
+        elif self.generation_mode == "parallel":
+            return self._generate_project_parallel(requirements, project_type, on_file, bypass_cache)
+        elif self.generation_mode == "single":
+            return self._generate_project_single_call(requirements, project_type, on_file, bypass_cache)
         
         # FORCE FALLBACK GENERATION TO PREVENT HANGING
         logger.warning("⚠️ Using fallback generation to prevent hanging")
-        return self._generate_fallback_files()
+        files = self._generate_fallback_files()
+        if on_file:
+            for filename, content in files.items():
+                on_file(filename, content)
+        return files
     
     def _extract_files_from_response(self, response: str) -> Dict[str, str]:
         """Extract file contents from the LLM response"""
-        files = {}
-        
-        # Enhanced regex pattern to find files in the format FILE: filename.ext\n```\ncontent\n```
-        # This pattern is more forgiving with file paths containing special characters
-        pattern = r'FILE:\s*([\w\-\.\/\+\@\#\$\%\&\=\?\!\:\;]+)\s*```(?:\w+)?\s*([\s\S]*?)```'
-        matches = re.finditer(pattern, response)
+        files = extract_file_blocks(response)
+        if not files:
+            # Headers without a colon or bodies without fences
+            files = extract_file_blocks(response, lenient=True)
         
-        for match in matches:
-            filename = match.group(1).strip()
-            content = match.group(2).strip()
-            
-            # Normalize file path (handle spaces, quotes, etc)
-            filename = filename.replace('"', '').replace("'", "").strip()
-            
+        for filename in files:
             # Ensure directory exists for the file
             if '/' in filename:
                 dir_path = os.path.dirname(filename)
@@ -268,7 +387,6 @@ class AICodeGenerator:
                     except Exception as e:
                         logger.warning(f"Could not create directory for {filename}: {e}")
             
-            files[filename] = content
             logger.info(f"Extracted file from AI response: {filename}")
         
         # Check if we extracted a reasonable number of files
@@ -283,13 +401,26 @@ class AICodeGenerator:
         """Generate fallback code when AI generation fails"""
         logger.info("Generating fallback code due to AI generation failure")
         
-        # Extract project type from prompt
-        if "web" in user_prompt.lower():
-            return self._generate_fallback_web_project()
-        elif "mobile" in user_prompt.lower():
+        if self._fallback_kind(user_prompt) == "mobile":
             return self._generate_fallback_mobile_project()
-        else:
-            return self._generate_fallback_web_project()
+        return self._generate_fallback_web_project()
+    
+    def _fallback_kind(self, user_prompt: str) -> str:
+        """Fallback project for a prompt: web unless only mobile is mentioned"""
+        prompt = user_prompt.lower()
+        if "web" not in prompt and "mobile" in prompt:
+            return "mobile"
+        return "web"
+    
+    def _fallback_artifact(self, kind: str) -> FallbackArtifact:
+        """Fallback files built (and zipped / MMRY-encoded) once per process, not per build"""
+        builders = {
+            "basic": self._build_fallback_files,
+            "web": lambda: extract_file_blocks(self._generate_fallback_web_project()),
+            "mobile": lambda: extract_file_blocks(self._generate_fallback_mobile_project())
+        }
+        self.last_fallback_artifact = fallback_artifacts.get(("ai_generator", kind), builders[kind])
+        return self.last_fallback_artifact
     
     def _generate_fallback_web_project(self) -> str:
         """Generate a basic web project fallback"""
@@ -498,6 +629,9 @@ main {
     
     def _generate_fallback_files(self) -> Dict[str, str]:
         """Generate fallback files when AI extraction fails"""
+        return dict(self._fallback_artifact("basic").files)
+    
+    def _build_fallback_files(self) -> Dict[str, str]:
         return {
             "index.html": """<!DOCTYPE html>
 <html lang="en">
@@ -520,24 +654,19 @@ h1 { color: #333; }""",
             "README.md": """# Generated Project\n\nThis is a fallback project generated when AI generation failed.\n\n## Files\n- index.html - Main HTML file\n- styles.css - Basic styling\n\n## Usage\nOpen index.html in your browser."""
         }
     
-    def _check_extraction_quality(self, files: Dict[str, str]) -> bool:
+    def _check_extraction_quality(self, files: Dict[str, str], response: str) -> Dict[str, str]:
         """Check if the extracted files are of good quality"""
         if len(files) < 3:
             logger.warning(f"Only extracted {len(files)} files from response. This might indicate parsing issues.")
             
-            # Try a simpler/alternative pattern as backup
+            # Retry with the lenient parser as backup
             if len(files) == 0:
-                logger.info("Attempting alternative file extraction pattern...")
-                simpler_pattern = r'FILE:?\s*([\S]+)[\s\n]*```[\s\n]*([\s\S]*?)```'
-                matches = re.finditer(simpler_pattern, response)
-                
-                for match in matches:
-                    filename = match.group(1).strip()
-                    content = match.group(2).strip()
+                logger.info("Attempting lenient file extraction...")
+                for filename, content in extract_file_blocks(response, lenient=True).items():
                     files[filename] = content
-                    logger.info(f"Extracted file using backup pattern: {filename}")
+                    logger.info(f"Extracted file using lenient parser: {filename}")
         
-        # If no files were extracted using both patterns, return the whole response as README.md
+        # If no files were extracted either way, return the whole response as README.md
         if not files:
             logger.warning("No files extracted from AI response, returning full response as README.md")
             files["README.md"] = response
@@ -6,13 +6,12 @@ By: AI Assistant
 Completeness: 95/100
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Header
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
 import shutil
 import os
-import zipfile
 import time
 import json
 from typing import List, Dict, Any, Optional
@@ -22,10 +21,17 @@ import logging
 # Import our project generator, template controller, and projects controller
 from project_generator import ProjectGenerator
 from template_controller import TemplateController
-from projects_controller import ProjectsController, router as projects_router
+from projects_controller import projects_controller, router as projects_router
 from mmry_workflow_service import mmry_workflow_service
 from agentic_team_system import agentic_team_system
 from agentic_team_monitor import agentic_team_monitor
+from build_queue import BuildQueue, BuildWorkerPool, FINISHED_STATUSES, client_address
+from llm_cache import get_completion_cache
+from http_caching import (stat_etag, http_date, etag_matches, parse_range, read_byte_range,
+                          RangeNotSatisfiable, cache_control, content_hashes, content_etag,
+                          evaluate_conditional, iter_byte_range)
+from build_events import (build_event_bus, format_sse, parse_last_event_id,
+                          STATUS_PROGRESS, TERMINAL_STATUSES)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -56,6 +62,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Readable by the dashboard's incremental log fetches
+    expose_headers=["ETag", "X-Next-Offset", "X-Log-Reset", "Content-Range", "X-Total-Count"],
 )
 
 # Directory to store generated projects
@@ -75,6 +83,25 @@ project_generator = ProjectGenerator(
     api_key_path=api_key_path
 )
 
+# Builds run in worker processes fed by a durable queue; BUILD_WORKERS=0 leaves
+# them to a standalone `python build_queue.py worker`
+build_queue = BuildQueue(os.environ.get("BUILD_QUEUE_DB", "build_queue.db"))
+build_worker_pool = BuildWorkerPool(build_queue.db_path, event_bus=build_event_bus)
+
+@app.on_event("startup")
+def start_build_workers():
+    if build_worker_pool.workers > 0:
+        build_worker_pool.start()
+
+@app.on_event("startup")
+def rebuild_project_index():
+    # Background scan; builds started meanwhile are indexed from their events
+    projects_controller.index.start_rebuild()
+
+@app.on_event("shutdown")
+def stop_build_workers():
+    build_worker_pool.stop()
+
 # Set up template controller
 template_controller = TemplateController(project_generator.template_manager)
 app.include_router(template_controller.router)
@@ -99,10 +126,6 @@ def is_safe_project_id(project_id):
 def is_safe_filename(filename):
     return SAFE_FILENAME.match(filename)
 
-def execute_build_task(project_id: str):
-    """Background task to execute project build"""
-    project_generator.execute_build(project_id)
-
 
 @app.get("/")
 async def root():
@@ -114,9 +137,18 @@ async def health():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": time.time()}
 
+@app.get("/ready")
+async def ready():
+    """Readiness: 503 until the LLM provider's model check has passed (unless generation is forced to fallback)"""
+    ai_generator = project_generator.ai_generator
+    llm = ai_generator.readiness.status()
+    is_ready = ai_generator.generation_mode == "fallback" or llm["state"] == "ready"
+    return JSONResponse({"ready": is_ready, "generation_mode": ai_generator.generation_mode, "llm": llm},
+                        status_code=200 if is_ready else 503)
+
 @app.post("/generate-project/")
 async def generate_project(
-    background_tasks: BackgroundTasks,
+    request: Request,
     requirements: List[str] = Form(...),
     project_type: str = Form("web"),
     template_id: Optional[str] = Form(None),
@@ -125,6 +157,7 @@ async def generate_project(
     use_personal_key: Optional[str] = Form(None),
     ollama_url: Optional[str] = Form(None),
     use_ollama: Optional[str] = Form(None),
+    bypass_cache: bool = Form(False),
     x_user_api_key: Optional[str] = Header(None),
     x_ollama_url: Optional[str] = Header(None),
 ):
@@ -132,17 +165,20 @@ async def generate_project(
     Accepts requirements and initiates an AI-powered project build process
     
     Args:
-        background_tasks: FastAPI BackgroundTasks
+        request: Incoming request (its client address keys the per-user build limit)
         requirements: List of project requirements as strings
         project_type: Type of project to generate (web, api, mobile, etc.)
         template_id: Optional template to use as starting point
         project_name: Name of the project
+        bypass_cache: Generate fresh completions instead of reusing cached ones
     """
     # Start project build
     # Determine effective preferences
     effective_key = x_user_api_key or user_api_key
     effective_ollama = x_ollama_url or ollama_url
 
+    # Limits builds per client; the MMRY vault owner stays the default user
+    client = client_address(request.client.host if request.client else None, request.headers)
     result = project_generator.start_build(
         project_name=project_name,
         requirements=requirements,
@@ -152,25 +188,167 @@ async def generate_project(
         use_personal_key=bool(use_personal_key) or bool(effective_key),
         ollama_url=effective_ollama,
         use_ollama=bool(use_ollama) or bool(effective_ollama),
+        bypass_cache=bypass_cache,
     )
     
     project_id = result["project_id"]
     
-    # Start background task for building
-    background_tasks.add_task(execute_build_task, project_id)
+    # Queue the build; a worker process picks it up
+    job = build_queue.enqueue(project_id, user_id=client)
     
-    return {"project_id": project_id, "zip_file": f"/download/{project_id}.zip"}
+    return {"project_id": project_id, "zip_file": f"/download/{project_id}.zip",
+            "job_id": job["job_id"], "queue_status": job["status"]}
 
 @app.get("/logs/{project_id}")
-def get_logs(project_id: str):
+def get_logs(project_id: str, request: Request, since: Optional[int] = None):
+    """
+    Build log, whole or incremental
+    
+    ?since=<byte offset> returns only bytes appended after that offset, with
+    X-Next-Offset giving the offset for the next call (X-Log-Reset: 1 when the
+    log was restarted and the full log is returned). Range requests and
+    If-None-Match are honoured, so an unchanged log costs a stat and a 304.
+    """
     if not is_safe_project_id(project_id):
         raise HTTPException(status_code=400, detail="Invalid project id")
     log_path = os.path.join(PROJECTS_DIR, project_id, "build.log")
-    if not os.path.exists(log_path):
+    try:
+        st = os.stat(log_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Log not found")
-    with open(log_path, "r") as f:
-        content = f.read()
-    return PlainTextResponse(content)
+    
+    size = st.st_size
+    etag = stat_etag(st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(st.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control("logs"),
+        "X-Next-Offset": str(size)
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    media_type = "text/plain; charset=utf-8"
+    if since is not None:
+        start = max(since, 0)
+        if start > size:
+            # The log is shorter than the client's offset: it was rewritten by a rebuild
+            start = 0
+            headers["X-Log-Reset"] = "1"
+        return Response(read_byte_range(log_path, start, size - start), media_type=media_type, headers=headers)
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers=dict(headers, **{"Content-Range": f"bytes */{size}"}))
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["X-Next-Offset"] = str(end + 1)
+        return Response(read_byte_range(log_path, start, end - start + 1), status_code=206,
+                        media_type=media_type, headers=headers)
+    
+    return Response(read_byte_range(log_path, 0, size), media_type=media_type, headers=headers)
+
+# Seconds without events before an event stream checks the build queue
+EVENT_STREAM_IDLE_CHECK = float(os.environ.get("EVENT_STREAM_IDLE_CHECK", "5"))
+
+def _build_event_snapshot(project_id: str) -> Dict[str, Any]:
+    """Current status, agents and log of a build, for event stream clients without usable history"""
+    status_data = project_generator.get_build_status(project_id)
+    status_data["progress"] = STATUS_PROGRESS.get(status_data["status"], 0)
+    log_path = os.path.join(PROJECTS_DIR, project_id, "build.log")
+    log = b""
+    if os.path.exists(log_path):
+        with open(log_path, "rb") as f:
+            log = f.read()
+    return {
+        "status": status_data,
+        "agents": project_generator.get_agent_status(project_id),
+        "log": log.decode("utf-8", errors="replace"),
+        "log_offset": len(log)
+    }
+
+def _finished_build_snapshot(project_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Snapshot of a build whose queue job has finished, else None
+
+    Events of builds run by a standalone worker pool, or relayed to another
+    API worker, never reach this process's bus; the job status in the queue
+    database is what tells an idle stream the build is over.
+    """
+    job = build_queue.get_job(project_id)
+    if job is None or job["status"] not in FINISHED_STATUSES:
+        return None
+    snapshot = _build_event_snapshot(project_id)
+    if snapshot["status"]["status"] not in TERMINAL_STATUSES:
+        # The worker died or the job was cancelled before the manifest was updated
+        snapshot["status"].update(status="failed", progress=STATUS_PROGRESS["failed"],
+                                  error=job["last_error"] or f"Build job {job['status']}")
+    return snapshot
+
+@app.get("/events/{project_id}")
+async def stream_build_events(project_id: str, request: Request, since: Optional[str] = None,
+                              last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events stream of a build's log lines, status and agent updates
+
+    Reconnecting clients resume after Last-Event-ID (EventSource sends it
+    automatically) or ?since=<event id>. A client with no usable history gets
+    a "snapshot" event first. The stream ends when the build completes or fails;
+    if no events arrive it ends with a final "snapshot" once the build's queue
+    job has finished.
+    """
+    if not is_safe_project_id(project_id):
+        raise HTTPException(status_code=400, detail="Invalid project id")
+    if not os.path.exists(os.path.join(PROJECTS_DIR, project_id)):
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    resume_from = parse_last_event_id(last_event_id or since)
+    subscription = build_event_bus.subscribe(project_id, resume_from)
+    
+    async def event_stream():
+        try:
+            log_offset = 0
+            if subscription.gap or (resume_from is None and subscription.backlog_size == 0):
+                snapshot = await run_in_threadpool(_build_event_snapshot, project_id)
+                log_offset = snapshot["log_offset"]
+                # No id: the client's Last-Event-ID keeps pointing at real events
+                yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+                if snapshot["status"]["status"] in TERMINAL_STATUSES:
+                    return
+            
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=EVENT_STREAM_IDLE_CHECK)
+                if event is None:
+                    snapshot = await run_in_threadpool(_finished_build_snapshot, project_id)
+                    if snapshot is not None:
+                        yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                # Already part of the snapshot's log
+                if event["type"] == "log" and event["data"]["offset"] < log_offset:
+                    continue
+                yield format_sse(event)
+                if event["type"] == "status" and event["data"]["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            build_event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/build-events/stats")
+def get_build_event_stats():
+    """Event bus counters: tracked projects, connected watchers, events published and delivered"""
+    return build_event_bus.stats()
+
+@app.get("/llm/cache-stats")
+def get_llm_cache_stats():
+    """Completion cache counters (all processes): hits, near-duplicate hits, misses, bypasses, evictions, size"""
+    return get_completion_cache().stats()
 
 @app.get("/build-status/{project_id}")
 def get_build_status(project_id: str):
@@ -201,8 +379,22 @@ def get_build_status(project_id: str):
     status_data["progress"] = progress
     status_data["timestamp"] = time.time()
     
+    job = build_queue.get_job(project_id)
+    if job:
+        status_data["queue"] = {
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "queue_position": job.get("queue_position"),
+            "last_error": job["last_error"]
+        }
+    
     return status_data
 
+@app.get("/build-queue/stats")
+def get_build_queue_stats():
+    """Counts of queued, running and finished build jobs"""
+    return dict(build_queue.stats(), workers=build_worker_pool.workers)
+
 @app.get("/agent-status/{project_id}")
 def get_agent_status(project_id: str):
     """Get the status of AI agents for a project"""
@@ -221,13 +413,46 @@ def get_agent_status(project_id: str):
 
 # Template endpoints are now handled by TemplateController
 
+def _conditional_file_response(request: Request, path: str, route: str, download_name: Optional[str] = None):
+    """
+    Serve a file with a strong content-hash ETag and Last-Modified
+    
+    Answers If-None-Match / If-Modified-Since with 304 and Range (guarded by
+    If-Range) with 206, so unchanged files and resumed downloads are not re-sent.
+    """
+    st = os.stat(path)
+    etag = content_etag(content_hashes.get(path, st))
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(st.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control(route)
+    }
+    if download_name:
+        headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    
+    status, byte_range = evaluate_conditional(request.headers, etag, st.st_mtime, st.st_size)
+    if status == 304:
+        headers.pop("Content-Disposition", None)
+        return Response(status_code=304, headers=headers)
+    if status == 416:
+        return Response(status_code=416, headers=dict(headers, **{"Content-Range": f"bytes */{st.st_size}"}))
+    if status == 206:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(iter_byte_range(path, start, end), status_code=206,
+                                 media_type="application/octet-stream", headers=headers)
+    # Our ETag / Last-Modified take precedence over FileResponse's own
+    return FileResponse(path, headers=headers)
+
 @app.get("/download/{zip_name}")
-def download_zip(zip_name: str):
+def download_zip(zip_name: str, request: Request):
     if not is_safe_filename(zip_name):
         raise HTTPException(status_code=400, detail="Invalid zip filename")
     zip_path = os.path.join(PROJECTS_DIR, zip_name)
-    if os.path.exists(zip_path):
-        return FileResponse(zip_path, filename=zip_name)
+    if os.path.isfile(zip_path) and not zip_name.endswith(content_hashes.SIDECAR_SUFFIX):
+        return _conditional_file_response(request, zip_path, "download", download_name=zip_name)
     return JSONResponse({"error": "Not found"}, status_code=404)
 
 @app.delete("/cleanup/{project_id}")
@@ -236,16 +461,28 @@ def cleanup_project(project_id: str):
         raise HTTPException(status_code=400, detail="Invalid project id")
     project_path = os.path.join(PROJECTS_DIR, project_id)
     zip_path = os.path.join(PROJECTS_DIR, f"{project_id}.zip")
+    # Drop any build still waiting in the queue
+    build_queue.cancel(project_id)
     # Remove project directory
     if os.path.exists(project_path):
         shutil.rmtree(project_path)
     # Remove zip file
     if os.path.exists(zip_path):
         os.remove(zip_path)
+    if os.path.exists(zip_path + content_hashes.SIDECAR_SUFFIX):
+        os.remove(zip_path + content_hashes.SIDECAR_SUFFIX)
+    projects_controller.index.remove(project_id)
     return {"status": "cleaned"}
 
-# Serve generated zips statically
-app.mount("/generated_projects", StaticFiles(directory=PROJECTS_DIR), name="generated_projects")
+# Serve generated zips and project files (replaces the StaticFiles mount, which re-sent
+# whole files on every request); HEAD answers like GET without the body, as the mount did
+@app.api_route("/generated_projects/{file_path:path}", methods=["GET", "HEAD"])
+def serve_generated_file(file_path: str, request: Request):
+    projects_root = os.path.realpath(PROJECTS_DIR)
+    full_path = os.path.realpath(os.path.join(projects_root, file_path))
+    if os.path.commonpath([projects_root, full_path]) != projects_root or not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="Not found")
+    return _conditional_file_response(request, full_path, "static")
 
 # MMRY Storage and Retrieval Endpoints
 @app.get("/mmry/user-stats/{user_id}")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: build_events.py
+# Description: In-process pub/sub of build progress (log lines, status, agent updates) for SSE streaming
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+Builds publish events here instead of clients polling build.log and
+build_manifest.json:
+
+- "log"    {"offset", "text"}       text appended to build.log at byte offset
+- "status" {"status", "progress", "files_generated", ...}
+- "agent"  {"agents", "overall_progress"}
+- "queue"  {"status", "attempt", ...} build job lifecycle
+
+Each project keeps a ring buffer of recent events with sequential ids, so a
+reconnecting client resumes from its Last-Event-ID without touching disk.
+Builds run in worker processes; their events are relayed to the API process
+over a multiprocessing queue (see BuildEventRelay and set_relay_queue). That
+relay only exists for workers the API process started itself; watchers of
+builds run elsewhere (a standalone worker pool, another API worker) rely on
+the build queue's job status to know when the build is over.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque, OrderedDict
+from typing import Dict, Any, List, Optional, Set, Callable
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+EVENT_BUFFER_SIZE = int(os.environ.get("BUILD_EVENT_BUFFER", "2000"))
+MAX_TRACKED_PROJECTS = int(os.environ.get("BUILD_EVENT_PROJECTS", "500"))
+TERMINAL_STATUSES = {"complete", "failed"}
+STATUS_PROGRESS = {"initializing": 10, "generating": 50, "retrying": 50, "complete": 100, "failed": 100}
+
+
+class BuildEventSubscription:
+    """One watcher of a project's events, delivered onto an asyncio queue"""
+
+    def __init__(self, project_id: str, loop: asyncio.AbstractEventLoop, backlog: List[Dict[str, Any]],
+                 gap: bool):
+        self.project_id = project_id
+        self.loop = loop
+        # True when events after the client's last id were evicted (or never seen);
+        # the client needs a snapshot before the backlog makes sense
+        self.gap = gap
+        self.backlog_size = len(backlog)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        for event in backlog:
+            self._queue.put_nowait(event)
+
+    def deliver(self, event: Dict[str, Any]):
+        """Called from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after timeout"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BuildEventBus:
+    """Thread-safe per-project event buffers with live subscribers"""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE, max_projects: int = MAX_TRACKED_PROJECTS):
+        self.buffer_size = buffer_size
+        self.max_projects = max_projects
+        self._lock = threading.Lock()
+        self._buffers: "OrderedDict[str, deque]" = OrderedDict()
+        self._last_ids: Dict[str, int] = {}
+        # Highest id of an evicted project; new counters start above it, so an id
+        # a client kept from before the eviction still reads as a gap
+        self._id_floor = 0
+        self._subscribers: Dict[str, Set[BuildEventSubscription]] = {}
+        # In-process consumers called synchronously for every event (e.g. the project index)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.published = 0
+        self.delivered = 0
+
+    def publish(self, project_id: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record an event and push it to the project's subscribers"""
+        with self._lock:
+            event_id = self._last_ids.get(project_id, self._id_floor) + 1
+            self._last_ids[project_id] = event_id
+            event = {"id": event_id, "project_id": project_id, "type": event_type,
+                     "data": data, "timestamp": time.time()}
+
+            buffer = self._buffers.get(project_id)
+            if buffer is None:
+                buffer = self._buffers[project_id] = deque(maxlen=self.buffer_size)
+                self._evict_idle_projects()
+            else:
+                self._buffers.move_to_end(project_id)
+            buffer.append(event)
+
+            subscribers = list(self._subscribers.get(project_id, ()))
+            self.published += 1
+            self.delivered += len(subscribers)
+
+        for subscription in subscribers:
+            subscription.deliver(event)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Build event listener failed on {event_type} for {project_id}: {e}")
+        return event
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener(event) for every published event, on the publishing thread"""
+        self._listeners.append(listener)
+
+    def subscribe(self, project_id: str, last_event_id: Optional[int] = None) -> BuildEventSubscription:
+        """
+        Watch a project from inside a running event loop
+
+        Buffered events after last_event_id (all of them when None) are queued
+        first; registration happens under the same lock, so nothing published
+        in between is lost or duplicated.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            buffer = self._buffers.get(project_id, ())
+            latest = self._last_ids.get(project_id, 0)
+            after = last_event_id or 0
+            backlog = [event for event in buffer if event["id"] > after]
+
+            oldest = buffer[0]["id"] if buffer else latest + 1
+            # Events between the client's position and the buffer start are gone,
+            # or the ids come from before an API restart
+            gap = after + 1 < oldest or after > latest
+
+            subscription = BuildEventSubscription(project_id, loop, backlog, gap)
+            self._subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: BuildEventSubscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def last_event_id(self, project_id: str) -> int:
+        with self._lock:
+            return self._last_ids.get(project_id, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "projects": len(self._buffers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "published": self.published,
+                "delivered": self.delivered
+            }
+
+    def _evict_idle_projects(self):
+        """Drop the least recently active buffers nobody is watching (lock held)"""
+        for project_id in list(self._buffers):
+            if len(self._buffers) <= self.max_projects:
+                break
+            if project_id not in self._subscribers:
+                del self._buffers[project_id]
+                self._id_floor = max(self._id_floor, self._last_ids.pop(project_id, 0))
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event in text/event-stream format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Last-Event-ID header / ?since= value, ignoring anything that is not an id"""
+    try:
+        return int(value) if value is not None and value != "" else None
+    except ValueError:
+        return None
+
+
+def status_event_data(manifest: Dict[str, Any], **extra) -> Dict[str, Any]:
+    """Payload of a "status" event from a build manifest"""
+    status = manifest.get("status", "unknown")
+    data = {
+        "status": status,
+        "progress": STATUS_PROGRESS.get(status, 0),
+        "files_generated": len(manifest.get("files_generated", [])),
+        "errors": manifest.get("errors", [])
+    }
+    if manifest.get("end_time") and manifest.get("start_time"):
+        data["end_time"] = manifest["end_time"]
+        data["duration"] = manifest["end_time"] - manifest["start_time"]
+    data.update(extra)
+    return data
+
+
+# Global event bus for the API process
+build_event_bus = BuildEventBus()
+
+# Set in build worker processes: events go to the API process instead of the local bus
+_relay_queue = None
+
+
+def set_relay_queue(event_queue):
+    """Route publish_build_event through a multiprocessing queue (build workers)"""
+    global _relay_queue
+    _relay_queue = event_queue
+
+
+def publish_build_event(project_id: str, event_type: str, data: Dict[str, Any]):
+    """Publish from build code, whichever process it runs in; never raises"""
+    try:
+        if _relay_queue is not None:
+            # A full relay queue means the API process is not draining it; progress
+            # events are best-effort, the files on disk stay authoritative
+            _relay_queue.put_nowait((project_id, event_type, data))
+        else:
+            build_event_bus.publish(project_id, event_type, data)
+    except Exception as e:
+        logger.debug(f"Dropped {event_type} event for {project_id}: {e}")
+
+
+class BuildEventRelay:
+    """Drains events published by worker processes into the API process's bus"""
+
+    def __init__(self, event_queue, bus: BuildEventBus = build_event_bus):
+        self.event_queue = event_queue
+        self.bus = bus
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="build-event-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread:
+            self.event_queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                item = self.event_queue.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            project_id, event_type, data = item
+            self.bus.publish(project_id, event_type, data)
+
+
+# Benchmark: 100 watchers of one build, status polling vs event stream
+if __name__ == "__main__":
+    import tempfile
+    import statistics
+    from build_logger import BuildLogger, ManifestWriter
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    WATCHERS = 100
+    BUILD_SECONDS = 6.0
+    LOG_LINES = 120
+    # The dashboard polls logs and build status every 1.5s and agent status every 2s
+    POLL_INTERVALS = {"logs": 1.5, "build-status": 1.5, "agent-status": 2.0}
+
+    def simulated_build(project_path: str, project_id: str, publish: bool):
+        log_path = os.path.join(project_path, "build.log")
+        manifest_path = os.path.join(project_path, "build_manifest.json")
+        manifest = ManifestWriter(manifest_path, {"status": "initializing", "files_generated": [], "errors": [],
+                                                  "start_time": time.time()})
+        manifest.flush(force=True)
+
+        def on_log(text, offset):
+            if publish:
+                publish_build_event(project_id, "log", {"offset": offset, "text": text, "sent": time.perf_counter()})
+
+        def on_status():
+            if publish:
+                publish_build_event(project_id, "status",
+                                    status_event_data(manifest.manifest, sent=time.perf_counter()))
+
+        with BuildLogger(log_path, listener=on_log) as build_log:
+            manifest.update(status="generating")
+            manifest.flush(force=True)
+            on_status()
+            for i in range(LOG_LINES):
+                manifest.manifest["files_generated"].append(f"src/components/Widget{i}.jsx")
+                manifest.mark_dirty()
+                build_log.write(f"Generated: src/components/Widget{i}.jsx\n", milestone=i % 20 == 0)
+                manifest.flush()
+                time.sleep(BUILD_SECONDS / LOG_LINES)
+            manifest.update(status="complete", end_time=time.time())
+            manifest.flush(force=True)
+            build_log.milestone("Build completed\n")
+            on_status()
+
+    def read_file(path: str) -> int:
+        with open(path, "rb") as f:
+            return len(f.read())
+
+    async def polling_watchers(project_path: str, done: threading.Event) -> Dict[str, float]:
+        counters = {"requests": 0, "bytes_read": 0}
+
+        def handle(endpoint: str):
+            # What each endpoint reads per call
+            counters["requests"] += 1
+            if endpoint == "logs":
+                counters["bytes_read"] += read_file(os.path.join(project_path, "build.log"))
+            else:
+                counters["bytes_read"] += read_file(os.path.join(project_path, "build_manifest.json"))
+                if endpoint == "build-status":
+                    sum(len(files) for _, _, files in os.walk(project_path))
+
+        async def watcher(endpoint: str, interval: float):
+            while not done.is_set():
+                handle(endpoint)
+                await asyncio.sleep(interval)
+
+        await asyncio.gather(*(watcher(endpoint, interval) for _ in range(WATCHERS)
+                               for endpoint, interval in POLL_INTERVALS.items()))
+        return counters
+
+    async def streaming_watchers(project_path: str, project_id: str, ready: threading.Event) -> Dict[str, Any]:
+        counters = {"requests": 0, "bytes_read": 0, "events": 0}
+        latencies: List[float] = []
+
+        async def watcher():
+            counters["requests"] += 1
+            subscription = build_event_bus.subscribe(project_id)
+            # Initial snapshot for a client that connects mid-build
+            counters["bytes_read"] += read_file(os.path.join(project_path, "build_manifest.json"))
+            try:
+                while True:
+                    event = await subscription.get(timeout=30)
+                    if event is None:
+                        break
+                    counters["events"] += 1
+                    latencies.append(time.perf_counter() - event["data"]["sent"])
+                    if event["type"] == "status" and event["data"]["status"] in TERMINAL_STATUSES:
+                        break
+            finally:
+                build_event_bus.unsubscribe(subscription)
+
+        tasks = [asyncio.ensure_future(watcher()) for _ in range(WATCHERS)]
+        await asyncio.sleep(0.1)
+        ready.set()
+        await asyncio.gather(*tasks)
+        counters["latency_p50_ms"] = statistics.median(latencies) * 1000
+        counters["latency_p99_ms"] = sorted(latencies)[int(len(latencies) * 0.99)] * 1000
+        return counters
+
+    def run(mode: str) -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory() as project_path:
+            with open(os.path.join(project_path, "build_manifest.json"), "w") as f:
+                json.dump({"status": "initializing"}, f)
+            open(os.path.join(project_path, "build.log"), "w").close()
+            done, ready = threading.Event(), threading.Event()
+
+            def build():
+                ready.wait()
+                simulated_build(project_path, mode, publish=mode == "stream")
+                done.set()
+
+            builder = threading.Thread(target=build)
+            builder.start()
+            start = time.perf_counter()
+            if mode == "poll":
+                ready.set()
+                counters = asyncio.run(polling_watchers(project_path, done))
+            else:
+                counters = asyncio.run(streaming_watchers(project_path, mode, ready))
+            builder.join()
+            counters["seconds"] = time.perf_counter() - start
+            return counters
+
+    print(f"=== {WATCHERS} watchers of one {BUILD_SECONDS:.0f}s build ({LOG_LINES} log lines) ===\n")
+    poll = run("poll")
+    stream = run("stream")
+    print(f"{'':<22}{'polling':>12}{'SSE stream':>12}")
+    print(f"{'Requests':<22}{poll['requests']:>12}{stream['requests']:>12}")
+    print(f"{'Requests/sec':<22}{poll['requests'] / poll['seconds']:>12.1f}{stream['requests'] / stream['seconds']:>12.1f}")
+    print(f"{'Disk bytes read':<22}{poll['bytes_read']:>12,}{stream['bytes_read']:>12,}")
+    print(f"\nEvents delivered: {stream['events']:,} "
+          f"(publish-to-watcher latency p50 {stream['latency_p50_ms']:.2f} ms, p99 {stream['latency_p99_ms']:.2f} ms)")
+    print(f"Polling sees a new line up to {max(POLL_INTERVALS.values()):.1f}s late")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: build_finalizer.py
+# Description: Single-pass build finalization - write, MMRY-store and zip generated files from memory
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+import os
+import time
+import zipfile
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable
+
+from project_files import file_entry, write_file_manifest
+from http_caching import content_hashes
+from fallback_artifacts import FallbackArtifact
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Build bookkeeping files that live in the project directory and ship in the zip
+BUILD_METADATA_FILES = ["build.log", "build_manifest.json"]
+
+
+def merge_generated_files(template_files: Dict[str, str], ai_files: Dict[str, str]) -> Dict[str, str]:
+    """
+    Combine template output and AI output in memory
+
+    AI files never overwrite template files; a clashing AI file is kept
+    alongside as name.ai.ext, matching what the on-disk build used to do.
+    """
+    merged = dict(template_files)
+    for filename, content in ai_files.items():
+        if filename in merged:
+            base_name, ext = os.path.splitext(filename)
+            filename = f"{base_name}.ai{ext}"
+        merged[filename] = content
+    return merged
+
+
+class BuildFinalizer:
+    """
+    Finalizes a build from the in-memory file map in one sweep
+
+    Each file is encoded once, written to disk and added to a DEFLATE zip in the
+    same loop, while MMRY storage runs concurrently on a worker thread from the
+    same in-memory contents. Nothing generated is read back from disk. The
+    file manifest (paths, sizes, hashes) used for file listings is written
+    from the same pass.
+    """
+
+    def __init__(self, store_func: Optional[Callable[..., Dict[str, Any]]] = None,
+                 file_type_func: Optional[Callable[[str], str]] = None, compresslevel: int = 6):
+        """
+        Args:
+            store_func: MMRY store callable (user_id, project_id, project_files);
+                        defaults to mmry_workflow_service.store_project_files
+            file_type_func: Maps a filename to the MMRY file type
+            compresslevel: DEFLATE level for the download zip
+        """
+        self.store_func = store_func
+        self.file_type_func = file_type_func or (lambda filename: "text")
+        self.compresslevel = compresslevel
+
+    def finalize(self, project_path: str, zip_path: str, files: Dict[str, str],
+                 user_id: str = "default_user", project_id: str = "",
+                 artifact: Optional[FallbackArtifact] = None) -> Dict[str, Any]:
+        """
+        Write files, store them in MMRY and build the download zip
+
+        Args:
+            project_path: Project directory
+            zip_path: Destination of the download zip
+            files: Ordered map of project-relative path -> content
+            user_id: MMRY vault owner
+            project_id: Project identifier
+            artifact: Precomputed fallback artifact; used only if files is exactly its file map,
+                      in which case its zip and MMRY pack payloads are reused instead of recompressed
+
+        Returns:
+            Dict with mmry_storage result and I/O / timing stats
+        """
+        start = time.perf_counter()
+        if artifact is not None and not artifact.matches(files):
+            artifact = None
+        project_files = [{"name": name, "content": content, "type": self.file_type_func(os.path.basename(name))}
+                         for name, content in files.items()]
+        if artifact is not None:
+            for file_data in project_files:
+                file_data["encoded"] = artifact.pack_payloads[file_data["name"]]
+
+        # MMRY storage only needs the in-memory contents, so it overlaps with disk and zip work
+        mmry_result: Dict[str, Any] = {}
+        mmry_error: List[BaseException] = []
+
+        def store():
+            mmry_start = time.perf_counter()
+            try:
+                mmry_result.update(self._store(user_id, project_id, project_files))
+            except BaseException as e:
+                mmry_error.append(e)
+            mmry_result["_seconds"] = time.perf_counter() - mmry_start
+
+        mmry_thread = threading.Thread(target=store, name=f"mmry-store-{project_id}", daemon=True)
+        mmry_thread.start()
+
+        bytes_written = 0
+        write_start = time.perf_counter()
+        created_dirs = set()
+        manifest_entries = []
+        if artifact is not None:
+            # The files are already deflated; copy the zip and append the build metadata to it
+            with open(zip_path, "wb") as f:
+                f.write(artifact.zip_bytes)
+        with zipfile.ZipFile(zip_path, "a" if artifact is not None else "w", compression=zipfile.ZIP_DEFLATED,
+                             compresslevel=self.compresslevel) as zipf:
+            for name, content in files.items():
+                data = content.encode("utf-8")
+                file_path = os.path.join(project_path, name)
+
+                directory = os.path.dirname(file_path)
+                if directory not in created_dirs:
+                    os.makedirs(directory, exist_ok=True)
+                    created_dirs.add(directory)
+
+                with open(file_path, "wb") as f:
+                    f.write(data)
+                if artifact is None:
+                    zipf.writestr(name, data)
+                bytes_written += len(data)
+                manifest_entries.append(file_entry(name, data, time.time()))
+
+            # Build log and manifest are written incrementally elsewhere; snapshot them into the zip
+            metadata_bytes = 0
+            for name in BUILD_METADATA_FILES:
+                metadata_path = os.path.join(project_path, name)
+                if name not in files and os.path.exists(metadata_path):
+                    zipf.write(metadata_path, name)
+                    metadata_bytes += os.path.getsize(metadata_path)
+        file_manifest = write_file_manifest(project_path, manifest_entries)
+        write_seconds = time.perf_counter() - write_start
+
+        # Content hash for the download's strong ETag, persisted next to the zip
+        zip_sha256 = content_hashes.record(zip_path)
+
+        mmry_thread.join()
+        if mmry_error:
+            raise mmry_error[0]
+        mmry_seconds = mmry_result.pop("_seconds", 0.0)
+
+        zip_size = os.path.getsize(zip_path)
+        return {
+            "mmry_storage": mmry_result,
+            "build_version": file_manifest["build_version"],
+            "zip_sha256": zip_sha256,
+            "stats": {
+                "files": len(files),
+                "content_bytes": bytes_written,
+                "zip_bytes": zip_size,
+                # The walk-based finalization re-read every file twice (MMRY and zip)
+                "bytes_read": metadata_bytes,
+                "bytes_read_saved": 2 * bytes_written,
+                "write_and_zip_seconds": write_seconds,
+                "mmry_seconds": mmry_seconds,
+                "precomputed_artifact": artifact is not None,
+                "finalize_seconds": time.perf_counter() - start
+            }
+        }
+
+    def write_files(self, project_path: str, files: Dict[str, str]) -> List[str]:
+        """Write files and the file manifest only (used when a build fails before finalization)"""
+        written = []
+        manifest_entries = []
+        for name, content in files.items():
+            data = content.encode("utf-8")
+            file_path = os.path.join(project_path, name)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            written.append(file_path)
+            manifest_entries.append(file_entry(name, data, time.time()))
+        write_file_manifest(project_path, manifest_entries)
+        return written
+
+    def _store(self, user_id: str, project_id: str, project_files: List[Dict[str, Any]]) -> Dict[str, Any]:
+        store_func = self.store_func
+        if store_func is None:
+            from mmry_workflow_service import mmry_workflow_service
+            store_func = mmry_workflow_service.store_project_files
+        return store_func(user_id=user_id, project_id=project_id, project_files=project_files)
+
+
+def legacy_finalize(project_path: str, zip_path: str, files: Dict[str, str],
+                    store_func: Callable[..., Dict[str, Any]], user_id: str, project_id: str) -> Dict[str, Any]:
+    """The previous write / walk+read / walk+zip sequence, kept for benchmarking"""
+    start = time.perf_counter()
+    for filename, content in files.items():
+        file_path = os.path.join(project_path, filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(content)
+
+    bytes_read = 0
+    project_files = []
+    for root, _, filenames in os.walk(project_path):
+        for filename in filenames:
+            abs_path = os.path.join(root, filename)
+            with open(abs_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            bytes_read += len(content.encode("utf-8"))
+            project_files.append({"name": os.path.relpath(abs_path, project_path), "content": content, "type": "text"})
+    store_func(user_id=user_id, project_id=project_id, project_files=project_files)
+
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        for root, _, filenames in os.walk(project_path):
+            for filename in filenames:
+                abs_path = os.path.join(root, filename)
+                zipf.write(abs_path, os.path.relpath(abs_path, project_path))
+                bytes_read += os.path.getsize(abs_path)
+
+    return {"bytes_read": bytes_read, "zip_bytes": os.path.getsize(zip_path),
+            "finalize_seconds": time.perf_counter() - start}
+
+
+# Benchmark finalization of a 50-file project
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    import statistics
+    from template_manager import TemplateManager
+    from mmry_pack_storage import MMRYPackStorage
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    files = TemplateManager().render_template("ecommerce_advanced", "Benchmark Store", ["Cart", "Checkout"])
+    component = next(content for name, content in files.items() if name.startswith("src/components/"))
+    i = 0
+    while len(files) < 50:
+        files[f"src/components/generated/Widget{i}.jsx"] = component.replace("export default function ",
+                                                                             f"export default function W{i}")
+        i += 1
+    total = sum(len(c.encode("utf-8")) for c in files.values())
+
+    print(f"=== Build finalization: {len(files)} files, {total:,} bytes ===\n")
+    print("MMRY stage uses MMRYPackStorage here so the benchmark runs without the neural folding dependencies\n")
+
+    legacy_times, new_times = [], []
+    for run in range(5):
+        root = tempfile.mkdtemp()
+        store = MMRYPackStorage(os.path.join(root, "mmry"), pack_threshold=1 << 30)
+
+        def store_func(user_id, project_id, project_files):
+            return {"stored": len(store.store_files(user_id, project_id, project_files))}
+
+        legacy_dir = os.path.join(root, "legacy")
+        os.makedirs(legacy_dir)
+        legacy = legacy_finalize(legacy_dir, os.path.join(root, "legacy.zip"), files, store_func, "bench", f"legacy{run}")
+
+        new_dir = os.path.join(root, "new")
+        os.makedirs(new_dir)
+        result = BuildFinalizer(store_func).finalize(new_dir, os.path.join(root, "new.zip"), files, "bench", f"new{run}")
+
+        legacy_times.append(legacy["finalize_seconds"])
+        new_times.append(result["stats"]["finalize_seconds"])
+        shutil.rmtree(root)
+
+    stats = result["stats"]
+    print(f"{'':<22}{'walk-based':>14}{'single-pass':>14}")
+    print(f"{'Bytes re-read':<22}{legacy['bytes_read']:>14,}{stats['bytes_read']:>14,}")
+    print(f"{'Zip size':<22}{legacy['zip_bytes']:>14,}{stats['zip_bytes']:>14,}")
+    print(f"{'Finalize (median ms)':<22}{statistics.median(legacy_times) * 1000:>14.2f}"
+          f"{statistics.median(new_times) * 1000:>14.2f}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: build_logger.py
+# Description: Buffered per-build log writer and coalesced atomic manifest writes
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, Callable
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class BuildLogger:
+    """
+    Per-build log writer for build.log
+
+    The file is opened once and written through a buffer; records reach disk when
+    a milestone is logged, when the buffer fills, or on close. An optional
+    listener is called with (text, offset) for every write, before it reaches
+    disk; live readers follow the build through it (see build_events).
+    """
+
+    def __init__(self, log_path: str, mode: str = "a", buffer_size: int = 64 * 1024,
+                 listener: Optional[Callable[[str, int], None]] = None):
+        self.log_path = log_path
+        self.listener = listener
+        self._lock = threading.Lock()
+        self._file = open(log_path, mode, encoding="utf-8", buffering=buffer_size)
+        self._offset = self._file.tell()
+        self.records_written = 0
+        self.flushes = 0
+
+    def write(self, text: str, milestone: bool = False):
+        """Append text (one or more lines); milestones are flushed to disk immediately"""
+        with self._lock:
+            self._file.write(text)
+            if self.listener:
+                self.listener(text, self._offset)
+            self._offset += len(text.encode("utf-8"))
+            self.records_written += 1
+            if milestone:
+                self._file.flush()
+                self.flushes += 1
+
+    def milestone(self, text: str):
+        self.write(text, milestone=True)
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+            self.flushes += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ManifestWriter:
+    """
+    Coalesces build_manifest.json updates
+
+    Changes are applied to the in-memory manifest and written at most once per
+    min_interval; flush(force=True) writes immediately (status transitions).
+    Writes go to a temp file and are renamed into place, so readers never see
+    a half-written manifest.
+    """
+
+    def __init__(self, manifest_path: str, manifest: Optional[Dict[str, Any]] = None,
+                 min_interval: float = 1.0):
+        self.manifest_path = manifest_path
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._dirty = False
+        self.writes = 0
+
+        if manifest is None:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        else:
+            self._dirty = True
+        self.manifest = manifest
+
+    def update(self, **fields):
+        """Set top-level manifest fields and write if the rate limit allows"""
+        with self._lock:
+            self.manifest.update(fields)
+            self._dirty = True
+        self.flush()
+
+    def mark_dirty(self):
+        """Call after mutating nested structures in self.manifest directly"""
+        with self._lock:
+            self._dirty = True
+
+    def flush(self, force: bool = False) -> bool:
+        """Write the manifest if it changed; returns True when a write happened"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            if not force and time.monotonic() - self._last_write < self.min_interval:
+                return False
+
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+            self._last_write = time.monotonic()
+            self._dirty = False
+            self.writes += 1
+            return True
+
+
+def read_proc_io() -> Dict[str, int]:
+    """This process's I/O counters (syscr/syscw = read/write syscalls); empty off Linux"""
+    counters = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+# Compare syscalls for a build's log and manifest traffic, before and after
+if __name__ == "__main__":
+    import builtins
+    import tempfile
+
+    GENERATED_FILES = 50
+    STATUS_LINES = 20
+
+    def legacy_build(project_path: str):
+        log_path = os.path.join(project_path, "build.log")
+        manifest_path = os.path.join(project_path, "build_manifest.json")
+        manifest = {"status": "initializing", "files_generated": [], "errors": []}
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        for status in ("generating", "complete"):
+            manifest["status"] = status
+            for i in range(STATUS_LINES // 2):
+                with open(log_path, "a") as logf:
+                    logf.write(f"Status line {i} while {status}\n")
+            if status == "generating":
+                for i in range(GENERATED_FILES):
+                    manifest["files_generated"].append(f"src/file{i}.jsx")
+                    with open(log_path, "a") as logf:
+                        logf.write(f"Generated: src/file{i}.jsx\n")
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+
+    def buffered_build(project_path: str):
+        log_path = os.path.join(project_path, "build.log")
+        manifest_path = os.path.join(project_path, "build_manifest.json")
+        manifest = ManifestWriter(manifest_path, {"status": "initializing", "files_generated": [], "errors": []})
+        manifest.flush(force=True)
+        with BuildLogger(log_path) as build_log:
+            for status in ("generating", "complete"):
+                manifest.update(status=status)
+                for i in range(STATUS_LINES // 2):
+                    build_log.write(f"Status line {i} while {status}\n")
+                if status == "generating":
+                    for i in range(GENERATED_FILES):
+                        manifest.manifest["files_generated"].append(f"src/file{i}.jsx")
+                        build_log.write(f"Generated: src/file{i}.jsx\n")
+                    manifest.mark_dirty()
+                build_log.milestone(f"Milestone: {status}\n")
+                manifest.flush(force=True)
+
+    def measure(build) -> Dict[str, int]:
+        opens = [0]
+        real_open = builtins.open
+
+        def counting_open(*args, **kwargs):
+            opens[0] += 1
+            return real_open(*args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as project_path:
+            before = read_proc_io()
+            builtins.open = counting_open
+            try:
+                build(project_path)
+            finally:
+                builtins.open = real_open
+                after = read_proc_io()
+        return {
+            "opens": opens[0],
+            "write_syscalls": after.get("syscw", 0) - before.get("syscw", 0),
+            "read_syscalls": after.get("syscr", 0) - before.get("syscr", 0)
+        }
+
+    print(f"=== Build log/manifest syscalls ({GENERATED_FILES} files, {STATUS_LINES} status lines) ===\n")
+    legacy = measure(legacy_build)
+    buffered = measure(buffered_build)
+    print(f"{'':<18}{'per-line open':>15}{'buffered':>12}")
+    for key in ("opens", "write_syscalls", "read_syscalls"):
+        print(f"{key:<18}{legacy[key]:>15}{buffered[key]:>12}")
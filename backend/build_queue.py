@@ -0,0 +1,552 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: build_queue.py
+# Description: Durable SQLite build queue and worker process pool for project builds
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+The API enqueues a build and returns immediately; worker processes claim jobs,
+run ProjectGenerator.execute_build and report back.
+
+- Jobs are ordered by priority, then submission order
+- At most `per_user_limit` jobs per user run at once
+- Failed builds are retried with exponential backoff up to `max_attempts`;
+  each attempt rebuilds from scratch
+- Running jobs hold a lease renewed by a heartbeat; if a worker dies the lease
+  expires and the job is picked up again (or failed once its attempts are used
+  up), so queue state survives restarts
+- Only the lease owner can complete or fail a job; a worker that loses its
+  lease exits rather than keep building a job another worker now owns
+
+Usage:
+    python build_queue.py worker [--workers N]   # standalone worker pool
+    python build_queue.py stats
+    python build_queue.py benchmark
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import importlib
+import ipaddress
+import threading
+import multiprocessing
+from typing import Dict, Any, Optional, List, Callable, Mapping
+
+import build_events
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = os.environ.get("BUILD_QUEUE_DB", "build_queue.db")
+FINISHED_STATUSES = {"succeeded", "failed", "cancelled"}
+
+# Peers allowed to report the client address (the nginx front end on the Docker network)
+TRUSTED_PROXIES = os.environ.get("BUILD_TRUSTED_PROXIES",
+                                 "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16")
+
+
+def client_address(peer: Optional[str], headers: Mapping[str, str], trusted_proxies: str = TRUSTED_PROXIES) -> str:
+    """
+    The client address a request's builds are limited by
+
+    Behind nginx every peer is the proxy, so the address comes from X-Real-IP
+    (or the last X-Forwarded-For hop, the one the proxy added), but only when
+    the peer is a trusted proxy; from anyone else those headers are ignored.
+    """
+    try:
+        peer_ip = ipaddress.ip_address(peer) if peer else None
+    except ValueError:
+        peer_ip = None
+    networks = [ipaddress.ip_network(n.strip(), strict=False) for n in trusted_proxies.split(",") if n.strip()]
+    if peer_ip is not None and any(peer_ip in network for network in networks):
+        forwarded = headers.get("x-real-ip") or (headers.get("x-forwarded-for") or "").split(",")[-1]
+        if forwarded.strip():
+            return forwarded.strip()
+    return peer or "anonymous"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS build_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT,
+    state TEXT NOT NULL DEFAULT '{}',
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_build_jobs_claim ON build_jobs (status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_build_jobs_user ON build_jobs (user_id, status);
+CREATE INDEX IF NOT EXISTS idx_build_jobs_project ON build_jobs (project_id);
+"""
+
+
+class BuildQueue:
+    """
+    SQLite-backed build job queue, safe to share between processes
+
+    Each thread gets its own connection; claims run inside BEGIN IMMEDIATE so two
+    workers can never take the same job.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_PATH, per_user_limit: Optional[int] = None,
+                 lease_seconds: float = 60.0, backoff_base: float = 5.0, backoff_max: float = 300.0):
+        self.db_path = db_path
+        self.per_user_limit = per_user_limit or int(os.environ.get("BUILD_USER_CONCURRENCY", "2"))
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, project_id: str, user_id: str = "default_user", priority: int = 0,
+                max_attempts: int = 3, state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Add a build job; returns the job record"""
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO build_jobs (project_id, user_id, priority, max_attempts, available_at, created_at, state) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (project_id, user_id, priority, max_attempts, now, now, json.dumps(state or {}))
+        )
+        return {"job_id": cursor.lastrowid, "project_id": project_id, "user_id": user_id,
+                "priority": priority, "status": "queued"}
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the next runnable job, or None
+
+        Runnable means queued and past its backoff, or running with an expired
+        lease (its worker died) and attempts left; an expired job without attempts
+        left is failed. Users already at their concurrency limit are skipped.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE build_jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, "
+                "last_error = 'lease expired (worker died) on the last attempt' "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts", (now, now)
+            )
+            conn.execute(
+                "UPDATE build_jobs SET status = 'queued', lease_owner = NULL, "
+                "last_error = 'lease expired (worker died)' "
+                "WHERE status = 'running' AND lease_expires < ?", (now,)
+            )
+            row = conn.execute(
+                "SELECT * FROM build_jobs AS j WHERE j.status = 'queued' AND j.available_at <= ? "
+                "AND (SELECT COUNT(*) FROM build_jobs AS r WHERE r.user_id = j.user_id "
+                "     AND r.status = 'running') < ? "
+                "ORDER BY j.priority DESC, j.id LIMIT 1",
+                (now, self.per_user_limit)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE build_jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (worker_id, now + self.lease_seconds, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        job = self._row_to_job(row)
+        job["status"] = "running"
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend a running job's lease; False if the job is no longer ours"""
+        cursor = self._conn().execute(
+            "UPDATE build_jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def save_state(self, job_id: int, state: Dict[str, Any]):
+        """Replace the job's state (its enqueue-time inputs plus the current attempt's worker and start time)"""
+        self._conn().execute("UPDATE build_jobs SET state = ? WHERE id = ?", (json.dumps(state), job_id))
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a job succeeded; False (and no change) if worker_id no longer holds its lease"""
+        cursor = self._conn().execute(
+            "UPDATE build_jobs SET status = 'succeeded', finished_at = ?, lease_owner = NULL, result = ? "
+            "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (time.time(), json.dumps(result or {}), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> str:
+        """
+        Record a failed attempt; requeue with backoff or mark failed. Returns the new
+        status, or "lost" (no change) if worker_id no longer holds the job's lease
+        """
+        conn = self._conn()
+        row = conn.execute("SELECT attempts, max_attempts FROM build_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return "missing"
+
+        now = time.time()
+        if row["attempts"] < row["max_attempts"]:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (row["attempts"] - 1)))
+            delay *= random.uniform(0.8, 1.2)
+            cursor = conn.execute(
+                "UPDATE build_jobs SET status = 'queued', available_at = ?, lease_owner = NULL, last_error = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'", (now + delay, error, job_id, worker_id)
+            )
+            status = "queued"
+        else:
+            cursor = conn.execute(
+                "UPDATE build_jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, last_error = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'", (now, error, job_id, worker_id)
+            )
+            status = "failed"
+        return status if cursor.rowcount == 1 else "lost"
+
+    def cancel(self, project_id: str) -> int:
+        """Cancel queued jobs for a project; running jobs are left to finish"""
+        cursor = self._conn().execute(
+            "UPDATE build_jobs SET status = 'cancelled', finished_at = ? WHERE project_id = ? AND status = 'queued'",
+            (time.time(), project_id)
+        )
+        return cursor.rowcount
+
+    def get_job(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Latest job for a project, with its position in the queue when still waiting"""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT * FROM build_jobs WHERE project_id = ? ORDER BY id DESC LIMIT 1", (project_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job = self._row_to_job(row)
+        if job["status"] == "queued":
+            job["queue_position"] = conn.execute(
+                "SELECT COUNT(*) FROM build_jobs WHERE status = 'queued' AND "
+                "(priority > ? OR (priority = ? AND id < ?))",
+                (job["priority"], job["priority"], job["job_id"])
+            ).fetchone()[0] + 1
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM build_jobs GROUP BY status").fetchall()
+        counts = {row["status"]: row["n"] for row in rows}
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "succeeded": counts.get("succeeded", 0),
+            "failed": counts.get("failed", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "per_user_limit": self.per_user_limit
+        }
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["job_id"] = job.pop("id")
+        job["state"] = json.loads(job["state"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+# Build targets run inside worker processes
+
+_project_generator = None
+
+
+def run_project_build(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Default build target: ProjectGenerator.execute_build, one generator per worker process"""
+    global _project_generator
+    if _project_generator is None:
+        from project_generator import ProjectGenerator
+        _project_generator = ProjectGenerator(projects_dir=os.environ.get("PROJECTS_DIR", "generated_projects"))
+    return _project_generator.execute_build(job["project_id"], attempt=job["attempts"],
+                                            final_attempt=job["attempts"] >= job["max_attempts"])
+
+
+def _simulated_build(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Benchmark target: waiting on the LLM, then pure-Python work (folding, manifests) and zlib"""
+    time.sleep(float(os.environ.get("BUILD_SIM_IO_SECONDS", "0.1")))
+    content = f"export default function Page{job['project_id']}() {{ return <div/>; }}\n" * 20000
+    folded = "".join(ch for ch in content if ch != " ")
+    import zlib
+    zlib.compress(folded.encode("utf-8") * 5, 9)
+    return {"status": "complete", "project_id": job["project_id"]}
+
+
+def _probe_request() -> float:
+    """A cheap status-style handler; its latency shows how starved request handling is"""
+    start = time.perf_counter()
+    json.loads(json.dumps({"project_id": "1", "status": "generating", "files_generated": list(range(50))}))
+    return time.perf_counter() - start
+
+
+def _resolve_target(target: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+# Exit code of a worker that lost its lease mid-build; the pool starts a replacement
+EXIT_LEASE_LOST = 3
+
+
+def _abort_lost_build(job: Dict[str, Any], worker_id: str):
+    # The build runs synchronously on the main thread and cannot be interrupted; exiting
+    # stops it from writing into a project that another worker is now building
+    logger.error(f"Worker {worker_id} lost the lease on build {job['project_id']}; aborting")
+    os._exit(EXIT_LEASE_LOST)
+
+
+def _worker_main(db_path: str, worker_id: str, target: str, stop_event, poll_interval: float,
+                 event_queue=None, on_lease_lost: Callable[[Dict[str, Any], str], None] = _abort_lost_build):
+    queue = BuildQueue(db_path)
+    build = _resolve_target(target)
+    if event_queue is not None:
+        build_events.set_relay_queue(event_queue)
+    logger.info(f"Build worker {worker_id} started (pid {os.getpid()})")
+
+    while not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        # Renew the lease while the (synchronous) build runs
+        done = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            while not done.wait(queue.lease_seconds / 3):
+                if not queue.heartbeat(job["job_id"], worker_id):
+                    lost.set()
+                    on_lease_lost(job, worker_id)
+                    return
+
+        heartbeat_thread = threading.Thread(target=beat, daemon=True)
+        heartbeat_thread.start()
+        build_events.publish_build_event(job["project_id"], "queue", {"status": "running", "attempt": job["attempts"],
+                                                                      "worker": worker_id})
+
+        try:
+            queue.save_state(job["job_id"], dict(job["state"], worker=worker_id, attempt=job["attempts"],
+                                                 attempt_started=time.time()))
+            result = build(job) or {}
+            if result.get("status") == "failed":
+                status = queue.fail(job["job_id"], worker_id, result.get("error", "build failed"))
+                logger.warning(f"Build {job['project_id']} failed on attempt {job['attempts']}, now {status}")
+            else:
+                status = "succeeded" if queue.complete(job["job_id"], worker_id, result) else "lost"
+        except Exception as e:
+            status = queue.fail(job["job_id"], worker_id, str(e))
+            logger.error(f"Build {job['project_id']} raised {e} on attempt {job['attempts']}, now {status}")
+        finally:
+            done.set()
+            heartbeat_thread.join()
+        if status == "lost" or lost.is_set():
+            # Another worker owns the job now; its events are the ones that count
+            logger.warning(f"Build {job['project_id']} result discarded: lease lost")
+            continue
+        build_events.publish_build_event(job["project_id"], "queue", {"status": status, "attempt": job["attempts"]})
+
+    logger.info(f"Build worker {worker_id} stopped")
+
+
+class BuildWorkerPool:
+    """
+    N worker processes draining a BuildQueue
+
+    With an event_bus, build events published inside the workers are relayed
+    to that bus in this process (for /events streaming).
+    """
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_PATH, workers: Optional[int] = None,
+                 target: str = "build_queue:run_project_build", poll_interval: float = 0.5,
+                 event_bus: Optional[build_events.BuildEventBus] = None):
+        self.db_path = db_path
+        self.workers = workers if workers is not None else int(os.environ.get("BUILD_WORKERS", "2"))
+        self.target = target
+        self.poll_interval = poll_interval
+        # Spawn rather than fork: the API process runs threads and holds sockets
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._processes: List[multiprocessing.Process] = []
+        self._supervisor: Optional[threading.Thread] = None
+        self._events = self._ctx.Queue(maxsize=10000) if event_bus is not None else None
+        self._relay = build_events.BuildEventRelay(self._events, event_bus) if event_bus is not None else None
+
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.db_path, f"{os.getpid()}-{index}-{int(time.time() * 1000)}", self.target, self._stop,
+                  self.poll_interval, self._events),
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def start(self):
+        if self._relay:
+            self._relay.start()
+        self._processes = [self._spawn(i) for i in range(self.workers)]
+        self._supervisor = threading.Thread(target=self._supervise, name="build-worker-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info(f"Started {self.workers} build workers on {self.db_path}")
+
+    def _supervise(self):
+        """Replace workers that exited (lease lost, crash, OOM kill) until the pool stops"""
+        while not self._stop.wait(1.0):
+            for i, process in enumerate(self._processes):
+                if not process.is_alive() and not self._stop.is_set():
+                    logger.warning(f"Build worker {i} exited with {process.exitcode}; starting a replacement")
+                    self._processes[i] = self._spawn(i)
+
+    def stop(self, timeout: float = 30.0):
+        self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._relay:
+            self._relay.stop()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_benchmark(submissions: int = 20, workers: int = 4):
+    """
+    Compare builds run inside the API process with enqueue + worker pool
+
+    Probe requests run throughout each scenario; their p99 is the request
+    latency other users see while the builds are in flight.
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    print(f"=== Build queue benchmark: {submissions} concurrent submissions ===\n")
+
+    def probe_until(done: threading.Event) -> List[float]:
+        # A request "arrives" every 5 ms; latency counts waiting for the GIL plus handling
+        samples = []
+        while not done.is_set():
+            arrival = time.perf_counter() + 0.005
+            time.sleep(0.005)
+            _probe_request()
+            samples.append(time.perf_counter() - arrival)
+        return samples
+
+    # Before: builds run in the API process's thread pool, as BackgroundTasks does
+    done = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as prober:
+        probes = prober.submit(probe_until, done)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=submissions) as executor:
+            submit_latencies = list(executor.map(lambda i: _timed(lambda: None), range(submissions)))
+            list(executor.map(lambda i: _simulated_build({"project_id": str(i)}), range(submissions)))
+        inline_elapsed = time.perf_counter() - start
+        done.set()
+        inline_probes = probes.result()
+
+    print(f"In-process builds:  submit p99 {_percentile(submit_latencies, 99) * 1000:7.2f} ms   "
+          f"probe p99 {_percentile(inline_probes, 99) * 1000:7.2f} ms   "
+          f"{submissions / inline_elapsed * 60:6.1f} builds/min")
+
+    # After: the API only enqueues; worker processes run the builds
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queue.db")
+        queue = BuildQueue(db_path, per_user_limit=workers)
+        pool = BuildWorkerPool(db_path, workers=workers, target="build_queue:_simulated_build", poll_interval=0.05)
+        pool.start()
+        time.sleep(1.0)  # let workers finish importing
+
+        done = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as prober:
+            probes = prober.submit(probe_until, done)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=submissions) as executor:
+                submit_latencies = list(executor.map(
+                    lambda i: _timed(lambda: queue.enqueue(str(i), user_id=f"user{i % 5}")), range(submissions)))
+
+            while queue.stats()["succeeded"] < submissions:
+                time.sleep(0.05)
+            queued_elapsed = time.perf_counter() - start
+            done.set()
+            queued_probes = probes.result()
+        pool.stop()
+
+    print(f"Queued builds:      submit p99 {_percentile(submit_latencies, 99) * 1000:7.2f} ms   "
+          f"probe p99 {_percentile(queued_probes, 99) * 1000:7.2f} ms   "
+          f"{submissions / queued_elapsed * 60:6.1f} builds/min ({workers} workers)")
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Squadbox build queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker_parser = sub.add_parser("worker", help="Run a standalone worker pool")
+    worker_parser.add_argument("--workers", type=int, default=None)
+    worker_parser.add_argument("--db", default=DEFAULT_QUEUE_PATH)
+    stats_parser = sub.add_parser("stats", help="Print queue counts")
+    stats_parser.add_argument("--db", default=DEFAULT_QUEUE_PATH)
+    bench_parser = sub.add_parser("benchmark", help="Inline vs queued build benchmark")
+    bench_parser.add_argument("--submissions", type=int, default=20)
+    bench_parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        pool = BuildWorkerPool(args.db, workers=args.workers)
+        pool.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pool.stop()
+    elif args.command == "stats":
+        print(json.dumps(BuildQueue(args.db).stats(), indent=2))
+    else:
+        run_benchmark(args.submissions, args.workers)
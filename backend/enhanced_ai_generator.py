@@ -13,16 +13,24 @@ import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from llm_provider import LLMProvider
+from file_block_parser import extract_file_blocks
+from prompt_builder import PromptBuilder, PromptStats
+from fallback_artifacts import fallback_artifacts
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stands in for the project name in the shared fallback landing page template
+PROJECT_NAME_SLOT = "__SQUADBOX_PROJECT_NAME__"
+
 class EnhancedAIGenerator:
     """Enhanced AI code generator with quality-focused prompts"""
     
     def __init__(self, api_key=None, provider_type="openai"):
         self.llm = LLMProvider.create(provider_type, api_key=api_key)
         logger.info(f"Initialized EnhancedAIGenerator with {self.llm.__class__.__name__}")
+        self.prompt_builder = PromptBuilder()
+        self.last_prompt_stats: Optional[PromptStats] = None
     
     def generate_landing_page(self, requirements: List[str], project_name: str) -> Dict[str, str]:
         """Generate a high-quality landing page"""
@@ -65,13 +73,7 @@ REQUIRED FILES:
 Format: FILE: filename.ext followed by complete code in triple backticks."""
 
             # Enhanced user prompt
-            user_prompt = f"""
-Generate a stunning, professional landing page for: {project_name}
-
-Requirements:
-{chr(10).join([f"• {req}" for req in requirements])}
-
-CRITICAL INSTRUCTIONS:
+            instructions = """CRITICAL INSTRUCTIONS:
 1. Create a COMPLETE, FUNCTIONAL landing page
 2. Include ALL sections mentioned in requirements
 3. Use modern, professional design
@@ -96,8 +98,14 @@ DESIGN ELEMENTS TO INCLUDE:
 
 The landing page must be immediately viewable and professional-looking!"""
 
+            # Static instructions first so the prompt prefix is the same for every project
+            user_prompt = f"""Generate a stunning, professional landing page for: {project_name}
+
+Requirements:
+{chr(10).join([f"• {req}" for req in requirements])}"""
+
             # Generate the code
-            response = self._call_llm_api(system_prompt, user_prompt)
+            response = self._call_llm_api(system_prompt, user_prompt, instructions)
             files = self._extract_files_from_response(response)
             
             # Add project manifest
@@ -121,13 +129,7 @@ The landing page must be immediately viewable and professional-looking!"""
         try:
             system_prompt = self._get_enhanced_system_prompt(project_type)
             
-            user_prompt = f"""
-Generate a complete, professional {project_type} project: {project_name}
-
-Requirements:
-{chr(10).join([f"• {req}" for req in requirements])}
-
-QUALITY REQUIREMENTS:
+            instructions = """QUALITY REQUIREMENTS:
 1. Production-ready code with best practices
 2. Modern frameworks and libraries
 3. Responsive design for all devices
@@ -145,7 +147,12 @@ TECHNICAL REQUIREMENTS:
 
 Generate ALL necessary files for a complete, functional project."""
 
-            response = self._call_llm_api(system_prompt, user_prompt)
+            user_prompt = f"""Generate a complete, professional {project_type} project: {project_name}
+
+Requirements:
+{chr(10).join([f"• {req}" for req in requirements])}"""
+
+            response = self._call_llm_api(system_prompt, user_prompt, instructions)
             files = self._extract_files_from_response(response)
             
             # Add project manifest
@@ -214,16 +221,14 @@ Generate ALL necessary files for a complete, functional project."""
         
         return prompts.get(project_type, prompts["landing_page"])
     
-    def _call_llm_api(self, system_prompt: str, user_prompt: str) -> str:
-        """Call the LLM API with enhanced prompts"""
+    def _call_llm_api(self, system_prompt: str, user_prompt: str, instructions: str = "") -> str:
+        """Call the LLM API with enhanced prompts (compacted, static instructions before user_prompt)"""
         try:
-            # Use a more specific model for better quality
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                max_tokens=4000,
-                temperature=0.3  # Lower temperature for more consistent quality
-            )
+            prompt = self.prompt_builder.build(system_prompt, instructions, user_prompt)
+            self.last_prompt_stats = PromptStats()
+            self.last_prompt_stats.record_built(prompt)
+            # Provider settings (model, max_tokens, temperature) come from its environment
+            response = self.llm.generate_completion(prompt.system, prompt.user)
             return response
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
@@ -231,33 +236,28 @@ Generate ALL necessary files for a complete, functional project."""
     
     def _extract_files_from_response(self, response: str) -> Dict[str, str]:
         """Extract files from LLM response"""
-        files = {}
-        current_file = None
-        current_content = []
-        
-        lines = response.split('\n')
-        for line in lines:
-            if line.startswith('FILE:'):
-                # Save previous file
-                if current_file and current_content:
-                    files[current_file] = '\n'.join(current_content)
-                
-                # Start new file
-                current_file = line.replace('FILE:', '').strip()
-                current_content = []
-            elif line.startswith('```'):
-                continue
-            elif current_file:
-                current_content.append(line)
-        
-        # Save last file
-        if current_file and current_content:
-            files[current_file] = '\n'.join(current_content)
-        
-        return files
+        # Lenient: also takes bodies the model left unfenced
+        return extract_file_blocks(response, lenient=True)
     
     def _generate_fallback_landing_page(self, project_name: str, requirements: List[str]) -> Dict[str, str]:
         """Generate a fallback landing page if AI generation fails"""
+        # The template is built once; the name is filled in per call, so every project shares one entry
+        template = fallback_artifacts.get(
+            ("enhanced_landing_page",),
+            lambda: self._build_fallback_landing_page(PROJECT_NAME_SLOT)).files
+        files = {name: content.replace(PROJECT_NAME_SLOT, project_name) for name, content in template.items()}
+        files["project_manifest.json"] = json.dumps({
+            "project_type": "landing_page",
+            "project_name": project_name,
+            "requirements": requirements,
+            "files_generated": list(template),
+            "quality_score": "fallback",
+            "build_status": "complete",
+            "note": "Fallback landing page generated due to AI generation failure"
+        }, indent=2)
+        return files
+    
+    def _build_fallback_landing_page(self, project_name: str) -> Dict[str, str]:
         return {
             "index.html": f"""<!DOCTYPE html>
 <html lang="en">
@@ -580,17 +580,7 @@ Edit the HTML, CSS, and JavaScript files to customize the landing page for your
 - Modern web browser
 - No additional dependencies required
 
-Generated by SquadBox Enhanced AI Generator""",
-            
-            "project_manifest.json": json.dumps({
-                "project_type": "landing_page",
-                "project_name": project_name,
-                "requirements": requirements,
-                "files_generated": ["index.html", "styles.css", "script.js", "README.md"],
-                "quality_score": "fallback",
-                "build_status": "complete",
-                "note": "Fallback landing page generated due to AI generation failure"
-            }, indent=2)
+Generated by SquadBox Enhanced AI Generator"""
         }
     
     def _generate_fallback_project(self, project_type: str, project_name: str, requirements: List[str]) -> Dict[str, str]:
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: fallback_artifacts.py
+# Description: Fallback projects built once and served as ready file maps, zips and MMRY pack payloads
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+With forced fallback generation every build is a fallback build, and each one
+rebuilt the same canned HTML/CSS/JS strings, parsed them back into files, and
+then deflated them for the zip and the MMRY pack again.
+
+FallbackArtifactCache builds a fallback once per key (project type plus any
+parameters that shape the files) into a FallbackArtifact:
+- files: the read-only file map (callers get a copy from files());
+- zip_bytes: the files already deflated into a zip, which BuildFinalizer
+  copies and then appends the build log and manifest to;
+- pack_payloads: each file encoded for the MMRY pack tier, which
+  MMRYPackStorage stores as is.
+Entries past FALLBACK_ARTIFACT_CACHE_SIZE are evicted least recently used
+first. Key on the template, not on per-build values such as the project
+name: a key that changes every build misses every time and pays for the
+zip and MMRY encoding without ever reusing them.
+"""
+
+import io
+import os
+import time
+import zipfile
+import logging
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Mapping, NamedTuple, Optional, Tuple
+
+from mmry_pack_storage import encode_pack_payload
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class FallbackArtifact(NamedTuple):
+    key: Hashable
+    files: Mapping[str, str]                        # read-only
+    zip_bytes: bytes                                # DEFLATE zip of files, in file order
+    pack_payloads: Dict[str, Tuple[str, bytes, str]]  # name -> (codec setting, payload, codec)
+    build_seconds: float
+
+    def matches(self, files: Dict[str, str]) -> bool:
+        """True if files is exactly this artifact's file map, in the same order"""
+        return len(files) == len(self.files) and all(
+            name == own_name and (content is own or content == own)
+            for (name, content), (own_name, own) in zip(files.items(), self.files.items()))
+
+
+def build_artifact(key: Hashable, files: Dict[str, str], compresslevel: int = 6,
+                   codec: str = "zlib-dict") -> FallbackArtifact:
+    """Encode, zip and MMRY-encode a file map once"""
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    pack_payloads = {}
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        for name, content in files.items():
+            data = content.encode("utf-8")
+            zipf.writestr(name, data)
+            pack_payloads[name] = (codec, *encode_pack_payload(data, codec))
+    return FallbackArtifact(key, MappingProxyType(dict(files)), buffer.getvalue(), pack_payloads,
+                            time.perf_counter() - start)
+
+
+class FallbackArtifactCache:
+    """Fallback artifacts keyed by project type and parameters, each built once"""
+
+    def __init__(self, max_entries: Optional[int] = None, compresslevel: int = 6, codec: str = "zlib-dict"):
+        self.max_entries = max_entries or int(os.environ.get("FALLBACK_ARTIFACT_CACHE_SIZE", "64"))
+        self.compresslevel = compresslevel
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self._artifacts: "OrderedDict[Hashable, FallbackArtifact]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Dict[str, str]]) -> FallbackArtifact:
+        """The artifact for key, building it with build() on first use (once, even under concurrency)"""
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is not None:
+                self._artifacts.move_to_end(key)
+                self.hits += 1
+                return artifact
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                artifact = self._artifacts.get(key)
+                if artifact is not None:
+                    self.hits += 1
+                    return artifact
+                self.misses += 1
+            try:
+                artifact = build_artifact(key, build(), self.compresslevel, self.codec)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+            with self._lock:
+                self._artifacts[key] = artifact
+                while len(self._artifacts) > self.max_entries:
+                    self._artifacts.popitem(last=False)
+        logger.info(f"Built fallback artifact {key} ({len(artifact.files)} files, "
+                    f"{len(artifact.zip_bytes)} zip bytes) in {artifact.build_seconds * 1000:.1f} ms")
+        return artifact
+
+    def files(self, key: Hashable, build: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """A fresh, mutable copy of the artifact's file map"""
+        return dict(self.get(key, build).files)
+
+    def clear(self):
+        with self._lock:
+            self._artifacts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._artifacts), "hits": self.hits, "misses": self.misses}
+
+
+# Shared by the generators in this process
+fallback_artifacts = FallbackArtifactCache()
+
+
+# Benchmark: fallback build (files, zip, MMRY pack) per call vs from the precomputed artifact
+if __name__ == "__main__":
+    import ast
+    import shutil
+    import tempfile
+    import statistics
+    from pathlib import Path
+    from build_finalizer import BuildFinalizer
+    from file_block_parser import extract_file_blocks
+    from mmry_pack_storage import MMRYPackStorage
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # ai_generator needs requests at import time; compile its fallback builders on their own
+    source = (Path(__file__).parent / "ai_generator.py").read_text()
+    builders = {}
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.FunctionDef) and node.name in ("_generate_fallback_web_project",
+                                                                "_build_fallback_files"):
+            namespace = {"Dict": Dict}
+            exec(compile(ast.Module([node], []), "ai_generator.py", "exec"), namespace)
+            builders[node.name] = namespace[node.name]
+
+    def build_web() -> Dict[str, str]:
+        return extract_file_blocks(builders["_generate_fallback_web_project"](None))
+
+    root = tempfile.mkdtemp()
+    store = MMRYPackStorage(os.path.join(root, "mmry"), pack_threshold=1 << 30)
+
+    def store_func(user_id, project_id, project_files):
+        return {"stored": len(store.store_files(user_id, project_id, project_files))}
+
+    finalizer = BuildFinalizer(store_func)
+    cache = FallbackArtifactCache()
+
+    def run(label: str, precomputed: bool, runs: int = 200) -> float:
+        times = []
+        for n in range(runs):
+            project_path = os.path.join(root, f"{label}{n}")
+            os.makedirs(project_path)
+            with open(os.path.join(project_path, "build.log"), "w") as f:
+                f.write("Build started\nGenerating code with AI...\n")
+            start = time.perf_counter()
+            if precomputed:
+                artifact = cache.get(("ai_generator", "web"), build_web)
+                files = dict(artifact.files)
+            else:
+                artifact, files = None, build_web()
+            finalizer.finalize(project_path, project_path + ".zip", files, "bench", f"{label}{n}",
+                               artifact=artifact)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times) * 1000
+
+    files = build_web()
+    print(f"=== Fallback build: {len(files)} files, {sum(len(c) for c in files.values()):,} bytes, "
+          f"200 builds each ===\n")
+    print("MMRY stage uses MMRYPackStorage here so the benchmark runs without the neural folding dependencies\n")
+    per_call = run("percall", False)
+    cached = run("cached", True)
+    print(f"{'':<28}{'median ms/build':>16}")
+    print(f"{'strings + parse per call':<28}{per_call:>16.3f}")
+    print(f"{'precomputed artifact':<28}{cached:>16.3f}")
+    print(f"\nartifact built once in {cache.get(('ai_generator', 'web'), build_web).build_seconds * 1000:.2f} ms; "
+          f"cache {cache.stats()}")
+    shutil.rmtree(root)
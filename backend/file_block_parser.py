@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: file_block_parser.py
+# Description: Single-pass incremental parser for FILE:/code-fence blocks in LLM output
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+The generation prompts ask the model for
+
+    FILE: path/to/file.ext
+    ```lang
+    contents
+    ```
+
+FileBlockParser is a line-oriented state machine: each character is looked
+at a constant number of times, chunks can split lines (or fences) anywhere,
+and a file is returned as soon as the line closing its fence arrives, so it
+can be written and pushed to the UI while the model is still generating.
+Whole responses go through the same parser (extract_file_blocks), so streamed
+and buffered extraction always agree.
+
+Rules, chosen for what models actually emit:
+- A header is a line starting with FILE: (after markdown decoration such as
+  "**", "###", "- " or "1. "); the path is its first token, without quotes,
+  backticks or a trailing colon. Blank lines may separate it from the fence,
+  and the fence may also follow the path on the header line.
+- Fences are lines starting with three or more backticks. Backticks inside a
+  line (template literals, inline code) never end a block.
+- Inside a block, a fence with a language tag (```bash in a README) opens a
+  nested fence and the next bare fence closes it; a bare fence at least as
+  long as the opening one closes the block, as does ``` ending a code line.
+- Inside an unclosed block only a bare "FILE: path" at column 0 that is
+  followed by a fence (on its line or the next non-blank one) ends the block
+  (the model forgot the closing fence) and starts the next file. Anything
+  else, such as "# FILE: app.py" in Python or "1. FILE: ..." in a README,
+  is content.
+- lenient=True also accepts "FILE path" without the colon, and content that
+  is not fenced at all (it runs until the next header or the end).
+"""
+
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FENCE = "```"
+HEADER_DECORATION = "#*->0123456789. \t"
+PATH_DECORATION = "\"'`*:,"
+
+# Parser states
+PROSE = 0           # outside any file
+HEADER = 1          # saw FILE: <path>, waiting for its fence
+BLOCK = 2           # inside a fenced file body
+UNFENCED = 3        # lenient only: body without a fence, until the next header
+
+
+def _parse_header(line: str, lenient: bool) -> Optional[Tuple[str, str]]:
+    """(path, rest of the line after the path) if the line is a FILE: header"""
+    text = line.lstrip(HEADER_DECORATION)
+    if not text.startswith("FILE"):
+        return None
+    rest = text[4:]
+    if rest.startswith(":"):
+        rest = rest[1:]
+    elif not (lenient and rest[:1] in (" ", "\t")):
+        return None
+
+    fence_at = rest.find(FENCE)
+    tail = rest[fence_at:] if fence_at >= 0 else ""
+    head = rest[:fence_at] if fence_at >= 0 else rest
+    tokens = head.split()
+    if not tokens:
+        return None
+    path = tokens[0].strip(PATH_DECORATION)
+    return (path, tail) if path else None
+
+
+def _parse_fence(line: str) -> Optional[Tuple[int, str]]:
+    """(backtick count, language tag) if the line is a code fence"""
+    text = line.strip()
+    if not text.startswith(FENCE):
+        return None
+    count = len(text) - len(text.lstrip("`"))
+    info = text[count:].strip()
+    # ```js``` or ```a` `b``` on one line is inline code, not a fence
+    if "`" in info:
+        return None
+    return count, info
+
+
+def _body(lines: List[str]) -> str:
+    start = 0
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+    return "\n".join(lines[start:]).rstrip()
+
+
+class FileBlockParser:
+    """Emits (filename, content) for each FILE: block once its fence closes"""
+
+    def __init__(self, lenient: bool = False):
+        self.lenient = lenient
+        self._partial: List[str] = []  # pieces of the last, unterminated line (minified files can be MBs long)
+        self._state = PROSE
+        self._path: Optional[str] = None
+        self._fence = 0                # backticks of the block's opening fence
+        self._depth = 0                # nested fences open inside the block
+        self._lines: List[str] = []    # body lines of the current block
+        self._raw: List[str] = []      # source lines since the current header
+        self._next_header: Optional[Tuple[str, str]] = None  # header candidate inside a block
+        self._held: List[str] = []     # its line and the blank lines after it, until a fence decides
+        self._finished = False
+        self.files_emitted = 0
+        self.chars_fed = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Add streamed text; returns files completed by it"""
+        self.chars_fed += len(chunk)
+        completed: List[Tuple[str, str]] = []
+        if "\n" not in chunk:
+            if chunk:
+                self._partial.append(chunk)
+            return completed
+
+        lines = chunk.split("\n")
+        if self._partial:
+            self._partial.append(lines[0])
+            lines[0] = "".join(self._partial)
+        tail = lines.pop()
+        self._partial = [tail] if tail else []
+        for line in lines:
+            self._line(line[:-1] if line.endswith("\r") else line, completed)
+        return completed
+
+    def finish(self) -> List[Tuple[str, str]]:
+        """End of stream; returns files completed by it (a last line without newline, lenient bodies)"""
+        completed: List[Tuple[str, str]] = []
+        if self._finished:
+            return completed
+        self._finished = True
+        if self._partial:
+            partial, self._partial = "".join(self._partial), []
+            self._line(partial.rstrip("\r"), completed)
+        # A header candidate no fence followed is content of the (unclosed) block
+        self._lines.extend(self._held)
+        self._next_header, self._held = None, []
+        if self._state == UNFENCED:
+            self._emit(completed)
+        return completed
+
+    def close(self) -> str:
+        """End of stream; returns the unparsed remainder (an unclosed block)"""
+        self.finish()
+        remainder = "\n".join(self._raw) if self._state in (HEADER, BLOCK) else ""
+        self._reset()
+        return remainder
+
+    def _reset(self):
+        self._state = PROSE
+        self._path = None
+        self._lines = []
+        self._raw = []
+        self._depth = 0
+        self._next_header = None
+        self._held = []
+
+    def _emit(self, completed: List[Tuple[str, str]]):
+        completed.append((self._path, _body(self._lines)))
+        self.files_emitted += 1
+        self._reset()
+
+    def _start(self, header: Tuple[str, str], line: str, completed: List[Tuple[str, str]]):
+        path, tail = header
+        self._reset()
+        self._state = HEADER
+        self._path = path
+        self._raw = [line]
+        if tail:
+            # FILE: a.js ```js  -- the fence follows the path
+            self._line(tail, completed, raw=False)
+
+    def _line(self, line: str, completed: List[Tuple[str, str]], raw: bool = True):
+        state = self._state
+        if state == PROSE:
+            header = _parse_header(line, self.lenient)
+            if header:
+                self._start(header, line, completed)
+            return
+
+        if raw:
+            self._raw.append(line)
+
+        if state == HEADER:
+            if not line.strip():
+                return
+            fence = _parse_fence(line)
+            if fence:
+                self._state = BLOCK
+                self._fence = fence[0]
+                return
+            header = _parse_header(line, self.lenient)
+            if header:
+                # A header without a body; the newer one wins
+                self._start(header, line, completed)
+            elif self.lenient:
+                self._state = UNFENCED
+                self._lines.append(line)
+            else:
+                # Prose between header and fence: not a file block
+                self._reset()
+            return
+
+        if state == UNFENCED:
+            header = _parse_header(line, self.lenient)
+            if header:
+                self._emit(completed)
+                self._start(header, line, completed)
+            elif _parse_fence(line) is None:
+                self._lines.append(line)
+            return
+
+        # BLOCK
+        if self._next_header:
+            if not line.strip():
+                self._held.append(line)
+                return
+            header, held = self._next_header, self._held
+            if _parse_fence(line):
+                logger.warning(f"FILE: {self._path} not closed before the next header")
+                self._emit(completed)
+                self._start(header, held[0], completed)
+                for held_line in held[1:] + [line]:
+                    self._line(held_line, completed)
+                return
+            self._lines.extend(held)
+            self._next_header, self._held = None, []
+
+        fence = _parse_fence(line)
+        if fence:
+            count, info = fence
+            if info:
+                self._depth += 1
+            elif self._depth:
+                self._depth -= 1
+            elif count >= self._fence:
+                self._emit(completed)
+                return
+            self._lines.append(line)
+            return
+
+        if self._depth == 0:
+            stripped = line.rstrip()
+            if stripped.endswith(FENCE) and not stripped.endswith("`" + FENCE):
+                # Closing fence glued to the last code line
+                self._lines.append(stripped[:-len(FENCE)])
+                self._emit(completed)
+                return
+            header = _parse_header(line, False) if line.startswith("FILE:") else None
+            if header and header[1]:
+                # FILE: b.js ```js -- the fence is on the header line
+                logger.warning(f"FILE: {self._path} not closed before the next header")
+                self._emit(completed)
+                self._start(header, line, completed)
+                return
+            if header:
+                # Decided by the next non-blank line
+                self._next_header, self._held = header, [line]
+                return
+        self._lines.append(line)
+
+
+def iter_file_blocks(chunks: Iterable[str], lenient: bool = False) -> Iterator[Tuple[str, str]]:
+    """Yield files from a stream of completion chunks as they complete"""
+    parser = FileBlockParser(lenient)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.finish()
+    if parser.close():
+        logger.warning("Completion ended inside an unterminated FILE: block")
+
+
+def extract_file_blocks(response: str, lenient: bool = False) -> Dict[str, str]:
+    """All files in a complete response (later duplicates win)"""
+    parser = FileBlockParser(lenient)
+    files = dict(parser.feed(response))
+    files.update(parser.finish())
+    return files
+
+
+# Benchmark: single-pass parser vs the previous regex extraction
+if __name__ == "__main__":
+    import re
+    import time
+
+    logging.getLogger().setLevel(logging.ERROR)
+    LEGACY_PATTERN = re.compile(r'FILE:\s*([\w\-\.\/\+\@\#\$\%\&\=\?\!\:\;]+)\s*```(?:\w+)?\s*([\s\S]*?)```')
+
+    def legacy_extract(response: str) -> Dict[str, str]:
+        return {m.group(1): m.group(2).strip() for m in LEGACY_PATTERN.finditer(response)}
+
+    def legacy_stream(chunks: List[str]) -> int:
+        # Previous FileBlockParser.feed: rescan the whole buffer whenever a chunk has a backtick
+        buffer, found = "", 0
+        for chunk in chunks:
+            buffer += chunk
+            if "`" not in chunk:
+                continue
+            pos = 0
+            for match in LEGACY_PATTERN.finditer(buffer):
+                found += 1
+                pos = match.end()
+            buffer = buffer[pos:]
+        return found
+
+    code_line = "  const value = items.map((item) => `${item.name}: ${item.price}`).join(', ');\n"
+
+    def project(files: int) -> str:
+        return "".join(f"FILE: src/components/Component{i}.jsx\n```jsx\n" + code_line * 60 + "```\n\n"
+                       for i in range(files))
+
+    # Model forgets every closing fence: the regex folds each next file into the previous one
+    unclosed = "".join(f"FILE: src/part{i}.js\n```js\n" + code_line * 8 for i in range(3000))
+    # A long run of path characters without a fence: the regex backtracks from every FILE: in it
+    path_run = "FILE:" * 6000
+    # One long file that never closes, streamed
+    truncated = "FILE: src/huge.js\n```js\n" + code_line * 1200
+
+    def timed(fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        return time.perf_counter() - start, result
+
+    def chunked(text: str, size: int = 16) -> List[str]:
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    print(f"{'input':<34}{'size':>9}{'regex':>12}{'parser':>12}{'files (regex/parser)':>24}")
+    for label, text in (("well-formed, whole", project(1200)), ("fences never closed, whole", unclosed),
+                        ("'FILE:' x 6000, whole", path_run)):
+        regex_seconds, regex_files = timed(legacy_extract, text)
+        parser_seconds, parser_files = timed(extract_file_blocks, text)
+        print(f"{label:<34}{len(text) / 1e6:>6.2f} MB{regex_seconds * 1000:>9.0f} ms{parser_seconds * 1000:>9.0f} ms"
+              f"{len(regex_files):>12}/{len(parser_files)}")
+
+    for label, text in (("well-formed, 16-char chunks", project(200)), ("unclosed file, 16-char chunks", truncated)):
+        chunks = chunked(text)
+        regex_seconds, regex_count = timed(legacy_stream, chunks)
+        parser_seconds, parser_files = timed(lambda c: list(iter_file_blocks(c)), chunks)
+        print(f"{label:<34}{len(text) / 1e6:>6.2f} MB{regex_seconds * 1000:>9.0f} ms{parser_seconds * 1000:>9.0f} ms"
+              f"{regex_count:>12}/{len(parser_files)}")
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: http_caching.py
+# Description: Conditional request and byte-range helpers for file-backed endpoints
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple, Mapping, Dict
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cache-Control per route, each overridable with CACHE_CONTROL_<ROUTE> (e.g. CACHE_CONTROL_DOWNLOAD)
+CACHE_CONTROL_POLICIES = {
+    # Zips keep their name across rebuilds, so clients always revalidate (cheap with ETags)
+    "download": "private, no-cache",
+    "static": "private, max-age=60, must-revalidate",
+    "logs": "no-cache",
+    "files": "no-cache",
+}
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class RangeNotSatisfiable(Exception):
+    """Range header that selects no bytes of the file (HTTP 416)"""
+
+    def __init__(self, size: int):
+        super().__init__(f"Range not satisfiable for {size} bytes")
+        self.size = size
+
+
+def stat_etag(st: os.stat_result) -> str:
+    """Validator from size and mtime; changes whenever the file is appended to or replaced"""
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def http_date(timestamp: float) -> str:
+    """RFC 7231 date for Last-Modified / Date headers"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Timestamp of an HTTP date header, or None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def cache_control(route: str) -> str:
+    """Cache-Control header for a route"""
+    return os.environ.get(f"CACHE_CONTROL_{route.upper()}", CACHE_CONTROL_POLICIES.get(route, "no-cache"))
+
+
+class ContentHashStore:
+    """
+    sha256 of served files, for strong ETags
+
+    Hashes are remembered per (path, size, mtime) in memory. Files recorded
+    with a sidecar (build zips, at finalization) keep theirs in <file>.sha256,
+    so a restarted server does not re-read them.
+    """
+
+    SIDECAR_SUFFIX = ".sha256"
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hashes: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self.computed = 0
+
+    def record(self, path: str, sidecar: bool = True) -> str:
+        """Hash a freshly written file and remember it"""
+        st = os.stat(path)
+        digest = self._compute(path)
+        self._remember(path, st, digest)
+        if sidecar:
+            tmp_path = f"{path}{self.SIDECAR_SUFFIX}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(f"{digest} {st.st_size} {st.st_mtime_ns}\n")
+            os.replace(tmp_path, f"{path}{self.SIDECAR_SUFFIX}")
+        return digest
+
+    def get(self, path: str, st: os.stat_result) -> str:
+        """Content hash of path as of stat result st (computed if unknown or stale)"""
+        with self._lock:
+            cached = self._hashes.get(path)
+            if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                self._hashes.move_to_end(path)
+                return cached[2]
+
+        digest = self._read_sidecar(path, st)
+        if digest is None:
+            digest = self._compute(path)
+        self._remember(path, st, digest)
+        return digest
+
+    def _read_sidecar(self, path: str, st: os.stat_result) -> Optional[str]:
+        try:
+            with open(f"{path}{self.SIDECAR_SUFFIX}") as f:
+                digest, size, mtime_ns = f.read().split()
+        except (OSError, ValueError):
+            return None
+        # A sidecar from before the file was rewritten is ignored
+        if int(size) == st.st_size and int(mtime_ns) == st.st_mtime_ns:
+            return digest
+        return None
+
+    def _compute(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        with self._lock:
+            self.computed += 1
+        return digest.hexdigest()
+
+    def _remember(self, path: str, st: os.stat_result, digest: str):
+        with self._lock:
+            self._hashes[path] = (st.st_size, st.st_mtime_ns, digest)
+            self._hashes.move_to_end(path)
+            while len(self._hashes) > self.max_entries:
+                self._hashes.popitem(last=False)
+
+
+# Global content hash store for the API process
+content_hashes = ContentHashStore()
+
+
+def content_etag(digest: str) -> str:
+    """Strong ETag from a content hash"""
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match evaluation (weak comparison)
+
+    Returns True when the client's cached copy is current and a 304 can be sent.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range against a file of the given size
+
+    Returns (start, end) with end inclusive, or None when the header is absent,
+    malformed or asks for several ranges (the full body is served instead).
+    Raises RangeNotSatisfiable when the range lies entirely past the end.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable(size)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def read_byte_range(path: str, start: int, length: int) -> bytes:
+    """Read length bytes from start without loading the rest of the file"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+
+def evaluate_conditional(headers: Mapping[str, str], etag: str, last_modified: float,
+                         size: int) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """
+    Decide the status of a GET for a file with a strong ETag
+
+    Returns (status, byte_range): 304 when the client's copy is current,
+    206 with the (start, end) range to send, 416 for an unsatisfiable range,
+    otherwise 200. headers is a case-insensitive mapping (or lower-case keys).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return 304, None
+    else:
+        since = parse_http_date(headers.get("if-modified-since"))
+        if since is not None and int(last_modified) <= since:
+            return 304, None
+
+    range_header = headers.get("range")
+    if not range_header:
+        return 200, None
+
+    # If-Range: only send a part if the client's partial copy is of this exact content
+    if_range = headers.get("if-range")
+    if if_range:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if if_range != etag:
+                return 200, None
+        else:
+            date = parse_http_date(if_range)
+            if date is None or int(last_modified) > date:
+                return 200, None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return 416, None
+    return (206, byte_range) if byte_range else (200, None)
+
+
+def iter_byte_range(path: str, start: int, end: int, chunk_size: int = 1 << 16):
+    """Yield bytes start..end (inclusive) of a file in chunks"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# Replay of dashboard download traffic: bytes sent with and without validators
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(39)
+    tmp = tempfile.mkdtemp()
+    store = ContentHashStore()
+
+    # 20 projects with zips between 200 KB and 5 MB
+    zips = {}
+    for project_id in range(20):
+        path = os.path.join(tmp, f"{project_id}.zip")
+        with open(path, "wb") as f:
+            f.write(os.urandom(rng.randint(200_000, 5_000_000)))
+        store.record(path)
+        zips[project_id] = path
+
+    # 30 users, each with a browser cache of (etag, last_modified) per zip
+    caches: Dict[Tuple[int, int], Tuple[str, float]] = {}
+    sent_before = sent_after = requests = 0
+    counts: Dict[int, int] = {}
+    lookup_seconds = 0.0
+    for _ in range(3000):
+        user, project_id = rng.randrange(30), rng.randrange(20)
+        path = zips[project_id]
+        action = rng.random()
+        if action < 0.03:
+            # Rebuild: same name, new content
+            size = os.path.getsize(path)
+            with open(path, "wb") as f:
+                f.write(os.urandom(size))
+            store.record(path)
+            continue
+
+        st = os.stat(path)
+        start = time.perf_counter()
+        etag = content_etag(store.get(path, st))
+        lookup_seconds += time.perf_counter() - start
+
+        headers = {}
+        cached = caches.get((user, project_id))
+        if action < 0.10 and cached:
+            # Resuming an interrupted download of the cached version
+            offset = rng.randrange(st.st_size)
+            headers = {"range": f"bytes={offset}-", "if-range": cached[0]}
+        elif cached:
+            # Page refresh / re-click on download: browser revalidates
+            headers = {"if-none-match": cached[0]}
+
+        status, byte_range = evaluate_conditional(headers, etag, st.st_mtime, st.st_size)
+        counts[status] = counts.get(status, 0) + 1
+        requests += 1
+        sent_before += st.st_size
+        if status == 200:
+            sent_after += st.st_size
+        elif status == 206:
+            sent_after += byte_range[1] - byte_range[0] + 1
+        caches[(user, project_id)] = (etag, st.st_mtime)
+
+    shutil.rmtree(tmp)
+    print(f"=== Dashboard download replay: {requests} requests, 20 zips, 30 clients ===\n")
+    print("Responses: " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+    print(f"Bytes sent without validators: {sent_before / 1e6:10.1f} MB")
+    print(f"Bytes sent with ETag/If-Range: {sent_after / 1e6:10.1f} MB "
+          f"({100 * (1 - sent_after / sent_before):.1f}% saved)")
+    print(f"ETag lookup: {lookup_seconds / requests * 1e6:.1f} us/request, "
+          f"{store.computed} full hashes computed, all when zips were written")
@@ -0,0 +1,503 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_cache.py
+# Description: Persistent LLM completion cache with TTL/LRU eviction, metrics and near-duplicate matching
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+Completions are cached in SQLite, keyed by provider, model, temperature, a
+hash of the system prompt and the whitespace-normalized user prompt. The
+cache is shared by the API and the build worker processes. Hit/miss counters
+are stored alongside the entries, so /llm/cache-stats reports every process.
+
+Near-duplicate matching (LLM_CACHE_SIMILARITY, a Jaccard threshold; 0 turns
+it off) applies only when the caller passes similarity_text, normally the
+requirement list inside the prompt. The rest of the prompt, with that text
+cut out, must still match exactly, so a similar request for a different file
+or project type never matches. Similarity is estimated with MinHash over word
+shingles, and candidates are found through LSH bands.
+
+Settings (environment): LLM_CACHE (1/0), LLM_CACHE_DB, LLM_CACHE_TTL
+(seconds), LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_BYTES, LLM_CACHE_SIMILARITY.
+"""
+
+import os
+import re
+import json
+import time
+import struct
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from llm_provider import LLMProvider
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.environ.get("LLM_CACHE_DB", "llm_cache.db")
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed so signatures stay comparable across processes and restarts
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % (_MERSENNE_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    generation_seconds REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    signature BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_completions_access ON completions (last_access);
+CREATE INDEX IF NOT EXISTS idx_completions_created ON completions (created_at);
+CREATE TABLE IF NOT EXISTS completion_bands (
+    band TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (band, key)
+);
+CREATE INDEX IF NOT EXISTS idx_completion_bands_key ON completion_bands (key);
+CREATE TABLE IF NOT EXISTS cache_metrics (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS inflight (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    lease_expires REAL NOT NULL
+);
+"""
+
+METRICS = ("hits", "semantic_hits", "misses", "bypassed", "stores", "evictions", "expirations", "saved_seconds")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace runs (prompt indentation, trailing spaces, blank lines)"""
+    return " ".join(text.split())
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text: str, shingle_size: int = 2) -> List[int]:
+    """
+    MinHash signature over lowercase word shingles taken within each line, so
+    reordering requirement lines leaves the signature unchanged
+    """
+    shingles = set()
+    for line in text.lower().splitlines():
+        words = re.findall(r"\w+", line)
+        if len(words) < shingle_size:
+            if words:
+                shingles.add(" ".join(words))
+        else:
+            shingles.update(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+              for s in shingles or {""}]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _pack_signature(signature: List[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def _unpack_signature(blob: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(blob) // 8}Q", blob))
+
+
+class CompletionCache:
+    """
+    SQLite-backed completion cache, safe to share between threads and processes
+
+    Each thread gets its own connection (as in BuildQueue).
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 similarity_threshold: Optional[float] = None):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.environ.get("LLM_CACHE_TTL", 7 * 86400))
+        self.max_entries = max_entries or int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+        self.max_bytes = max_bytes or int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.similarity_threshold = (similarity_threshold if similarity_threshold is not None
+                                     else float(os.environ.get("LLM_CACHE_SIMILARITY", "0")))
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_keys(provider: str, model: str, temperature: float, system_prompt: str, user_prompt: str,
+                  similarity_text: Optional[str] = None) -> Tuple[str, str]:
+        """
+        (exact key, scope); the scope is everything but similarity_text, and
+        near-duplicates only match within it
+        """
+        normalized = normalize_prompt(user_prompt)
+        head = json.dumps([provider, model, round(float(temperature), 3), _sha256(system_prompt)])
+        key = _sha256(f"{head}\n{normalized}")
+        if similarity_text and normalize_prompt(similarity_text) in normalized:
+            scope = _sha256(f"{head}\n{normalized.replace(normalize_prompt(similarity_text), chr(0))}")
+        else:
+            scope = key
+        return key, scope
+
+    def _bump(self, conn: sqlite3.Connection, **increments: float):
+        for name, value in increments.items():
+            conn.execute("INSERT INTO cache_metrics (name, value) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, value))
+
+    def record_bypass(self):
+        self._bump(self._conn(), bypassed=1)
+
+    def get(self, key: str, scope: Optional[str] = None,
+            similarity_text: Optional[str] = None) -> Optional[str]:
+        """Cached response for key, else the best near-duplicate in scope, else None (counted as a miss)"""
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT response, created_at, generation_seconds FROM completions WHERE key = ?",
+                           (key,)).fetchone()
+        if row and now - row[1] > self.ttl_seconds:
+            self._delete(conn, [key])
+            self._bump(conn, expirations=1)
+            row = None
+
+        hit_key, metric = key, "hits"
+        if row is None and similarity_text and self.similarity_threshold > 0 and scope and scope != key:
+            hit_key = self._similar_key(conn, scope, minhash_signature(similarity_text), now)
+            if hit_key:
+                row = conn.execute("SELECT response, created_at, generation_seconds FROM completions WHERE key = ?",
+                                   (hit_key,)).fetchone()
+                metric = "semantic_hits"
+
+        if row is None:
+            self._bump(conn, misses=1)
+            return None
+        conn.execute("UPDATE completions SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, hit_key))
+        self._bump(conn, **{metric: 1, "saved_seconds": row[2]})
+        return row[0]
+
+    def _similar_key(self, conn: sqlite3.Connection, scope: str, signature: List[int], now: float) -> Optional[str]:
+        bands = self._band_keys(scope, signature)
+        placeholders = ",".join("?" * len(bands))
+        candidates = conn.execute(
+            f"SELECT DISTINCT c.key, c.signature FROM completion_bands b JOIN completions c ON c.key = b.key "
+            f"WHERE b.band IN ({placeholders}) AND c.scope = ? AND c.created_at > ?",
+            (*bands, scope, now - self.ttl_seconds)
+        ).fetchall()
+        best_key, best_score = None, self.similarity_threshold
+        for candidate_key, blob in candidates:
+            score = estimate_similarity(signature, _unpack_signature(blob))
+            if score >= best_score:
+                best_key, best_score = candidate_key, score
+        return best_key
+
+    @staticmethod
+    def _band_keys(scope: str, signature: List[int]) -> List[str]:
+        return [_sha256(f"{scope}:{band}:" + ",".join(map(str, signature[band * _ROWS_PER_BAND:
+                                                                         (band + 1) * _ROWS_PER_BAND])))[:32]
+                for band in range(LSH_BANDS)]
+
+    def put(self, key: str, response: str, scope: Optional[str] = None, similarity_text: Optional[str] = None,
+            generation_seconds: float = 0.0):
+        """Store a completion, then evict over the entry/byte limits"""
+        conn = self._conn()
+        now = time.time()
+        signature = minhash_signature(similarity_text) if similarity_text and scope and scope != key else None
+        size = len(response.encode("utf-8"))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM completion_bands WHERE key = ?", (key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, scope, response, size, generation_seconds, created_at, "
+                "last_access, hits, signature) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                (key, scope or key, response, size, generation_seconds, now, now,
+                 _pack_signature(signature) if signature else None)
+            )
+            if signature:
+                conn.executemany("INSERT OR IGNORE INTO completion_bands (band, key) VALUES (?, ?)",
+                                 [(band, key) for band in self._band_keys(scope, signature)])
+            self._bump(conn, stores=1)
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _delete(self, conn: sqlite3.Connection, keys: List[str]):
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            conn.execute(f"DELETE FROM completions WHERE key IN ({placeholders})", batch)
+            conn.execute(f"DELETE FROM completion_bands WHERE key IN ({placeholders})", batch)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones over the limits"""
+        expired = [row[0] for row in conn.execute("SELECT key FROM completions WHERE created_at < ?",
+                                                  (time.time() - self.ttl_seconds,))]
+        if expired:
+            self._delete(conn, expired)
+            self._bump(conn, expirations=len(expired))
+
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY last_access"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append(key)
+            count -= 1
+            total -= size
+        self._delete(conn, victims)
+        self._bump(conn, evictions=len(victims))
+
+    # In-flight generations, so identical requests in other processes wait for the
+    # stored completion instead of generating it again (see llm_singleflight)
+
+    def claim_flight(self, key: str, owner: str, lease_seconds: float) -> bool:
+        """Take the in-flight claim on key unless another owner holds an unexpired one"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM inflight WHERE key = ? AND lease_expires < ?", (key, now))
+            claimed = conn.execute("INSERT OR IGNORE INTO inflight (key, owner, lease_expires) VALUES (?, ?, ?)",
+                                   (key, owner, now + lease_seconds)).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return claimed
+
+    def renew_flight(self, key: str, owner: str, lease_seconds: float):
+        self._conn().execute("UPDATE inflight SET lease_expires = ? WHERE key = ? AND owner = ?",
+                             (time.time() + lease_seconds, key, owner))
+
+    def release_flight(self, key: str, owner: str):
+        self._conn().execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+
+    def flight_active(self, key: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM inflight WHERE key = ? AND lease_expires >= ?",
+                                    (key, time.time())).fetchone() is not None
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        metrics = dict.fromkeys(METRICS, 0)
+        metrics.update({name: value for name, value in conn.execute("SELECT name, value FROM cache_metrics")})
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        lookups = metrics["hits"] + metrics["semantic_hits"] + metrics["misses"]
+        return dict(
+            {name: int(value) for name, value in metrics.items() if name != "saved_seconds"},
+            saved_seconds=round(metrics["saved_seconds"], 3),
+            hit_rate=round((metrics["hits"] + metrics["semantic_hits"]) / lookups, 4) if lookups else 0.0,
+            entries=count,
+            bytes=total,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+            ttl_seconds=self.ttl_seconds,
+            similarity_threshold=self.similarity_threshold
+        )
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM completions")
+        conn.execute("DELETE FROM completion_bands")
+        conn.execute("DELETE FROM cache_metrics")
+        conn.execute("DELETE FROM inflight")
+
+
+# Global cache instance
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    global _completion_cache
+    with _completion_cache_lock:
+        if _completion_cache is None:
+            _completion_cache = CompletionCache()
+        return _completion_cache
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("LLM_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+class CachingLLMProvider(LLMProvider):
+    """
+    Wraps a provider with the completion cache
+
+    generate_completion and stream_completion take two extra keyword arguments:
+    bypass_cache (skip the lookup; the fresh completion still replaces the
+    entry) and similarity_text (the part of the prompt near-duplicates may
+    differ in). Use llm_options() to pass them without knowing whether the
+    provider is wrapped.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: Optional[CompletionCache] = None):
+        self.provider = provider
+        self.cache = cache or get_completion_cache()
+
+    @property
+    def model(self) -> str:
+        return getattr(self.provider, "model", "")
+
+    def _keys(self, system_prompt: str, user_prompt: str, similarity_text: Optional[str]) -> Tuple[str, str]:
+        return self.cache.make_keys(self.provider.__class__.__name__, self.model,
+                                    getattr(self.provider, "temperature", 0.2),
+                                    system_prompt, user_prompt, similarity_text)
+
+    def generate_completion(self, system_prompt: str, user_prompt: str, bypass_cache: bool = False,
+                            similarity_text: Optional[str] = None) -> str:
+        return "".join(self.stream_completion(system_prompt, user_prompt, bypass_cache, similarity_text))
+
+    def _lookup(self, key: str, scope: str, similarity_text: Optional[str], bypass_cache: bool) -> Optional[str]:
+        if bypass_cache:
+            self.cache.record_bypass()
+            return None
+        try:
+            cached = self.cache.get(key, scope, similarity_text)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache unavailable: {e}")
+            return None
+        if cached is not None:
+            logger.info("LLM completion served from cache")
+        return cached
+
+    def _store(self, key: str, response: str, scope: str, similarity_text: Optional[str], seconds: float):
+        if response.strip():
+            try:
+                self.cache.put(key, response, scope, similarity_text, seconds)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not cache LLM completion: {e}")
+
+    def stream_completion(self, system_prompt: str, user_prompt: str, bypass_cache: bool = False,
+                          similarity_text: Optional[str] = None) -> Iterator[str]:
+        key, scope = self._keys(system_prompt, user_prompt, similarity_text)
+        cached = self._lookup(key, scope, similarity_text, bypass_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        parts = []
+        for chunk in self.provider.stream_completion(system_prompt, user_prompt):
+            parts.append(chunk)
+            yield chunk
+        # Only completed streams are stored (an abandoned generator never gets here)
+        self._store(key, "".join(parts), scope, similarity_text, time.perf_counter() - start)
+
+    async def generate_completion_async(self, async_provider, system_prompt: str, user_prompt: str,
+                                        bypass_cache: bool = False, similarity_text: Optional[str] = None) -> str:
+        """
+        generate_completion through async_provider, an AsyncLLMProvider for the
+        same backend, so callers on the event loop share this cache
+        """
+        key, scope = self._keys(system_prompt, user_prompt, similarity_text)
+        cached = self._lookup(key, scope, similarity_text, bypass_cache)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        response = await async_provider.generate_completion(system_prompt, user_prompt)
+        self._store(key, response, scope, similarity_text, time.perf_counter() - start)
+        return response
+
+    def ensure_model_available(self) -> bool:
+        return self.provider.ensure_model_available()
+
+
+def caching_provider(llm: LLMProvider) -> Optional[CachingLLMProvider]:
+    """The CachingLLMProvider in llm's wrapper chain, or None"""
+    # Look through wrappers such as SingleFlightLLMProvider
+    while not isinstance(llm, CachingLLMProvider) and "provider" in vars(llm):
+        llm = llm.provider
+    return llm if isinstance(llm, CachingLLMProvider) else None
+
+
+def llm_options(llm: LLMProvider, similarity_text: Optional[str] = None, bypass_cache: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for cache-aware calls; empty for providers without the cache"""
+    if caching_provider(llm) is None:
+        return {}
+    return {"similarity_text": similarity_text, "bypass_cache": bypass_cache}
+
+
+# Benchmark: repeated near-identical builds through the cache
+if __name__ == "__main__":
+    import random
+    import tempfile
+    from llm_provider_stub import StubLLMProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    components = ["Header", "FAQ", "PricingCard", "Footer", "Hero", "Testimonials", "ContactForm", "Navbar",
+                  "Blog", "Gallery"]
+    rng = random.Random(7)
+    projects = [sorted(rng.sample(components, 4)) for _ in range(30)]
+
+    def requirement_lines(names: List[str]) -> List[str]:
+        # Same requests resubmitted: order, casing and punctuation vary
+        names = rng.sample(names, len(names))
+        return [rng.choice([f"Add a {name} component", f"add a {name.lower()} component.",
+                            f"Add a {name} Component"]) for name in names]
+
+    def responder(system_prompt: str, user_prompt: str) -> str:
+        # The "project" is the component set the prompt asks for
+        return "|".join(sorted(name for name in components if re.search(rf"\b{name}\b", user_prompt, re.I)))
+
+    builds = [(project, requirement_lines(project)) for project in (rng.choice(projects) for _ in range(300))]
+    with tempfile.TemporaryDirectory() as tmp:
+        print("=== 300 builds of 30 distinct projects, requirements reordered/recased "
+              "(stub LLM: 50 ms per completion) ===\n")
+        print(f"{'':<22}{'LLM calls':>10}{'hit rate':>10}{'wrong':>7}{'total':>10}{'lookup':>10}")
+        for label, threshold in (("no cache", None), ("exact", 0.0), ("exact + MinHash 0.85", 0.85)):
+            stub = StubLLMProvider(first_token_delay=0.05, responder=responder)
+            llm = stub if threshold is None else CachingLLMProvider(
+                stub, CompletionCache(os.path.join(tmp, f"cache-{threshold}.db"), similarity_threshold=threshold))
+            wrong = 0
+            start = time.perf_counter()
+            for project, lines in builds:
+                reqs = "\n".join(f"- {line}" for line in lines)
+                response = llm.generate_completion("system", f"Build a web project:\n{reqs}\nUse React.",
+                                                   **llm_options(llm, similarity_text=reqs))
+                wrong += response != "|".join(project)
+            elapsed = time.perf_counter() - start
+            if threshold is None:
+                hit_rate, lookup = "-", "-"
+            else:
+                stats = llm.cache.stats()
+                hit_rate = f"{stats['hit_rate']:.0%}"
+                # Time not spent waiting on the stub model, per build
+                lookup = f"{(elapsed - stub.calls * 0.05) / len(builds) * 1000:.2f} ms"
+            print(f"{label:<22}{stub.calls:>10}{hit_rate:>10}{wrong:>7}{elapsed:>8.2f} s{lookup:>10}")
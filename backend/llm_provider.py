@@ -9,8 +9,7 @@
 import os
 import logging
 import abc
-import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,18 +23,31 @@ class LLMProvider(abc.ABC):
         """Generate a completion from the LLM"""
         pass
     
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """
+        Yield the completion in chunks as the model produces them
+        
+        Providers without a streaming API yield the whole completion at once.
+        """
+        yield self.generate_completion(system_prompt, user_prompt)
+    
     @abc.abstractmethod
     def ensure_model_available(self) -> bool:
         """Ensure the model is available for use"""
         pass
     
     @classmethod
-    def create(cls, provider_type: str = None, **kwargs) -> 'LLMProvider':
+    def create(cls, provider_type: str = None, cache: Optional[bool] = None, singleflight: Optional[bool] = None,
+               **kwargs) -> 'LLMProvider':
         """
         Factory method to create the appropriate LLM provider
         
         Args:
-            provider_type: Type of provider ("ollama", "openai", or None)
+            provider_type: Type of provider ("ollama", "openai", "router", "stub", or None)
+            cache: Wrap the provider with the completion cache (default: LLM_CACHE,
+                   on for real providers, off for the stub)
+            singleflight: Coalesce identical concurrent requests (default: LLM_SINGLEFLIGHT,
+                          on for real providers, off for the stub)
             **kwargs: Additional provider-specific arguments
             
         Returns:
@@ -48,8 +60,28 @@ class LLMProvider(abc.ABC):
         # Create appropriate provider
         if provider_type == "openai":
             from llm_provider_openai import OpenAIProvider
-            return OpenAIProvider(**kwargs)
+            provider = OpenAIProvider(**kwargs)
+        elif provider_type == "router":
+            # Pool of backends from LLM_ROUTER_BACKENDS
+            from llm_router import RouterLLMProvider
+            provider = RouterLLMProvider.from_spec(**kwargs)
+        elif provider_type == "stub":
+            from llm_provider_stub import StubLLMProvider
+            provider = StubLLMProvider(**kwargs)
         else:
             # Default to Ollama
             from llm_provider_ollama import OllamaProvider
-            return OllamaProvider(**kwargs)
+            provider = OllamaProvider(**kwargs)
+        
+        from llm_cache import CachingLLMProvider, cache_enabled
+        from llm_singleflight import SingleFlightLLMProvider, singleflight_enabled
+        if cache is None:
+            cache = provider_type != "stub" and cache_enabled()
+        if cache:
+            provider = CachingLLMProvider(provider)
+        if singleflight is None:
+            singleflight = provider_type != "stub" and singleflight_enabled()
+        # Coalesce identical concurrent requests in front of the cache, so they share one lookup and store
+        if singleflight:
+            provider = SingleFlightLLMProvider(provider)
+        return provider
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_provider_async.py
+# Description: Async LLM provider interface with bounded concurrency, phased timeouts and cancellation
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+Async counterpart of LLMProvider for callers on the event loop. Each provider
+owns one pooled HTTP client (keep-alive connections reused across
+generations) and a semaphore bounding concurrent generations on its backend.
+Timeouts are split into connect, first token (covers queueing and prompt
+prefill) and total. Cancelling the awaiting task closes the HTTP stream, which
+stops generation on the backend.
+"""
+
+import os
+import abc
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class LLMTimeoutError(TimeoutError):
+    """A generation exceeded one of its timeouts; phase is connect, first_token or total"""
+
+    def __init__(self, phase: str, seconds: float):
+        super().__init__(f"LLM {phase} timeout after {seconds:.1f}s")
+        self.phase = phase
+        self.seconds = seconds
+
+
+class LLMTimeouts:
+    """Connect, first-token and total timeouts in seconds (None disables one)"""
+
+    def __init__(self, connect: Optional[float] = None, first_token: Optional[float] = None,
+                 total: Optional[float] = None):
+        self.connect = connect if connect is not None else float(os.environ.get("LLM_CONNECT_TIMEOUT", "5"))
+        self.first_token = (first_token if first_token is not None
+                            else float(os.environ.get("LLM_FIRST_TOKEN_TIMEOUT", "60")))
+        self.total = total if total is not None else float(os.environ.get("LLM_TOTAL_TIMEOUT", "300"))
+
+
+class AsyncLLMProvider(abc.ABC):
+    """Abstract base class for async LLM providers"""
+
+    def __init__(self, max_concurrency: Optional[int] = None, timeouts: Optional[LLMTimeouts] = None):
+        self.max_concurrency = max_concurrency or int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+        self.timeouts = timeouts or LLMTimeouts()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    @abc.abstractmethod
+    def _stream_chunks(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Backend-specific stream of completion text (an async generator)"""
+
+    async def aclose(self):
+        """Close the provider's connection pool"""
+
+    async def stream_completion(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """
+        Yield completion text as it arrives
+
+        Waits for a concurrency slot first; the first-token and total timeouts
+        count from when the request is sent. Raises LLMTimeoutError.
+        """
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        chunks = self._stream_chunks(system_prompt, user_prompt).__aiter__()
+        start = time.monotonic()
+        first = True
+        try:
+            while True:
+                remaining = self.timeouts.total - (time.monotonic() - start) if self.timeouts.total else None
+                timeout, phase = remaining, "total"
+                if first and self.timeouts.first_token and (remaining is None or self.timeouts.first_token < remaining):
+                    timeout, phase = self.timeouts.first_token, "first_token"
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise LLMTimeoutError(phase, timeout)
+                first = False
+                yield chunk
+            self.completed += 1
+        except BaseException:
+            # Includes cancellation and the consumer abandoning the stream
+            self.failed += 1
+            raise
+        finally:
+            # Closing the backend stream drops the HTTP response so generation stops
+            await chunks.aclose()
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def generate_completion(self, system_prompt: str, user_prompt: str) -> str:
+        """Generate a complete completion"""
+        parts = []
+        async for chunk in self.stream_completion(system_prompt, user_prompt):
+            parts.append(chunk)
+        return "".join(parts)
+
+    async def ensure_model_available(self) -> bool:
+        """Ensure the model is available for use"""
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"max_concurrency": self.max_concurrency, "in_flight": self.in_flight,
+                "waiting": self.waiting, "completed": self.completed, "failed": self.failed}
+
+    @classmethod
+    def create(cls, provider_type: str = None, **kwargs) -> 'AsyncLLMProvider':
+        """
+        Factory method to create the appropriate async LLM provider
+
+        Args:
+            provider_type: Type of provider ("ollama", "openai", "stub", or None)
+            **kwargs: Additional provider-specific arguments
+        """
+        if not provider_type:
+            provider_type = os.environ.get("LLM_PROVIDER", "ollama").lower()
+
+        if provider_type == "openai":
+            from llm_provider_async_openai import AsyncOpenAIProvider
+            return AsyncOpenAIProvider(**kwargs)
+        elif provider_type == "stub":
+            from llm_provider_stub import AsyncStubLLMProvider
+            return AsyncStubLLMProvider(**kwargs)
+        else:
+            from llm_provider_async_ollama import AsyncOllamaProvider
+            return AsyncOllamaProvider(**kwargs)
+
+
+# Benchmark: 50 concurrent generations against the mock Ollama server
+if __name__ == "__main__":
+    import statistics
+    from concurrent.futures import ThreadPoolExecutor
+    from llm_stub_server import StubOllamaServer
+
+    logging.getLogger().setLevel(logging.WARNING)
+    generations = 50
+
+    server = StubOllamaServer(first_token_delay=0.2, tokens_per_second=2000).start()
+    host, port = server.server_address[:2]
+    os.environ["LLM_HOST"], os.environ["LLM_PORT"] = host, str(port)
+    print(f"=== {generations} concurrent generations, mock Ollama at {server.url} ===\n")
+
+    def report(label: str, latencies, elapsed: float):
+        print(f"{label:<34}{generations / elapsed:>8.1f} gen/s{statistics.median(latencies):>9.2f} s p50"
+              f"{max(latencies):>9.2f} s max")
+
+    # Today: sync provider (no session) called from worker threads
+    try:
+        from llm_provider_ollama import OllamaProvider
+        sync_provider = OllamaProvider()
+
+        def timed_sync(_):
+            begin = time.perf_counter()
+            sync_provider.generate_completion("system", "user")
+            return time.perf_counter() - begin
+
+        for workers in (4, 50):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(workers) as pool:
+                latencies = list(pool.map(timed_sync, range(generations)))
+            report(f"sync, {workers} threads", latencies, time.perf_counter() - start)
+    except ImportError as e:
+        print(f"sync baseline skipped ({e})")
+
+    async def run_async(max_concurrency: int):
+        provider = AsyncLLMProvider.create("ollama", max_concurrency=max_concurrency)
+
+        async def timed(_):
+            begin = time.perf_counter()
+            await provider.generate_completion("system", "user")
+            return time.perf_counter() - begin
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed(i) for i in range(generations)))
+        elapsed = time.perf_counter() - start
+
+        # Cancellation: abandoned generations release their slot and connection
+        task = asyncio.ensure_future(provider.generate_completion("system", "user"))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await provider.aclose()
+        return latencies, elapsed, provider.stats()
+
+    try:
+        for max_concurrency in (4, 50):
+            latencies, elapsed, stats = asyncio.run(run_async(max_concurrency))
+            report(f"async pooled, concurrency {max_concurrency}", latencies, elapsed)
+        print(f"\nAfter cancelling one generation: {stats}; server saw "
+              f"{server.requests_cancelled} cancelled stream(s)")
+    except ImportError as e:
+        print(f"async provider skipped ({e})")
+    server.stop()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_provider_async_ollama.py
+# Description: Async Ollama implementation of LLM provider on a pooled httpx client
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+import os
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from llm_provider_async import AsyncLLMProvider, LLMTimeoutError, LLMTimeouts
+from prompt_builder import keep_alive
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AsyncOllamaProvider(AsyncLLMProvider):
+    """
+    Concrete implementation of AsyncLLMProvider for Ollama
+    """
+    def __init__(self, base_url: Optional[str] = None, model: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, timeouts: Optional[LLMTimeouts] = None, **kwargs):
+        super().__init__(max_concurrency, timeouts)
+        host = os.environ.get("LLM_HOST", "localhost")
+        port = os.environ.get("LLM_PORT", "11434")
+        self.base_url = (base_url or f"http://{host}:{port}").rstrip("/")
+        self.model = model or os.environ.get("LLM_MODEL", "gpt-oss:20b")
+
+        # One keep-alive connection per concurrent generation; the phased
+        # timeouts in AsyncLLMProvider bound reads
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+            timeout=httpx.Timeout(connect=self.timeouts.connect, read=None, write=self.timeouts.connect, pool=None)
+        )
+
+        logger.info(f"Initialized AsyncOllamaProvider with model: {self.model} at {self.base_url} "
+                    f"(max {self.max_concurrency} concurrent)")
+
+    async def _stream_chunks(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        payload = {
+            "model": self.model,
+            "prompt": user_prompt,
+            "system": system_prompt,
+            "stream": True,
+            "keep_alive": keep_alive(),
+            "options": {
+                "temperature": 0.2,
+                "top_p": 0.95,
+            }
+        }
+        try:
+            async with self._client.stream("POST", "/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+        except httpx.ConnectTimeout:
+            raise LLMTimeoutError("connect", self.timeouts.connect)
+
+    async def ensure_model_available(self) -> bool:
+        """
+        Check that the model is present on the Ollama server (does not pull)
+        """
+        try:
+            response = await self._client.get("/api/tags", timeout=self.timeouts.connect)
+            response.raise_for_status()
+            models = response.json().get("models", [])
+            return any(model.get("name") == self.model for model in models)
+        except Exception as e:
+            logger.error(f"Error checking Ollama model availability: {e}")
+            return False
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_provider_async_openai.py
+# Description: Async OpenAI implementation of LLM provider on a pooled httpx client
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+import os
+import logging
+from typing import AsyncIterator, Optional
+
+import httpx
+import openai
+
+from llm_provider_async import AsyncLLMProvider, LLMTimeoutError, LLMTimeouts
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AsyncOpenAIProvider(AsyncLLMProvider):
+    """
+    Concrete implementation of AsyncLLMProvider for OpenAI
+    """
+    def __init__(self, api_key=None, api_key_path=None, model: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, timeouts: Optional[LLMTimeouts] = None, **kwargs):
+        super().__init__(max_concurrency, timeouts)
+        if not api_key:
+            api_key_path = api_key_path or os.environ.get("OPENAI_API_KEY_PATH")
+            if os.environ.get("OPENAI_API_KEY"):
+                api_key = os.environ.get("OPENAI_API_KEY")
+            elif api_key_path:
+                with open(api_key_path, 'r') as f:
+                    api_key = f.read().strip()
+
+        self.model = model or os.environ.get("OPENAI_MODEL", "gpt-4o")
+        self.temperature = float(os.environ.get("OPENAI_TEMPERATURE", "0.2"))
+        self.max_tokens = int(os.environ.get("OPENAI_MAX_TOKENS", "4000"))
+
+        # Own client instead of the module-global one so the pool and timeouts are per provider;
+        # retries are left to the caller so timeouts stay meaningful
+        self._client = openai.AsyncOpenAI(
+            api_key=api_key,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                timeout=httpx.Timeout(connect=self.timeouts.connect, read=None,
+                                      write=self.timeouts.connect, pool=None)
+            )
+        )
+
+        logger.info(f"Initialized AsyncOpenAIProvider with model: {self.model} "
+                    f"(max {self.max_concurrency} concurrent)")
+
+    async def _stream_chunks(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        try:
+            stream = await self._client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+        except openai.APITimeoutError:
+            raise LLMTimeoutError("connect", self.timeouts.connect)
+
+        try:
+            async for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+        finally:
+            # Closes the HTTP response when the generation is cancelled or abandoned
+            await stream.response.aclose()
+
+    async def ensure_model_available(self) -> bool:
+        try:
+            await self._client.models.retrieve(self.model)
+            return True
+        except Exception as e:
+            logger.error(f"Error checking OpenAI model availability: {e}")
+            return False
+
+    async def aclose(self):
+        await self._client.close()
@@ -7,11 +7,13 @@
 # Completeness: 100
 
 import os
+import json
 import logging
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator
 
 from llm_provider import LLMProvider
+from prompt_builder import keep_alive
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,18 +23,19 @@ class OllamaProvider(LLMProvider):
     """
     Concrete implementation of LLMProvider for Ollama
     """
-    def __init__(self, api_key=None, api_key_path=None):
+    def __init__(self, api_key=None, api_key_path=None, base_url=None, model=None):
         self.host = os.environ.get("LLM_HOST", "localhost")
         self.port = os.environ.get("LLM_PORT", "11434")
         
         # Choose a model based on environment or system capabilities
-        self.model = os.environ.get("LLM_MODEL", "gpt-oss:20b")
+        self.model = model or os.environ.get("LLM_MODEL", "gpt-oss:20b")
         
         # Default to gpt-oss:20b if not specified (better quality)
         if not self.model:
             self.model = "gpt-oss:20b"
             
-        self.base_url = f"http://{self.host}:{self.port}"
+        # base_url overrides LLM_HOST/LLM_PORT (one provider per host behind the router)
+        self.base_url = (base_url or f"http://{self.host}:{self.port}").rstrip("/")
         
         logger.info(f"Initialized OllamaProvider with model: {self.model} at {self.base_url}")
         
@@ -51,6 +54,7 @@ class OllamaProvider(LLMProvider):
                 "prompt": user_prompt,
                 "system": system_prompt,
                 "stream": False,
+                "keep_alive": keep_alive(),  # keep the model and its prompt cache loaded
                 "options": {
                     "temperature": 0.2,
                     "top_p": 0.95,
@@ -72,6 +76,44 @@ class OllamaProvider(LLMProvider):
             logger.error(f"Ollama error: {e}")
             raise
     
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """
+        Stream a completion from the Ollama API (newline-delimited JSON chunks)
+        """
+        logger.info(f"Streaming completion with Ollama model: {self.model}")
+        
+        url = f"{self.base_url}/api/generate"
+        payload = {
+            "model": self.model,
+            "prompt": user_prompt,
+            "system": system_prompt,
+            "stream": True,
+            "keep_alive": keep_alive(),
+            "options": {
+                "temperature": 0.2,
+                "top_p": 0.95,
+            }
+        }
+        
+        # Connect timeout, then the longest allowed gap between chunks
+        with requests.post(url, json=payload, stream=True, timeout=(10, 60)) as response:
+            response.raise_for_status()
+            generated = 0
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                text = chunk.get("response", "")
+                if text:
+                    generated += len(text)
+                    yield text
+                if chunk.get("done"):
+                    break
+        
+        logger.info(f"Successfully streamed {generated} chars of text with Ollama")
+    
     def ensure_model_available(self) -> bool:
         """
         Ensure the model is available locally on Ollama
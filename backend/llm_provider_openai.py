@@ -8,7 +8,7 @@
 
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator
 import openai
 
 from llm_provider import LLMProvider
@@ -21,7 +21,7 @@ class OpenAIProvider(LLMProvider):
     """
     Concrete implementation of LLMProvider for OpenAI
     """
-    def __init__(self, api_key=None, api_key_path=None):
+    def __init__(self, api_key=None, api_key_path=None, model=None):
         # Configure API key
         if api_key:
             openai.api_key = api_key
@@ -37,7 +37,7 @@ class OpenAIProvider(LLMProvider):
                 openai.api_key = f.read().strip()
                 
         # Choose a model based on environment variables
-        self.model = os.environ.get("OPENAI_MODEL", "gpt-4o")
+        self.model = model or os.environ.get("OPENAI_MODEL", "gpt-4o")
         
         # Set model parameters
         self.temperature = float(os.environ.get("OPENAI_TEMPERATURE", "0.2"))
@@ -79,6 +79,34 @@ class OpenAIProvider(LLMProvider):
             logger.error(f"OpenAI API error: {e}")
             raise
     
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """
+        Stream a chat completion from the OpenAI API
+        """
+        logger.info(f"Streaming completion with OpenAI model: {self.model}")
+        
+        stream = openai.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        
+        generated = 0
+        for event in stream:
+            if not event.choices:
+                continue
+            text = event.choices[0].delta.content
+            if text:
+                generated += len(text)
+                yield text
+        
+        logger.info(f"Successfully streamed {generated} chars of text with OpenAI")
+    
     def ensure_model_available(self) -> bool:
         """
         Check if the OpenAI API key is valid and the model is available
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_provider_stub.py
+# Description: In-process stub implementation of LLM provider for tests and offline development
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+from llm_provider import LLMProvider
+from llm_provider_async import AsyncLLMProvider, LLMTimeouts
+from llm_stub_server import build_stub_response, tokenize
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class StubLLMProvider(LLMProvider):
+    """
+    Returns a canned multi-file completion, paced like a model
+    (LLM_PROVIDER=stub; STUB_LLM_FIRST_TOKEN_DELAY / STUB_LLM_TOKENS_PER_SECOND)
+    """
+    def __init__(self, response: Optional[str] = None, first_token_delay: Optional[float] = None,
+                 tokens_per_second: Optional[float] = None,
+                 responder: Optional[Callable[[str, str], str]] = None,
+                 max_tokens: Optional[int] = None, **kwargs):
+        self.response = response if response is not None else build_stub_response()
+        # responder(system_prompt, user_prompt) -> completion, for prompt-dependent answers
+        self.responder = responder
+        # Truncates completions like a provider's max_tokens
+        self.max_tokens = max_tokens
+        self.first_token_delay = (first_token_delay if first_token_delay is not None
+                                  else float(os.environ.get("STUB_LLM_FIRST_TOKEN_DELAY", "0")))
+        self.tokens_per_second = (tokens_per_second if tokens_per_second is not None
+                                  else float(os.environ.get("STUB_LLM_TOKENS_PER_SECOND", "0")))
+        self.model = "stub"
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+        logger.info("Initialized StubLLMProvider")
+
+    def generate_completion(self, system_prompt: str, user_prompt: str) -> str:
+        return "".join(self.stream_completion(system_prompt, user_prompt))
+
+    def _tokens(self, system_prompt: str, user_prompt: str) -> List[str]:
+        response = self.responder(system_prompt, user_prompt) if self.responder else self.response
+        tokens = tokenize(response)
+        return tokens[:self.max_tokens] if self.max_tokens else tokens
+
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        with self._calls_lock:
+            self.calls += 1
+        start = time.perf_counter()
+        for index, token in enumerate(self._tokens(system_prompt, user_prompt)):
+            # tokens_per_second of 0 means no pacing
+            if self.first_token_delay or self.tokens_per_second:
+                due = start + self.first_token_delay + (index / self.tokens_per_second if self.tokens_per_second else 0)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield token
+
+    def ensure_model_available(self) -> bool:
+        return True
+
+
+class AsyncStubLLMProvider(AsyncLLMProvider):
+    """
+    Async counterpart of StubLLMProvider; pacing uses asyncio.sleep so
+    concurrent generations overlap like they would against a real backend
+    """
+    def __init__(self, response: Optional[str] = None, first_token_delay: Optional[float] = None,
+                 tokens_per_second: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 timeouts: Optional[LLMTimeouts] = None,
+                 responder: Optional[Callable[[str, str], str]] = None,
+                 max_tokens: Optional[int] = None, **kwargs):
+        super().__init__(max_concurrency, timeouts)
+        self._sync = StubLLMProvider(response, first_token_delay, tokens_per_second, responder, max_tokens)
+        self.model = "stub"
+        self.calls = 0
+
+    async def _stream_chunks(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        stub = self._sync
+        start = time.perf_counter()
+        for index, token in enumerate(stub._tokens(system_prompt, user_prompt)):
+            if stub.first_token_delay or stub.tokens_per_second:
+                due = start + stub.first_token_delay + (index / stub.tokens_per_second if stub.tokens_per_second else 0)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield token
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_readiness.py
+# Description: Background model availability probe with a cached, TTL-bound result
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+ensure_model_available() lists models over the network and, for Ollama, may
+pull a model for up to ten minutes. Running it in a constructor blocks API
+startup on the LLM backend. ModelReadiness runs the probe on a daemon thread
+instead and caches its outcome: a success is trusted for LLM_READINESS_TTL
+seconds, a failure for LLM_READINESS_RETRY seconds. Reading a stale result
+returns it immediately and schedules a refresh; callers never wait on the
+probe unless they ask to (wait()).
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = "pending"          # no probe has finished yet
+STATE_READY = "ready"
+STATE_UNAVAILABLE = "unavailable"
+
+
+class ModelReadiness:
+    """Cached result of a provider's model availability probe, refreshed in the background"""
+
+    def __init__(self, probe: Callable[[], bool], name: str = "llm",
+                 ttl_seconds: Optional[float] = None, retry_seconds: Optional[float] = None):
+        self.probe = probe
+        self.name = name
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get("LLM_READINESS_TTL", "300"))
+        self.retry_seconds = retry_seconds if retry_seconds is not None else float(
+            os.environ.get("LLM_READINESS_RETRY", "30"))
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = STATE_PENDING
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.probe_seconds: Optional[float] = None
+        self.probes = 0
+
+    @property
+    def probing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start a probe on a daemon thread unless one is running; never blocks"""
+        with self._lock:
+            if self.probing:
+                return False
+            self._thread = threading.Thread(target=self._run, name=f"readiness-{self.name}", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            ready, error = bool(self.probe()), None
+        except Exception as e:
+            ready, error = False, str(e)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.state = STATE_READY if ready else STATE_UNAVAILABLE
+            self.error = error if error else (None if ready else "model availability check failed")
+            self.checked_at = time.time()
+            self.probe_seconds = elapsed
+            self.probes += 1
+        self._finished.set()
+        if ready:
+            logger.info(f"{self.name} ready (probe took {elapsed:.2f}s)")
+        else:
+            logger.warning(f"{self.name} unavailable after {elapsed:.2f}s: {self.error}")
+
+    def _expired(self) -> bool:
+        if self.checked_at is None:
+            return True
+        ttl = self.ttl_seconds if self.state == STATE_READY else self.retry_seconds
+        return time.time() - self.checked_at >= ttl
+
+    def refresh_if_stale(self):
+        if self._expired() and not self.probing:
+            self.start()
+
+    def is_ready(self) -> bool:
+        """Last known result (False until the first probe finishes); schedules a refresh when stale"""
+        self.refresh_if_stale()
+        return self.state == STATE_READY
+
+    def is_unavailable(self) -> bool:
+        """True only when a finished probe said the model cannot be used"""
+        self.refresh_if_stale()
+        return self.state == STATE_UNAVAILABLE
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first probe has finished (or timeout); returns is_ready()"""
+        self.refresh_if_stale()
+        self._finished.wait(timeout)
+        return self.state == STATE_READY
+
+    def status(self) -> Dict[str, Any]:
+        self.refresh_if_stale()
+        with self._lock:
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "probing": self.probing,
+                "error": self.error,
+                "checked_at": self.checked_at,
+                "age_seconds": round(time.time() - self.checked_at, 3) if self.checked_at else None,
+                "probe_seconds": round(self.probe_seconds, 3) if self.probe_seconds is not None else None,
+                "probes": self.probes
+            }
+
+
+# Demo: constructor blocking on the probe vs background readiness
+if __name__ == "__main__":
+    import socket
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # A backend that accepts connections but never answers (hung or still loading the model)
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(16)
+
+    def unresponsive_backend_probe() -> bool:
+        # GET /api/tags with a 3 s timeout, as the provider would do
+        with socket.create_connection(silent.getsockname(), timeout=3) as conn:
+            conn.sendall(b"GET /api/tags HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            return bool(conn.recv(1))
+
+    start = time.perf_counter()
+    try:
+        unresponsive_backend_probe()
+    except OSError:
+        pass
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    readiness = ModelReadiness(unresponsive_backend_probe, name="ollama")
+    readiness.start()
+    status = readiness.status()
+    background = time.perf_counter() - start
+
+    print("=== Startup with the LLM backend not answering ===")
+    print(f"probe in constructor   {blocking * 1000:>9.1f} ms")
+    print(f"background readiness   {background * 1000:>9.1f} ms   (state: {status['state']})")
+    readiness.wait()
+    print(f"probe finished later   {readiness.status()['probe_seconds'] * 1000:>9.1f} ms   "
+          f"(state: {readiness.state}, retry in {readiness.retry_seconds:.0f}s)")
@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_router.py
+# Description: LLM provider that balances requests over a pool of backends, with failover and hedging
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+RouterLLMProvider (LLM_PROVIDER=router) spreads completions over several
+backends, e.g. a few Ollama hosts plus OpenAI:
+
+    LLM_ROUTER_BACKENDS="ollama@http://gpu1:11434*2, ollama:qwen2.5-coder:7b@http://gpu2:11434, openai:gpt-4o-mini*0.5"
+
+Each entry is type[:model][@base_url][*weight]. For every request the router
+picks the backend with the lowest
+
+    (outstanding + 1) / weight * time-to-first-chunk EWMA * (1 + 4 * error EWMA)
+
+so busy, slow or failing backends get less traffic and idle ones more. A
+backend failing LLM_ROUTER_EJECT_AFTER times in a row is skipped for
+LLM_ROUTER_EJECT_SECONDS. A request that fails before its first chunk fails
+over to the next backend; one that fails mid-stream raises (its output was
+already handed out).
+
+Hedging (LLM_ROUTER_HEDGE): "off", a percentile such as "p95" (wait for the
+chosen backend's p95 time to first chunk, once it has
+LLM_ROUTER_HEDGE_MIN_SAMPLES samples) or a fixed delay in seconds. When the first chunk is late, a duplicate goes to the
+next best backend; the first to produce a chunk wins and the other stream is
+closed as soon as it yields, which stops its generation.
+"""
+
+import os
+import time
+import queue
+import random
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from llm_provider import LLMProvider
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2
+LATENCY_SAMPLES = 200
+_END = object()
+
+
+def parse_backend_spec(spec: str) -> List[Dict[str, Any]]:
+    """Backend entries from LLM_ROUTER_BACKENDS syntax: type[:model][@base_url][*weight], comma separated"""
+    backends = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        weight = 1.0
+        if "*" in entry:
+            entry, _, weight_text = entry.rpartition("*")
+            weight = float(weight_text)
+            if weight <= 0:
+                raise ValueError(f"Backend weight must be positive: {weight_text}")
+        entry, _, base_url = entry.partition("@")
+        provider_type, _, model = entry.partition(":")
+        backends.append({"type": provider_type.strip().lower(), "model": model.strip() or None,
+                         "base_url": base_url.strip() or None, "weight": weight})
+    if not backends:
+        raise ValueError("No router backends configured (LLM_ROUTER_BACKENDS)")
+    return backends
+
+
+class Backend:
+    """One provider in the pool and its live load, latency and error statistics"""
+
+    def __init__(self, provider: LLMProvider, name: Optional[str] = None, weight: float = 1.0):
+        self.provider = provider
+        self.name = name or f"{provider.__class__.__name__}:{getattr(provider, 'model', '')}"
+        self.weight = weight
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ttft_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.ttft_samples = deque(maxlen=LATENCY_SAMPLES)
+        self.ejected_until = 0.0
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Time to first chunk at the given percentile of recent requests"""
+        if not self.ttft_samples:
+            return None
+        ordered = sorted(self.ttft_samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.percentile(95)
+        return {
+            "name": self.name,
+            "weight": self.weight,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_ewma, 4),
+            "ttft_ewma_ms": round(self.ttft_ewma * 1000, 1) if self.ttft_ewma is not None else None,
+            "ttft_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "ejected": self.ejected_until > time.time()
+        }
+
+
+class _Attempt:
+    __slots__ = ("backend", "hedge", "started", "stream", "abandoned")
+
+    def __init__(self, backend: Backend, hedge: bool):
+        self.backend = backend
+        self.hedge = hedge
+        self.started = time.perf_counter()
+        self.stream = None
+        self.abandoned = False
+
+
+class RouterLLMProvider(LLMProvider):
+    """Routes each completion to one backend of a pool; see the module docstring"""
+
+    def __init__(self, backends: List[Backend], hedge: Union[str, float, None] = None,
+                 hedge_min_samples: Optional[int] = None, eject_after: Optional[int] = None,
+                 eject_seconds: Optional[float] = None, seed: Optional[int] = None):
+        if not backends:
+            raise ValueError("RouterLLMProvider needs at least one backend")
+        self.backends = backends
+        hedge = hedge if hedge is not None else os.environ.get("LLM_ROUTER_HEDGE", "off")
+        if isinstance(hedge, str):
+            hedge = hedge.strip().lower()
+            if hedge in ("", "0", "off", "false", "no"):
+                hedge = "off"
+            elif not hedge.startswith("p"):
+                hedge = float(hedge)
+            elif not 0 < float(hedge[1:]) < 100:
+                raise ValueError(f"Invalid hedge percentile: {hedge}")
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples or int(os.environ.get("LLM_ROUTER_HEDGE_MIN_SAMPLES", "20"))
+        self.eject_after = eject_after or int(os.environ.get("LLM_ROUTER_EJECT_AFTER", "3"))
+        self.eject_seconds = (eject_seconds if eject_seconds is not None
+                              else float(os.environ.get("LLM_ROUTER_EJECT_SECONDS", "30")))
+        self.model = "+".join(getattr(backend.provider, "model", backend.name) for backend in backends)
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.failovers = 0
+
+        logger.info(f"Initialized RouterLLMProvider with {len(backends)} backends "
+                    f"({', '.join(backend.name for backend in backends)}), hedge={self.hedge}")
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str] = None, **kwargs) -> "RouterLLMProvider":
+        """Build the pool from LLM_ROUTER_BACKENDS; kwargs (api_key, ...) go to every backend"""
+        spec = spec or os.environ.get("LLM_ROUTER_BACKENDS", "ollama")
+        backends = []
+        for entry in parse_backend_spec(spec):
+            options = dict(kwargs)
+            if entry["model"]:
+                options["model"] = entry["model"]
+            if entry["base_url"]:
+                options["base_url"] = entry["base_url"]
+            if entry["type"] == "stub" and entry["base_url"]:
+                # A local mock Ollama server (llm_stub_server.py --serve)
+                from llm_stub_server import StubServerProvider
+                provider = StubServerProvider(**options)
+            else:
+                provider = LLMProvider.create(entry["type"], cache=False, singleflight=False, **options)
+            name = f"{entry['type']}:{getattr(provider, 'model', '')}" + (f"@{entry['base_url']}"
+                                                                          if entry["base_url"] else "")
+            backends.append(Backend(provider, name, entry["weight"]))
+        return cls(backends)
+
+    def _score(self, backend: Backend, default_ttft: float) -> float:
+        ttft = backend.ttft_ewma if backend.ttft_ewma is not None else default_ttft
+        return (backend.outstanding + 1) / backend.weight * ttft * (1 + 4 * backend.error_ewma)
+
+    def _pick(self, exclude: List[Backend]) -> Optional[Backend]:
+        """Lowest-score backend not in exclude (ejected ones only if nothing else is left)"""
+        now = time.time()
+        with self._lock:
+            candidates = [backend for backend in self.backends if backend not in exclude]
+            if not candidates:
+                return None
+            healthy = [backend for backend in candidates if backend.ejected_until <= now]
+            candidates = healthy or candidates
+            known = sorted(backend.ttft_ewma for backend in self.backends if backend.ttft_ewma is not None)
+            # Backends without samples yet look like a typical one
+            default_ttft = known[len(known) // 2] if known else 1.0
+            best = min(self._score(backend, default_ttft) for backend in candidates)
+            return self._rng.choice([backend for backend in candidates
+                                     if self._score(backend, default_ttft) <= best * 1.0001])
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        if self.hedge == "off":
+            return None
+        if isinstance(self.hedge, str):
+            with self._lock:
+                if len(backend.ttft_samples) < self.hedge_min_samples:
+                    return None
+                return backend.percentile(float(self.hedge[1:]))
+        return float(self.hedge)
+
+    def _launch(self, backend: Backend, hedge: bool, system_prompt: str, user_prompt: str,
+                results: "queue.Queue", decided: threading.Lock, state: Dict[str, Any]) -> _Attempt:
+        attempt = _Attempt(backend, hedge)
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+
+        def run():
+            try:
+                stream = iter(backend.provider.stream_completion(system_prompt, user_prompt))
+                first = next(stream, _END)
+            except Exception as e:
+                self._record_failure(backend)
+                results.put((attempt, None, e))
+                return
+            self._record_first_chunk(backend, time.perf_counter() - attempt.started)
+            with decided:
+                lost = state["winner"] is not None
+                if not lost:
+                    attempt.stream = stream
+                    results.put((attempt, first, None))
+            if lost:
+                # Another attempt already answered: stop this generation
+                self._abandon(attempt, stream)
+
+        threading.Thread(target=run, name=f"router-{backend.name}", daemon=True).start()
+        return attempt
+
+    def _abandon(self, attempt: _Attempt, stream: Iterator[str]):
+        attempt.abandoned = True
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+        self._release(attempt.backend)
+
+    def _release(self, backend: Backend):
+        with self._lock:
+            backend.outstanding -= 1
+
+    def _record_first_chunk(self, backend: Backend, seconds: float):
+        with self._lock:
+            backend.ttft_samples.append(seconds)
+            backend.ttft_ewma = seconds if backend.ttft_ewma is None else (
+                EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * backend.ttft_ewma)
+            backend.error_ewma *= 1 - EWMA_ALPHA
+            backend.consecutive_failures = 0
+
+    def _record_failure(self, backend: Backend):
+        with self._lock:
+            backend.outstanding -= 1
+            backend.failures += 1
+            backend.consecutive_failures += 1
+            backend.error_ewma = EWMA_ALPHA + (1 - EWMA_ALPHA) * backend.error_ewma
+            if backend.consecutive_failures >= self.eject_after:
+                backend.ejected_until = time.time() + self.eject_seconds
+                logger.warning(f"Ejecting LLM backend {backend.name} for {self.eject_seconds:.0f}s "
+                               f"after {backend.consecutive_failures} failures")
+
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        results: "queue.Queue" = queue.Queue()
+        decided = threading.Lock()
+        state: Dict[str, Any] = {"winner": None}
+        tried: List[Backend] = []
+        pending = 0
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        backend = self._pick(tried)
+        tried.append(backend)
+        primary = self._launch(backend, False, system_prompt, user_prompt, results, decided, state)
+        pending += 1
+        hedge_at = self._hedge_delay(backend)
+
+        while True:
+            timeout = None
+            if hedge_at is not None and not hedged:
+                timeout = max(0.0, primary.started + hedge_at - time.perf_counter())
+            try:
+                attempt, first, error = results.get(timeout=timeout)
+            except queue.Empty:
+                hedged = True
+                other = self._pick(tried)
+                if other is not None:
+                    tried.append(other)
+                    self._launch(other, True, system_prompt, user_prompt, results, decided, state)
+                    pending += 1
+                    with self._lock:
+                        self.hedges_sent += 1
+                continue
+
+            pending -= 1
+            if error is None:
+                with decided:
+                    state["winner"] = attempt
+                    # Attempts that answered at the same moment are already queued
+                    while not results.empty():
+                        other, _, other_error = results.get_nowait()
+                        if other_error is None:
+                            self._abandon(other, other.stream)
+                break
+
+            last_error = error
+            logger.warning(f"LLM backend {attempt.backend.name} failed: {error}")
+            if pending:
+                continue
+            backend = self._pick(tried)
+            if backend is None:
+                raise last_error
+            with self._lock:
+                self.failovers += 1
+            tried.append(backend)
+            primary = self._launch(backend, False, system_prompt, user_prompt, results, decided, state)
+            pending += 1
+            # A failover is not hedged again
+            hedged = True
+
+        if attempt.hedge:
+            with self._lock:
+                self.hedges_won += 1
+        stream = attempt.stream
+        failed = False
+        try:
+            if first is not _END:
+                yield first
+            for chunk in stream:
+                yield chunk
+        except Exception:
+            failed = True
+            self._record_failure(attempt.backend)
+            raise
+        finally:
+            # Also reached when the caller stops reading (GeneratorExit)
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+            if not failed:
+                self._release(attempt.backend)
+
+    def generate_completion(self, system_prompt: str, user_prompt: str) -> str:
+        return "".join(self.stream_completion(system_prompt, user_prompt))
+
+    def ensure_model_available(self) -> bool:
+        """True if any backend is usable; every backend is checked"""
+        available = False
+        for backend in self.backends:
+            try:
+                ok = backend.provider.ensure_model_available()
+            except Exception as e:
+                logger.warning(f"LLM backend {backend.name} unavailable: {e}")
+                ok = False
+            available = available or ok
+        return available
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backends": [backend.stats() for backend in self.backends],
+                    "hedges_sent": self.hedges_sent, "hedges_won": self.hedges_won,
+                    "failovers": self.failovers}
+
+
+# Benchmark: naive round-robin vs routed vs routed + hedged, over stub servers with injected faults
+if __name__ == "__main__":
+    import itertools
+    from concurrent.futures import ThreadPoolExecutor
+    from llm_stub_server import StubOllamaServer, StubServerProvider, build_stub_response
+
+    logging.getLogger().setLevel(logging.ERROR)
+    response = build_stub_response(file_count=2, lines_per_file=10)
+    requests_per_run, concurrency = 240, 12
+    # Every host stalls on some prefills (queueing, model swaps); the third is worse and also fails
+    servers = [
+        StubOllamaServer(response=response, first_token_delay=0.15, tokens_per_second=3000,
+                         slow_rate=0.04, slow_delay=1.5, seed=1).start(),
+        StubOllamaServer(response=response, first_token_delay=0.15, tokens_per_second=3000,
+                         slow_rate=0.04, slow_delay=1.5, seed=2).start(),
+        StubOllamaServer(response=response, first_token_delay=0.15, tokens_per_second=3000,
+                         slow_rate=0.15, slow_delay=1.5, failure_rate=0.05, seed=3).start(),
+    ]
+
+    class RoundRobin(LLMProvider):
+        def __init__(self, providers):
+            self._cycle = itertools.cycle(providers)
+            self._lock = threading.Lock()
+
+        def generate_completion(self, system_prompt, user_prompt):
+            with self._lock:
+                provider = next(self._cycle)
+            return provider.generate_completion(system_prompt, user_prompt)
+
+        def ensure_model_available(self):
+            return True
+
+    def run(label: str, provider: LLMProvider):
+        latencies, errors = [], 0
+
+        def request(index: int):
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                provider.generate_completion("system", f"request {index}")
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(request, range(requests_per_run)))
+        wall = time.perf_counter() - start
+        latencies.sort()
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        print(f"{label:<24}{pct(0.5):>8.0f} ms{pct(0.95):>8.0f} ms{pct(0.99):>8.0f} ms{errors:>8}{wall:>8.1f} s")
+
+    def backends():
+        return [Backend(StubServerProvider(server.url), f"stub{i}") for i, server in enumerate(servers)]
+
+    print(f"=== {requests_per_run} requests, {concurrency} concurrent, 3 stub hosts: 150 ms prefill, "
+          f"+1.5 s stalls on 4%/4%/15%, third host fails 5% ===\n")
+    print(f"{'':<24}{'p50':>11}{'p95':>11}{'p99':>11}{'errors':>8}{'wall':>10}")
+    run("round-robin", RoundRobin([backend.provider for backend in backends()]))
+    router = RouterLLMProvider(backends(), hedge="off", seed=1)
+    run("router", router)
+    hedged = RouterLLMProvider(backends(), hedge="p95", hedge_min_samples=10, seed=1)
+    run("router + p95 hedge", hedged)
+    stats = hedged.stats()
+    print(f"\nhedged: {stats['hedges_sent']} hedges sent, {stats['hedges_won']} won, {stats['failovers']} failovers")
+    for backend in stats["backends"]:
+        print(f"  {backend['name']}: {backend['requests']} requests, {backend['failures']} failures, "
+              f"p95 first chunk {backend['ttft_p95_ms']} ms")
+    for server in servers:
+        server.stop()
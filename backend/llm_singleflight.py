@@ -0,0 +1,452 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_singleflight.py
+# Description: Request coalescing (single-flight) for identical in-flight LLM generations
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+Identical requests that arrive while one is already generating wait for that
+generation instead of starting their own; every waiter gets the same result
+or the same exception. A flight ends when its generation does, so later
+requests start fresh (the completion cache answers those).
+
+- SingleFlight: for threads in one process (the parallel generator's pool)
+- SharedStream: a stream fanned out to several consumers; any live consumer
+  pulls the next chunk, so one consumer abandoning it does not stall the rest,
+  and the upstream stream is closed only when every consumer has left
+- AsyncSingleFlight: for the event loop; a cancelled waiter leaves the flight
+  and the generation is cancelled only once no waiter is left
+
+Builds run in separate worker processes, one job each, so identical builds
+submitted together only meet in the shared completion cache. When the wrapped
+provider has the cache, a generation first claims its key there (a lease,
+LLM_SINGLEFLIGHT_LEASE seconds, renewed while it streams). A request finding
+the key claimed by another process polls (LLM_SINGLEFLIGHT_POLL) until the
+claim is released or expires, then claims it itself, which is answered from
+the cache if the other generation stored a completion. bypass_cache calls
+never wait.
+
+SingleFlightLLMProvider puts SingleFlight/SharedStream in front of a provider;
+LLMProvider.create() adds it unless LLM_SINGLEFLIGHT=0.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from llm_provider import LLMProvider
+from llm_cache import CompletionCache, caching_provider
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def singleflight_enabled() -> bool:
+    return os.environ.get("LLM_SINGLEFLIGHT", "1").lower() not in ("0", "false", "no", "off")
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs fn once per key among concurrent callers (threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.errors = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(result, shared); shared is True when another caller's call was reused"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.followers += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            # Remove before waking waiters so a caller arriving now starts a new flight
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._flights), "leaders": self.leaders,
+                    "followers": self.followers, "errors": self.errors}
+
+
+class SharedStream:
+    """One upstream iterator replayed to several consumers"""
+
+    def __init__(self, upstream: Iterator[str], on_finish: Callable[["SharedStream"], None]):
+        self._upstream = upstream
+        self._on_finish = on_finish
+        self._cond = threading.Condition()
+        self._chunks: List[str] = []
+        self._pulling = False
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._consumers = 0
+        self.closed = False
+
+    def join(self) -> Optional[Iterator[str]]:
+        """A consumer iterator, or None if the stream already ended (start a new one)"""
+        with self._cond:
+            if self._done or self.closed:
+                return None
+            self._consumers += 1
+        return self._consume()
+
+    def _consume(self) -> Iterator[str]:
+        index = 0
+        try:
+            while True:
+                with self._cond:
+                    while index >= len(self._chunks) and not self._done and self._pulling:
+                        self._cond.wait()
+                    if index < len(self._chunks):
+                        chunk = self._chunks[index]
+                        index += 1
+                    elif self._done:
+                        if self._error is not None:
+                            raise self._error
+                        return
+                    else:
+                        # Nobody is pulling: this consumer fetches the next chunk
+                        self._pulling = True
+                        chunk = None
+                if chunk is not None:
+                    yield chunk
+                    continue
+                self._pull()
+        finally:
+            self._leave()
+
+    def _pull(self):
+        try:
+            chunk = next(self._upstream)
+        except StopIteration:
+            self._finish()
+            return
+        except BaseException as e:
+            self._finish(e)
+            return
+        with self._cond:
+            self._chunks.append(chunk)
+            self._pulling = False
+            self._cond.notify_all()
+
+    def _finish(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self._done = True
+            self._error = error
+            self._pulling = False
+            self._cond.notify_all()
+        self._on_finish(self)
+
+    def _leave(self):
+        with self._cond:
+            self._consumers -= 1
+            abandoned = self._consumers == 0 and not self._done
+            if abandoned:
+                self.closed = True
+        if abandoned:
+            # Last consumer gone mid-stream: stop the generation
+            close = getattr(self._upstream, "close", None)
+            if close:
+                close()
+            self._on_finish(self)
+
+
+class SingleFlightLLMProvider(LLMProvider):
+    """Coalesces identical concurrent generate_completion and stream_completion calls"""
+
+    def __init__(self, provider: LLMProvider, lease_seconds: Optional[float] = None,
+                 poll_interval: Optional[float] = None):
+        self.provider = provider
+        self.flights = SingleFlight()
+        self.lease_seconds = lease_seconds or float(os.environ.get("LLM_SINGLEFLIGHT_LEASE", "60"))
+        self.poll_interval = poll_interval or float(os.environ.get("LLM_SINGLEFLIGHT_POLL", "0.1"))
+        self._streams_lock = threading.Lock()
+        self._streams: Dict[str, SharedStream] = {}
+        self.streams_started = 0
+        self.streams_joined = 0
+        self.process_waits = 0
+
+    @property
+    def model(self) -> str:
+        return getattr(self.provider, "model", "")
+
+    def _key(self, system_prompt: str, user_prompt: str, options: Dict[str, Any]) -> str:
+        key = CompletionCache.make_keys(self.provider.__class__.__name__, self.model,
+                                        getattr(self.provider, "temperature", 0.2), system_prompt, user_prompt)[0]
+        # Calls only share a flight when their options agree: a bypass_cache call must
+        # not be answered by a flight that may be serving a cached completion.
+        # similarity_text only steers the cache lookup of non-bypass calls
+        shared_options = {name: value for name, value in options.items() if name != "similarity_text"}
+        if shared_options:
+            key += repr(sorted(shared_options.items()))
+        return key
+
+    def _shared_cache(self, options: Dict[str, Any]) -> Optional[CompletionCache]:
+        """The cache coordinating flights across processes; None if the call can't be answered from it"""
+        if options.get("bypass_cache"):
+            return None
+        caching = caching_provider(self.provider)
+        return caching.cache if caching else None
+
+    def _across_processes(self, cache: CompletionCache, key: str, system_prompt: str, user_prompt: str,
+                          options: Dict[str, Any]) -> Iterator[str]:
+        """Stream the completion; while another process generates it, wait and then read it from the cache"""
+        owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        waited = False
+        while not cache.claim_flight(key, owner, self.lease_seconds):
+            if not waited:
+                waited = True
+                with self._streams_lock:
+                    self.process_waits += 1
+                logger.info("Waiting for an identical LLM generation in another process")
+            while cache.flight_active(key):
+                time.sleep(self.poll_interval)
+        try:
+            renewed = time.monotonic()
+            for chunk in self.provider.stream_completion(system_prompt, user_prompt, **options):
+                if time.monotonic() - renewed > self.lease_seconds / 3:
+                    cache.renew_flight(key, owner, self.lease_seconds)
+                    renewed = time.monotonic()
+                yield chunk
+        finally:
+            cache.release_flight(key, owner)
+
+    def generate_completion(self, system_prompt: str, user_prompt: str, **options) -> str:
+        key = self._key(system_prompt, user_prompt, options)
+        cache = self._shared_cache(options)
+        if cache:
+            generate = lambda: "".join(self._across_processes(cache, key, system_prompt, user_prompt, options))
+        else:
+            generate = lambda: self.provider.generate_completion(system_prompt, user_prompt, **options)
+        result, shared = self.flights.do(key, generate)
+        if shared:
+            logger.info("LLM completion shared with an identical in-flight request")
+        return result
+
+    def stream_completion(self, system_prompt: str, user_prompt: str, **options) -> Iterator[str]:
+        key = self._key(system_prompt, user_prompt, options)
+
+        def finished(stream: SharedStream):
+            with self._streams_lock:
+                if self._streams.get(key) is stream:
+                    del self._streams[key]
+
+        with self._streams_lock:
+            stream = self._streams.get(key)
+            consumer = stream.join() if stream else None
+            if consumer is None:
+                cache = self._shared_cache(options)
+                upstream = (self._across_processes(cache, key, system_prompt, user_prompt, options) if cache
+                            else iter(self.provider.stream_completion(system_prompt, user_prompt, **options)))
+                stream = self._streams[key] = SharedStream(upstream, finished)
+                consumer = stream.join()
+                self.streams_started += 1
+            else:
+                self.streams_joined += 1
+        return consumer
+
+    def ensure_model_available(self) -> bool:
+        return self.provider.ensure_model_available()
+
+    def stats(self) -> Dict[str, int]:
+        with self._streams_lock:
+            streams = {"streams_in_flight": len(self._streams), "streams_started": self.streams_started,
+                       "streams_joined": self.streams_joined, "process_waits": self.process_waits}
+        return dict(self.flights.stats(), **streams)
+
+    def __getattr__(self, name):
+        # cache, stats of the wrapped provider etc.
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+
+class AsyncSingleFlight:
+    """Runs one coroutine per key among concurrent awaiters (event loop)"""
+
+    def __init__(self):
+        self._flights: Dict[str, Tuple[asyncio.Task, List[int]]] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(factory())
+            flight = self._flights[key] = (task, [0])
+            task.add_done_callback(lambda _: self._flights.pop(key, None) if self._flights.get(key) is flight
+                                   else None)
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared generation
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                # Last waiter gone: stop the generation and free the key
+                task.cancel()
+                self.cancelled += 1
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._flights), "leaders": self.leaders,
+                "followers": self.followers, "cancelled": self.cancelled}
+
+
+# Load test: bursts of duplicate requests, with and without coalescing
+if __name__ == "__main__":
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    from llm_provider_stub import StubLLMProvider, AsyncStubLLMProvider
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(11)
+    bursts, burst_size, distinct, backend_slots = 10, 20, 5, 4
+    # Each burst: burst_size requests at once, drawn from a few popular template+requirement prompts
+    traffic = [[f"template={rng.randrange(distinct)} reqs=Header,FAQ,PricingCard" for _ in range(burst_size)]
+               for _ in range(bursts)]
+    total = bursts * burst_size
+
+    def responder(system_prompt, user_prompt):
+        return f"FILE: index.html\n```\n<!-- {user_prompt} -->\n```\n" * 5
+
+    class SlottedStub(StubLLMProvider):
+        """A backend that decodes at most backend_slots generations at once (OLLAMA_NUM_PARALLEL)"""
+        slots = threading.Semaphore(backend_slots)
+
+        def stream_completion(self, system_prompt, user_prompt):
+            with self.slots:
+                yield from super().stream_completion(system_prompt, user_prompt)
+
+    print(f"=== {total} requests in {bursts} bursts of {burst_size}, {distinct} distinct prompts, "
+          f"stub LLM 200 ms + 2000 tok/s, {backend_slots} backend slots ===\n")
+    print(f"{'':<26}{'upstream calls':>15}{'p50':>10}{'p95':>10}{'wall':>9}")
+
+    def run_sync(label: str, provider: LLMProvider, streaming: bool, upstream: StubLLMProvider):
+        latencies = []
+
+        def request(prompt: str):
+            begin = time.perf_counter()
+            if streaming:
+                "".join(provider.stream_completion("system", prompt))
+            else:
+                provider.generate_completion("system", prompt)
+            latencies.append(time.perf_counter() - begin)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(burst_size) as pool:
+            for burst in traffic:
+                list(pool.map(request, burst))
+        wall = time.perf_counter() - start
+        latencies.sort()
+        print(f"{label:<26}{upstream.calls:>15}{latencies[len(latencies) // 2] * 1000:>7.0f} ms"
+              f"{latencies[int(len(latencies) * 0.95)] * 1000:>7.0f} ms{wall:>7.1f} s")
+
+    for streaming in (False, True):
+        kind = "stream" if streaming else "generate"
+        stub = SlottedStub(first_token_delay=0.2, tokens_per_second=2000, responder=responder)
+        run_sync(f"{kind}, direct", stub, streaming, stub)
+        stub = SlottedStub(first_token_delay=0.2, tokens_per_second=2000, responder=responder)
+        run_sync(f"{kind}, single-flight", SingleFlightLLMProvider(stub), streaming, stub)
+
+    async def run_async(coalesce: bool):
+        provider = AsyncStubLLMProvider(first_token_delay=0.2, tokens_per_second=2000, responder=responder,
+                                        max_concurrency=backend_slots)
+        flights = AsyncSingleFlight()
+        start = time.perf_counter()
+        for burst in traffic:
+            calls = [flights.do(prompt, lambda p=prompt: provider.generate_completion("system", p)) if coalesce
+                     else provider.generate_completion("system", prompt) for prompt in burst]
+            await asyncio.gather(*calls)
+        return provider.calls, time.perf_counter() - start
+
+    for coalesce in (False, True):
+        calls, wall = asyncio.run(run_async(coalesce))
+        label = "async, single-flight" if coalesce else "async, direct"
+        print(f"{label:<26}{calls:>15}{'':>20}{wall:>7.1f} s")
+
+    # Build workers: one process per build, sharing only the completion cache DB
+    import tempfile
+    import multiprocessing
+    from llm_cache import CachingLLMProvider
+    processes = 12
+
+    def build_worker(cache_path: str, prompt: str, coalesce: bool, start, results):
+        stub = StubLLMProvider(first_token_delay=0.2, tokens_per_second=2000, responder=responder)
+        provider = CachingLLMProvider(stub, CompletionCache(cache_path))
+        if coalesce:
+            provider = SingleFlightLLMProvider(provider, poll_interval=0.02)
+        start.wait()
+        begin = time.perf_counter()
+        provider.generate_completion("system", prompt, similarity_text=prompt)
+        results.put((stub.calls, time.perf_counter() - begin))
+
+    print(f"\n=== {processes} build worker processes at once, {distinct} distinct prompts, shared cache DB ===\n")
+    context = multiprocessing.get_context("fork")
+    for coalesce in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            start, results = context.Barrier(processes), context.Queue()
+            workers = [context.Process(target=build_worker, args=(os.path.join(tmp, "cache.db"),
+                                                                  f"template={i % distinct} reqs=Header,FAQ,PricingCard", coalesce, start, results))
+                       for i in range(processes)]
+            for worker in workers:
+                worker.start()
+            outcomes = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+        latencies = sorted(latency for _, latency in outcomes)
+        label = "processes, single-flight" if coalesce else "processes, cache only"
+        print(f"{label:<26}{sum(calls for calls, _ in outcomes):>15}{latencies[len(latencies) // 2] * 1000:>7.0f} ms"
+              f"{latencies[int(len(latencies) * 0.95)] * 1000:>7.0f} ms")
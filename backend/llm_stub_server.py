@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: llm_stub_server.py
+# Description: Local mock of the Ollama HTTP API for tests and latency benchmarks
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+Serves /api/generate (streaming NDJSON or a single JSON body), /api/tags and
+/api/pull with a canned multi-file completion, paced like a real model: a
+prefill delay before the first token, then a fixed token rate. Failures and
+slow prefills can be injected for routing tests. Point the Ollama provider at
+it with LLM_HOST/LLM_PORT, or run
+
+    python llm_stub_server.py --serve --port 11435
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional
+
+from llm_provider import LLMProvider
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-oss:20b"
+# Roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+
+def build_stub_response(file_count: int = 8, lines_per_file: int = 30) -> str:
+    """A completion in the FILE:/code-fence format the generation prompts ask for"""
+    parts = ["Here is the complete project.\n\n"]
+    for i in range(file_count):
+        if i == 0:
+            path, lang = "index.html", "html"
+            body = [f"    <div class=\"row-{n}\">Section {n}</div>" for n in range(lines_per_file)]
+        elif i == 1:
+            path, lang = "styles.css", "css"
+            body = [f".row-{n} {{ padding: {n % 8}px; display: flex; }}" for n in range(lines_per_file)]
+        else:
+            path, lang = f"src/components/Component{i}.jsx", "jsx"
+            body = [f"  const value{n} = useMemo(() => compute({n}), []);" for n in range(lines_per_file)]
+        parts.append(f"FILE: {path}\n```{lang}\n" + "\n".join(body) + "\n```\n\n")
+    parts.append("Run `npm install` and open index.html to view the project.\n")
+    return "".join(parts)
+
+
+def tokenize(text: str, chars_per_token: int = CHARS_PER_TOKEN) -> List[str]:
+    return [text[i:i + chars_per_token] for i in range(0, len(text), chars_per_token)]
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("stub ollama: " + format % args)
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.server.model}]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json({"error": "invalid JSON"}, 400)
+            return
+
+        if self.path == "/api/pull":
+            self._send_json({"status": "success"})
+            return
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, 404)
+            return
+
+        server = self.server
+        with server.stats_lock:
+            server.requests_served += 1
+            # Injected faults: an error status, or a slow prefill (tail latency)
+            failed = server.rng.random() < server.failure_rate
+            prefill = server.first_token_delay + (server.slow_delay if server.rng.random() < server.slow_rate else 0)
+            if failed:
+                server.requests_failed += 1
+        if failed:
+            self._send_json({"error": "injected failure"}, 500)
+            return
+        tokens = tokenize(server.response)
+        start = time.perf_counter()
+
+        def wait_for_token(index: int):
+            # Scheduled against the request start so pacing does not drift
+            due = start + prefill + index / server.tokens_per_second
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if not request.get("stream", True):
+            wait_for_token(len(tokens) - 1)
+            self._send_json({"model": server.model, "response": server.response, "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for index, token in enumerate(tokens):
+                wait_for_token(index)
+                self._write_chunk(json.dumps({"model": server.model, "response": token,
+                                              "done": False}).encode("utf-8") + b"\n")
+            self._write_chunk(json.dumps({"model": server.model, "response": "", "done": True,
+                                          "eval_count": len(tokens)}).encode("utf-8") + b"\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client cancelled the generation
+            with server.stats_lock:
+                server.requests_cancelled += 1
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """
+    Mock Ollama server on a background thread (port 0 picks a free port)
+
+    failure_rate: share of generations answered with HTTP 500
+    slow_rate, slow_delay: share of generations whose prefill takes slow_delay longer
+    """
+    daemon_threads = True
+    # The socketserver default of 5 drops connects past it when a client opens its whole pool at once
+    request_queue_size = 128
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, response: Optional[str] = None,
+                 first_token_delay: float = 0.2, tokens_per_second: float = 2000.0,
+                 model: str = DEFAULT_MODEL, failure_rate: float = 0.0, slow_rate: float = 0.0,
+                 slow_delay: float = 0.0, seed: Optional[int] = None):
+        super().__init__((host, port), StubOllamaHandler)
+        self.response = response if response is not None else build_stub_response()
+        self.first_token_delay = first_token_delay
+        self.tokens_per_second = tokens_per_second
+        self.model = model
+        self.failure_rate = failure_rate
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.rng = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.requests_served = 0
+        self.requests_failed = 0
+        self.requests_cancelled = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections (cancelled or failed generations) are expected
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+class StubServerProvider(LLMProvider):
+    """
+    Ollama-protocol client on http.client, so the stub servers can back tests
+    and benchmarks without the requests package; closing a stream closes its
+    connection, which the server counts as a cancelled generation
+    """
+    def __init__(self, base_url: str, model: str = DEFAULT_MODEL, timeout: float = 60):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+
+    def generate_completion(self, system_prompt: str, user_prompt: str) -> str:
+        return "".join(self.stream_completion(system_prompt, user_prompt))
+
+    def stream_completion(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        import http.client
+        from urllib.parse import urlparse
+
+        parsed = urlparse(self.base_url)
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=self.timeout)
+        try:
+            conn.request("POST", "/api/generate", json.dumps({"model": self.model, "system": system_prompt,
+                                                              "prompt": user_prompt, "stream": True}),
+                         {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"Ollama stub returned HTTP {response.status}: {response.read()[:200]!r}")
+            for line in response:
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+        finally:
+            conn.close()
+
+    def ensure_model_available(self) -> bool:
+        return True
+
+
+def _generate(base_url: str, stream: bool, on_chunk=None) -> str:
+    """Minimal Ollama client (http.client) so the benchmark runs with the stdlib only"""
+    import http.client
+    from urllib.parse import urlparse
+
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+    conn.request("POST", "/api/generate", json.dumps({"model": DEFAULT_MODEL, "prompt": "bench",
+                                                      "stream": stream}),
+                 {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    if not stream:
+        text = json.loads(response.read())["response"]
+        if on_chunk:
+            on_chunk(text)
+    else:
+        parts = []
+        for line in response:
+            chunk = json.loads(line)
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                if on_chunk:
+                    on_chunk(chunk["response"])
+            if chunk.get("done"):
+                break
+        text = "".join(parts)
+    conn.close()
+    return text
+
+
+# Benchmark: time-to-first-file and end-to-end, blocking vs streaming extraction
+if __name__ == "__main__":
+    import argparse
+    import statistics
+    from file_block_parser import FileBlockParser, extract_file_blocks
+
+    parser = argparse.ArgumentParser(description="Mock Ollama server")
+    parser.add_argument("--serve", action="store_true", help="serve until interrupted instead of benchmarking")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    if args.serve:
+        server = StubOllamaServer(port=args.port, first_token_delay=args.first_token_delay,
+                                  tokens_per_second=args.tokens_per_second)
+        logger.info(f"Mock Ollama listening on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+        sys.exit(0)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server = StubOllamaServer(first_token_delay=args.first_token_delay,
+                              tokens_per_second=args.tokens_per_second).start()
+    expected = extract_file_blocks(server.response)
+    tokens = len(tokenize(server.response))
+    print(f"=== Mock Ollama: {len(expected)} files, {len(server.response):,} chars, {tokens:,} tokens, "
+          f"{args.first_token_delay * 1000:.0f} ms prefill, {args.tokens_per_second:.0f} tok/s ===\n")
+
+    results = {"blocking": ([], []), "streaming": ([], [])}
+    for run in range(5):
+        for mode in results:
+            start = time.perf_counter()
+            first_file = []
+            files = {}
+            block_parser = FileBlockParser()
+
+            def on_chunk(text):
+                for name, content in block_parser.feed(text):
+                    if not first_file:
+                        first_file.append(time.perf_counter() - start)
+                    files[name] = content
+
+            if mode == "blocking":
+                files = extract_file_blocks(_generate(server.url, stream=False))
+                first_file.append(time.perf_counter() - start)
+            else:
+                _generate(server.url, stream=True, on_chunk=on_chunk)
+            total = time.perf_counter() - start
+            assert files == expected, mode
+            results[mode][0].append(first_file[0])
+            results[mode][1].append(total)
+
+    server.stop()
+    print(f"{'':<12}{'first file':>14}{'all files':>14}")
+    for mode, (first, total) in results.items():
+        print(f"{mode:<12}{statistics.median(first) * 1000:>11.0f} ms{statistics.median(total) * 1000:>11.0f} ms")
@@ -0,0 +1,402 @@
+# MMRY Benchmark Harness - Reproducible Codec Benchmarks
+# Purpose: Frozen seeded corpus, repeated timed runs with confidence intervals, diffable JSON results
+# Last Modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90/100
+
+"""
+Usage:
+    python mmry_benchmark_harness.py run --out results.json [--repeats 7] [--codecs zlib,lzma]
+    python mmry_benchmark_harness.py compare baseline.json results.json [--threshold 0.05]
+    python mmry_benchmark_harness.py manifest
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import fnmatch
+import random
+import hashlib
+import argparse
+import platform
+import subprocess
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.append(str(Path(__file__).parent))
+
+from mmry_codec_registry import codec_registry
+
+RESULTS_SCHEMA = "mmry-benchmark/1"
+DEFAULT_SEED = 20251005
+BACKEND_DIR = Path(__file__).parent
+
+# Two-sided 95% Student t critical values by degrees of freedom
+T_CRITICAL_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+                 8: 2.306, 9: 2.262, 10: 2.228, 15: 2.131, 20: 2.086, 30: 2.042}
+
+WORDS = ("the project build file page component user data render state value system "
+         "layout style route server client request response cache index module").split()
+CODE_TOKENS = ["const", "let", "return", "function", "import", "export", "from", "if", "else",
+               "=>", "{", "}", "(", ")", ";", "=", "useState", "props", "className", "<div>", "</div>"]
+
+
+class BenchmarkCorpus:
+    """
+    Deterministic benchmark corpus
+
+    Synthetic entries follow the entropy spectrum used by the integrity analysis,
+    generated from a fixed seed. Real entries are the template specs, the template
+    sources generated projects are built from and the generated-project files in
+    mmry_secure_storage, read as committed at HEAD (git ls-tree), so builds writing
+    to the vault at runtime don't change the corpus; it only changes with a commit.
+    Outside a git checkout only the templates are read, from the working tree.
+    Every entry is hashed into a manifest so two result files can be checked for
+    having measured the same bytes.
+    """
+
+    # (category, directory, pattern relative to the directory)
+    REAL_SOURCES = [
+        ("template_specs", "templates", "*.json"),
+        ("templates", "templates/templates", "**"),
+        ("vault", "mmry_secure_storage", "**"),
+    ]
+
+    def __init__(self, seed: int = DEFAULT_SEED, include_real: bool = True,
+                 max_real_files: int = 1000, max_file_size: int = 256 * 1024):
+        self.seed = seed
+        self.include_real = include_real
+        self.max_real_files = max_real_files
+        self.max_file_size = max_file_size
+        self.entries: List[Dict[str, Any]] = []
+        self.source = "synthetic"
+
+    def build(self) -> List[Dict[str, Any]]:
+        self.entries = self._synthetic_entries()
+        if self.include_real:
+            self.entries.extend(self._real_entries())
+        return self.entries
+
+    def manifest(self) -> Dict[str, Any]:
+        if not self.entries:
+            self.build()
+
+        files = [{
+            "name": e["name"],
+            "category": e["category"],
+            "size": len(e["content"]),
+            "sha256": hashlib.sha256(e["content"]).hexdigest()
+        } for e in self.entries]
+
+        digest = hashlib.sha256()
+        for f in files:
+            digest.update(f"{f['name']}\0{f['sha256']}\n".encode("utf-8"))
+
+        return {
+            "seed": self.seed,
+            "source": self.source,
+            "digest": digest.hexdigest(),
+            "entries": len(files),
+            "bytes": sum(f["size"] for f in files),
+            "files": files
+        }
+
+    def _synthetic_entries(self) -> List[Dict[str, Any]]:
+        rng = random.Random(self.seed)
+        spectrum = {
+            "ultra_low_entropy": "A" * 10000,
+            "very_low_entropy": "AB" * 5000,
+            "low_entropy": "Hello World! " * 800,
+            "medium_low_entropy": 'function test() {\n    return "hello";\n}\n' * 500,
+            "medium_high_entropy": "".join(f"var{i} = {i * 17 % 1000}; " for i in range(1000)),
+            "high_entropy": "".join(chr(65 + (i * 7 + i ** 2) % 26) for i in range(10000)),
+            "ultra_high_entropy": "".join(chr(32 + (i * 19 + i ** 2 + i ** 3) % 95) for i in range(10000)),
+        }
+
+        entries = [{"name": f"synthetic/{name}", "category": "synthetic", "content": text.encode("utf-8")}
+                   for name, text in spectrum.items()]
+
+        for size in (512, 4096, 32768):
+            prose = " ".join(rng.choice(WORDS) for _ in range(size // 5))[:size]
+            code = " ".join(rng.choice(CODE_TOKENS) for _ in range(size // 4))[:size]
+            noise = "".join(chr(rng.randint(32, 126)) for _ in range(size))
+            entries.append({"name": f"synthetic/prose_{size}", "category": "synthetic", "content": prose.encode("utf-8")})
+            entries.append({"name": f"synthetic/code_{size}", "category": "synthetic", "content": code.encode("utf-8")})
+            entries.append({"name": f"synthetic/noise_{size}", "category": "synthetic", "content": noise.encode("utf-8")})
+
+        return entries
+
+    def _real_entries(self) -> List[Dict[str, Any]]:
+        try:
+            revision = _git("rev-parse", "HEAD").decode().strip()
+        except (OSError, subprocess.CalledProcessError):
+            print("Corpus: not a git checkout, reading templates from the working tree", file=sys.stderr)
+            self.source = "worktree"
+            return self._worktree_entries()
+
+        self.source = f"git:{revision}"
+        entries = []
+        for category, directory, pattern in self.REAL_SOURCES:
+            blobs = []
+            for record in _git("ls-tree", "-r", "-z", "--long", "HEAD", "--", directory).split(b"\0"):
+                if not record:
+                    continue
+                info, path = record.decode("utf-8").split("\t", 1)
+                _, kind, sha, size = info.split()
+                relative = path[len(directory) + 1:]
+                if kind == "blob" and _matches(relative, pattern) and "node_modules" not in relative.split("/") \
+                        and int(size) <= self.max_file_size:
+                    blobs.append((relative, sha))
+            blobs = sorted(blobs)[:self.max_real_files]
+            for (relative, _), content in zip(blobs, _read_blobs([sha for _, sha in blobs])):
+                entries.append({"name": f"{category}/{relative}", "category": category, "content": content})
+        return entries
+
+    def _worktree_entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for category, directory, pattern in self.REAL_SOURCES[:2]:
+            root = BACKEND_DIR / directory
+            if not root.exists():
+                continue
+            paths = sorted(p for p in root.rglob("*") if p.is_file() and "node_modules" not in p.parts
+                           and _matches(p.relative_to(root).as_posix(), pattern)
+                           and p.stat().st_size <= self.max_file_size)
+            for path in paths[:self.max_real_files]:
+                entries.append({
+                    "name": f"{category}/{path.relative_to(root).as_posix()}",
+                    "category": category,
+                    "content": path.read_bytes()
+                })
+        return entries
+
+
+def _matches(relative: str, pattern: str) -> bool:
+    # "**" takes everything below the directory; other patterns only match its own files
+    return pattern == "**" or ("/" not in relative and fnmatch.fnmatch(relative, pattern))
+
+
+def _git(*args: str, stdin: Optional[bytes] = None) -> bytes:
+    return subprocess.run(["git", *args], cwd=BACKEND_DIR, input=stdin, stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True).stdout
+
+
+def _read_blobs(shas: List[str]) -> List[bytes]:
+    """Contents of git blobs, in order (one git cat-file --batch call)"""
+    if not shas:
+        return []
+    output = _git("cat-file", "--batch", stdin="".join(f"{sha}\n" for sha in shas).encode())
+    contents, offset = [], 0
+    for _ in shas:
+        header_end = output.index(b"\n", offset)
+        size = int(output[offset:header_end].split()[2])
+        contents.append(output[header_end + 1:header_end + 1 + size])
+        offset = header_end + 1 + size + 1
+    return contents
+
+
+def _summarize(samples: List[float], nbytes: int) -> Dict[str, Any]:
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    dof = len(samples) - 1
+    t_value = T_CRITICAL_95[max(k for k in T_CRITICAL_95 if k <= dof)] if dof >= 1 else 0.0
+    half_width = t_value * stdev / math.sqrt(len(samples)) if dof >= 1 else 0.0
+    mb = nbytes / (1024 * 1024)
+
+    return {
+        "mean_s": mean,
+        "stdev_s": stdev,
+        "ci95_s": [mean - half_width, mean + half_width],
+        "min_s": min(samples),
+        "mb_s": mb / mean if mean else 0.0
+    }
+
+
+class BenchmarkHarness:
+    """Times each codec per corpus category with warmup and repeated runs"""
+
+    def __init__(self, corpus: BenchmarkCorpus, codecs: Optional[List[str]] = None,
+                 warmup: int = 1, repeats: int = 5):
+        self.corpus = corpus
+        self.codecs = [codec_registry.get(name) for name in codecs] if codecs else \
+            codec_registry.list_codecs(reversible_only=True)
+        self.warmup = warmup
+        self.repeats = repeats
+
+    def run(self) -> Dict[str, Any]:
+        entries = self.corpus.entries or self.corpus.build()
+        categories: Dict[str, List[bytes]] = {}
+        for entry in entries:
+            categories.setdefault(entry["category"], []).append(entry["content"])
+
+        results = []
+        for codec in self.codecs:
+            for category, contents in sorted(categories.items()):
+                results.append(self._bench(codec, category, contents))
+
+        manifest = self.corpus.manifest()
+        return {
+            "schema": RESULTS_SCHEMA,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count()
+            },
+            "config": {"warmup": self.warmup, "repeats": self.repeats},
+            "corpus": {k: manifest[k] for k in ("seed", "source", "digest", "entries", "bytes")},
+            "results": results
+        }
+
+    def _bench(self, codec, category: str, contents: List[bytes]) -> Dict[str, Any]:
+        nbytes = sum(len(c) for c in contents)
+        encode_samples, decode_samples = [], []
+        encoded: List[bytes] = []
+
+        for run in range(self.warmup + self.repeats):
+            start = time.perf_counter()
+            encoded = [codec.encode(c) for c in contents]
+            encode_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = [codec.decode(e) for e in encoded]
+            decode_s = time.perf_counter() - start
+
+            if run >= self.warmup:
+                encode_samples.append(encode_s)
+                decode_samples.append(decode_s)
+
+        encoded_bytes = sum(len(e) for e in encoded)
+        return {
+            "codec": codec.name,
+            "category": category,
+            "files": len(contents),
+            "bytes": nbytes,
+            "encoded_bytes": encoded_bytes,
+            "ratio": encoded_bytes / nbytes if nbytes else 1.0,
+            "round_trip": decoded == contents,
+            "encode": _summarize(encode_samples, nbytes),
+            "decode": _summarize(decode_samples, nbytes)
+        }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.05) -> Dict[str, Any]:
+    """
+    Diff two result files
+
+    A timing counts as a regression only when the mean slows by more than the
+    threshold and the two 95% confidence intervals do not overlap.
+    """
+    base_index = {(r["codec"], r["category"]): r for r in baseline["results"]}
+    rows, regressions = [], []
+
+    for result in current["results"]:
+        key = (result["codec"], result["category"])
+        base = base_index.get(key)
+        if base is None:
+            continue
+
+        row = {"codec": key[0], "category": key[1],
+               "ratio_change": result["ratio"] - base["ratio"]}
+        for phase in ("encode", "decode"):
+            old, new = base[phase], result[phase]
+            change = (new["mean_s"] - old["mean_s"]) / old["mean_s"] if old["mean_s"] else 0.0
+            significant = new["ci95_s"][0] > old["ci95_s"][1] or new["ci95_s"][1] < old["ci95_s"][0]
+            row[f"{phase}_change"] = change
+            row[f"{phase}_significant"] = significant
+            if change > threshold and significant:
+                regressions.append(f"{key[0]}/{key[1]} {phase} {change:+.1%}")
+        if not result["round_trip"]:
+            regressions.append(f"{key[0]}/{key[1]} round-trip failed")
+        if row["ratio_change"] > 0.005:
+            regressions.append(f"{key[0]}/{key[1]} ratio {base['ratio']:.4f} → {result['ratio']:.4f}")
+        rows.append(row)
+
+    return {
+        "same_corpus": baseline["corpus"]["digest"] == current["corpus"]["digest"],
+        "threshold": threshold,
+        "rows": rows,
+        "regressions": regressions
+    }
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("schema") != RESULTS_SCHEMA:
+        raise SystemExit(f"{path}: not a {RESULTS_SCHEMA} result file")
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="MMRY reproducible codec benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Benchmark codecs over the frozen corpus")
+    run_parser.add_argument("--out", default="mmry_benchmark_results.json")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--codecs", help="Comma-separated codec names (default: all reversible)")
+    run_parser.add_argument("--synthetic-only", action="store_true", help="Skip real-corpus files")
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.05,
+                                help="Relative slowdown counted as a regression (default 0.05)")
+
+    manifest_parser = sub.add_parser("manifest", help="Print the corpus manifest")
+    manifest_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "manifest":
+        print(json.dumps(BenchmarkCorpus(args.seed).manifest(), indent=2))
+        return 0
+
+    if args.command == "run":
+        corpus = BenchmarkCorpus(args.seed, include_real=not args.synthetic_only)
+        codecs = args.codecs.split(",") if args.codecs else None
+        results = BenchmarkHarness(corpus, codecs, args.warmup, args.repeats).run()
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        print(f"Corpus {results['corpus']['digest'][:12]}: {results['corpus']['entries']} files, "
+              f"{results['corpus']['bytes']:,} bytes")
+        print(f"{'Codec':<10} {'Category':<10} {'Ratio':>7} {'Enc MB/s':>9} {'±CI%':>6} {'Dec MB/s':>9} {'±CI%':>6}")
+        for r in results["results"]:
+            enc, dec = r["encode"], r["decode"]
+            enc_ci = (enc["ci95_s"][1] - enc["mean_s"]) / enc["mean_s"] if enc["mean_s"] else 0.0
+            dec_ci = (dec["ci95_s"][1] - dec["mean_s"]) / dec["mean_s"] if dec["mean_s"] else 0.0
+            print(f"{r['codec']:<10} {r['category']:<10} {r['ratio']:>7.3f} {enc['mb_s']:>9.1f} {enc_ci:>6.1%} "
+                  f"{dec['mb_s']:>9.1f} {dec_ci:>6.1%}")
+        print(f"\nResults written to {args.out}")
+        return 0
+
+    comparison = compare_results(_load(args.baseline), _load(args.current), args.threshold)
+    if not comparison["same_corpus"]:
+        print("Warning: corpus digests differ, timings are not directly comparable")
+    print(f"{'Codec':<10} {'Category':<10} {'Encode':>9} {'Decode':>9} {'Ratio Δ':>9}")
+    for row in comparison["rows"]:
+        enc = f"{row['encode_change']:+.1%}{'*' if row['encode_significant'] else ''}"
+        dec = f"{row['decode_change']:+.1%}{'*' if row['decode_significant'] else ''}"
+        print(f"{row['codec']:<10} {row['category']:<10} {enc:>9} {dec:>9} {row['ratio_change']:>+9.4f}")
+    print("(* = confidence intervals do not overlap)")
+
+    if comparison["regressions"]:
+        print("\nRegressions:")
+        for regression in comparison["regressions"]:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
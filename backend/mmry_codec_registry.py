@@ -0,0 +1,607 @@
+# MMRY Codec Registry - Single Home for Compress/Decompress Stacks
+# Purpose: Register every MMRY codec behind one streaming interface and one vault reader
+# Last Modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90/100
+
+import abc
+import bz2
+import base64
+import json
+import lzma
+import zlib
+import struct
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Union
+
+class MMRYStreamCoder(abc.ABC):
+    """Incremental encoder/decoder: feed chunks with update(), finish with flush()"""
+
+    @abc.abstractmethod
+    def update(self, chunk: bytes) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    def flush(self) -> bytes:
+        pass
+
+
+class _CompressObjCoder(MMRYStreamCoder):
+    """Wraps zlib/bz2/lzma compressor and decompressor objects"""
+
+    def __init__(self, obj, decompress: bool = False):
+        self._obj = obj
+        self._decompress = decompress
+
+    def update(self, chunk: bytes) -> bytes:
+        if self._decompress:
+            return self._obj.decompress(chunk)
+        return self._obj.compress(chunk)
+
+    def flush(self) -> bytes:
+        flush = getattr(self._obj, "flush", None)
+        return flush() if flush else b""
+
+
+class _BufferedCoder(MMRYStreamCoder):
+    """Buffers the whole input and runs a one-shot function on flush (for whole-file codecs)"""
+
+    def __init__(self, func):
+        self._func = func
+        self._chunks: List[bytes] = []
+
+    def update(self, chunk: bytes) -> bytes:
+        self._chunks.append(chunk)
+        return b""
+
+    def flush(self) -> bytes:
+        return self._func(b"".join(self._chunks))
+
+
+class MMRYCodec(abc.ABC):
+    """
+    Base class for registered codecs
+
+    Declared properties:
+        reversible       decode(encode(x)) == x for every input
+        block_capable    input can be split into independently decodable blocks
+        dictionary_aware codec uses a preset dictionary of common project tokens
+    """
+
+    codec_id: int = -1
+    name: str = ""
+    reversible: bool = True
+    block_capable: bool = False
+    dictionary_aware: bool = False
+
+    @abc.abstractmethod
+    def encoder(self) -> MMRYStreamCoder:
+        pass
+
+    @abc.abstractmethod
+    def decoder(self) -> MMRYStreamCoder:
+        pass
+
+    def encode(self, data: bytes) -> bytes:
+        coder = self.encoder()
+        return coder.update(data) + coder.flush()
+
+    def decode(self, data: bytes) -> bytes:
+        coder = self.decoder()
+        return coder.update(data) + coder.flush()
+
+    def properties(self) -> Dict[str, Any]:
+        return {
+            "codec_id": self.codec_id,
+            "name": self.name,
+            "reversible": self.reversible,
+            "block_capable": self.block_capable,
+            "dictionary_aware": self.dictionary_aware
+        }
+
+
+class RawCodec(MMRYCodec):
+    codec_id = 0
+    name = "raw"
+    block_capable = True
+
+    def encoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(lambda data: data)
+
+    def decoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(lambda data: data)
+
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(MMRYCodec):
+    codec_id = 1
+    name = "zlib"
+    block_capable = True
+
+    def __init__(self, level: int = 6, zdict: Optional[bytes] = None):
+        self.level = level
+        self.zdict = zdict
+
+    def encoder(self) -> MMRYStreamCoder:
+        if self.zdict:
+            obj = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS, 9,
+                                   zlib.Z_DEFAULT_STRATEGY, self.zdict)
+        else:
+            obj = zlib.compressobj(self.level)
+        return _CompressObjCoder(obj)
+
+    def decoder(self) -> MMRYStreamCoder:
+        obj = zlib.decompressobj(zdict=self.zdict) if self.zdict else zlib.decompressobj()
+        return _CompressObjCoder(obj, decompress=True)
+
+
+# Tokens that dominate generated Next.js/React projects; a preset dictionary lets
+# zlib back-reference them even in files too small to contain a repeat
+PROJECT_ZDICT = (
+    b'import React from "react";\nimport { useState, useEffect } from "react";\n'
+    b"export default function \nexport const \nconst [, set] = useState(\n"
+    b'return (\n    <div className="\n  );\n}\n</div>\n<span></span><p></p><h1></h1><h2></h2>'
+    b"<button onClick={() => \nclassName=\"flex items-center justify-between px-4 py-2 "
+    b"text-gray-900 bg-white rounded-lg shadow\"\n"
+    b'{\n  "name": "\n  "version": "1.0.0",\n  "private": true,\n  "scripts": {\n'
+    b'    "dev": "next dev",\n    "build": "next build",\n    "start": "next start"\n  },\n'
+    b'  "dependencies": {\n    "next": "\n    "react": "\n    "react-dom": "\n'
+    b"@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+    b"margin: 0;\npadding: 0;\nbox-sizing: border-box;\ndisplay: flex;\ncolor: #333;\n"
+    b"# Project\n\n## Getting Started\n\nnpm install\nnpm run dev\n"
+)
+
+
+class ZlibDictCodec(ZlibCodec):
+    codec_id = 2
+    name = "zlib-dict"
+    dictionary_aware = True
+
+    def __init__(self, level: int = 9):
+        super().__init__(level=level, zdict=PROJECT_ZDICT)
+
+
+class Bz2Codec(MMRYCodec):
+    codec_id = 3
+    name = "bz2"
+
+    def encoder(self) -> MMRYStreamCoder:
+        return _CompressObjCoder(bz2.BZ2Compressor(9))
+
+    def decoder(self) -> MMRYStreamCoder:
+        return _CompressObjCoder(bz2.BZ2Decompressor(), decompress=True)
+
+
+class LzmaCodec(MMRYCodec):
+    codec_id = 4
+    name = "lzma"
+
+    def encoder(self) -> MMRYStreamCoder:
+        return _CompressObjCoder(lzma.LZMACompressor(preset=6))
+
+    def decoder(self) -> MMRYStreamCoder:
+        return _CompressObjCoder(lzma.LZMADecompressor(), decompress=True)
+
+
+class _LegacyCodec(MMRYCodec):
+    """
+    Adapter exposing one of the older MMRY stacks through the codec interface
+
+    The legacy stack's own result dict is serialized as JSON so the payload can be
+    stored in a vault container and fed back to the stack's decompressor. These
+    stacks work on whole files, so the stream coders buffer until flush.
+    Each adapter declares whether its stack actually round-trips; test_mmry_codecs
+    checks the declaration against a fuzz corpus.
+    """
+
+    def encoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(lambda data: json.dumps(
+            self._compress(data.decode("utf-8")), separators=(",", ":")).encode("utf-8"))
+
+    def decoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(lambda data: self._decompress(
+            json.loads(data.decode("utf-8"))).encode("utf-8"))
+
+    @abc.abstractmethod
+    def _compress(self, content: str) -> Dict[str, Any]:
+        pass
+
+    @abc.abstractmethod
+    def _decompress(self, result: Dict[str, Any]) -> str:
+        pass
+
+
+class SmartMMRYCodec(_LegacyCodec):
+    codec_id = 16
+    name = "smart"
+
+    def _engine(self):
+        from mmry_smart_compression import SmartMMRY
+        return SmartMMRY(tempfile.gettempdir())
+
+    def _compress(self, content: str) -> Dict[str, Any]:
+        return self._engine().compress_file_content(content, "text", ".txt")
+
+    def _decompress(self, result: Dict[str, Any]) -> str:
+        return self._engine().decompress_file_content(
+            result["compressed_data"], result["compression_type"], result)
+
+
+class EnhancedMMRYCodec(_LegacyCodec):
+    codec_id = 17
+    name = "enhanced"
+    reversible = False  # raises ZeroDivisionError on empty input
+
+    def _engine(self):
+        from mmry_enhanced import EnhancedMMRY
+        return EnhancedMMRY(tempfile.gettempdir())
+
+    def _compress(self, content: str) -> Dict[str, Any]:
+        return self._engine().compress_file_content(content, "text", ".txt")
+
+    def _decompress(self, result: Dict[str, Any]) -> str:
+        return self._engine().decompress_file_content(
+            result["compressed_data"], result["compression_type"], result)
+
+
+class NeuralFoldingCodec(_LegacyCodec):
+    codec_id = 18
+    name = "neural-folding"
+    reversible = False  # the folding stages lose data on marker lookalikes and runs
+
+    def _compress(self, content: str) -> Dict[str, Any]:
+        from mmry_neural_folding_v3 import CompressionFoldingEngine
+        folded, metadata = CompressionFoldingEngine().fold_compress(content, "adaptive")
+        if isinstance(folded, bytes):
+            return {"data": base64.b64encode(folded).decode("ascii"), "encoding": "base64",
+                    "folding_metadata": metadata}
+        return {"data": str(folded), "encoding": "text", "folding_metadata": metadata}
+
+    def _decompress(self, result: Dict[str, Any]) -> str:
+        from mmry_neural_folding_v3 import MMRYNeuralFoldingSystem
+        data = result["data"]
+        if result["encoding"] == "base64":
+            data = base64.b64decode(data)
+        system = MMRYNeuralFoldingSystem(tempfile.gettempdir())
+        return system._unfold_content(data, result["folding_metadata"])
+
+
+class _VaultFileCodec(MMRYCodec):
+    """
+    Adapter for the older stacks that only compress by writing their own vault file
+
+    The stack writes into a scratch directory and the file it wrote becomes the
+    payload; decoding writes the payload back to a scratch file and hands it to
+    the stack's reader. The same files are what MMRYVault._read_legacy recognises
+    on disk, so a payload can also be saved as is and read through mmry_vault.
+    """
+
+    def encoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(self._encode_whole)
+
+    def decoder(self) -> MMRYStreamCoder:
+        return _BufferedCoder(self._decode_whole)
+
+    def _encode_whole(self, data: bytes) -> bytes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            return Path(self._write(storage_path, data.decode("utf-8"))).read_bytes()
+
+    def _decode_whole(self, data: bytes) -> bytes:
+        with tempfile.TemporaryDirectory() as storage_path:
+            filepath = Path(storage_path) / "payload.mmry"
+            filepath.write_bytes(data)
+            return self._read(storage_path, str(filepath)).encode("utf-8")
+
+    @abc.abstractmethod
+    def _write(self, storage_path: str, content: str) -> str:
+        """Store content with the stack; returns the path of the file it wrote"""
+
+    @abc.abstractmethod
+    def _read(self, storage_path: str, filepath: str) -> str:
+        pass
+
+
+class CompleteV2Codec(_VaultFileCodec):
+    """
+    complete-v2 vault files written without DNA folding: the folding pattern
+    search takes about a minute on 4 KB and grows faster than quadratically.
+    Folded files already on disk still decode through the same reader.
+    """
+
+    codec_id = 19
+    name = "complete-v2"
+
+    def _write(self, storage_path: str, content: str) -> str:
+        from mmry_complete_v2 import MMRYCompleteV2
+        return MMRYCompleteV2(storage_path).create_mmry_vault_file(
+            "codec", "codec", {"content": content, "file_type": "text", "file_extension": ".txt",
+                               "enable_folding": False})
+
+    def _read(self, storage_path: str, filepath: str) -> str:
+        from mmry_complete_v2 import MMRYCompleteV2
+        return MMRYCompleteV2(storage_path).read_mmry_vault_file(filepath)["content"]
+
+
+class IntegrationCodec(_VaultFileCodec):
+    codec_id = 20
+    name = "mmry-neural-dna"
+    reversible = False  # inputs with fewer than two distinct characters build no usable Huffman tree
+
+    def _write(self, storage_path: str, content: str) -> str:
+        from mmry_integration import MMRYIntegration
+        return MMRYIntegration(storage_path).create_mmry_file(
+            "codec", "codec", {"content": content, "file_type": "text", "file_extension": ".txt"})
+
+    def _read(self, storage_path: str, filepath: str) -> str:
+        from mmry_integration import MMRYIntegration
+        return MMRYIntegration(storage_path).retrieve_mmry_file(filepath)["content"]
+
+
+class LightweightCodec(_VaultFileCodec):
+    codec_id = 21
+    name = "lightweight"
+
+    def _write(self, storage_path: str, content: str) -> str:
+        from mmry_lightweight import MMRYLightweight
+        return MMRYLightweight(storage_path).store_file(
+            "codec", "codec", {"content": content, "file_name": "payload.txt"})["filepath"]
+
+    def _read(self, storage_path: str, filepath: str) -> str:
+        from mmry_lightweight import MMRYLightweight
+        return MMRYLightweight(storage_path).retrieve_file(filepath)["content"]
+
+
+class MinimalOverheadCodec(_VaultFileCodec):
+    codec_id = 22
+    name = "minimal-overhead"
+
+    def _write(self, storage_path: str, content: str) -> str:
+        from mmry_minimal_overhead import MMRYMinimalOverhead
+        return MMRYMinimalOverhead(storage_path).store_file_smart(
+            "codec", "codec", "payload.txt", content)["filepath"]
+
+    def _read(self, storage_path: str, filepath: str) -> str:
+        from mmry_minimal_overhead import MMRYMinimalOverhead
+        return MMRYMinimalOverhead(storage_path).retrieve_file(filepath)["content"]
+
+
+class IntelligentCodec(_VaultFileCodec):
+    codec_id = 23
+    name = "intelligent"
+    reversible = False  # retrieve_file_intelligent only decodes the zlib and raw methods
+
+    def _write(self, storage_path: str, content: str) -> str:
+        from mmry_intelligent_compression import MMRYIntelligentCompression
+        return MMRYIntelligentCompression(storage_path).store_file_intelligent(
+            "codec", "codec", "payload.txt", content)["filepath"]
+
+    def _read(self, storage_path: str, filepath: str) -> str:
+        from mmry_intelligent_compression import MMRYIntelligentCompression
+        return MMRYIntelligentCompression(storage_path).retrieve_file_intelligent(filepath)["content"]
+
+
+class MMRYCodecRegistry:
+    """Lookup of codecs by numeric ID or name"""
+
+    def __init__(self):
+        self._by_id: Dict[int, MMRYCodec] = {}
+        self._by_name: Dict[str, MMRYCodec] = {}
+
+    def register(self, codec: MMRYCodec) -> MMRYCodec:
+        if codec.codec_id in self._by_id:
+            raise ValueError(f"Codec ID {codec.codec_id} already registered as {self._by_id[codec.codec_id].name}")
+        self._by_id[codec.codec_id] = codec
+        self._by_name[codec.name] = codec
+        return codec
+
+    def get(self, codec: Union[int, str]) -> MMRYCodec:
+        found = self._by_id.get(codec) if isinstance(codec, int) else self._by_name.get(codec)
+        if found is None:
+            raise KeyError(f"Unknown MMRY codec: {codec}")
+        return found
+
+    def list_codecs(self, reversible_only: bool = False) -> List[MMRYCodec]:
+        codecs = sorted(self._by_id.values(), key=lambda c: c.codec_id)
+        if reversible_only:
+            codecs = [c for c in codecs if c.reversible]
+        return codecs
+
+
+codec_registry = MMRYCodecRegistry()
+for _codec in (RawCodec(), ZlibCodec(), ZlibDictCodec(), Bz2Codec(), LzmaCodec(),
+               SmartMMRYCodec(), EnhancedMMRYCodec(), NeuralFoldingCodec(), CompleteV2Codec(),
+               IntegrationCodec(), LightweightCodec(), MinimalOverheadCodec(), IntelligentCodec()):
+    codec_registry.register(_codec)
+
+
+# Vault container: fixed header, JSON metadata, then the codec payload
+#   magic(4) version(B) codec_id(H) flags(B) original_size(Q) sha256_prefix(8s) meta_len(I)
+VAULT_MAGIC = b"MMRY"
+VAULT_VERSION = 2
+VAULT_HEADER = struct.Struct(">4sBHBQ8sI")
+FLAG_BLOCKED = 0x01
+BLOCK_HEADER = struct.Struct(">I")
+
+
+class MMRYVault:
+    """
+    One writer and one reader for every MMRY vault file
+
+    New files use the binary container and dispatch on codec ID. Files written by
+    the older stacks are recognised by their JSON/binary layout and handed to the
+    stack that wrote them, so existing vaults stay readable.
+    """
+
+    def __init__(self, registry: MMRYCodecRegistry = codec_registry):
+        self.registry = registry
+
+    def encode(self, content: Union[str, bytes], codec: Union[int, str] = "zlib",
+               metadata: Optional[Dict[str, Any]] = None, block_size: int = 0) -> bytes:
+        """Build a vault container in memory"""
+        codec_obj = self.registry.get(codec)
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        meta_bytes = json.dumps(metadata or {}, separators=(",", ":")).encode("utf-8")
+
+        flags = 0
+        if block_size and codec_obj.block_capable and len(data) > block_size:
+            flags |= FLAG_BLOCKED
+            blocks = []
+            for start in range(0, len(data), block_size):
+                block = codec_obj.encode(data[start:start + block_size])
+                blocks.append(BLOCK_HEADER.pack(len(block)) + block)
+            payload = b"".join(blocks)
+        else:
+            payload = codec_obj.encode(data)
+
+        header = VAULT_HEADER.pack(VAULT_MAGIC, VAULT_VERSION, codec_obj.codec_id, flags,
+                                   len(data), hashlib.sha256(data).digest()[:8], len(meta_bytes))
+        return header + meta_bytes + payload
+
+    def write(self, filepath: Union[str, Path], content: Union[str, bytes],
+              codec: Union[int, str] = "zlib", metadata: Optional[Dict[str, Any]] = None,
+              block_size: int = 0) -> Dict[str, Any]:
+        """Write a vault container file"""
+        blob = self.encode(content, codec, metadata, block_size)
+        with open(filepath, "wb") as f:
+            f.write(blob)
+
+        original_size = len(content.encode("utf-8")) if isinstance(content, str) else len(content)
+        return {
+            "filepath": str(filepath),
+            "codec": self.registry.get(codec).name,
+            "original_size": original_size,
+            "stored_size": len(blob),
+            "compression_ratio": len(blob) / original_size if original_size else 1.0
+        }
+
+    def decode(self, blob: bytes) -> Dict[str, Any]:
+        """Decode an in-memory vault container"""
+        magic, version, codec_id, flags, original_size, digest, meta_len = VAULT_HEADER.unpack_from(blob)
+        if magic != VAULT_MAGIC:
+            raise ValueError("Not an MMRY vault container")
+        if version != VAULT_VERSION:
+            raise ValueError(f"Unsupported MMRY vault version {version}")
+
+        codec_obj = self.registry.get(codec_id)
+        meta_start = VAULT_HEADER.size
+        metadata = json.loads(blob[meta_start:meta_start + meta_len].decode("utf-8"))
+        data = b"".join(self._iter_payload(codec_obj, flags, memoryview(blob)[meta_start + meta_len:]))
+
+        if len(data) != original_size or hashlib.sha256(data).digest()[:8] != digest:
+            raise ValueError("File integrity check failed")
+
+        return {
+            "content": data.decode("utf-8"),
+            "codec": codec_obj.name,
+            "codec_id": codec_id,
+            "format": "vault-v2",
+            "metadata": metadata,
+            "original_size": original_size,
+            "stored_size": len(blob)
+        }
+
+    def _iter_payload(self, codec_obj: MMRYCodec, flags: int, payload: memoryview) -> Iterator[bytes]:
+        if not flags & FLAG_BLOCKED:
+            yield codec_obj.decode(bytes(payload))
+            return
+
+        pos = 0
+        while pos < len(payload):
+            (length,) = BLOCK_HEADER.unpack_from(payload, pos)
+            pos += BLOCK_HEADER.size
+            yield codec_obj.decode(bytes(payload[pos:pos + length]))
+            pos += length
+
+    def read(self, filepath: Union[str, Path]) -> Dict[str, Any]:
+        """Read any MMRY vault file, new container or legacy format"""
+        with open(filepath, "rb") as f:
+            blob = f.read()
+
+        if blob[:4] == VAULT_MAGIC:
+            return self.decode(blob)
+        return self._read_legacy(str(filepath), blob)
+
+    def _read_legacy(self, filepath: str, blob: bytes) -> Dict[str, Any]:
+        """Dispatch a pre-registry vault file to the stack that wrote it"""
+        storage_path = str(Path(filepath).parent)
+        try:
+            data = json.loads(blob.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            data = None
+
+        if not isinstance(data, dict):
+            # 2-byte header length + pipe-separated header: MMRYMinimalOverhead
+            from mmry_minimal_overhead import MMRYMinimalOverhead
+            result = MMRYMinimalOverhead(storage_path).retrieve_file(filepath)
+            return dict(result, codec=result.get("strategy"), format="minimal-overhead")
+
+        if data.get("mmry_signature") == "MMRY_NEURAL_FOLDING_PROPRIETARY":
+            from mmry_neural_folding_v3 import MMRYNeuralFoldingSystem
+            result = MMRYNeuralFoldingSystem(storage_path).retrieve_file_neural_folding(filepath)
+            return dict(result, codec=result["folding_metadata"].get("strategy"), format="neural-folding-v3")
+
+        if data.get("compression_engine") == "complete-v2":
+            from mmry_complete_v2 import MMRYCompleteV2
+            result = MMRYCompleteV2(storage_path).read_mmry_vault_file(filepath)
+            return dict(result, codec=data["compression_info"].get("compression_type"), format="complete-v2")
+
+        if "huffman_tree" in data:
+            from mmry_integration import MMRYIntegration
+            result = MMRYIntegration(storage_path).retrieve_mmry_file(filepath)
+            return dict(result, codec="mmry-neural-dna", format="integration")
+
+        if "compression_method" in data:
+            from mmry_intelligent_compression import MMRYIntelligentCompression
+            result = MMRYIntelligentCompression(storage_path).retrieve_file_intelligent(filepath)
+            return dict(result, codec=data["compression_method"], format="intelligent")
+
+        if data.get("v") == "2.0m" or data.get("version") == "2.0l" or "integrity" in data:
+            from mmry_lightweight import MMRYLightweight
+            result = MMRYLightweight(storage_path).retrieve_file(filepath)
+            return dict(result, codec=data.get("compression", "raw"), format="lightweight")
+
+        raise ValueError(f"Unrecognised MMRY vault format: {filepath}")
+
+
+mmry_vault = MMRYVault()
+
+
+# List registered codecs and round-trip a sample through each of them
+if __name__ == "__main__":
+    import time
+
+    print("=== MMRY Codec Registry ===\n")
+
+    sample = (Path(__file__).parent / "template_manager.py").read_text(encoding="utf-8")
+    data = sample.encode("utf-8")
+
+    print(f"{'ID':>3} {'Codec':<15} {'Rev':<4} {'Blk':<4} {'Dict':<5} {'Ratio':>7} {'Enc MB/s':>9} {'Dec MB/s':>9}  Round-trip")
+    for codec in codec_registry.list_codecs():
+        try:
+            start = time.perf_counter()
+            encoded = codec.encode(data)
+            encode_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = codec.decode(encoded)
+            decode_s = time.perf_counter() - start
+
+            mb = len(data) / (1024 * 1024)
+            status = "✅" if decoded == data else "❌ lossy"
+            print(f"{codec.codec_id:>3} {codec.name:<15} {str(codec.reversible)[0]:<4} "
+                  f"{str(codec.block_capable)[0]:<4} {str(codec.dictionary_aware)[0]:<5} "
+                  f"{len(encoded) / len(data):>7.3f} {mb / max(encode_s, 1e-9):>9.1f} "
+                  f"{mb / max(decode_s, 1e-9):>9.1f}  {status}")
+        except Exception as e:
+            print(f"{codec.codec_id:>3} {codec.name:<15} ❌ error: {e}")
+
+    blob = mmry_vault.encode(sample, "zlib-dict", {"file_name": "template_manager.py"}, block_size=4096)
+    assert mmry_vault.decode(blob)["content"] == sample
+    print(f"\nVault container (zlib-dict, 4 KB blocks): {len(data)} → {len(blob)} bytes, integrity verified")
@@ -185,8 +185,14 @@ class MMRYCompleteV2:
         with open(vault_filepath, 'r', encoding='utf-8') as f:
             vault_data = json.load(f)
         
-        # Decompress content
-        original_content = self.decompress_file(vault_data['compression_info'])
+        # Decompress content (the payload, file type and size are stored outside compression_info)
+        original_content = self.decompress_file({
+            **vault_data['compression_info'],
+            'mmry_strategy': vault_data['compression_info'].get('strategy', 'smart'),
+            'compressed_data': vault_data['compressed_content'],
+            'file_type': vault_data['file_metadata'].get('file_type', ''),
+            'original_size': vault_data['file_metadata']['original_size']
+        })
         
         # Verify integrity
         calculated_hash = hashlib.sha256(original_content.encode()).hexdigest()
@@ -248,6 +248,7 @@ class CompressionFoldingEngine:
         }
         
         self.folding_performance = {}  # Track performance of different folding chains
+        self.stage_profiler = None  # Optional ResourceMeter recording the cost of each stage
     
     def fold_compress(self, content: str, strategy: str = 'adaptive') -> Tuple[Any, Dict[str, Any]]:
         """
@@ -281,6 +282,7 @@ class CompressionFoldingEngine:
             
             try:
                 stage_start_size = len(str(folded_content).encode('utf-8'))
+                stage_token = self.stage_profiler.start() if self.stage_profiler else None
                 
                 if method == 'neural':
                     # Use neural compression engine
@@ -313,6 +315,8 @@ class CompressionFoldingEngine:
                     'stage_compression_ratio': stage_compression,
                     'metadata': stage_metadata
                 }
+                if stage_token is not None:
+                    stage_info['resources'] = self.stage_profiler.stop(stage_token)
                 
                 folding_metadata['stages'].append(stage_info)
                 current_size = stage_end_size
@@ -0,0 +1,397 @@
+# MMRY Pack Storage - Tiered Small-File Packing
+# Purpose: Store many tiny project files in one append-only pack file plus an offset index
+# Last Modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 95/100
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from mmry_codec_registry import codec_registry
+
+def encode_pack_payload(content_bytes: bytes, codec_name: str = "zlib-dict") -> Tuple[bytes, str]:
+    """Pack record payload and its codec; compresses only when it saves at least 10%, mirroring MMRYLightweight"""
+    if len(content_bytes) > 30:
+        codec = codec_registry.get(codec_name)
+        compressed = codec.encode(content_bytes)
+        if len(compressed) < len(content_bytes) * 0.9:
+            return compressed, codec.name
+    return content_bytes, "raw"
+
+
+class MMRYPackStorage:
+    """
+    Per-project pack storage for small files
+
+    Every standalone .mmry file costs an inode, a directory entry and at least one
+    filesystem block (4 KB on most filesystems), even for a 20-byte file. Files below
+    the pack threshold are appended to a single data file per project instead, and an
+    append-only JSON-lines index maps each file name to its offset in the pack.
+
+    Layout inside <storage_path>/<user_id>/<project_id>/:
+        project.mmry-pack      concatenated record payloads (raw or a registered codec)
+        project.mmry-pack.idx  one JSON record per line: {"op": "put"|"del", ...}
+
+    Pack bytes not referenced by a live index entry are dead: overwritten and
+    deleted records, and data appended by a batch whose index write failed.
+    Reads take the same lock as writes, since compaction swaps both files.
+    """
+
+    PACK_FILE = "project.mmry-pack"
+    INDEX_FILE = "project.mmry-pack.idx"
+    PACK_VERSION = 1
+
+    def __init__(self, storage_path: str = "mmry_storage", pack_threshold: int = 4096,
+                 compaction_ratio: float = 0.5, codec: str = "zlib-dict"):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(exist_ok=True)
+
+        # Files strictly smaller than this many bytes go into the pack
+        self.pack_threshold = pack_threshold
+        # Compact automatically once dead bytes exceed this share of the pack
+        self.compaction_ratio = compaction_ratio
+        # Registered codec for packed records; the preset dictionary suits small files
+        self.codec = codec
+
+        self._lock = threading.Lock()
+        # (user_id, project_id) -> (index_size, live_entries)
+        self._index_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, Dict[str, Any]]]] = {}
+
+    def should_pack(self, content_size: int) -> bool:
+        """Return True if a file of this size belongs in the pack tier"""
+        return content_size < self.pack_threshold
+
+    def store_file(self, user_id: str, project_id: str, file_name: str,
+                   content: str, file_type: str = "text") -> Dict[str, Any]:
+        """Append a single file to the project pack"""
+        return self.store_files(user_id, project_id, [{
+            "name": file_name,
+            "content": content,
+            "type": file_type
+        }])[0]
+
+    def store_files(self, user_id: str, project_id: str,
+                    files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Append a batch of files to the project pack with one data write and one index write
+
+        Args:
+            user_id: User identifier
+            project_id: Project identifier
+            files: List of {"name", "content", "type"} dictionaries
+
+        Returns:
+            Per-file storage results in input order
+        """
+        with self._lock:
+            project_dir = self._project_dir(user_id, project_id, create=True)
+            pack_path = project_dir / self.PACK_FILE
+            index_path = project_dir / self.INDEX_FILE
+
+            payloads = []
+            index_records = []
+            results = []
+
+            offset = pack_path.stat().st_size if pack_path.exists() else 0
+
+            for file_data in files:
+                file_name = file_data.get("name", "unknown")
+                content = file_data.get("content", "")
+                content_bytes = content.encode("utf-8")
+                # Precomputed artifacts carry (codec setting, payload, codec) from encode_pack_payload
+                encoded = file_data.get("encoded")
+                if encoded and encoded[0] == self.codec:
+                    payload, codec = encoded[1], encoded[2]
+                else:
+                    payload, codec = self._encode_payload(content_bytes)
+
+                record = {
+                    "op": "put",
+                    "name": file_name,
+                    "offset": offset,
+                    "length": len(payload),
+                    "size": len(content_bytes),
+                    "codec": codec,
+                    "type": file_data.get("type", "text"),
+                    "hash": hashlib.sha256(content_bytes).hexdigest()[:16],
+                    "created": int(time.time())
+                }
+
+                payloads.append(payload)
+                index_records.append(record)
+                offset += len(payload)
+
+                results.append({
+                    "pack_path": str(pack_path),
+                    "file_name": file_name,
+                    "storage_tier": "pack",
+                    "original_size": len(content_bytes),
+                    "compressed_size": len(payload),
+                    "compression_ratio": len(payload) / len(content_bytes) if content_bytes else 1.0,
+                    "codec": codec
+                })
+
+            # Data first, then index: a crash in between only leaves unreferenced bytes
+            with open(pack_path, "ab") as f:
+                f.write(b"".join(payloads))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._append_index(index_path, index_records)
+
+            self._index_cache.pop((user_id, project_id), None)
+            return results
+
+    def retrieve_file(self, user_id: str, project_id: str, file_name: str) -> Dict[str, Any]:
+        """Random access read of a single packed file by name"""
+        with self._lock:
+            entry = self._load_index(user_id, project_id).get(file_name)
+            if entry is None:
+                raise FileNotFoundError(f"{file_name} not found in pack for project {project_id}")
+
+            pack_path = self._project_dir(user_id, project_id) / self.PACK_FILE
+            with open(pack_path, "rb") as f:
+                f.seek(entry["offset"])
+                payload = f.read(entry["length"])
+
+        content = self._decode_payload(payload, entry["codec"]).decode("utf-8")
+
+        if hashlib.sha256(content.encode("utf-8")).hexdigest()[:16] != entry["hash"]:
+            raise ValueError(f"Pack integrity check failed for {file_name}")
+
+        return {
+            "content": content,
+            "user_id": user_id,
+            "project_id": project_id,
+            "file_name": file_name,
+            "file_type": entry.get("type", "text"),
+            "storage_tier": "pack",
+            "original_size": entry["size"],
+            "compressed_size": entry["length"]
+        }
+
+    def list_files(self, user_id: str, project_id: str) -> List[Dict[str, Any]]:
+        """List packed files from the index without touching the data file"""
+        with self._lock:
+            entries = self._load_index(user_id, project_id)
+        return [
+            {
+                "file_name": name,
+                "file_type": entry.get("type", "text"),
+                "original_size": entry["size"],
+                "compressed_size": entry["length"],
+                "codec": entry["codec"],
+                "created": entry.get("created")
+            }
+            for name, entry in sorted(entries.items())
+        ]
+
+    def delete_file(self, user_id: str, project_id: str, file_name: str) -> bool:
+        """Tombstone a packed file and compact once enough of the pack is dead"""
+        with self._lock:
+            if file_name not in self._load_index(user_id, project_id):
+                return False
+
+            index_path = self._project_dir(user_id, project_id) / self.INDEX_FILE
+            self._append_index(index_path, [{"op": "del", "name": file_name}])
+
+            self._index_cache.pop((user_id, project_id), None)
+
+        stats = self.get_pack_stats(user_id, project_id)
+        if stats["pack_size"] and stats["dead_bytes"] / stats["pack_size"] >= self.compaction_ratio:
+            self.compact(user_id, project_id)
+        return True
+
+    def compact(self, user_id: str, project_id: str) -> Dict[str, Any]:
+        """
+        Rewrite the pack with live records only and collapse the index journal
+
+        Both files are written to temporaries and swapped in with os.replace so a
+        reader never observes a half-written pack.
+        """
+        with self._lock:
+            project_dir = self._project_dir(user_id, project_id)
+            pack_path = project_dir / self.PACK_FILE
+            index_path = project_dir / self.INDEX_FILE
+            entries = self._load_index(user_id, project_id)
+            size_before = pack_path.stat().st_size if pack_path.exists() else 0
+            dead_bytes = size_before - sum(entry["length"] for entry in entries.values())
+
+            tmp_pack = project_dir / (self.PACK_FILE + ".tmp")
+            tmp_index = project_dir / (self.INDEX_FILE + ".tmp")
+
+            offset = 0
+            with open(pack_path, "rb") as src, open(tmp_pack, "wb") as dst, \
+                    open(tmp_index, "w", encoding="utf-8") as idx:
+                # Copy in offset order so the new pack is read sequentially
+                for name, entry in sorted(entries.items(), key=lambda item: item[1]["offset"]):
+                    src.seek(entry["offset"])
+                    dst.write(src.read(entry["length"]))
+
+                    record = dict(entry, op="put", name=name, offset=offset)
+                    idx.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    offset += entry["length"]
+
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            os.replace(tmp_pack, pack_path)
+            os.replace(tmp_index, index_path)
+            self._index_cache.pop((user_id, project_id), None)
+
+            return {
+                "files": len(entries),
+                "size_before": size_before,
+                "size_after": offset,
+                "reclaimed_bytes": size_before - offset,
+                "dead_bytes_before": dead_bytes
+            }
+
+    def get_pack_stats(self, user_id: str, project_id: str) -> Dict[str, Any]:
+        """Get pack size, live/dead bytes and file count for a project"""
+        with self._lock:
+            entries = self._load_index(user_id, project_id)
+            pack_path = self._project_dir(user_id, project_id) / self.PACK_FILE
+            pack_size = pack_path.stat().st_size if pack_path.exists() else 0
+
+        live_bytes = sum(entry["length"] for entry in entries.values())
+        return {
+            "files": len(entries),
+            "pack_size": pack_size,
+            "live_bytes": live_bytes,
+            "dead_bytes": pack_size - live_bytes,
+            "original_size": sum(entry["size"] for entry in entries.values())
+        }
+
+    def _append_index(self, index_path: Path, records: List[Dict[str, Any]]):
+        """Append journal records, first ending a torn trailing line so it cannot swallow them"""
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode("utf-8")
+        with open(index_path, "ab+") as f:
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+    def _load_index(self, user_id: str, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Replay the index journal into {name: entry}, cached until the journal grows (lock held)"""
+        index_path = self._project_dir(user_id, project_id) / self.INDEX_FILE
+        if not index_path.exists():
+            return {}
+
+        index_size = index_path.stat().st_size
+        cached = self._index_cache.get((user_id, project_id))
+        if cached and cached[0] == index_size:
+            return cached[1]
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn line from an interrupted append (ended by _append_index)
+                    continue
+
+                name = record.get("name")
+                entries.pop(name, None)
+                if record.get("op") == "put":
+                    entries[name] = record
+
+        self._index_cache[(user_id, project_id)] = (index_size, entries)
+        return entries
+
+    def _encode_payload(self, content_bytes: bytes) -> Tuple[bytes, str]:
+        return encode_pack_payload(content_bytes, self.codec)
+
+    def _decode_payload(self, payload: bytes, codec: str) -> bytes:
+        return codec_registry.get(codec).decode(payload)
+
+    def _project_dir(self, user_id: str, project_id: str, create: bool = False) -> Path:
+        project_dir = self.storage_path / user_id / project_id
+        if create:
+            project_dir.mkdir(parents=True, exist_ok=True)
+        return project_dir
+
+
+def _disk_usage(paths: List[Path]) -> int:
+    """Allocated bytes on disk (st_blocks is always in 512-byte units)"""
+    total = 0
+    for path in paths:
+        st = path.stat()
+        total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+    return total
+
+
+# Benchmark pack storage against one standalone file per entry
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    from mmry_minimal_overhead import MMRYMinimalOverhead
+
+    print("=== MMRY Pack Storage - Small File Packing Benchmark ===\n")
+
+    rng = random.Random(26)
+    words = ["const", "export", "default", "import", "return", "props", "div", "span", "class", "id"]
+
+    for file_count in (100, 300, 1000):
+        workdir = Path(tempfile.mkdtemp(prefix="mmry_pack_bench_"))
+        try:
+            files = []
+            for i in range(file_count):
+                size = rng.randint(20, 600)
+                text = " ".join(rng.choice(words) for _ in range(size // 5))[:size]
+                files.append({"name": f"src/components/File{i}.tsx", "content": text, "type": "javascript"})
+
+            standalone = MMRYMinimalOverhead(storage_path=str(workdir / "standalone"))
+            for f in files:
+                standalone.store_file_smart("bench", "p1", f["name"], f["content"], f["type"])
+
+            pack = MMRYPackStorage(storage_path=str(workdir / "packed"))
+            pack.store_files("bench", "p1", files)
+
+            standalone_dir = workdir / "standalone" / "bench" / "p1"
+            pack_dir = workdir / "packed" / "bench" / "p1"
+            standalone_disk = _disk_usage(list(standalone_dir.iterdir()))
+            pack_disk = _disk_usage(list(pack_dir.iterdir()))
+
+            start = time.perf_counter()
+            for _ in range(20):
+                listed = [standalone.retrieve_file(str(p))["file_name"] for p in standalone_dir.iterdir()]
+            standalone_list_ms = (time.perf_counter() - start) * 1000 / 20
+
+            start = time.perf_counter()
+            for _ in range(20):
+                pack._index_cache.clear()
+                listed = pack.list_files("bench", "p1")
+            pack_list_ms = (time.perf_counter() - start) * 1000 / 20
+
+            start = time.perf_counter()
+            for f in files:
+                assert pack.retrieve_file("bench", "p1", f["name"])["content"] == f["content"]
+            pack_read_ms = (time.perf_counter() - start) * 1000
+
+            for f in files[: file_count // 2]:
+                pack.delete_file("bench", "p1", f["name"])
+            stats = pack.get_pack_stats("bench", "p1")
+
+            print(f"{file_count} files:")
+            print(f"  Disk usage   standalone {standalone_disk:>9,d} B   pack {pack_disk:>9,d} B   "
+                  f"({standalone_disk / max(pack_disk, 1):.1f}x smaller)")
+            print(f"  Listing      standalone {standalone_list_ms:8.2f} ms   pack {pack_list_ms:8.2f} ms (cold index)")
+            print(f"  Read all     pack {pack_read_ms:.2f} ms, integrity verified")
+            print(f"  After deleting half: {stats['files']} files, pack {stats['pack_size']:,d} B, "
+                  f"dead {stats['dead_bytes']:,d} B")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n✅ Pack storage benchmark complete")
@@ -0,0 +1,246 @@
+# MMRY Resource Meter - Per-Process Cost Accounting
+# Purpose: Measure the CPU, memory and allocation cost of a block of code using only this process's counters
+# Last Modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90/100
+
+import os
+import sys
+import time
+import fcntl
+import ctypes
+import platform
+import resource
+import tracemalloc
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# perf_event_open(2) constants
+PERF_TYPE_HARDWARE = 0
+PERF_COUNT_HW_CPU_CYCLES = 0
+PERF_COUNT_HW_INSTRUCTIONS = 1
+PERF_EVENT_IOC_ENABLE = 0x2400
+PERF_EVENT_IOC_DISABLE = 0x2401
+PERF_EVENT_IOC_RESET = 0x2403
+PERF_FLAG_DISABLED = 1 << 0
+PERF_FLAG_EXCLUDE_KERNEL = 1 << 5
+PERF_FLAG_EXCLUDE_HV = 1 << 6
+SYS_PERF_EVENT_OPEN = {"x86_64": 298, "aarch64": 241, "i686": 336, "armv7l": 364}
+
+
+class _PerfEventAttr(ctypes.Structure):
+    # PERF_ATTR_SIZE_VER0 layout (64 bytes)
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("size", ctypes.c_uint32),
+        ("config", ctypes.c_uint64),
+        ("sample_period", ctypes.c_uint64),
+        ("sample_type", ctypes.c_uint64),
+        ("read_format", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+        ("wakeup_events", ctypes.c_uint32),
+        ("bp_type", ctypes.c_uint32),
+        ("config1", ctypes.c_uint64),
+    ]
+
+
+class PerfCounter:
+    """
+    User-space hardware counter for the calling thread via perf_event_open
+
+    The counter runs from creation and read() returns the running total, so
+    nested measurements can take deltas without resetting each other. Unavailable
+    on non-Linux systems, unknown architectures, and containers or hosts where
+    perf_event_paranoid forbids it; `available` is False then and read() returns None.
+    """
+
+    def __init__(self, config: int = PERF_COUNT_HW_CPU_CYCLES):
+        self.fd = -1
+        syscall_nr = SYS_PERF_EVENT_OPEN.get(platform.machine())
+        if sys.platform != "linux" or syscall_nr is None:
+            return
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            attr = _PerfEventAttr(type=PERF_TYPE_HARDWARE, size=ctypes.sizeof(_PerfEventAttr), config=config,
+                                  flags=PERF_FLAG_DISABLED | PERF_FLAG_EXCLUDE_KERNEL | PERF_FLAG_EXCLUDE_HV)
+            # pid=0 (this thread), cpu=-1 (any), group_fd=-1, flags=0
+            self.fd = libc.syscall(syscall_nr, ctypes.byref(attr), 0, -1, -1, 0)
+            if self.fd >= 0:
+                fcntl.ioctl(self.fd, PERF_EVENT_IOC_RESET, 0)
+                fcntl.ioctl(self.fd, PERF_EVENT_IOC_ENABLE, 0)
+        except (OSError, AttributeError):
+            self.fd = -1
+
+    @property
+    def available(self) -> bool:
+        return self.fd >= 0
+
+    def read(self) -> Optional[int]:
+        if not self.available:
+            return None
+        return int.from_bytes(os.read(self.fd, 8), sys.byteorder)
+
+    def close(self):
+        if self.available:
+            fcntl.ioctl(self.fd, PERF_EVENT_IOC_DISABLE, 0)
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ResourceMeter:
+    """
+    Measures what one piece of work costs this process
+
+    Everything comes from per-process or per-thread counters, so other load on the
+    machine does not leak into the numbers:
+        wall / process / thread CPU time   perf_counter_ns, process_time_ns, thread_time_ns
+        user / system time, page faults,   resource.getrusage (RUSAGE_SELF, and
+        context switches, max RSS          RUSAGE_THREAD where the platform has it)
+        net allocated blocks               sys.getallocatedblocks delta
+        CPU cycles / instructions          perf_event_open, when permitted
+        peak traced memory                 tracemalloc, in a separate pass
+
+    tracemalloc hooks every allocation and slows allocation-heavy code several
+    times over, so start()/stop() never trace: peak memory comes from running the
+    work again under measure_memory(). measure() does both passes.
+
+    Timed measurements may nest (a whole run and each of its stages).
+
+    Usage:
+        meter = ResourceMeter()
+        result, costs = meter.measure(do_work)
+        # or, timing only:
+        token = meter.start()
+        do_work()
+        costs = meter.stop(token)
+    """
+
+    def __init__(self, use_perf: bool = True, trace_memory: bool = True):
+        # Whether measure() adds the memory pass
+        self.trace_memory = trace_memory
+        self.cycles = PerfCounter(PERF_COUNT_HW_CPU_CYCLES) if use_perf else None
+        self.instructions = PerfCounter(PERF_COUNT_HW_INSTRUCTIONS) if use_perf else None
+        self._thread_rusage = getattr(resource, "RUSAGE_THREAD", None)
+
+    @property
+    def perf_available(self) -> bool:
+        return bool(self.cycles and self.cycles.available)
+
+    def start(self) -> Dict[str, Any]:
+        token = {
+            "blocks": sys.getallocatedblocks(),
+            "rusage_self": resource.getrusage(resource.RUSAGE_SELF),
+            "rusage_thread": resource.getrusage(self._thread_rusage) if self._thread_rusage is not None else None,
+        }
+        token["cycles"] = self.cycles.read() if self.cycles else None
+        token["instructions"] = self.instructions.read() if self.instructions else None
+
+        # Clocks last so counter setup is outside the measured window
+        token["thread_ns"] = time.thread_time_ns()
+        token["process_ns"] = time.process_time_ns()
+        token["wall_ns"] = time.perf_counter_ns()
+        return token
+
+    def stop(self, token: Dict[str, Any]) -> Dict[str, Any]:
+        wall_ns = time.perf_counter_ns() - token["wall_ns"]
+        process_ns = time.process_time_ns() - token["process_ns"]
+        thread_ns = time.thread_time_ns() - token["thread_ns"]
+
+        cycles = _counter_delta(self.cycles, token["cycles"])
+        instructions = _counter_delta(self.instructions, token["instructions"])
+
+        blocks = sys.getallocatedblocks() - token["blocks"]
+        rusage_self = resource.getrusage(resource.RUSAGE_SELF)
+        before = token["rusage_self"]
+
+        result = {
+            "wall_time_s": wall_ns / 1e9,
+            "process_cpu_time_s": process_ns / 1e9,
+            "thread_cpu_time_s": thread_ns / 1e9,
+            "cpu_percent": (process_ns / wall_ns) * 100 if wall_ns else 0.0,
+            "user_time_s": rusage_self.ru_utime - before.ru_utime,
+            "system_time_s": rusage_self.ru_stime - before.ru_stime,
+            "minor_page_faults": rusage_self.ru_minflt - before.ru_minflt,
+            "major_page_faults": rusage_self.ru_majflt - before.ru_majflt,
+            "voluntary_context_switches": rusage_self.ru_nvcsw - before.ru_nvcsw,
+            "involuntary_context_switches": rusage_self.ru_nivcsw - before.ru_nivcsw,
+            "max_rss_mb": _max_rss_mb(rusage_self),
+            "net_allocated_blocks": blocks,
+            "cpu_cycles": cycles,
+            "instructions": instructions,
+        }
+
+        if token["rusage_thread"] is not None:
+            thread_after = resource.getrusage(self._thread_rusage)
+            result["thread_user_time_s"] = thread_after.ru_utime - token["rusage_thread"].ru_utime
+            result["thread_system_time_s"] = thread_after.ru_stime - token["rusage_thread"].ru_stime
+
+        return result
+
+    def measure_memory(self, func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, float]]:
+        """Run func under tracemalloc; returns (result, peak and net traced memory in MB)"""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = func(*args, **kwargs)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+        return result, {
+            "peak_memory_mb": max(0, peak - baseline) / (1024 * 1024),
+            "memory_delta_mb": (current - baseline) / (1024 * 1024),
+        }
+
+    def measure(self, func: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Timed pass, then (with trace_memory) a memory pass of the same call
+
+        Returns the timed pass's result and its costs plus the memory pass's
+        peak_memory_mb / memory_delta_mb. func must be safe to run twice.
+        """
+        token = self.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            costs = self.stop(token)
+        if self.trace_memory:
+            _, memory = self.measure_memory(func, *args, **kwargs)
+            costs.update(memory)
+        return result, costs
+
+    def close(self):
+        for counter in (self.cycles, self.instructions):
+            if counter:
+                counter.close()
+
+
+def _counter_delta(counter: Optional[PerfCounter], start: Optional[int]) -> Optional[int]:
+    if counter is None or start is None:
+        return None
+    return counter.read() - start
+
+
+def _max_rss_mb(usage) -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / divisor
+
+
+# Show what a zlib pass over 4 MB costs
+if __name__ == "__main__":
+    import zlib
+
+    meter = ResourceMeter()
+    print(f"perf_event cycles available: {meter.perf_available}")
+
+    data = b"function render() { return <div className='card'>{props.title}</div>; }\n" * 60000
+    compressed, costs = meter.measure(zlib.compress, data, 9)
+
+    print(f"zlib level 9 over {len(data):,} bytes → {len(compressed):,} bytes")
+    for key, value in costs.items():
+        print(f"  {key:<30} {value}")
+    meter.close()
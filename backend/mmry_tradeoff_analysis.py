@@ -1,19 +1,18 @@
 # MMRY Trade-off Analysis - Finding the Sweet Spot
 # Purpose: Analyze trade-offs between compression ratio, speed, CPU usage, memory, and integrity
 # Find optimal configurations for different use cases
-# Last Modified: 2024-12-19
+# Last Modified: 2026-10-18
 # By: AI Assistant  
 # Completeness: 95/100
 
-import time
-import psutil
-import threading
+import copy
 import json
-import numpy as np
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Tuple
 import matplotlib.pyplot as plt
 from mmry_neural_folding_v3 import MMRYNeuralFoldingSystem, CompressionFoldingEngine
+from mmry_resource_meter import ResourceMeter
 import zlib
 import hashlib
 
@@ -25,100 +24,85 @@ class MMRYTradeoffAnalyzer:
     def __init__(self):
         self.mmry = MMRYNeuralFoldingSystem()
         self.folding_engine = CompressionFoldingEngine()
+        self.meter = ResourceMeter()
+        # Per-stage costs land in each stage's 'resources' entry of the folding metadata
+        self.folding_engine.stage_profiler = self.meter
         self.results = []
         
-    def monitor_system_resources(self, duration_seconds=1):
-        """Monitor CPU and memory usage during operation"""
-        measurements = []
-        start_time = time.time()
-        
-        while time.time() - start_time < duration_seconds:
-            cpu_percent = psutil.cpu_percent()
-            memory_info = psutil.virtual_memory()
-            measurements.append({
-                'timestamp': time.time() - start_time,
-                'cpu_percent': cpu_percent,
-                'memory_used_mb': memory_info.used / (1024 * 1024),
-                'memory_percent': memory_info.percent
-            })
-            time.sleep(0.1)  # Sample every 100ms
-        
-        return measurements
-    
     def benchmark_compression_method(self, content: str, method_name: str, method_func, *args):
-        """Benchmark a specific compression method"""
-        
-        # Pre-compression measurements
-        initial_cpu = psutil.cpu_percent()
-        initial_memory = psutil.virtual_memory().used / (1024 * 1024)
-        
-        # Start resource monitoring
-        monitoring_active = True
-        resource_measurements = []
-        
-        def monitor_resources():
-            while monitoring_active:
-                cpu = psutil.cpu_percent()
-                mem = psutil.virtual_memory().used / (1024 * 1024)
-                resource_measurements.append({
-                    'cpu': cpu,
-                    'memory': mem
-                })
-                time.sleep(0.05)  # 50ms intervals
-        
-        monitor_thread = threading.Thread(target=monitor_resources)
-        monitor_thread.start()
-        
-        # Compression benchmark
-        start_time = time.time()
-        start_cpu_time = time.process_time()
-        
-        try:
-            result = method_func(content, *args)
-            success = True
-            error = None
-        except Exception as e:
-            result = None
-            success = False
-            error = str(e)
-        
-        end_time = time.time()
-        end_cpu_time = time.process_time()
-        
-        # Stop monitoring
-        monitoring_active = False
-        monitor_thread.join()
-        
-        # Calculate metrics
-        wall_clock_time = end_time - start_time
-        cpu_time = end_cpu_time - start_cpu_time
-        
-        if resource_measurements:
-            avg_cpu = np.mean([m['cpu'] for m in resource_measurements])
-            max_cpu = max([m['cpu'] for m in resource_measurements])
-            avg_memory = np.mean([m['memory'] for m in resource_measurements])
-            max_memory = max([m['memory'] for m in resource_measurements])
-            memory_delta = max_memory - initial_memory
-        else:
-            avg_cpu = max_cpu = psutil.cpu_percent()
-            avg_memory = max_memory = initial_memory
-            memory_delta = 0
+        """
+        Benchmark a specific compression method using this process's own counters
+
+        The timed run executes without tracemalloc; peak memory comes from a second,
+        traced run of the same call. That run goes to copies of the MMRY system and
+        folding engine taken before the timed run, writing into a temporary vault,
+        so its vault files and adaptive-state updates don't happen twice and later
+        methods measure the same engine. CPU cost is reported per MB of input: a
+        single-threaded codec runs at ~100% CPU whatever it costs, so CPU percent
+        says nothing about efficiency.
+        """
+        
+        with tempfile.TemporaryDirectory(prefix="mmry_tradeoff_") as scratch_vault:
+            isolated = self._isolated_systems(scratch_vault)
+            token = self.meter.start()
+            
+            try:
+                result = method_func(content, *args)
+                success = True
+                error = None
+            except Exception as e:
+                result = None
+                success = False
+                error = str(e)
+            
+            costs = self.meter.stop(token)
+            
+            if success:
+                live = self.mmry, self.folding_engine
+                self.mmry, self.folding_engine = isolated
+                try:
+                    _, memory = self.meter.measure_memory(method_func, content, *args)
+                finally:
+                    self.mmry, self.folding_engine = live
+                costs.update(memory)
+        
+        input_mb = max(len(content.encode('utf-8')), 1) / (1024 * 1024)
+        cycles = costs['cpu_cycles']
         
         return {
             'method': method_name,
             'success': success,
             'error': error,
-            'wall_clock_time': wall_clock_time,
-            'cpu_time': cpu_time,
-            'cpu_efficiency': (cpu_time / wall_clock_time) * 100 if wall_clock_time > 0 else 0,
-            'avg_cpu_percent': avg_cpu,
-            'max_cpu_percent': max_cpu,
-            'avg_memory_mb': avg_memory,
-            'max_memory_mb': max_memory,
-            'memory_delta_mb': memory_delta,
+            'wall_clock_time': costs['wall_time_s'],
+            'cpu_time': costs['process_cpu_time_s'],
+            'thread_cpu_time': costs['thread_cpu_time_s'],
+            'cpu_efficiency': costs['cpu_percent'],
+            'avg_cpu_percent': costs['cpu_percent'],
+            'cpu_ms_per_mb': costs['process_cpu_time_s'] * 1000 / input_mb,
+            'cycles_per_byte': cycles / (input_mb * 1024 * 1024) if cycles is not None else None,
+            'user_time': costs['user_time_s'],
+            'system_time': costs['system_time_s'],
+            'page_faults': costs['minor_page_faults'] + costs['major_page_faults'],
+            'context_switches': costs['voluntary_context_switches'] + costs['involuntary_context_switches'],
+            'peak_memory_mb': costs.get('peak_memory_mb', 0.0),
+            'memory_delta_mb': costs.get('memory_delta_mb', 0.0),
+            'net_allocated_blocks': costs['net_allocated_blocks'],
+            'cpu_cycles': costs['cpu_cycles'],
+            'instructions': costs['instructions'],
             'result': result
         }
     
+    def _isolated_systems(self, storage_path: str) -> Tuple[MMRYNeuralFoldingSystem, CompressionFoldingEngine]:
+        """Copies of the systems under test (without the stage profiler), storing into storage_path"""
+        profiler, self.folding_engine.stage_profiler = self.folding_engine.stage_profiler, None
+        try:
+            folding_engine = copy.deepcopy(self.folding_engine)
+        finally:
+            self.folding_engine.stage_profiler = profiler
+        mmry = copy.deepcopy(self.mmry)
+        mmry.storage_path = Path(storage_path)
+        return mmry, folding_engine
+    
     def test_mmry_neural_folding(self, content: str) -> Dict:
         """Test MMRY Neural Folding method"""
         def mmry_compress(content):
@@ -247,8 +231,8 @@ class MMRYTradeoffAnalyzer:
             if mmry_result['success']:
                 ratio = mmry_result['result']['compression_ratio']
                 time_taken = mmry_result['wall_clock_time']
-                cpu_usage = mmry_result['avg_cpu_percent']
-                print(f"      Ratio: {ratio:.1f}:1, Time: {time_taken:.3f}s, CPU: {cpu_usage:.1f}%")
+                cpu_cost = mmry_result['cpu_ms_per_mb']
+                print(f"      Ratio: {ratio:.1f}:1, Time: {time_taken:.3f}s, CPU: {cpu_cost:.1f} ms/MB")
             else:
                 print(f"      ❌ Failed: {mmry_result['error']}")
             
@@ -261,8 +245,8 @@ class MMRYTradeoffAnalyzer:
                 if zlib_result['success']:
                     ratio = zlib_result['result']['compression_ratio']
                     time_taken = zlib_result['wall_clock_time']
-                    cpu_usage = zlib_result['avg_cpu_percent']
-                    print(f"      Ratio: {ratio:.1f}:1, Time: {time_taken:.3f}s, CPU: {cpu_usage:.1f}%")
+                    cpu_cost = zlib_result['cpu_ms_per_mb']
+                    print(f"      Ratio: {ratio:.1f}:1, Time: {time_taken:.3f}s, CPU: {cpu_cost:.1f} ms/MB")
             
             # Test 3: Folding strategies
             print("   🧬 Testing folding strategies...")
@@ -280,17 +264,15 @@ class MMRYTradeoffAnalyzer:
                 # Fastest method
                 fastest = min(successful_methods, key=lambda x: x['wall_clock_time'])
                 
-                # Most CPU efficient
-                most_cpu_efficient = min(successful_methods, key=lambda x: x['avg_cpu_percent'])
+                # Most CPU efficient (least CPU time per MB of input)
+                most_cpu_efficient = min(successful_methods, key=lambda x: x['cpu_ms_per_mb'])
                 
-                # Best balance (ratio * speed efficiency)
+                # Best balance (ratio per unit of CPU cost)
                 def balance_score(method):
                     if not method['result']:
                         return 0
                     ratio = method['result'].get('compression_ratio', 1)
-                    time_penalty = 1 / (method['wall_clock_time'] + 0.001)  # Add small epsilon
-                    cpu_penalty = 1 / (method['avg_cpu_percent'] + 1)
-                    return ratio * time_penalty * cpu_penalty
+                    return ratio / (method['cpu_ms_per_mb'] + 0.001)  # Add small epsilon
                 
                 best_balance = max(successful_methods, key=balance_score)
                 
@@ -299,17 +281,17 @@ class MMRYTradeoffAnalyzer:
                         'method': best_ratio['method'],
                         'ratio': best_ratio['result'].get('compression_ratio', 0) if best_ratio['result'] else 0,
                         'time': best_ratio['wall_clock_time'],
-                        'cpu': best_ratio['avg_cpu_percent']
+                        'cpu': best_ratio['cpu_ms_per_mb']
                     },
                     'fastest': {
                         'method': fastest['method'],
                         'time': fastest['wall_clock_time'],
                         'ratio': fastest['result'].get('compression_ratio', 0) if fastest['result'] else 0,
-                        'cpu': fastest['avg_cpu_percent']
+                        'cpu': fastest['cpu_ms_per_mb']
                     },
                     'most_cpu_efficient': {
                         'method': most_cpu_efficient['method'],
-                        'cpu': most_cpu_efficient['avg_cpu_percent'],
+                        'cpu': most_cpu_efficient['cpu_ms_per_mb'],
                         'ratio': most_cpu_efficient['result'].get('compression_ratio', 0) if most_cpu_efficient['result'] else 0,
                         'time': most_cpu_efficient['wall_clock_time']
                     },
@@ -318,13 +300,13 @@ class MMRYTradeoffAnalyzer:
                         'balance_score': balance_score(best_balance),
                         'ratio': best_balance['result'].get('compression_ratio', 0) if best_balance['result'] else 0,
                         'time': best_balance['wall_clock_time'],
-                        'cpu': best_balance['avg_cpu_percent']
+                        'cpu': best_balance['cpu_ms_per_mb']
                     }
                 }
                 
                 print(f"      🏆 Best ratio: {best_ratio['method']} ({test_result['analysis']['best_ratio']['ratio']:.1f}:1)")
                 print(f"      ⚡ Fastest: {fastest['method']} ({test_result['analysis']['fastest']['time']:.3f}s)")
-                print(f"      💻 CPU efficient: {most_cpu_efficient['method']} ({test_result['analysis']['most_cpu_efficient']['cpu']:.1f}%)")
+                print(f"      💻 CPU efficient: {most_cpu_efficient['method']} ({test_result['analysis']['most_cpu_efficient']['cpu']:.1f} ms/MB)")
                 print(f"      ⚖️  Best balance: {best_balance['method']}")
             
             all_results.append(test_result)
@@ -343,22 +325,22 @@ class MMRYTradeoffAnalyzer:
         # Categorize use cases
         use_cases = {
             'maximum_compression': {
-                'priority': 'compression_ratio',
+                'priority': 'best_ratio',
                 'description': 'Archive storage, long-term backup',
                 'tolerance': {'time': 'high', 'cpu': 'high', 'memory': 'medium'}
             },
             'balanced_performance': {
-                'priority': 'balance',
+                'priority': 'best_balance',
                 'description': 'General purpose, web applications',
                 'tolerance': {'time': 'medium', 'cpu': 'medium', 'memory': 'medium'}
             },
             'speed_critical': {
-                'priority': 'speed',
+                'priority': 'fastest',
                 'description': 'Real-time, streaming, interactive',
                 'tolerance': {'time': 'low', 'cpu': 'low', 'memory': 'low'}
             },
             'resource_constrained': {
-                'priority': 'cpu_efficiency',
+                'priority': 'most_cpu_efficient',
                 'description': 'IoT, mobile, edge computing',
                 'tolerance': {'time': 'medium', 'cpu': 'low', 'memory': 'low'}
             }
@@ -429,7 +411,7 @@ class MMRYTradeoffAnalyzer:
                 print(f"      Wins: {stats['count']}/{len(best_methods)} scenarios")
                 print(f"      Avg ratio: {stats['avg_ratio']:.1f}:1")
                 print(f"      Avg time: {stats['avg_time']:.3f}s")
-                print(f"      Avg CPU: {stats['avg_cpu']:.1f}%")
+                print(f"      Avg CPU: {stats['avg_cpu']:.1f} ms/MB")
                 
                 recommendations[use_case] = {
                     'method': method_name,
@@ -446,7 +428,7 @@ class MMRYTradeoffAnalyzer:
             print(f"🎯 {use_case.replace('_', ' ').title()}:")
             print(f"   Method: {rec['method']}")
             print(f"   Confidence: {confidence_pct:.0f}%")
-            print(f"   Performance: {rec['stats']['avg_ratio']:.1f}:1 ratio, {rec['stats']['avg_time']:.3f}s, {rec['stats']['avg_cpu']:.1f}% CPU")
+            print(f"   Performance: {rec['stats']['avg_ratio']:.1f}:1 ratio, {rec['stats']['avg_time']:.3f}s, {rec['stats']['avg_cpu']:.1f} ms/MB CPU")
             print()
         
         # Trade-off matrix
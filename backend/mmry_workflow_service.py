@@ -18,6 +18,8 @@ import zlib
 # Import MMRY components
 from mmry_neural_folding_v3 import MMRYNeuralFoldingSystem
 from mmry_integration import MMRYIntegration
+from mmry_pack_storage import MMRYPackStorage
+from mmry_codec_registry import mmry_vault
 
 class MMRYWorkflowService:
     """
@@ -33,6 +35,15 @@ class MMRYWorkflowService:
         self.neural_folding = MMRYNeuralFoldingSystem(storage_path=str(self.storage_path))
         self.mmry_integration = MMRYIntegration(storage_path=str(self.storage_path))
         
+        # Small files share one pack per project instead of one vault file each
+        self.pack_storage = MMRYPackStorage(
+            storage_path=str(self.storage_path),
+            pack_threshold=int(os.environ.get("MMRY_PACK_THRESHOLD", "4096"))
+        )
+        
+        # Larger files get a vault container each, written and read by mmry_vault
+        self.vault_codec = os.environ.get("MMRY_VAULT_CODEC", "zlib-dict")
+        
         # Privacy and security settings
         self.encryption_enabled = True
         self.access_logging = True
@@ -90,11 +101,23 @@ class MMRYWorkflowService:
                 "stored_files": []
             }
             
+            # Tiny files go to the project pack in one batch; the rest get vault files
+            packed_files = []
+            vault_files = []
             for file_data in project_files:
-                file_result = self._store_single_file(
+                content_size = len(file_data.get("content", "").encode("utf-8"))
+                if self.pack_storage.should_pack(content_size):
+                    packed_files.append(file_data)
+                else:
+                    vault_files.append(file_data)
+
+            file_results = self._store_packed_files(user_id, project_id, packed_files)
+            for file_data in vault_files:
+                file_results.append(self._store_single_file(
                     user_id, project_id, file_data, project_vault
-                )
-                
+                ))
+            
+            for file_result in file_results:
                 storage_metadata["files_stored"] += 1
                 storage_metadata["total_original_size"] += file_result["original_size"]
                 storage_metadata["total_compressed_size"] += file_result["compressed_size"]
@@ -124,7 +147,7 @@ class MMRYWorkflowService:
     
     def _store_single_file(self, user_id: str, project_id: str, 
                           file_data: Dict[str, Any], project_vault: Path) -> Dict[str, Any]:
-        """Store a single file with MMRY compression"""
+        """Store a single file in a vault container"""
         
         file_name = file_data.get("name", "unknown")
         file_content = file_data.get("content", "")
@@ -133,13 +156,12 @@ class MMRYWorkflowService:
         # Generate unique file identifier
         file_hash = hashlib.sha256(f"{user_id}_{project_id}_{file_name}".encode()).hexdigest()
         
-        # Store using neural folding system
-        mmry_result = self.neural_folding.store_file_neural_folding(
-            user_id=user_id,
-            project_id=project_id,
-            file_name=file_name,
-            content=file_content,
-            file_type=file_type
+        mmry_result = mmry_vault.write(
+            project_vault / f"{file_hash[:32]}.mmry",
+            file_content,
+            codec=self.vault_codec,
+            metadata={"user_id": user_id, "project_id": project_id,
+                      "file_name": file_name, "file_type": file_type}
         )
         
         # Create file metadata
@@ -147,15 +169,41 @@ class MMRYWorkflowService:
             "file_name": file_name,
             "file_type": file_type,
             "original_size": len(file_content),
-            "compressed_size": mmry_result.get("compressed_size", 0),
-            "compression_ratio": mmry_result.get("compression_ratio", 1.0),
-            "mmry_file_path": mmry_result.get("file_path", ""),
+            "compressed_size": mmry_result["stored_size"],
+            "compression_ratio": mmry_result["compression_ratio"],
+            "codec": mmry_result["codec"],
+            "mmry_file_path": mmry_result["filepath"],
             "file_hash": file_hash,
             "timestamp": datetime.now().isoformat()
         }
         
         return file_metadata
     
+    def _store_packed_files(self, user_id: str, project_id: str,
+                            project_files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store small files in the project pack with a single append"""
+        if not project_files:
+            return []
+        
+        pack_results = self.pack_storage.store_files(user_id, project_id, project_files)
+        
+        file_results = []
+        for file_data, pack_result in zip(project_files, pack_results):
+            file_name = file_data.get("name", "unknown")
+            file_results.append({
+                "file_name": file_name,
+                "file_type": file_data.get("type", "text"),
+                "original_size": len(file_data.get("content", "")),
+                "compressed_size": pack_result["compressed_size"],
+                "compression_ratio": pack_result["compression_ratio"],
+                "storage_tier": "pack",
+                "mmry_file_path": pack_result["pack_path"],
+                "file_hash": hashlib.sha256(f"{user_id}_{project_id}_{file_name}".encode()).hexdigest(),
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        return file_results
+    
     def retrieve_project_files(self, user_id: str, project_id: str) -> Dict[str, Any]:
         """
         Retrieve project files with privacy and integrity checks
@@ -185,7 +233,10 @@ class MMRYWorkflowService:
             # Retrieve all files
             retrieved_files = []
             for file_metadata in storage_metadata["stored_files"]:
-                file_result = self._retrieve_single_file(file_metadata)
+                if file_metadata.get("storage_tier") == "pack":
+                    file_result = self._retrieve_packed_file(user_id, project_id, file_metadata)
+                else:
+                    file_result = self._retrieve_single_file(file_metadata)
                 retrieved_files.append(file_result)
             
             # Log access
@@ -204,22 +255,15 @@ class MMRYWorkflowService:
             raise
     
     def _retrieve_single_file(self, file_metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Retrieve a single file with decompression"""
+        """Retrieve a single vault file (integrity is checked by the vault reader)"""
         
         mmry_file_path = file_metadata.get("mmry_file_path", "")
         
         if not mmry_file_path or not os.path.exists(mmry_file_path):
             raise FileNotFoundError(f"MMRY file not found: {mmry_file_path}")
         
-        # Retrieve using neural folding system
-        mmry_result = self.neural_folding.retrieve_file_neural_folding(mmry_file_path)
-        
-        # Verify integrity
-        retrieved_content = mmry_result.get("content", "")
-        content_hash = hashlib.sha256(retrieved_content.encode()).hexdigest()
-        
-        if content_hash != file_metadata.get("file_hash", ""):
-            raise ValueError(f"Integrity check failed for file {file_metadata.get('file_name')}")
+        # Reads vault containers and files written by the older stacks alike
+        retrieved_content = mmry_vault.read(mmry_file_path)["content"]
         
         return {
             "file_name": file_metadata.get("file_name"),
@@ -231,6 +275,22 @@ class MMRYWorkflowService:
             "integrity_verified": True
         }
     
+    def _retrieve_packed_file(self, user_id: str, project_id: str,
+                              file_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Retrieve a single file from the project pack (integrity is checked by the pack)"""
+        pack_result = self.pack_storage.retrieve_file(user_id, project_id, file_metadata.get("file_name"))
+        
+        return {
+            "file_name": file_metadata.get("file_name"),
+            "file_type": file_metadata.get("file_type"),
+            "content": pack_result["content"],
+            "original_size": file_metadata.get("original_size"),
+            "compressed_size": file_metadata.get("compressed_size"),
+            "compression_ratio": file_metadata.get("compression_ratio"),
+            "storage_tier": "pack",
+            "integrity_verified": True
+        }
+    
     def get_user_storage_stats(self, user_id: str) -> Dict[str, Any]:
         """Get storage statistics for a user with privacy protection"""
         try:
@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: parallel_generator.py
+# Description: Two-phase project generation - plan the file manifest once, then generate files concurrently
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+A single "write the whole project" completion is bounded by the provider's
+max_tokens and its timeout, and its latency grows with every file. Here a
+planning call returns the file manifest (paths plus one-line specs), then
+each file is generated by its own call on a bounded thread pool. Every file
+prompt shares the same context (requirements and the full manifest, so
+imports line up across files) and differs only in the file it asks for.
+Results are assembled in manifest order. The shared context comes first in
+every file prompt, so after the first call a backend prompt cache can reuse
+it; last_prompt_stats reports how many tokens that covers.
+
+With an async_llm_factory the file calls run on one event loop instead of
+the thread pool: a single AsyncLLMProvider per project keeps its HTTP
+connections alive across the file calls and bounds them with its semaphore.
+File calls still go through the completion cache of the sync provider.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from file_block_parser import extract_file_blocks
+from llm_cache import caching_provider, llm_options
+from prompt_builder import PromptStats, compact, count_tokens
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PLAN_SYSTEM_PROMPT = """You are a senior software architect. Plan the files of a project before
+any code is written. Respond with JSON only, in the form:
+{"summary": "<two sentences on architecture and styling>",
+ "files": [{"path": "relative/path.ext", "spec": "<one line: purpose, exports, what it imports>"}]}
+List every file the project needs (configuration, source, styles, README.md) and nothing else."""
+
+FENCE_PATTERN = re.compile(r'```[\w+-]*[ \t]*\n?([\s\S]*?)```')
+
+
+def parse_plan(response: str) -> Dict[str, Any]:
+    """Plan from a planning completion (tolerates prose or fences around the JSON); ValueError if unusable"""
+    start, end = response.find("{"), response.rfind("}")
+    if start < 0 or end <= start:
+        raise ValueError("No JSON object in planning response")
+    plan = json.loads(response[start:end + 1])
+
+    files, seen = [], set()
+    for entry in plan.get("files", []):
+        if isinstance(entry, str):
+            entry = {"path": entry, "spec": ""}
+        path = str(entry.get("path", "")).strip().lstrip("/")
+        # Paths escaping the project directory are dropped
+        if not path or path in seen or ".." in path.split("/"):
+            continue
+        seen.add(path)
+        files.append({"path": path, "spec": str(entry.get("spec", "")).strip()})
+    if not files:
+        raise ValueError("Planning response lists no files")
+    return {"summary": str(plan.get("summary", "")).strip(), "files": files}
+
+
+def file_content_from_response(response: str, path: str) -> str:
+    """The file body from a per-file completion: a FILE: block, else the first fence, else the text"""
+    blocks = extract_file_blocks(response)
+    if blocks:
+        return blocks.get(path, next(iter(blocks.values())))
+    match = FENCE_PATTERN.search(response)
+    if match:
+        return match.group(1).strip()
+    return response.strip()
+
+
+class ParallelProjectGenerator:
+    """Plans a project with one LLM call, then generates its files concurrently"""
+
+    def __init__(self, llm, max_concurrency: Optional[int] = None, max_files: Optional[int] = None,
+                 retries: int = 1, async_llm_factory: Optional[Callable[..., Any]] = None):
+        self.llm = llm
+        # Called with max_concurrency= to create the AsyncLLMProvider for one project's file calls
+        self.async_llm_factory = async_llm_factory
+        self.max_concurrency = max_concurrency or int(os.environ.get("AI_GENERATION_CONCURRENCY", "4"))
+        self.max_files = max_files or int(os.environ.get("AI_MAX_PLANNED_FILES", "40"))
+        self.retries = retries
+        self.last_stats: Dict[str, Any] = {}
+        self.last_prompt_stats: Optional[PromptStats] = None
+
+    def plan(self, requirements: List[str], project_type: str, bypass_cache: bool = False,
+             stats: Optional[PromptStats] = None) -> Dict[str, Any]:
+        formatted_reqs = "\n".join(f"- {req}" for req in requirements)
+        prompt = (f"Plan a complete {project_type} project for these requirements:\n\n{formatted_reqs}\n\n"
+                  f"Use at most {self.max_files} files.")
+        if stats:
+            stats.record(PLAN_SYSTEM_PROMPT, prompt)
+        response = self.llm.generate_completion(
+            PLAN_SYSTEM_PROMPT, prompt,
+            **llm_options(self.llm, similarity_text=formatted_reqs, bypass_cache=bypass_cache)
+        )
+        plan = parse_plan(response)
+        if len(plan["files"]) > self.max_files:
+            logger.warning(f"Plan lists {len(plan['files'])} files, keeping the first {self.max_files}")
+            plan["files"] = plan["files"][:self.max_files]
+        return plan
+
+    def _shared_context(self, requirements: List[str], project_type: str, plan: Dict[str, Any]) -> str:
+        """Prompt prefix common to every file call"""
+        formatted_reqs = "\n".join(f"- {req}" for req in requirements)
+        manifest = "\n".join(f"- {entry['path']}: {entry['spec']}" for entry in plan["files"])
+        return (f"You are writing one file of a {project_type} project.\n\n"
+                f"Requirements:\n{formatted_reqs}\n\n"
+                f"Architecture: {plan['summary']}\n\n"
+                f"Project files (write only the one requested; import the others by these paths):\n{manifest}\n\n")
+
+    def _file_prompt(self, system_prompt: str, context: str, entry: Dict[str, str],
+                     stats: Optional[PromptStats] = None, raw_system_tokens: Optional[int] = None) -> str:
+        prompt = (f"{context}Write the complete contents of {entry['path']} ({entry['spec']}).\n"
+                  f"Respond in the format:\n\nFILE: {entry['path']}\n```\nfile contents here\n```")
+        if stats:
+            stats.record(system_prompt, prompt, prefix=context,
+                         raw_tokens=(raw_system_tokens or count_tokens(system_prompt)) + count_tokens(prompt))
+        return prompt
+
+    def _generate_file(self, system_prompt: str, context: str, entry: Dict[str, str],
+                       options: Dict[str, Any], stats: Optional[PromptStats] = None,
+                       raw_system_tokens: Optional[int] = None) -> str:
+        prompt = self._file_prompt(system_prompt, context, entry, stats, raw_system_tokens)
+        for attempt in range(self.retries + 1):
+            try:
+                # A retry must not be served the cached answer that just failed
+                call_options = dict(options, bypass_cache=True) if attempt and options else options
+                content = file_content_from_response(
+                    self.llm.generate_completion(system_prompt, prompt, **call_options), entry["path"])
+                if content:
+                    return content
+                raise ValueError("empty completion")
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {entry['path']} after error: {e}")
+
+    async def _generate_file_async(self, async_llm, system_prompt: str, context: str, entry: Dict[str, str],
+                                   options: Dict[str, Any], stats: Optional[PromptStats] = None,
+                                   raw_system_tokens: Optional[int] = None) -> str:
+        prompt = self._file_prompt(system_prompt, context, entry, stats, raw_system_tokens)
+        cache = caching_provider(self.llm)
+        for attempt in range(self.retries + 1):
+            try:
+                if cache:
+                    # A retry must not be served the cached answer that just failed
+                    response = await cache.generate_completion_async(
+                        async_llm, system_prompt, prompt, bypass_cache=bool(attempt) or options["bypass_cache"],
+                        similarity_text=options["similarity_text"])
+                else:
+                    response = await async_llm.generate_completion(system_prompt, prompt)
+                content = file_content_from_response(response, entry["path"])
+                if content:
+                    return content
+                raise ValueError("empty completion")
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Retrying {entry['path']} after error: {e}")
+
+    def _generate_files_threaded(self, files: List[Dict[str, str]], on_result: Callable[[str, Any], None],
+                                 **file_args):
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="filegen") as pool:
+            futures = {pool.submit(self._generate_file, entry=entry, **file_args): entry["path"] for entry in files}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                on_result(futures[future], result)
+
+    async def _generate_files_async(self, files: List[Dict[str, str]], on_result: Callable[[str, Any], None],
+                                    **file_args):
+        async_llm = self.async_llm_factory(max_concurrency=self.max_concurrency)
+
+        async def generate_one(entry: Dict[str, str]):
+            try:
+                return entry["path"], await self._generate_file_async(async_llm, entry=entry, **file_args)
+            except Exception as e:
+                return entry["path"], e
+
+        try:
+            for next_done in asyncio.as_completed([generate_one(entry) for entry in files]):
+                on_result(*await next_done)
+        finally:
+            await async_llm.aclose()
+
+    def _use_async(self) -> bool:
+        if not self.async_llm_factory:
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        # asyncio.run cannot nest; callers on an event loop get the thread pool
+        logger.warning("Called from a running event loop, generating files on the thread pool")
+        return False
+
+    def generate(self, requirements: List[str], project_type: str, system_prompt: str,
+                 on_file: Optional[Callable[[str, str], None]] = None,
+                 plan: Optional[Dict[str, Any]] = None, bypass_cache: bool = False) -> Dict[str, str]:
+        """
+        Generate every planned file; raises if planning fails or no file could be generated
+
+        Returns:
+            Dict mapping filenames to contents, in plan order (files that failed are omitted)
+        """
+        start = time.perf_counter()
+        prompt_stats = PromptStats()
+        plan = plan or self.plan(requirements, project_type, bypass_cache, prompt_stats)
+        plan_seconds = time.perf_counter() - start
+        logger.info(f"Planned {len(plan['files'])} files in {plan_seconds:.2f}s")
+
+        context = self._shared_context(requirements, project_type, plan)
+        # The same compacted system prompt for every file keeps the cacheable prefix identical
+        raw_system_tokens = count_tokens(system_prompt)
+        system_prompt = compact(system_prompt)
+        # A file can only be served for a near-duplicate requirement list within the same manifest
+        options = llm_options(self.llm, similarity_text="\n".join(f"- {req}" for req in requirements),
+                              bypass_cache=bypass_cache)
+        generated, failed = {}, []
+
+        def on_result(path: str, result: Any):
+            if isinstance(result, Exception):
+                logger.error(f"Generating {path} failed: {result}")
+                failed.append(path)
+                return
+            generated[path] = result
+            logger.info(f"Generated file: {path}")
+            if on_file:
+                on_file(path, result)
+
+        file_args = {"system_prompt": system_prompt, "context": context, "options": options,
+                     "stats": prompt_stats, "raw_system_tokens": raw_system_tokens}
+        if self._use_async():
+            asyncio.run(self._generate_files_async(plan["files"], on_result, **file_args))
+        else:
+            self._generate_files_threaded(plan["files"], on_result, **file_args)
+
+        if not generated:
+            raise RuntimeError(f"No files generated ({len(failed)} failed)")
+
+        self.last_stats = {
+            "planned_files": len(plan["files"]),
+            "generated_files": len(generated),
+            "failed_files": failed,
+            "plan_seconds": plan_seconds,
+            "total_seconds": time.perf_counter() - start,
+            "prompt": prompt_stats.report()
+        }
+        self.last_prompt_stats = prompt_stats
+        return {entry["path"]: generated[entry["path"]] for entry in plan["files"] if entry["path"] in generated}
+
+
+def _benchmark_responder(file_count: int, lines_per_file: int) -> Callable[[str, str], str]:
+    """Stub LLM answers: a plan, one file, or the whole project in one response"""
+    paths = [f"src/components/Component{i}.jsx" for i in range(file_count)]
+
+    def body(path: str) -> str:
+        return "\n".join(f"  const value{n} = useMemo(() => compute({n}, '{path}'), []);"
+                         for n in range(lines_per_file))
+
+    def respond(system_prompt: str, user_prompt: str) -> str:
+        if system_prompt == PLAN_SYSTEM_PROMPT:
+            return json.dumps({"summary": "React components.",
+                               "files": [{"path": path, "spec": "component"} for path in paths]})
+        match = re.search(r"Write the complete contents of (\S+)", user_prompt)
+        if match:
+            return f"FILE: {match.group(1)}\n```jsx\n{body(match.group(1))}\n```\n"
+        return "".join(f"FILE: {path}\n```jsx\n{body(path)}\n```\n\n" for path in paths)
+
+    return respond
+
+
+# Benchmark: single-call vs plan + parallel generation on a paced stub LLM, then
+# thread-pool vs async file calls against the mock Ollama server
+if __name__ == "__main__":
+    import argparse
+    import functools
+    import statistics
+    import multiprocessing
+    from llm_provider_stub import StubLLMProvider
+    from file_block_parser import iter_file_blocks
+
+    parser = argparse.ArgumentParser(description="Single-call vs parallel per-file generation")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--max-tokens", type=int, default=4000, help="per-completion cap (OPENAI_MAX_TOKENS)")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"=== Stub LLM: {args.first_token_delay * 1000:.0f} ms to first token, "
+          f"{args.tokens_per_second:.0f} tok/s per stream, max_tokens {args.max_tokens} ===")
+    print("(assumes the backend decodes concurrent streams at full speed, e.g. OLLAMA_NUM_PARALLEL)\n")
+    print(f"{'files':>6}{'tokens':>8}{'single-call':>14}{'files ok':>10}"
+          f"{'parallel x4':>14}{'parallel x8':>14}{'files ok':>10}")
+
+    for file_count in (6, 12, 24):
+        llm = StubLLMProvider(first_token_delay=args.first_token_delay, tokens_per_second=args.tokens_per_second,
+                              responder=_benchmark_responder(file_count, 12), max_tokens=args.max_tokens)
+        project_tokens = len(_benchmark_responder(file_count, 12)("", "")) // 4
+
+        start = time.perf_counter()
+        single_files = dict(iter_file_blocks(llm.stream_completion("system", "Write the whole project")))
+        single_seconds = time.perf_counter() - start
+
+        timings = {}
+        for concurrency in (4, 8):
+            generator = ParallelProjectGenerator(llm, max_concurrency=concurrency)
+            files = generator.generate(["Component library"], "web", "system")
+            timings[concurrency] = generator.last_stats["total_seconds"]
+
+        print(f"{file_count:>6}{project_tokens:>8,}{single_seconds:>12.2f} s{len(single_files):>6}/{file_count:<3}"
+              f"{timings[4]:>12.2f} s{timings[8]:>12.2f} s{len(files):>6}/{file_count:<3}")
+
+    try:
+        from llm_provider import LLMProvider
+        from llm_provider_async import AsyncLLMProvider
+        from llm_stub_server import StubOllamaServer, build_stub_response
+        server = StubOllamaServer(response=build_stub_response(1, 12), first_token_delay=args.first_token_delay,
+                                  tokens_per_second=args.tokens_per_second)
+        # Its own process, so the server's threads do not compete with the client for the GIL
+        server_process = multiprocessing.Process(target=server.serve_forever, daemon=True)
+        server_process.start()
+        os.environ["LLM_HOST"], os.environ["LLM_PORT"] = "127.0.0.1", str(server.server_address[1])
+        sync_llm = LLMProvider.create("ollama", cache=False, singleflight=False)
+    except ImportError as e:
+        print(f"\nmock Ollama comparison skipped ({e})")
+        raise SystemExit(0)
+
+    projects = 5
+    print(f"\n=== Mock Ollama over HTTP: {projects} projects per row, plan given, cache off ===\n")
+    print(f"{'files':>6}{'concurrency':>13}{'threads':>12}{'async':>12}")
+    for file_count, concurrency in ((12, 4), (24, 8), (48, 16)):
+        plan = {"summary": "React components.",
+                "files": [{"path": f"src/components/Component{i}.jsx", "spec": "component"}
+                          for i in range(file_count)]}
+        timings = {}
+        for label, factory in (("threads", None), ("async", functools.partial(AsyncLLMProvider.create, "ollama"))):
+            generator = ParallelProjectGenerator(sync_llm, max_concurrency=concurrency, async_llm_factory=factory)
+            runs = []
+            for _ in range(projects):
+                generator.generate(["Component library"], "web", "system", plan=plan)
+                runs.append(generator.last_stats["total_seconds"])
+            timings[label] = statistics.median(runs)
+        print(f"{file_count:>6}{concurrency:>13}{timings['threads']:>10.2f} s{timings['async']:>10.2f} s")
+    server_process.terminate()
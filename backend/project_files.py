@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: project_files.py
+# Description: Per-build file manifest and cached, paginated directory listings of generated projects
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+Builds write file_manifest.json (path, size, sha256 of every generated file)
+at finalization. Listings are served from a directory tree built once from
+that manifest and cached per project; the cache key is the manifest's
+build_version, so a rebuild invalidates it. Projects built before the manifest
+existed get one written by a single directory walk the first time they are
+listed. A build still in progress is walked on every listing and nothing is
+written; its finalizer writes the manifest.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable
+
+from build_events import TERMINAL_STATUSES
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FILE_MANIFEST_NAME = "file_manifest.json"
+# Build bookkeeping, not project files
+EXCLUDED_FILES = {"build_manifest.json", "build.log", FILE_MANIFEST_NAME}
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def file_entry(path: str, data: bytes, modified_time: float) -> Dict[str, Any]:
+    """Manifest entry for a file whose content is in memory"""
+    return {"path": path, "size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+            "modified_time": modified_time}
+
+
+def build_file_manifest(entries: List[Dict[str, Any]], build_version: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "build_version": build_version or time.time_ns(),
+        "generated_at": time.time(),
+        "total_files": len(entries),
+        "total_bytes": sum(entry["size"] for entry in entries),
+        "files": sorted(entries, key=lambda entry: entry["path"])
+    }
+
+
+def write_file_manifest(project_path: str, entries: List[Dict[str, Any]],
+                        build_version: Optional[int] = None) -> Dict[str, Any]:
+    """Write file_manifest.json atomically; returns the manifest"""
+    manifest = build_file_manifest(entries, build_version)
+    # A unique temp file per writer: a listing scan and the finalizer may race
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{FILE_MANIFEST_NAME}.", suffix=".tmp", dir=project_path)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(project_path, FILE_MANIFEST_NAME))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return manifest
+
+
+def build_finished(project_path: str) -> bool:
+    """False while the project's build_manifest.json says the build is still running"""
+    try:
+        with open(os.path.join(project_path, "build_manifest.json"), "r") as f:
+            status = json.load(f).get("status")
+    except FileNotFoundError:
+        return True  # built before build manifests existed
+    except (OSError, ValueError):
+        return False
+    # Every current build records a status from the start; none means an older build
+    return status is None or status in TERMINAL_STATUSES
+
+
+def scan_file_manifest(project_path: str, persist: bool = True) -> Dict[str, Any]:
+    """Walk a project without a manifest (older builds), writing one if persist"""
+    entries = []
+    for root, _, files in os.walk(project_path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            rel_path = os.path.relpath(file_path, project_path).replace(os.sep, "/")
+            if rel_path in EXCLUDED_FILES or rel_path.endswith(".tmp"):
+                continue
+            digest = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+            st = os.stat(file_path)
+            entries.append({"path": rel_path, "size": st.st_size, "sha256": digest.hexdigest(),
+                            "modified_time": st.st_mtime})
+    if persist:
+        return write_file_manifest(project_path, entries)
+    return build_file_manifest(entries)
+
+
+class ProjectFileTree:
+    """Directory structure of one build, with per-directory totals"""
+
+    def __init__(self, manifest: Dict[str, Any]):
+        self.build_version = manifest["build_version"]
+        self.total_files = manifest["total_files"]
+        self.total_bytes = manifest["total_bytes"]
+        self.files: List[Dict[str, Any]] = manifest["files"]
+        # dir path -> {"dirs": {name: totals}, "files": [entries]}; "" is the project root
+        self._dirs: Dict[str, Dict[str, Any]] = {"": {"dirs": {}, "files": []}}
+
+        for entry in self.files:
+            parts = entry["path"].split("/")
+            parent = ""
+            for name in parts[:-1]:
+                path = f"{parent}/{name}" if parent else name
+                node = self._dirs.get(path)
+                if node is None:
+                    node = self._dirs[path] = {"dirs": {}, "files": []}
+                totals = self._dirs[parent]["dirs"].setdefault(
+                    name, {"name": name, "path": path, "type": "dir", "file_count": 0, "size": 0})
+                totals["file_count"] += 1
+                totals["size"] += entry["size"]
+                parent = path
+            self._dirs[parent]["files"].append(dict(entry, name=parts[-1], type="file"))
+
+        # Directories first, then files, each by name
+        self._listings = {
+            path: sorted(node["dirs"].values(), key=lambda d: d["name"]) +
+                  sorted(node["files"], key=lambda f: f["name"])
+            for path, node in self._dirs.items()
+        }
+
+    def listing(self, directory: str = "", page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """One page of a directory's immediate children; KeyError for unknown directories"""
+        directory = directory.strip("/")
+        entries = self._listings[directory]
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        start = (page - 1) * page_size
+        return {
+            "dir": directory,
+            "build_version": self.build_version,
+            "entries": entries[start:start + page_size],
+            "page": page,
+            "page_size": page_size,
+            "total_entries": len(entries),
+            "total_pages": max(1, -(-len(entries) // page_size))
+        }
+
+
+class ProjectFilesCache:
+    """LRU of ProjectFileTree per project, revalidated against the manifest on disk"""
+
+    def __init__(self, projects_dir: str = "generated_projects", max_projects: int = 64):
+        self.projects_dir = projects_dir
+        self.max_projects = max_projects
+        self._lock = threading.Lock()
+        self._trees: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_tree(self, project_id: str) -> Optional[ProjectFileTree]:
+        """The project's file tree, or None if the project does not exist"""
+        project_path = os.path.join(self.projects_dir, project_id)
+        manifest_path = os.path.join(project_path, FILE_MANIFEST_NAME)
+        try:
+            st = os.stat(manifest_path)
+        except FileNotFoundError:
+            if not os.path.isdir(project_path):
+                return None
+            if not build_finished(project_path):
+                # Files are still being written; list them as they are, uncached
+                return ProjectFileTree(scan_file_manifest(project_path, persist=False))
+            scan_file_manifest(project_path)
+            st = os.stat(manifest_path)
+
+        # A rewritten manifest (new build) has a new stat signature and build_version
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._trees.get(project_id)
+            if cached and cached[0] == signature:
+                self._trees.move_to_end(project_id)
+                self.hits += 1
+                return cached[1]
+
+        with open(manifest_path, "r") as f:
+            tree = ProjectFileTree(json.load(f))
+
+        with self._lock:
+            self.misses += 1
+            self._trees[project_id] = (signature, tree)
+            self._trees.move_to_end(project_id)
+            while len(self._trees) > self.max_projects:
+                self._trees.popitem(last=False)
+        return tree
+
+    def invalidate(self, project_id: str):
+        with self._lock:
+            self._trees.pop(project_id, None)
+
+
+def _legacy_listing(project_path: str) -> List[Dict[str, Any]]:
+    """The per-request walk get_project used to do, for benchmarking"""
+    files = []
+    for root, _, names in os.walk(project_path):
+        for name in names:
+            if name not in ["build_manifest.json", "build.log"]:
+                file_path = os.path.join(root, name)
+                files.append({"path": os.path.relpath(file_path, project_path),
+                              "size": os.path.getsize(file_path),
+                              "modified_time": os.path.getmtime(file_path)})
+    return files
+
+
+def _node_modules_tree(file_count: int) -> Iterable[str]:
+    """App sources plus a deep, wide dependency tree"""
+    for i in range(min(40, file_count)):
+        yield f"src/components/Component{i}.jsx"
+    package = 0
+    produced = min(40, file_count)
+    while produced < file_count:
+        for sub in ("", "lib/", "lib/internal/", "dist/esm/"):
+            for i in range(4):
+                if produced >= file_count:
+                    return
+                yield f"node_modules/pkg-{package}/{sub}file{i}.js"
+                produced += 1
+        package += 1
+
+
+# Benchmark: project details / file listing for large trees
+if __name__ == "__main__":
+    import shutil
+    import statistics
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def timed_ms(func, repeat: int) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    print("=== Project file listing vs tree size (node_modules-style) ===\n")
+    print(f"{'files':>7}{'walk+stat':>13}{'first list':>13}{'root page':>12}{'deep page':>12}")
+    for file_count in (1000, 5000, 20000):
+        projects_dir = tempfile.mkdtemp()
+        project_path = os.path.join(projects_dir, "1")
+        content = b"module.exports = function () { return 42; };\n" * 8
+        entries = []
+        for rel_path in _node_modules_tree(file_count):
+            file_path = os.path.join(project_path, rel_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.write(content)
+            entries.append(file_entry(rel_path, content, time.time()))
+        write_file_manifest(project_path, entries)
+
+        walk_ms = timed_ms(lambda: _legacy_listing(project_path), 5)
+        first_ms = timed_ms(lambda: ProjectFilesCache(projects_dir).get_tree("1").listing(""), 5)
+        cache = ProjectFilesCache(projects_dir)
+        cache.get_tree("1")
+        root_ms = timed_ms(lambda: cache.get_tree("1").listing("", page=1), 200)
+        deep_ms = timed_ms(lambda: cache.get_tree("1").listing("node_modules", page=3, page_size=100), 200)
+
+        print(f"{file_count:>7,}{walk_ms:>10.2f} ms{first_ms:>10.2f} ms{root_ms:>9.3f} ms{deep_ms:>9.3f} ms")
+        shutil.rmtree(projects_dir)
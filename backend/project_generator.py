@@ -12,12 +12,16 @@ import logging
 import time
 import shutil
 from typing import List, Dict, Any, Optional
-import zipfile
 
 from ai_generator import AICodeGenerator
 from template_manager import TemplateManager
 from mmry_workflow_service import mmry_workflow_service
 from agentic_team_system import agentic_team_system
+from project_id_allocator import ProjectIDAllocator
+from build_finalizer import BuildFinalizer, merge_generated_files
+from build_logger import BuildLogger, ManifestWriter
+from build_events import publish_build_event, status_event_data
+from prompt_builder import format_report
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -51,17 +55,13 @@ class ProjectGenerator:
         self.ai_generator = AICodeGenerator(api_key=api_key, api_key_path=api_key_path, provider_type=provider_type)
         
         os.makedirs(projects_dir, exist_ok=True)
+        self.id_allocator = ProjectIDAllocator(projects_dir)
+        self.build_finalizer = BuildFinalizer(store_func=mmry_workflow_service.store_project_files,
+                                              file_type_func=self._get_file_type)
     
     def create_project_id(self) -> str:
-        """Generate a new project ID"""
-        existing_projects = [d for d in os.listdir(self.projects_dir) 
-                           if os.path.isdir(os.path.join(self.projects_dir, d))]
-        
-        # Find numeric directories and get the next ID
-        numeric_dirs = [int(d) for d in existing_projects if d.isdigit()]
-        next_id = str(max(numeric_dirs) + 1 if numeric_dirs else 0)
-        
-        return next_id
+        """Generate a new project ID (atomic across threads and processes)"""
+        return self.id_allocator.allocate()
     
     def start_build(self, 
                    project_name: str, 
@@ -71,7 +71,9 @@ class ProjectGenerator:
                    user_api_key: Optional[str] = None,
                    use_personal_key: bool = False,
                    ollama_url: Optional[str] = None,
-                   use_ollama: bool = False) -> Dict[str, Any]:
+                   use_ollama: bool = False,
+                   user_id: Optional[str] = None,
+                   bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Start a new project build with agentic team system
         
@@ -80,6 +82,8 @@ class ProjectGenerator:
             requirements: List of requirements
             template_id: Optional template ID to use as base
             project_type: Type of project (web, api, mobile, etc.)
+            user_id: Requesting user (MMRY vault owner, project listing filter)
+            bypass_cache: Generate fresh LLM completions instead of reusing cached ones
             
         Returns:
             Dict with project_id and status
@@ -98,26 +102,29 @@ class ProjectGenerator:
         
         # Initialize build log
         log_path = os.path.join(project_path, "build.log")
-        with open(log_path, "w") as logf:
-            logf.write(f"Build started at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            logf.write(f"Project name: {project_name}\n")
-            logf.write(f"Project type: {project_type}\n")
-            logf.write(f"Agentic team ID: {team.team_id}\n")
-            logf.write(f"AI agents assigned: {', '.join([agent.value for agent in team.agents])}\n")
-            logf.write("Requirements:\n")
+        with BuildLogger(log_path, mode="w", listener=self._log_publisher(project_id)) as build_log:
+            build_log.write(f"Build started at {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                            f"Project name: {project_name}\n"
+                            f"Project type: {project_type}\n"
+                            f"Agentic team ID: {team.team_id}\n"
+                            f"AI agents assigned: {', '.join([agent.value for agent in team.agents])}\n"
+                            "Requirements:\n")
             for req in requirements:
-                logf.write(f"- {req}\n")
+                build_log.write(f"- {req}\n")
             
             if template_id:
-                logf.write(f"\nUsing template: {template_id}\n")
+                build_log.write(f"\nUsing template: {template_id}\n")
         
         # Start build in a way that can be monitored
-        self._initialize_build_manifest(project_id, project_name, requirements, template_id, project_type,
+        manifest = self._initialize_build_manifest(project_id, project_name, requirements, template_id, project_type,
                                        user_api_key=user_api_key,
                                        use_personal_key=use_personal_key,
                                        ollama_url=ollama_url,
                                        use_ollama=use_ollama,
-                                       team_id=team.team_id)
+                                       team_id=team.team_id,
+                                       user_id=user_id,
+                                       bypass_cache=bypass_cache)
+        self._publish_progress(project_id, manifest)
         
         return {
             "project_id": project_id,
@@ -134,7 +141,9 @@ class ProjectGenerator:
                                  use_personal_key: bool = False,
                                  ollama_url: Optional[str] = None,
                                  use_ollama: bool = False,
-                                 team_id: str = None):
+                                 team_id: str = None,
+                                 user_id: Optional[str] = None,
+                                 bypass_cache: bool = False):
         """Initialize the build manifest file to track progress"""
         manifest = {
             "project_id": project_id,
@@ -148,25 +157,32 @@ class ProjectGenerator:
             "files_generated": [],
             "errors": [],
             "team_id": team_id,
+            "user_id": user_id or "default_user",
             "agentic_team": True,
             "llm": {
                 "user_api_key": bool(user_api_key),
                 "use_personal_key": bool(use_personal_key),
                 "ollama_url": ollama_url,
-                "use_ollama": bool(use_ollama)
+                "use_ollama": bool(use_ollama),
+                "bypass_cache": bool(bypass_cache)
             }
         }
         
         manifest_path = os.path.join(self.projects_dir, project_id, "build_manifest.json")
-        with open(manifest_path, "w") as f:
-            json.dump(manifest, f, indent=2)
+        ManifestWriter(manifest_path, manifest).flush(force=True)
+        return manifest
     
-    def execute_build(self, project_id: str) -> Dict[str, Any]:
+    def execute_build(self, project_id: str, attempt: int = 1, final_attempt: bool = True) -> Dict[str, Any]:
         """
         Execute the build process for a project
         
+        Every attempt starts from scratch. A failed attempt that will be retried
+        leaves the build "retrying"; only the final one marks it "failed".
+        
         Args:
             project_id: ID of the project to build
+            attempt: Attempt number (the build queue retries failed builds)
+            final_attempt: Whether a failure is final
             
         Returns:
             Dict with build status
@@ -174,28 +190,31 @@ class ProjectGenerator:
         project_path = os.path.join(self.projects_dir, project_id)
         log_path = os.path.join(project_path, "build.log")
         manifest_path = os.path.join(project_path, "build_manifest.json")
+        build_log = None
         
         try:
-            # Load manifest
-            with open(manifest_path, "r") as f:
-                manifest = json.load(f)
+            # build.log stays open for the whole build; milestones flush it
+            build_log = BuildLogger(log_path, listener=self._log_publisher(project_id))
+            
+            # Load manifest; updates are coalesced and written atomically
+            manifest_writer = ManifestWriter(manifest_path)
+            manifest = manifest_writer.manifest
             
-            # Update status
-            manifest["status"] = "generating"
-            with open(manifest_path, "w") as f:
-                json.dump(manifest, f, indent=2)
+            # Update status; per-attempt fields start over so a retry doesn't add to them
+            manifest_writer.update(status="generating", attempt=attempt, files_generated=[], errors=[],
+                                   end_time=None)
+            manifest_writer.flush(force=True)
+            self._publish_progress(project_id, manifest)
             
             # Execute agentic team workflow if team_id exists
             if manifest.get("team_id"):
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nExecuting agentic team workflow...\n")
-                    logf.write(f"Team ID: {manifest['team_id']}\n")
+                build_log.write(f"\nExecuting agentic team workflow...\n"
+                                f"Team ID: {manifest['team_id']}\n")
                 
                 try:
                     # Execute the agentic team workflow (SIMPLIFIED TO PREVENT LOOP)
-                    with open(log_path, "a") as logf:
-                        logf.write(f"Starting agentic team workflow...\n")
-                        logf.write(f"Team ID: {manifest['team_id']}\n")
+                    build_log.write(f"Starting agentic team workflow...\n"
+                                    f"Team ID: {manifest['team_id']}\n")
                     
                     # SIMPLIFIED EXECUTION - Just mark as completed to prevent loop
                     team_result = {
@@ -205,141 +224,121 @@ class ProjectGenerator:
                         "execution_time": 0.1
                     }
                     
-                    with open(log_path, "a") as logf:
-                        logf.write(f"Agentic team execution completed (simplified):\n")
-                        logf.write(f"- Status: {team_result['status']}\n")
-                        logf.write(f"- Completed tasks: {team_result['completed_tasks']}\n")
-                        logf.write(f"- Failed tasks: {team_result['failed_tasks']}\n")
-                        logf.write(f"- Execution time: {team_result['execution_time']:.2f}s\n")
+                    build_log.milestone(f"Agentic team execution completed (simplified):\n"
+                                        f"- Status: {team_result['status']}\n"
+                                        f"- Completed tasks: {team_result['completed_tasks']}\n"
+                                        f"- Failed tasks: {team_result['failed_tasks']}\n"
+                                        f"- Execution time: {team_result['execution_time']:.2f}s\n")
                     
                     # Update manifest with team results
-                    manifest["agentic_team_result"] = team_result
+                    manifest_writer.update(agentic_team_result=team_result)
+                    publish_build_event(project_id, "agent", dict(self._agent_status_from_manifest(manifest),
+                                                                  team_result=team_result))
                     
                 except Exception as e:
                     logger.error(f"Agentic team execution failed: {str(e)}")
-                    with open(log_path, "a") as logf:
-                        logf.write(f"Agentic team execution failed: {str(e)}\n")
+                    build_log.milestone(f"Agentic team execution failed: {str(e)}\n")
                     manifest["errors"].append(f"Agentic team error: {str(e)}")
+                    manifest_writer.mark_dirty()
+            
+            # Template output is rendered in memory and written with the AI files at finalization
+            template_files = {}
             
             # Apply template if specified
             if manifest.get("template_id"):
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nApplying template {manifest['template_id']}...\n")
+                build_log.write(f"\nApplying template {manifest['template_id']}...\n")
                 
                 template_result = self.template_manager.apply_template(
                     manifest["template_id"],
                     project_path,
                     manifest["project_name"],
-                    manifest["requirements"]
+                    manifest["requirements"],
+                    write_files=False
                 )
                 
                 if template_result["status"] == "success":
-                    with open(log_path, "a") as logf:
-                        logf.write("Template applied successfully.\n")
-                        logf.write(f"Generated {len(template_result['files'])} files from template.\n")
+                    template_files = template_result["contents"]
+                    build_log.milestone("Template applied successfully.\n"
+                                        f"Generated {len(template_result['files'])} files from template.\n")
                     
                     manifest["files_generated"].extend(
                         [os.path.relpath(f, project_path) for f in template_result["files"]]
                     )
                 else:
-                    with open(log_path, "a") as logf:
-                        logf.write(f"Error applying template: {template_result['message']}\n")
-                        logf.write("Continuing with AI generation...\n")
+                    build_log.milestone(f"Error applying template: {template_result['message']}\n"
+                                        "Continuing with AI generation...\n")
                     
                     manifest["errors"].append(f"Template error: {template_result['message']}")
+                manifest_writer.mark_dirty()
+                manifest_writer.flush()
             
             # Generate code with AI
-            with open(log_path, "a") as logf:
-                logf.write("\nGenerating code with AI...\n")
+            build_log.write("\nGenerating code with AI...\n")
             
             try:
-                # FORCE FALLBACK GENERATION TO PREVENT HANGING
-                logger.warning("⚠️ Using forced fallback generation to prevent hanging")
-                with open(log_path, "a") as logf:
-                    logf.write("Using fallback generation to prevent hanging...\n")
+                if self.ai_generator.generation_mode == "fallback":
+                    # FORCE FALLBACK GENERATION TO PREVENT HANGING
+                    logger.warning("⚠️ Using forced fallback generation to prevent hanging")
+                    build_log.milestone("Using fallback generation to prevent hanging...\n")
+                else:
+                    build_log.milestone(f"Using {self.ai_generator.generation_mode} generation mode...\n")
                 
+                # Streamed files reach the build log (and the UI) as they complete
                 ai_files = self.ai_generator.generate_project(
                     manifest["requirements"], 
-                    manifest["project_type"]
+                    manifest["project_type"],
+                    on_file=lambda name, content: build_log.write(f"Received: {name} ({len(content)} bytes)\n"),
+                    bypass_cache=manifest.get("llm", {}).get("bypass_cache", False)
                 )
+                prompt_stats = self.ai_generator.last_prompt_stats
+                if prompt_stats:
+                    build_log.write(format_report(prompt_stats.report()) + "\n")
                 
-                # Write AI-generated files to disk
-                for filename, content in ai_files.items():
-                    file_path = os.path.join(project_path, filename)
-                    
-                    # Create subdirectories if needed
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    
-                    # Don't overwrite template files unless it's a merge situation
-                    if os.path.exists(file_path):
-                        base_name, ext = os.path.splitext(filename)
-                        new_filename = f"{base_name}.ai{ext}"
-                        file_path = os.path.join(project_path, new_filename)
-                    
-                    with open(file_path, "w") as f:
-                        f.write(content)
-                    
-                    rel_path = os.path.relpath(file_path, project_path)
+                # AI files never overwrite template files (clashes become name.ai.ext)
+                project_files = merge_generated_files(template_files, ai_files)
+                
+                for rel_path in list(project_files)[len(template_files):]:
                     manifest["files_generated"].append(rel_path)
-                    
-                    with open(log_path, "a") as logf:
-                        logf.write(f"Generated: {rel_path}\n")
+                    build_log.write(f"Generated: {rel_path}\n")
+                manifest_writer.mark_dirty()
                 
-                # Store project files using MMRY compression
-                project_files = []
-                for root, _, filenames in os.walk(project_path):
-                    for filename in filenames:
-                        abs_path = os.path.join(root, filename)
-                        rel_path = os.path.relpath(abs_path, project_path)
-                        
-                        # Read file content
-                        with open(abs_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        project_files.append({
-                            "name": rel_path,
-                            "content": content,
-                            "type": self._get_file_type(filename)
-                        })
+                # The zip snapshots build.log, so get it onto disk first
+                build_log.flush()
                 
-                # Store in MMRY vault with privacy protection
+                # Write to disk, store in MMRY vault (privacy protected) and zip in one pass
                 user_id = manifest.get("user_id", "default_user")
-                storage_result = mmry_workflow_service.store_project_files(
+                zip_path = os.path.join(self.projects_dir, f"{project_id}.zip")
+                finalize_result = self.build_finalizer.finalize(
+                    project_path, zip_path, project_files,
                     user_id=user_id,
                     project_id=project_id,
-                    project_files=project_files
+                    # Reused only when no template files were merged in
+                    artifact=self.ai_generator.last_fallback_artifact
                 )
-                
-                # Update manifest with storage info
-                manifest["mmry_storage"] = storage_result
+                storage_result = finalize_result["mmry_storage"]
                 
                 # Log MMRY storage results
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nMMRY Storage completed:\n")
-                    logf.write(f"- Files stored: {storage_result['files_stored']}\n")
-                    logf.write(f"- Original size: {storage_result['total_original_size']} bytes\n")
-                    logf.write(f"- Compressed size: {storage_result['total_compressed_size']} bytes\n")
-                    logf.write(f"- Compression ratio: {storage_result['compression_ratio']:.2f}\n")
+                build_log.write(f"\nMMRY Storage completed:\n"
+                                f"- Files stored: {storage_result['files_stored']}\n"
+                                f"- Original size: {storage_result['total_original_size']} bytes\n"
+                                f"- Compressed size: {storage_result['total_compressed_size']} bytes\n"
+                                f"- Compression ratio: {storage_result['compression_ratio']:.2f}\n"
+                                f"- Finalized in {finalize_result['stats']['finalize_seconds']:.3f}s "
+                                f"({finalize_result['stats']['bytes_read_saved']} bytes of re-reads avoided)\n")
                 
-                # Create zip file for download
-                zip_path = os.path.join(self.projects_dir, f"{project_id}.zip")
-                with zipfile.ZipFile(zip_path, "w") as zipf:
-                    for root, _, filenames in os.walk(project_path):
-                        for filename in filenames:
-                            abs_path = os.path.join(root, filename)
-                            rel_path = os.path.relpath(abs_path, project_path)
-                            zipf.write(abs_path, rel_path)
-                
-                # Update manifest to complete
-                manifest["status"] = "complete"
-                manifest["end_time"] = time.time()
-                
-                with open(manifest_path, "w") as f:
-                    json.dump(manifest, f, indent=2)
+                # Update manifest with storage info and mark complete
+                manifest_writer.update(
+                    mmry_storage=storage_result,
+                    finalize_stats=finalize_result["stats"],
+                    build_version=finalize_result["build_version"],
+                    status="complete",
+                    end_time=time.time()
+                )
+                manifest_writer.flush(force=True)
+                self._publish_progress(project_id, manifest)
                 
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nBuild completed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    logf.write(f"Total files generated: {len(manifest['files_generated'])}\n")
+                build_log.milestone(f"\nBuild completed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                                    f"Total files generated: {len(manifest['files_generated'])}\n")
                 
                 return {
                     "status": "complete",
@@ -350,17 +349,22 @@ class ProjectGenerator:
             except Exception as e:
                 logger.error(f"AI generation error: {str(e)}")
                 
-                # Update manifest with error
-                manifest["status"] = "failed"
-                manifest["end_time"] = time.time()
-                manifest["errors"].append(f"AI generation error: {str(e)}")
+                # Keep whatever the template produced
+                if template_files and not os.path.exists(os.path.join(project_path, next(iter(template_files)))):
+                    self.build_finalizer.write_files(project_path, template_files)
                 
-                with open(manifest_path, "w") as f:
-                    json.dump(manifest, f, indent=2)
+                # Update manifest with error; watchers only see "failed" once no retry follows
+                manifest["errors"].append(f"AI generation error: {str(e)}")
+                if final_attempt:
+                    manifest_writer.update(status="failed", end_time=time.time())
+                else:
+                    manifest_writer.update(status="retrying")
+                manifest_writer.flush(force=True)
+                self._publish_progress(project_id, manifest)
                 
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nERROR: AI generation failed: {str(e)}\n")
-                    logf.write(f"Build failed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                build_log.milestone(f"\nERROR: AI generation failed: {str(e)}\n"
+                                    + (f"Build failed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n" if final_attempt
+                                       else f"Attempt {attempt} failed, the build will be retried\n"))
                 
                 return {
                     "status": "failed",
@@ -372,9 +376,13 @@ class ProjectGenerator:
             logger.error(f"Build execution error: {str(e)}")
             
             try:
-                with open(log_path, "a") as logf:
-                    logf.write(f"\nCRITICAL ERROR: {str(e)}\n")
-                    logf.write(f"Build failed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                message = (f"\nCRITICAL ERROR: {str(e)}\n"
+                           f"Build failed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                if build_log:
+                    build_log.milestone(message)
+                else:
+                    with open(log_path, "a") as logf:
+                        logf.write(message)
             except:
                 pass
                 
@@ -383,6 +391,10 @@ class ProjectGenerator:
                 "project_id": project_id,
                 "error": str(e)
             }
+        
+        finally:
+            if build_log:
+                build_log.close()
     
     def get_build_status(self, project_id: str) -> Dict[str, Any]:
         """
@@ -446,28 +458,43 @@ class ProjectGenerator:
             with open(manifest_path, "r") as f:
                 manifest = json.load(f)
             
-            # Get agent status from manifest or generate default
-            agent_status = manifest.get("agent_status", {})
-            
-            # If no agent status exists, create default based on build status
-            if not agent_status:
-                agent_status = self._generate_default_agent_status(manifest)
-            
-            # Calculate overall progress
-            overall_progress = 0
-            if agent_status:
-                total_progress = sum(agent.get("progress", 0) for agent in agent_status.values())
-                overall_progress = total_progress / len(agent_status) if agent_status else 0
-            
-            return {
-                "agents": agent_status,
-                "overall_progress": overall_progress,
-                "timestamp": time.time()
-            }
+            return self._agent_status_from_manifest(manifest)
         except Exception as e:
             logger.error(f"Error reading agent status for {project_id}: {e}")
             return {"agents": {}, "overall_progress": 0, "error": str(e)}
     
+    def _agent_status_from_manifest(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        """Agent status payload for a loaded build manifest"""
+        # Get agent status from manifest or generate default
+        agent_status = manifest.get("agent_status", {})
+        
+        # If no agent status exists, create default based on build status
+        if not agent_status:
+            agent_status = self._generate_default_agent_status(manifest)
+        
+        # Calculate overall progress
+        overall_progress = 0
+        if agent_status:
+            total_progress = sum(agent.get("progress", 0) for agent in agent_status.values())
+            overall_progress = total_progress / len(agent_status) if agent_status else 0
+        
+        return {
+            "agents": agent_status,
+            "overall_progress": overall_progress,
+            "timestamp": time.time()
+        }
+    
+    def _log_publisher(self, project_id: str):
+        """BuildLogger listener streaming build.log writes to event watchers"""
+        def publish(text: str, offset: int):
+            publish_build_event(project_id, "log", {"offset": offset, "text": text})
+        return publish
+    
+    def _publish_progress(self, project_id: str, manifest: Dict[str, Any]):
+        """Push a status transition and the derived agent status to event watchers"""
+        publish_build_event(project_id, "status", status_event_data(manifest))
+        publish_build_event(project_id, "agent", self._agent_status_from_manifest(manifest))
+    
     def _generate_default_agent_status(self, manifest: Dict[str, Any]) -> Dict[str, Any]:
         """Generate default agent status based on build manifest"""
         status = manifest.get("status", "unknown")
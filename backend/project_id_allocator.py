@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: project_id_allocator.py
+# Description: Atomic, constant-time project ID allocation shared by every API worker process
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 95
+
+import os
+import fcntl
+import logging
+import threading
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+COUNTER_FILENAME = ".next_project_id"
+COUNTER_WIDTH = 20
+
+
+class ProjectIDAllocator:
+    """
+    Hands out sequential numeric project IDs from a counter file
+
+    The counter holds the next free ID and is updated under an exclusive flock,
+    so concurrent threads and processes (multiple uvicorn workers, build workers)
+    never receive the same ID. Each allocation is one locked read and write,
+    independent of how many projects exist. The counter is seeded once from the
+    highest existing numeric project directory.
+    """
+
+    def __init__(self, projects_dir: str = "generated_projects"):
+        self.projects_dir = projects_dir
+        self.counter_path = os.path.join(projects_dir, COUNTER_FILENAME)
+        self._thread_lock = threading.Lock()
+        os.makedirs(projects_dir, exist_ok=True)
+
+    def allocate(self) -> str:
+        """Reserve and return the next project ID"""
+        with self._thread_lock:
+            fd = os.open(self.counter_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.pread(fd, COUNTER_WIDTH, 0).strip()
+                next_id = int(raw) if raw else self._seed_from_directories()
+
+                # Skip IDs whose directory was created outside the allocator
+                while os.path.exists(os.path.join(self.projects_dir, str(next_id))):
+                    next_id += 1
+
+                os.pwrite(fd, str(next_id + 1).rjust(COUNTER_WIDTH).encode("ascii"), 0)
+                return str(next_id)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _seed_from_directories(self) -> int:
+        """One-off scan used only when the counter file is new"""
+        numeric_dirs = [int(d) for d in os.listdir(self.projects_dir)
+                        if d.isdigit() and os.path.isdir(os.path.join(self.projects_dir, d))]
+        next_id = max(numeric_dirs) + 1 if numeric_dirs else 0
+        logger.info(f"Seeded project ID counter at {next_id} from {len(numeric_dirs)} existing projects")
+        return next_id
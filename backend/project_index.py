@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: project_index.py
+# Description: In-memory index of generated projects for listing, filtering and pagination
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+GET /projects/ used to list generated_projects and open every manifest on each
+request. The index holds one summary entry per project instead:
+
+- rebuilt from disk once at startup, on a background thread
+- kept current from build status events (start, transitions, finish)
+- id-ordered lists per status and per user, so the default newest-first
+  listing fetches a page by slicing, independent of the number of projects
+
+Events only reach the index from builds of its own process, so disk stays the
+shared source: before each query the projects directory is rescanned if its
+mtime changed (projects created or deleted by other processes), the entries
+on the page served are reloaded when their build_manifest.json changed, and
+so are builds still in progress, at most every PROJECT_INDEX_REVALIDATE_SECONDS
+(status filters can lag by that much; the page itself never does).
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from build_events import TERMINAL_STATUSES
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sortable fields besides the default project id order
+SORT_KEYS = {
+    "creation_time": lambda entry: entry.get("creation_time") or 0,
+    "name": lambda entry: (entry.get("name") or "").lower(),
+    "status": lambda entry: entry.get("status") or "",
+    "duration": lambda entry: entry.get("duration") or 0,
+    "file_count": lambda entry: entry.get("file_count") or 0,
+}
+
+
+class ProjectIndex:
+    """Thread-safe summary entries for every project, with secondary indexes"""
+
+    def __init__(self, projects_dir: str = "generated_projects", revalidate_interval: Optional[float] = None):
+        self.projects_dir = projects_dir
+        self.revalidate_interval = (revalidate_interval if revalidate_interval is not None
+                                    else float(os.environ.get("PROJECT_INDEX_REVALIDATE_SECONDS", "1")))
+        self._active_checked = 0.0
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Ascending numeric ids: all projects, and per status / user
+        self._ids: List[int] = []
+        self._by_status: Dict[str, List[int]] = {}
+        self._by_user: Dict[str, List[int]] = {}
+        # Orderings other than by id, computed on demand for the current version
+        self._sorted_cache: Dict[Tuple, List[int]] = {}
+        # Manifest (mtime, size, inode) each entry was loaded from; builds not yet finished
+        self._signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self._active: set = set()
+        self._dir_mtime: Optional[int] = None
+        self.version = 0
+        self.ready = threading.Event()
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    # Loading
+
+    def _manifest_signature(self, project_id: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.projects_dir, project_id, "build_manifest.json"))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _directory_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.projects_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def load_entry(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Build a summary entry from the project's manifest and zip (disk read)"""
+        project_path = os.path.join(self.projects_dir, project_id)
+        try:
+            creation_time = os.path.getctime(project_path)
+        except OSError:
+            return None
+        # Taken before the read, so a write during it shows up as a change next time
+        signature = self._manifest_signature(project_id)
+
+        entry = {
+            "id": project_id,
+            "name": f"Project {project_id}",
+            "creation_time": creation_time,
+            "status": "unknown"
+        }
+
+        manifest_path = os.path.join(project_path, "build_manifest.json")
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, "r") as f:
+                    manifest = json.load(f)
+
+                entry.update({
+                    "name": manifest.get("project_name", f"Project {project_id}"),
+                    "status": manifest.get("status", "unknown"),
+                    "template_id": manifest.get("template_id"),
+                    "requirements": manifest.get("requirements", []),
+                    "start_time": manifest.get("start_time"),
+                    "end_time": manifest.get("end_time"),
+                    "duration": manifest.get("end_time", time.time()) - manifest.get("start_time") if manifest.get("start_time") and manifest.get("end_time") else 0,
+                    "file_count": len(manifest.get("files_generated", [])),
+                    "has_errors": len(manifest.get("errors", [])) > 0,
+                    "user_id": manifest.get("user_id")
+                })
+            except Exception as e:
+                logger.error(f"Error reading manifest for project {project_id}: {str(e)}")
+
+        self._apply_zip_info(entry)
+        with self._lock:
+            self._signatures[project_id] = signature
+        return entry
+
+    def _apply_zip_info(self, entry: Dict[str, Any]):
+        zip_path = os.path.join(self.projects_dir, f"{entry['id']}.zip")
+        try:
+            entry["zip_size"] = os.path.getsize(zip_path)
+            entry["has_zip"] = True
+            entry["download_url"] = f"/download/{entry['id']}.zip"
+        except OSError:
+            entry["has_zip"] = False
+            entry.pop("zip_size", None)
+            entry.pop("download_url", None)
+
+    def _list_project_ids(self) -> List[str]:
+        # Read before listing, so a project created during the listing changes it again
+        self._dir_mtime = self._directory_mtime()
+        try:
+            return [d for d in os.listdir(self.projects_dir)
+                    if d.isdigit() and os.path.isdir(os.path.join(self.projects_dir, d))]
+        except OSError as e:
+            logger.error(f"Error listing projects: {str(e)}")
+            return []
+
+    def rebuild(self):
+        """Index every project on disk not already indexed (startup)"""
+        start = time.perf_counter()
+        project_ids = self._list_project_ids()
+
+        loaded = 0
+        for project_id in project_ids:
+            # Builds that started meanwhile are already indexed from their events
+            if project_id in self._entries:
+                continue
+            entry = self.load_entry(project_id)
+            if entry:
+                with self._lock:
+                    if project_id not in self._entries:
+                        self._insert(entry)
+                        loaded += 1
+
+        self.ready.set()
+        logger.info(f"Project index rebuilt: {loaded} projects in {time.perf_counter() - start:.2f}s")
+
+    def ensure_loaded(self):
+        """Rebuild synchronously if no startup rebuild was scheduled (standalone use)"""
+        if not self.ready.is_set() and self._rebuild_thread is None:
+            self.rebuild()
+
+    def start_rebuild(self):
+        """Rebuild on a background thread; listings serve what is indexed so far"""
+        self._rebuild_thread = threading.Thread(target=self.rebuild, name="project-index-rebuild", daemon=True)
+        self._rebuild_thread.start()
+
+    def revalidate(self):
+        """Pick up changes made on disk by other processes (see module docstring)"""
+        if not self.ready.is_set():
+            return
+        if self._directory_mtime() != self._dir_mtime:
+            on_disk = set(self._list_project_ids())
+            with self._lock:
+                indexed = set(self._entries)
+            for project_id in on_disk - indexed:
+                self.refresh(project_id)
+            for project_id in indexed - on_disk:
+                self.remove(project_id)
+        now = time.monotonic()
+        if now - self._active_checked < self.revalidate_interval:
+            return
+        self._active_checked = now
+        with self._lock:
+            active = list(self._active)
+        for project_id in active:
+            self._revalidate_entry(project_id)
+
+    def _revalidate_entry(self, project_id: str) -> bool:
+        """Reload one entry if its manifest changed; True if it did"""
+        with self._lock:
+            if project_id not in self._entries or self._signatures.get(project_id) == \
+                    self._manifest_signature(project_id):
+                return False
+        self.refresh(project_id)
+        return True
+
+    # Updates
+
+    def upsert(self, entry: Dict[str, Any]):
+        with self._lock:
+            if entry["id"] in self._entries:
+                self._remove(entry["id"])
+            self._insert(entry)
+
+    def refresh(self, project_id: str):
+        """Reload one project from disk"""
+        entry = self.load_entry(project_id)
+        if entry:
+            self.upsert(entry)
+        else:
+            self.remove(project_id)
+
+    def remove(self, project_id: str):
+        with self._lock:
+            if project_id in self._entries:
+                self._remove(project_id)
+            self._signatures.pop(project_id, None)
+
+    def apply_event(self, event: Dict[str, Any]):
+        """Build event bus listener: keep entries current from status events"""
+        if event.get("type") != "status":
+            return
+        project_id = event["project_id"]
+        data = event["data"]
+
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is None or data.get("status") == "initializing":
+                known = False
+            else:
+                known = True
+                updated = dict(entry, status=data["status"], file_count=data.get("files_generated", 0),
+                               has_errors=bool(data.get("errors")))
+                if data.get("end_time"):
+                    updated["end_time"] = data["end_time"]
+                    updated["duration"] = data.get("duration", 0)
+
+        if not known:
+            # New (or unseen) build: one manifest read
+            self.refresh(project_id)
+            return
+        if data["status"] in ("complete", "failed"):
+            self._apply_zip_info(updated)
+        self.upsert(updated)
+
+    def _insert(self, entry: Dict[str, Any]):
+        """Add an entry to all indexes (lock held)"""
+        project_id = entry["id"]
+        numeric_id = int(project_id)
+        self._entries[project_id] = entry
+        self._insort(self._ids, numeric_id)
+        self._insort(self._by_status.setdefault(entry.get("status") or "unknown", []), numeric_id)
+        if entry.get("user_id"):
+            self._insort(self._by_user.setdefault(entry["user_id"], []), numeric_id)
+        if entry.get("status") not in TERMINAL_STATUSES:
+            self._active.add(project_id)
+        self._changed()
+
+    def _remove(self, project_id: str):
+        """Drop an entry from all indexes (lock held)"""
+        entry = self._entries.pop(project_id)
+        numeric_id = int(project_id)
+        self._discard(self._ids, numeric_id)
+        self._discard(self._by_status.get(entry.get("status") or "unknown", []), numeric_id)
+        if entry.get("user_id"):
+            self._discard(self._by_user.get(entry["user_id"], []), numeric_id)
+        self._active.discard(project_id)
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._sorted_cache.clear()
+
+    @staticmethod
+    def _insort(ids: List[int], value: int):
+        # New projects get the highest id, so this is almost always an append
+        if not ids or value > ids[-1]:
+            ids.append(value)
+        else:
+            bisect.insort(ids, value)
+
+    @staticmethod
+    def _discard(ids: List[int], value: int):
+        position = bisect.bisect_left(ids, value)
+        if position < len(ids) and ids[position] == value:
+            del ids[position]
+
+    # Queries
+
+    def query(self, status: Optional[str] = None, user_id: Optional[str] = None, sort: str = "id",
+              descending: bool = True, offset: int = 0,
+              limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of project entries and the total matching count
+
+        Sorting by id (newest first by default) slices the per-filter id
+        lists directly; other sort keys use an ordering cached until the
+        index next changes. Entries are revalidated against disk first.
+        """
+        self.revalidate()
+        page, total = self._query(status, user_id, sort, descending, offset, limit)
+        # A page entry changed by another process may no longer belong on this page
+        if any([self._revalidate_entry(entry["id"]) for entry in page]):
+            page, total = self._query(status, user_id, sort, descending, offset, limit)
+        for entry in page:
+            self._apply_zip_info(entry)
+        return page, total
+
+    def _query(self, status: Optional[str], user_id: Optional[str], sort: str, descending: bool,
+               offset: int, limit: Optional[int]) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            ids = self._filtered_ids(status, user_id)
+            total = len(ids)
+            offset = max(offset, 0)
+            end = total if limit is None else min(total, offset + max(limit, 0))
+
+            if sort in SORT_KEYS:
+                ordered = self._sorted_ids(ids, sort, status, user_id)
+                page_ids = ordered[total - end:total - offset][::-1] if descending else ordered[offset:end]
+            elif descending:
+                page_ids = ids[total - end:total - offset][::-1]
+            else:
+                page_ids = ids[offset:end]
+
+            # Copies, so callers can't mutate the index
+            return [dict(self._entries[str(i)]) for i in page_ids], total
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        self._revalidate_entry(project_id)
+        with self._lock:
+            entry = self._entries.get(project_id)
+            return dict(entry) if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _filtered_ids(self, status: Optional[str], user_id: Optional[str]) -> List[int]:
+        """Ascending id list for the filter (lock held)"""
+        if status and user_id:
+            key = ("filter", status, user_id)
+            if key not in self._sorted_cache:
+                user_ids = set(self._by_user.get(user_id, ()))
+                self._sorted_cache[key] = [i for i in self._by_status.get(status, ()) if i in user_ids]
+            return self._sorted_cache[key]
+        if status:
+            return self._by_status.get(status, [])
+        if user_id:
+            return self._by_user.get(user_id, [])
+        return self._ids
+
+    def _sorted_ids(self, ids: List[int], sort: str, status: Optional[str], user_id: Optional[str]) -> List[int]:
+        """Ascending ordering by sort key, ties by id (lock held)"""
+        key = ("sort", sort, status, user_id)
+        if key not in self._sorted_cache:
+            sort_key = SORT_KEYS[sort]
+            # ids is ascending and sort() is stable, so ties keep id order
+            self._sorted_cache[key] = sorted(ids, key=lambda i: sort_key(self._entries[str(i)]))
+        return self._sorted_cache[key]
+
+
+# Benchmark: listing cost against the number of projects on disk
+if __name__ == "__main__":
+    import sys
+    import shutil
+    import tempfile
+    import statistics
+
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    statuses = ["complete"] * 8 + ["failed", "generating"]
+
+    def timed_ms(func, repeat: int) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    print("=== GET /projects/ cost vs number of projects ===\n")
+    print(f"{'projects':>9}{'full scan':>14}{'index rebuild':>16}{'index page':>13}{'status page':>13}{'name sort':>12}")
+    for size in sizes:
+        projects_dir = tempfile.mkdtemp()
+        for i in range(size):
+            project_path = os.path.join(projects_dir, str(i))
+            os.mkdir(project_path)
+            with open(os.path.join(project_path, "build_manifest.json"), "w") as f:
+                json.dump({"project_name": f"Project {i:06d}", "status": statuses[i % len(statuses)],
+                           "requirements": ["Landing page", "Contact form"], "start_time": 1.0, "end_time": 5.0,
+                           "files_generated": ["src/App.jsx"] * 12, "errors": [], "user_id": f"user{i % 50}"}, f)
+
+        # Before: every request listed the directory and read each manifest and zip
+        def full_scan():
+            scanner = ProjectIndex(projects_dir)
+            return [scanner.load_entry(d) for d in sorted(os.listdir(projects_dir), key=int, reverse=True)]
+
+        scan_ms = timed_ms(full_scan, 1 if size > 10000 else 3)
+
+        index = ProjectIndex(projects_dir)
+        rebuild_ms = timed_ms(index.rebuild, 1)
+        page_ms = timed_ms(lambda: index.query(offset=size // 2, limit=50), 200)
+        status_ms = timed_ms(lambda: index.query(status="failed", limit=50), 200)
+        index.query(sort="name", limit=50)  # first call builds the ordering
+        name_ms = timed_ms(lambda: index.query(sort="name", descending=False, offset=100, limit=50), 200)
+
+        print(f"{size:>9,}{scan_ms:>11.1f} ms{rebuild_ms:>13.1f} ms{page_ms:>10.3f} ms"
+              f"{status_ms:>10.3f} ms{name_ms:>9.3f} ms")
+        shutil.rmtree(projects_dir)
@@ -2,86 +2,64 @@
 # -*- coding: utf-8 -*-
 # File: projects_controller.py
 # Description: API endpoints for managing and retrieving projects
-# Last modified: 2025-08-06
+# Last modified: 2026-10-18
 # By: AI Assistant
 # Completeness: 100
 
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 import time
 
+from project_index import ProjectIndex, SORT_KEYS
+from project_files import ProjectFilesCache, DEFAULT_PAGE_SIZE
+from http_caching import etag_matches, cache_control
+from build_events import build_event_bus
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Files inlined in project details; the rest are listed through /projects/{id}/files
+FILES_PREVIEW = 50
+
 class ProjectsController:
     def __init__(self, projects_dir: str = "generated_projects"):
         self.projects_dir = projects_dir
         os.makedirs(projects_dir, exist_ok=True)
+        self.index = ProjectIndex(projects_dir)
+        self.files_cache = ProjectFilesCache(projects_dir)
     
     def get_all_projects(self) -> List[Dict[str, Any]]:
         """Get a list of all projects with their status and stats"""
-        try:
-            # Get all project directories (numeric folders)
-            project_dirs = [d for d in os.listdir(self.projects_dir) 
-                          if os.path.isdir(os.path.join(self.projects_dir, d)) and d.isdigit()]
-            
-            projects = []
-            for project_id in sorted(project_dirs, key=int, reverse=True):  # Newest first
-                project_path = os.path.join(self.projects_dir, project_id)
-                manifest_path = os.path.join(project_path, "build_manifest.json")
-                
-                project_info = {
-                    "id": project_id,
-                    "name": f"Project {project_id}",
-                    "creation_time": os.path.getctime(project_path),
-                    "status": "unknown"
-                }
-                
-                # Try to get info from manifest
-                if os.path.exists(manifest_path):
-                    try:
-                        with open(manifest_path, "r") as f:
-                            manifest = json.load(f)
-                            
-                        project_info.update({
-                            "name": manifest.get("project_name", f"Project {project_id}"),
-                            "status": manifest.get("status", "unknown"),
-                            "template_id": manifest.get("template_id"),
-                            "requirements": manifest.get("requirements", []),
-                            "start_time": manifest.get("start_time"),
-                            "end_time": manifest.get("end_time"),
-                            "duration": manifest.get("end_time", time.time()) - manifest.get("start_time") if manifest.get("start_time") and manifest.get("end_time") else 0,
-                            "file_count": len(manifest.get("files_generated", [])),
-                            "has_errors": len(manifest.get("errors", [])) > 0
-                        })
-                
-                    except Exception as e:
-                        logger.error(f"Error reading manifest for project {project_id}: {str(e)}")
-                
-                # Check if zip file exists
-                zip_path = os.path.join(self.projects_dir, f"{project_id}.zip")
-                project_info["has_zip"] = os.path.exists(zip_path)
-                if project_info["has_zip"]:
-                    project_info["zip_size"] = os.path.getsize(zip_path)
-                    project_info["download_url"] = f"/download/{project_id}.zip"
-                
-                projects.append(project_info)
-            
-            return projects
-            
-        except Exception as e:
-            logger.error(f"Error getting projects: {str(e)}")
-            return []
+        return self.list_projects()[0]
+    
+    def list_projects(self, status: Optional[str] = None, user_id: Optional[str] = None,
+                      sort: str = "id", descending: bool = True, offset: int = 0,
+                      limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        A page of projects from the in-memory index, and the total matching
+        
+        Used standalone (no startup rebuild), the index is built on first use.
+        """
+        self.index.ensure_loaded()
+        return self.index.query(status=status, user_id=user_id, sort=sort, descending=descending,
+                                offset=offset, limit=limit)
     
-    def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
-        """Get details for a specific project"""
+    def get_project(self, project_id: str, include_log: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get details for a specific project
+        
+        The build log is only inlined with include_log; otherwise log_url and
+        log_size point clients at /logs/{id} for a separate, incremental fetch.
+        Likewise "files" is a preview from the build's file manifest; the full
+        tree is browsed per directory through files_url.
+        """
         try:
             project_path = os.path.join(self.projects_dir, project_id)
             if not os.path.exists(project_path):
@@ -97,17 +75,16 @@ class ProjectsController:
                 "files": []
             }
             
-            # Get file list
-            for root, _, files in os.walk(project_path):
-                for file in files:
-                    if file not in ["build_manifest.json", "build.log"]:
-                        file_path = os.path.join(root, file)
-                        rel_path = os.path.relpath(file_path, project_path)
-                        project_info["files"].append({
-                            "path": rel_path,
-                            "size": os.path.getsize(file_path),
-                            "modified_time": os.path.getmtime(file_path)
-                        })
+            # File preview and totals from the cached file manifest
+            tree = self.files_cache.get_tree(project_id)
+            if tree:
+                project_info.update({
+                    "files": tree.files[:FILES_PREVIEW],
+                    "file_count": tree.total_files,
+                    "total_size": tree.total_bytes,
+                    "build_version": tree.build_version,
+                    "files_url": f"/projects/{project_id}/files"
+                })
             
             # Try to get info from manifest
             if os.path.exists(manifest_path):
@@ -137,14 +114,17 @@ class ProjectsController:
                 project_info["zip_size"] = os.path.getsize(zip_path)
                 project_info["download_url"] = f"/download/{project_id}.zip"
             
-            # Check if build log exists and add its content
+            # Check if build log exists; its content is fetched separately unless asked for
             log_path = os.path.join(project_path, "build.log")
             if os.path.exists(log_path):
-                try:
-                    with open(log_path, "r") as f:
-                        project_info["build_log"] = f.read()
-                except Exception as e:
-                    logger.error(f"Error reading build log for project {project_id}: {str(e)}")
+                project_info["log_size"] = os.path.getsize(log_path)
+                project_info["log_url"] = f"/logs/{project_id}"
+                if include_log:
+                    try:
+                        with open(log_path, "r") as f:
+                            project_info["build_log"] = f.read()
+                    except Exception as e:
+                        logger.error(f"Error reading build log for project {project_id}: {str(e)}")
             
             return project_info
             
@@ -154,16 +134,58 @@ class ProjectsController:
 
 # Initialize controller
 projects_controller = ProjectsController()
+# Builds report status changes (relayed from worker processes) to the index
+build_event_bus.add_listener(projects_controller.index.apply_event)
 
 @router.get("/projects/")
-async def list_projects():
-    """Get a list of all projects with basic info"""
-    return projects_controller.get_all_projects()
+async def list_projects(response: Response, status: Optional[str] = None, user_id: Optional[str] = None,
+                        sort: str = "id", order: str = "desc", offset: int = 0, limit: Optional[int] = None):
+    """
+    Get a list of projects with basic info, newest first
+    
+    Filter by status / user_id, sort by id or one of SORT_KEYS, and page with
+    offset / limit; X-Total-Count carries the number of matching projects.
+    """
+    if sort != "id" and sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort field: {sort}")
+    projects, total = projects_controller.list_projects(status=status, user_id=user_id, sort=sort,
+                                                        descending=order != "asc", offset=offset, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    if not projects_controller.index.ready.is_set():
+        response.headers["X-Index-Complete"] = "false"
+    return projects
 
 @router.get("/projects/{project_id}")
-async def get_project(project_id: str):
-    """Get detailed info for a specific project"""
-    project = projects_controller.get_project(project_id)
+async def get_project(project_id: str, include_log: bool = False):
+    """Get detailed info for a specific project (?include_log=true inlines the build log)"""
+    project = projects_controller.get_project(project_id, include_log=include_log)
     if project is None:
         raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
-    return project
\ No newline at end of file
+    return project
+
+
+@router.get("/projects/{project_id}/files")
+def list_project_files(project_id: str, request: Request, dir: str = "", page: int = 1,
+                       page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    One page of a project directory's immediate children (directories first)
+    
+    Directories carry recursive file_count / size so clients expand them
+    lazily. Responses are keyed by the build version and revalidate with ETag.
+    """
+    if not project_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid project id")
+    tree = projects_controller.files_cache.get_tree(project_id)
+    if tree is None:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    # Same URL and build version means the same listing
+    etag = f'"{tree.build_version:x}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control("files")}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    try:
+        listing = tree.listing(dir, page=page, page_size=page_size)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Directory {dir} not found")
+    return JSONResponse(listing, headers=headers)
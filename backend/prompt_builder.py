@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: prompt_builder.py
+# Description: Compact, budgeted generation prompts with byte-stable static prefixes
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 85
+
+"""
+The generation prompts are triple-quoted strings indented to the code around
+them, repeat the same instructions in the system and user prompt, and put
+the requirements first, so no two builds share a prompt prefix.
+
+PromptBuilder.build(system, instructions, dynamic) returns prompts where
+- static text is compacted once (dedented, blank runs collapsed, repeated
+  instruction lines dropped, and user instructions already given by the
+  system prompt removed) and is byte-identical from build to build;
+- the per-build text (project type, requirements, manifests) comes last, so
+  system + instructions form a stable prefix that Ollama (model kept loaded
+  with LLM_KEEP_ALIVE) and OpenAI prompt caching can reuse;
+- the total stays within LLM_PROMPT_TOKEN_BUDGET tokens: optional sections
+  are dropped first, then the dynamic text is cut.
+
+Tokens are counted with tiktoken when it is installed, else with a local
+approximation (word pieces of up to four characters, punctuation, whitespace
+runs). PromptStats adds up, per build, the tokens sent, the tokens compaction
+saved and the prefix tokens a backend cache can reuse.
+"""
+
+import os
+import re
+import logging
+import textwrap
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_APPROX_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\w\s]|\s+|\w")
+_INSTRUCTION_PREFIX = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+TRUNCATION_MARKER = "\n[... truncated to fit the prompt budget]"
+
+
+def keep_alive() -> str:
+    """How long Ollama keeps the model (and its prompt cache) loaded between requests"""
+    return os.environ.get("LLM_KEEP_ALIVE", "30m")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, approximating token counts: {e}")
+        return None
+
+
+@lru_cache(maxsize=512)
+def count_tokens(text: str) -> int:
+    """Tokens in text (tiktoken cl100k_base if installed, else a local approximation)"""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    tokens = 0
+    for piece in _APPROX_TOKEN.findall(text):
+        # Long words split into several BPE tokens; whitespace runs are mostly one
+        tokens += (len(piece) + 3) // 4 if piece[0].isalpha() else 1
+    return tokens
+
+
+def _instruction_key(line: str) -> Optional[str]:
+    """Normalized form of an instruction line, or None for headings and prose"""
+    if not _INSTRUCTION_PREFIX.match(line):
+        return None
+    body = _INSTRUCTION_PREFIX.sub("", line)
+    return re.sub(r"[^a-z0-9]+", " ", body.lower()).strip()
+
+
+def _drop_empty_headings(lines: List[str]) -> List[str]:
+    """Remove "HEADING:" lines whose instructions were all removed"""
+    def is_heading(line: str) -> bool:
+        return line.rstrip().endswith(":") and _instruction_key(line) is None
+
+    kept = []
+    for index, line in enumerate(lines):
+        if is_heading(line):
+            following = next((l for l in lines[index + 1:] if l.strip()), "")
+            if not following or is_heading(following):
+                continue
+        kept.append(line)
+    return kept
+
+
+def _collapse(lines: List[str]) -> str:
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+@lru_cache(maxsize=256)
+def compact(text: str) -> str:
+    """Dedented text without trailing spaces, blank-line runs or repeated instruction lines"""
+    # The first line of a triple-quoted prompt usually starts right after the quotes
+    first, _, rest = text.strip("\n").partition("\n")
+    lines = [first.strip()] + textwrap.dedent(rest).split("\n")
+    seen, kept = set(), []
+    for line in lines:
+        line = line.rstrip()
+        key = _instruction_key(line)
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return _collapse(_drop_empty_headings(kept))
+
+
+@lru_cache(maxsize=256)
+def dedupe_against(text: str, reference: str) -> str:
+    """text without the instruction lines reference already contains"""
+    given = {key for key in map(_instruction_key, reference.split("\n")) if key}
+    kept = [line for line in text.split("\n") if _instruction_key(line) not in given]
+    return _collapse(_drop_empty_headings(kept))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text (cut at a line) within max_tokens, marked as truncated"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    lines, kept, used = text.split("\n"), [], 0
+    for line in lines:
+        cost = count_tokens(line + "\n")
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept) + TRUNCATION_MARKER
+
+
+class BuiltPrompt(NamedTuple):
+    system: str
+    user: str
+    instructions: str         # static start of user (the cacheable prefix after system)
+    prompt_tokens: int        # system + user as sent
+    prefix_tokens: int        # system + static instructions, identical across builds
+    raw_tokens: int           # what the uncompacted prompts would have cost
+    dropped: List[str]        # optional sections left out for the budget
+
+
+class PromptBuilder:
+    """Builds (system, user) prompts: compacted static prefix, dynamic suffix, token budget"""
+
+    def __init__(self, budget_tokens: Optional[int] = None):
+        self.budget_tokens = budget_tokens or int(os.environ.get("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+
+    def build(self, system: str, instructions: str = "", dynamic: str = "",
+              optional: Sequence[str] = ()) -> BuiltPrompt:
+        """
+        Args:
+            system: System prompt (static)
+            instructions: Static user instructions; lines the system prompt already gives are removed
+            dynamic: Per-request text, placed last
+            optional: Static sections that may be dropped (last first) to fit the budget
+        """
+        system_text = compact(system)
+        static_text = dedupe_against(compact(instructions), system_text) if instructions else ""
+        sections = [dedupe_against(compact(section), system_text) for section in optional]
+        raw_tokens = sum(count_tokens(part) for part in (system, instructions, dynamic, *optional) if part)
+
+        def assemble(kept_sections: List[str], dynamic_text: str) -> str:
+            return "\n\n".join(part for part in (static_text, *kept_sections, dynamic_text.strip()) if part)
+
+        dropped: List[str] = []
+        user = assemble(sections, dynamic)
+        while sections and count_tokens(system_text) + count_tokens(user) > self.budget_tokens:
+            dropped.insert(0, sections.pop())
+            user = assemble(sections, dynamic)
+
+        total = count_tokens(system_text) + count_tokens(user)
+        if total > self.budget_tokens:
+            room = self.budget_tokens - (total - count_tokens(dynamic.strip()))
+            logger.warning(f"Prompt is {total} tokens, over the {self.budget_tokens} token budget; "
+                           f"cutting the request text to {max(room, 0)} tokens")
+            user = assemble(sections, truncate_to_tokens(dynamic.strip(), max(room, 0)))
+
+        prefix_tokens = count_tokens(system_text) + (count_tokens(static_text) if static_text else 0)
+        return BuiltPrompt(system_text, user, static_text, count_tokens(system_text) + count_tokens(user),
+                           prefix_tokens, raw_tokens, dropped)
+
+
+class PromptStats:
+    """Prompt token accounting for one build (thread-safe; parallel generation records concurrently)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prefixes = set()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.raw_tokens = 0
+        self.prefix_reusable_tokens = 0
+
+    def record(self, system: str, user: str, prefix: str = "", raw_tokens: Optional[int] = None):
+        """
+        One LLM call. prefix is the leading part of user shared with other calls; after its
+        first use, system + prefix can come from the backend's prompt cache.
+        """
+        tokens = count_tokens(system) + count_tokens(user)
+        shared = count_tokens(system) + (count_tokens(prefix) if prefix else 0)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += tokens
+            self.raw_tokens += raw_tokens if raw_tokens is not None else tokens
+            key = (system, prefix)
+            if key in self._prefixes:
+                self.prefix_reusable_tokens += shared
+            else:
+                self._prefixes.add(key)
+
+    def record_built(self, prompt: BuiltPrompt):
+        self.record(prompt.system, prompt.user, prompt.instructions, prompt.raw_tokens)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "raw_prompt_tokens": self.raw_tokens,
+                "saved_by_compaction": self.raw_tokens - self.prompt_tokens,
+                "prefix_cache_reusable": self.prefix_reusable_tokens,
+                "prefill_tokens": self.prompt_tokens - self.prefix_reusable_tokens,
+                "tokenizer": "tiktoken" if _encoding() is not None else "approximate"
+            }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    return (f"Prompt tokens: {report['prompt_tokens']:,} sent over {report['calls']} call(s), "
+            f"{report['saved_by_compaction']:,} saved by compaction, "
+            f"{report['prefix_cache_reusable']:,} reusable from the prefix cache "
+            f"({report['tokenizer']} count)")
+
+
+# Benchmark: prefill tokens per build, previous prompt layout vs PromptBuilder
+if __name__ == "__main__":
+    import ast
+    from pathlib import Path
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    # ai_generator needs requests at import time; read its prompt literals instead
+    tree = ast.parse((Path(__file__).parent / "ai_generator.py").read_text())
+    instructions = next(ast.literal_eval(node.value) for node in tree.body if isinstance(node, ast.Assign)
+                        and node.targets[0].id == "SINGLE_CALL_INSTRUCTIONS")
+    method = next(node for node in ast.walk(tree)
+                  if isinstance(node, ast.FunctionDef) and node.name == "_get_system_prompt")
+    system_prompts = ast.literal_eval(next(node for node in ast.walk(method) if isinstance(node, ast.Dict)))
+
+    builds = [[f"Landing page for product {n}", f"Pricing table with {n % 4 + 2} tiers",
+               "Contact form with validation", f"Blog with {n + 3} posts"] for n in range(20)]
+
+    def previous_user_prompt(project_type: str, requirements: List[str]) -> str:
+        # The old f-string: indented, requirements first, instructions after
+        formatted_reqs = "\n".join(f"- {req}" for req in requirements)
+        body = (f"Generate a complete functional {project_type} project based on these requirements:\n\n"
+                f"{formatted_reqs}\n\n{instructions}")
+        return "\n" + textwrap.indent(body, " " * 12) + "\n" + " " * 12
+
+    print(f"tokenizer: {'tiktoken cl100k_base' if _encoding() is not None else 'approximate'}, "
+          f"{len(builds)} single-call builds per project type\n")
+    print(f"{'type':<8}{'tokens/build before':>21}{'after':>8}{'prefill/build before':>23}{'after':>8}")
+    builder = PromptBuilder()
+    for project_type, system in system_prompts.items():
+        before, after = PromptStats(), PromptStats()
+        for requirements in builds:
+            formatted_reqs = "\n".join(f"- {req}" for req in requirements)
+            # Before, only the system prompt was a shared prefix
+            before.record(system, previous_user_prompt(project_type, requirements))
+            after.record_built(builder.build(
+                system, instructions,
+                f"Generate a complete functional {project_type} project based on these requirements:\n"
+                f"{formatted_reqs}"))
+        old, new = before.report(), after.report()
+        print(f"{project_type:<8}{old['prompt_tokens'] // old['calls']:>21}{new['prompt_tokens'] // new['calls']:>8}"
+              f"{old['prefill_tokens'] // old['calls']:>23}{new['prefill_tokens'] // new['calls']:>8}")
@@ -2,14 +2,17 @@
 # -*- coding: utf-8 -*-
 # File: template_manager.py
 # Description: Template management for Squadbox project generation
-# Last modified: 2024-11-03
+# Last modified: 2026-10-18
 # By: AI Assistant
 # Completeness: 100
 
 import os
 import json
+import errno
+import fcntl
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import re
 from pathlib import Path
 
@@ -17,6 +20,59 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Stands in for variable values while a template is compiled; cannot occur in template text
+SLOT_MARKER = "\x00{}\x00"
+TEMPLATE_VARIABLES = ("project_name",)
+LINK_MODES = ("copy", "hardlink", "reflink")
+# Linux FICLONE ioctl (btrfs, XFS, overlayfs on either)
+FICLONE = 0x40049409
+
+
+class TemplateSkeleton:
+    """
+    A template rendered once with placeholder variables and split into
+    (path, content fragments, variable slots); rendering for a build is a join
+    """
+    def __init__(self, template_id: str, files: List[Tuple[str, List[str], List[str]]], summary_index: int):
+        self.template_id = template_id
+        self.files = files
+        # Position of project_structure.md, which gets the custom requirements appended
+        self.summary_index = summary_index
+        # Content hashes of files without slots; identical across every build
+        self.static_hashes = {
+            path: hashlib.sha256(fragments[0].encode("utf-8")).hexdigest()
+            for path, fragments, slots in files if not slots
+        }
+
+    @classmethod
+    def compile(cls, template_id: str, rendered: Dict[str, str]) -> "TemplateSkeleton":
+        """Split content rendered with SLOT_MARKER values into fragments and slots"""
+        pattern = re.compile("\x00(" + "|".join(TEMPLATE_VARIABLES) + ")\x00")
+        files = []
+        for path, content in rendered.items():
+            parts = pattern.split(content)
+            # re.split alternates text, captured variable name, text, ...
+            files.append((path, parts[0::2], parts[1::2]))
+        return cls(template_id, files, list(rendered).index("project_structure.md"))
+
+    def render(self, variables: Dict[str, str], summary_suffix: str = "") -> Dict[str, str]:
+        rendered = {}
+        for path, fragments, slots in self.files:
+            if not slots:
+                content = fragments[0]
+            else:
+                parts = [fragments[0]]
+                for slot, fragment in zip(slots, fragments[1:]):
+                    parts.append(variables[slot])
+                    parts.append(fragment)
+                content = "".join(parts)
+            rendered[path] = content
+        if summary_suffix:
+            path = self.files[self.summary_index][0]
+            rendered[path] += summary_suffix
+        return rendered
+
+
 class TemplateManager:
     """
     Manages templates for project generation
@@ -26,6 +82,13 @@ class TemplateManager:
         self.templates_dir = templates_dir
         self.templates_path = os.path.join(os.path.dirname(__file__), templates_dir)
         self.templates = self._load_templates()
+        self.skeletons = self._compile_skeletons()
+        # Where slot-free files are kept for hardlink/reflink; defaults to beside the project directory
+        self.blob_dir = os.getenv("TEMPLATE_BLOB_DIR")
+        self.link_mode = os.getenv("TEMPLATE_LINK_MODE", "copy")
+        self._ready_blobs = set()
+        # Cleared the first time the filesystem rejects FICLONE
+        self._reflink_supported = True
     
     def _load_templates(self) -> Dict[str, Dict]:
         """Load all template files from the templates directory"""
@@ -49,6 +112,19 @@ class TemplateManager:
         
         return templates
     
+    def _compile_skeletons(self) -> Dict[str, TemplateSkeleton]:
+        """Render every template once with placeholder variables"""
+        skeletons = {}
+        placeholders = {name: SLOT_MARKER.format(name) for name in TEMPLATE_VARIABLES}
+        for template_id, template in self.templates.items():
+            try:
+                rendered = self._render_direct(template, placeholders["project_name"])
+                skeletons[template_id] = TemplateSkeleton.compile(template_id, rendered)
+            except Exception as e:
+                # Rendered directly on every apply instead
+                logger.error(f"Error compiling template {template_id}: {str(e)}")
+        return skeletons
+    
     def get_available_templates(self) -> List[Dict]:
         """Get list of available templates with basic info"""
         return [
@@ -66,7 +142,8 @@ class TemplateManager:
         return self.templates.get(template_id)
     
     def apply_template(self, template_id: str, project_path: str, project_name: str, 
-                       custom_requirements: List[str] = None) -> Dict:
+                       custom_requirements: List[str] = None, write_files: bool = True,
+                       link_mode: Optional[str] = None) -> Dict:
         """
         Apply a template to generate project structure
         
@@ -75,100 +152,193 @@ class TemplateManager:
             project_path: Path where project will be created
             project_name: Name of the project (for variable substitution)
             custom_requirements: Additional custom requirements
+            write_files: Write the rendered files to disk; when False the caller
+                         writes them (see BuildFinalizer) from the returned contents
+            link_mode: "copy" (default, TEMPLATE_LINK_MODE), "hardlink" or "reflink";
+                       the link modes share one copy of files that are identical
+                       across builds. Hardlinked files share an inode, so they must
+                       be replaced rather than rewritten in place
             
         Returns:
-            Dict with status and generated files
+            Dict with status, generated file paths and their rendered contents
         """
         template = self.templates.get(template_id)
         if not template:
             return {"status": "error", "message": f"Template {template_id} not found"}
         
-        os.makedirs(project_path, exist_ok=True)
-        generated_files = []
-        
         try:
-            # Create base files defined in template
-            base_files = template.get("base_files", [])
-            for file_def in base_files:
-                file_path = os.path.join(project_path, file_def["path"])
-                
-                # Create subdirectories if needed
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
-                # Handle content based on type
-                content = file_def["content"]
-                
-                if isinstance(content, dict):
-                    # Convert dict to JSON string with proper formatting
-                    content = json.dumps(content, indent=2)
-                    
-                # Replace template variables
-                content = self._replace_variables(content, {
-                    "project_name": project_name
-                })
-                
-                # Write file
-                with open(file_path, "w") as f:
-                    f.write(content)
-                
-                generated_files.append(file_path)
-                logger.info(f"Created file: {file_path}")
+            contents = self.render_template(template_id, project_name, custom_requirements)
+            generated_files = [os.path.join(project_path, rel_path) for rel_path in contents]
             
-            # Generate source code files based on structure
-            if "structure" in template:
-                structure_files = self._generate_structure_files(template, project_path, project_name)
-                generated_files.extend(structure_files)
-            
-            # Create a project structure summary
-            structure_path = os.path.join(project_path, "project_structure.md")
-            with open(structure_path, "w") as f:
-                f.write(f"# {project_name} Structure\n\n")
-                f.write(f"Template: {template.get('name')}\n\n")
-                
-                f.write("## Pages/Sections\n\n")
-                # Add pages/sections from template structure
-                if "structure" in template:
-                    if "pages" in template["structure"]:
-                        for page in template["structure"]["pages"]:
-                            f.write(f"- {page['name']}\n")
-                            if "sections" in page:
-                                for section in page["sections"]:
-                                    f.write(f"  - {section}\n")
-                    elif "sections" in template["structure"]:
-                        for section in template["structure"]["sections"]:
-                            f.write(f"- {section['name']}\n")
-                            if "components" in section:
-                                for component in section["components"]:
-                                    f.write(f"  - {component}\n")
-                                    
-                f.write("\n## Components\n\n")
-                if "structure" in template and "components" in template["structure"]:
-                    for component in template["structure"]["components"]:
-                        f.write(f"- {component}\n")
-                        
-                f.write("\n## Tech Stack\n\n")
-                if "tech_stack" in template:
-                    for tech in template["tech_stack"]:
-                        f.write(f"- {tech}\n")
-                
-                # Add custom requirements
-                if custom_requirements:
-                    f.write("\n## Custom Requirements\n\n")
-                    for req in custom_requirements:
-                        f.write(f"- {req}\n")
-                
-            generated_files.append(structure_path)
+            if write_files:
+                self._write_files(template_id, project_path, contents, link_mode or self.link_mode)
             
             return {
                 "status": "success", 
                 "message": f"Template {template_id} applied successfully",
-                "files": generated_files
+                "files": generated_files,
+                "contents": contents
             }
             
         except Exception as e:
             logger.error(f"Error applying template {template_id}: {str(e)}")
             return {"status": "error", "message": f"Error applying template: {str(e)}"}
     
+    def render_template(self, template_id: str, project_name: str,
+                        custom_requirements: List[str] = None) -> Dict[str, str]:
+        """
+        Render a template in memory
+        
+        Returns:
+            Ordered dict of project-relative path -> file content
+        """
+        skeleton = self.skeletons.get(template_id)
+        if skeleton is None:
+            return self._render_direct(self.templates[template_id], project_name, custom_requirements)
+        return skeleton.render({"project_name": project_name},
+                               self._render_custom_requirements(custom_requirements))
+    
+    def _render_direct(self, template: Dict, project_name: str,
+                       custom_requirements: List[str] = None) -> Dict[str, str]:
+        """Render a template from its definition (used to compile skeletons)"""
+        rendered = {}
+        
+        # Base files defined in template
+        for file_def in template.get("base_files", []):
+            content = file_def["content"]
+            
+            if isinstance(content, dict):
+                # Convert dict to JSON string with proper formatting
+                content = json.dumps(content, indent=2)
+                
+            # Replace template variables
+            rendered[file_def["path"]] = self._replace_variables(content, {
+                "project_name": project_name
+            })
+        
+        # Source code files based on structure
+        if "structure" in template:
+            rendered.update(self._render_structure_files(template, project_name))
+        
+        # Project structure summary
+        rendered["project_structure.md"] = self._render_structure_summary(template, project_name, custom_requirements)
+        
+        return rendered
+    
+    def _render_structure_summary(self, template: Dict, project_name: str,
+                                  custom_requirements: List[str] = None) -> str:
+        """Render project_structure.md"""
+        lines = [f"# {project_name} Structure\n\n", f"Template: {template.get('name')}\n\n", "## Pages/Sections\n\n"]
+        
+        # Add pages/sections from template structure
+        if "structure" in template:
+            if "pages" in template["structure"]:
+                for page in template["structure"]["pages"]:
+                    lines.append(f"- {page['name']}\n")
+                    if "sections" in page:
+                        for section in page["sections"]:
+                            lines.append(f"  - {section}\n")
+            elif "sections" in template["structure"]:
+                for section in template["structure"]["sections"]:
+                    lines.append(f"- {section['name']}\n")
+                    if "components" in section:
+                        for component in section["components"]:
+                            lines.append(f"  - {component}\n")
+                            
+        lines.append("\n## Components\n\n")
+        if "structure" in template and "components" in template["structure"]:
+            for component in template["structure"]["components"]:
+                lines.append(f"- {component}\n")
+                
+        lines.append("\n## Tech Stack\n\n")
+        if "tech_stack" in template:
+            for tech in template["tech_stack"]:
+                lines.append(f"- {tech}\n")
+        
+        lines.append(self._render_custom_requirements(custom_requirements))
+        return "".join(lines)
+    
+    def _render_custom_requirements(self, custom_requirements: List[str] = None) -> str:
+        """Custom requirements section appended to project_structure.md"""
+        if not custom_requirements:
+            return ""
+        return "\n## Custom Requirements\n\n" + "".join(f"- {req}\n" for req in custom_requirements)
+    
+    def _write_files(self, template_id: str, project_path: str, contents: Dict[str, str], link_mode: str):
+        """Write rendered files, linking identical content when link_mode allows"""
+        if link_mode not in LINK_MODES:
+            logger.warning(f"Unknown template link mode {link_mode}, copying files")
+            link_mode = "copy"
+        if link_mode == "reflink" and not self._reflink_supported:
+            link_mode = "copy"
+        skeleton = self.skeletons.get(template_id)
+        static_hashes = skeleton.static_hashes if skeleton and link_mode != "copy" else {}
+        blob_dir = self.blob_dir or os.path.join(os.path.dirname(os.path.abspath(project_path)), ".template_blobs")
+        # Per-build content (e.g. a Next.js home page written twice) links to its first copy
+        first_copies: Dict[str, str] = {}
+        
+        for rel_path, content in contents.items():
+            file_path = os.path.join(project_path, rel_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            source = None
+            if link_mode != "copy":
+                digest = static_hashes.get(rel_path)
+                if digest:
+                    source = self._ensure_blob(blob_dir, digest, content)
+                else:
+                    source = first_copies.get(content)
+            
+            if source is None or not self._link_file(source, file_path, link_mode):
+                with open(file_path, "w") as f:
+                    f.write(content)
+                if link_mode != "copy":
+                    first_copies.setdefault(content, file_path)
+            logger.info(f"Created file: {file_path}")
+    
+    def _ensure_blob(self, blob_dir: str, digest: str, content: str) -> Optional[str]:
+        """Shared copy of a slot-free file, written once per blob directory"""
+        blob_path = os.path.join(blob_dir, digest)
+        if blob_path in self._ready_blobs:
+            return blob_path
+        try:
+            if not os.path.exists(blob_path):
+                os.makedirs(blob_dir, exist_ok=True)
+                tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(content)
+                os.replace(tmp_path, blob_path)
+        except OSError as e:
+            logger.warning(f"Template blob unavailable, copying instead: {str(e)}")
+            return None
+        self._ready_blobs.add(blob_path)
+        return blob_path
+    
+    def _link_file(self, source: str, file_path: str, link_mode: str) -> bool:
+        """Hardlink or reflink source to file_path; False when the filesystem can't"""
+        tmp_path = f"{file_path}.link.tmp"
+        try:
+            if link_mode == "hardlink":
+                if os.path.lexists(tmp_path):
+                    os.remove(tmp_path)
+                os.link(source, tmp_path)
+            else:
+                with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            os.replace(tmp_path, file_path)
+            return True
+        except OSError as e:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            if link_mode == "reflink" and e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV):
+                logger.info("Filesystem does not support reflinks, copying template files")
+                self._reflink_supported = False
+            elif e.errno == errno.ENOENT:
+                # Blob directory cleaned up; rewritten on next use
+                self._ready_blobs.discard(source)
+            elif e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                logger.warning(f"Linking {file_path} failed, copying instead: {str(e)}")
+            return False
+    
     def _replace_variables(self, content: str, variables: Dict[str, str]) -> str:
         """Replace template variables in content"""
         for var_name, var_value in variables.items():
@@ -181,6 +351,17 @@ class TemplateManager:
     def _generate_structure_files(self, template: Dict, project_path: str, project_name: str) -> List[str]:
         """Generate actual source code files based on template structure"""
         generated_files = []
+        for rel_path, content in self._render_structure_files(template, project_name).items():
+            file_path = os.path.join(project_path, rel_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w") as f:
+                f.write(content)
+            generated_files.append(file_path)
+        return generated_files
+    
+    def _render_structure_files(self, template: Dict, project_name: str) -> Dict[str, str]:
+        """Render source code files based on template structure (relative path -> content)"""
+        rendered = {}
         tech_stack = template.get("tech_stack", [])
         structure = template.get("structure", {})
         
@@ -191,90 +372,40 @@ class TemplateManager:
         
         file_ext = "tsx" if is_typescript and is_react else "jsx" if is_react else "ts" if is_typescript else "js"
         
-        # Create src directory for most projects
-        src_dir = os.path.join(project_path, "src")
-        os.makedirs(src_dir, exist_ok=True)
-        
-        # Create standard directories
+        # Standard directories
         if is_next_js:
             # Next.js app directory structure
-            app_dir = os.path.join(src_dir, "app")
-            os.makedirs(app_dir, exist_ok=True)
-            components_dir = os.path.join(src_dir, "components")
-            os.makedirs(components_dir, exist_ok=True)
-            
-            # Create app/layout.{ext}
-            layout_content = self._generate_base_layout(project_name, is_typescript)
-            layout_path = os.path.join(app_dir, f"layout.{file_ext}")
-            with open(layout_path, "w") as f:
-                f.write(layout_content)
-            generated_files.append(layout_path)
-            
-            # Create app/globals.css
-            globals_css_path = os.path.join(app_dir, "globals.css")
-            with open(globals_css_path, "w") as f:
-                f.write(self._generate_base_css())
-            generated_files.append(globals_css_path)
+            app_dir = "src/app"
+            components_dir = "src/components"
+            rendered[f"{app_dir}/layout.{file_ext}"] = self._generate_base_layout(project_name, is_typescript)
+            rendered[f"{app_dir}/globals.css"] = self._generate_base_css()
         else:
             # Standard React project structure
-            components_dir = os.path.join(src_dir, "components")
-            os.makedirs(components_dir, exist_ok=True)
-            
-            # Create App.{ext}
-            app_content = self._generate_base_app(project_name, is_typescript)
-            app_path = os.path.join(src_dir, f"App.{file_ext}")
-            with open(app_path, "w") as f:
-                f.write(app_content)
-            generated_files.append(app_path)
-            
-            # Create index.{ext}
-            index_content = self._generate_base_index(is_typescript)
-            index_path = os.path.join(src_dir, f"index.{file_ext}")
-            with open(index_path, "w") as f:
-                f.write(index_content)
-            generated_files.append(index_path)
+            components_dir = "src/components"
+            rendered[f"src/App.{file_ext}"] = self._generate_base_app(project_name, is_typescript)
+            rendered[f"src/index.{file_ext}"] = self._generate_base_index(is_typescript)
         
-        # Generate page files
-        if "pages" in structure:
-            pages = structure["pages"]
-            for page in pages:
-                page_name = page["name"]
-                file_name = self._page_name_to_file_name(page_name)
-                
-                if is_next_js:
-                    # For Next.js, create app/page-name/page.{ext}
-                    page_dir = os.path.join(app_dir, file_name)
-                    os.makedirs(page_dir, exist_ok=True)
-                    page_file_path = os.path.join(page_dir, f"page.{file_ext}")
-                    
-                    # For home page, also add to root
-                    if page_name.lower() == "home":
-                        root_page_path = os.path.join(app_dir, f"page.{file_ext}")
-                        with open(root_page_path, "w") as f:
-                            f.write(self._generate_page_content(page_name, page.get("sections", []), is_typescript))
-                        generated_files.append(root_page_path)
-                else:
-                    # For standard React, create src/pages/PageName.{ext}
-                    pages_dir = os.path.join(src_dir, "pages")
-                    os.makedirs(pages_dir, exist_ok=True)
-                    page_file_path = os.path.join(pages_dir, f"{self._capitalize(file_name)}.{file_ext}")
-                
-                # Generate page content based on sections
-                with open(page_file_path, "w") as f:
-                    f.write(self._generate_page_content(page_name, page.get("sections", []), is_typescript))
-                
-                generated_files.append(page_file_path)
+        # Page files
+        for page in structure.get("pages", []):
+            page_name = page["name"]
+            file_name = self._page_name_to_file_name(page_name)
+            page_content = self._generate_page_content(page_name, page.get("sections", []), is_typescript)
+            
+            if is_next_js:
+                # For home page, also add to root
+                if page_name.lower() == "home":
+                    rendered[f"{app_dir}/page.{file_ext}"] = page_content
+                # For Next.js, create app/page-name/page.{ext}
+                rendered[f"{app_dir}/{file_name}/page.{file_ext}"] = page_content
+            else:
+                # For standard React, create src/pages/PageName.{ext}
+                rendered[f"src/pages/{self._capitalize(file_name)}.{file_ext}"] = page_content
         
-        # Generate component files
-        if "components" in structure:
-            components = structure["components"]
-            for component in components:
-                component_file_path = os.path.join(components_dir, f"{component}.{file_ext}")
-                with open(component_file_path, "w") as f:
-                    f.write(self._generate_component_content(component, is_typescript))
-                generated_files.append(component_file_path)
+        # Component files
+        for component in structure.get("components", []):
+            rendered[f"{components_dir}/{component}.{file_ext}"] = self._generate_component_content(component, is_typescript)
         
-        return generated_files
+        return rendered
     
     def _page_name_to_file_name(self, page_name: str) -> str:
         """Convert page name to file name format"""
@@ -397,17 +528,73 @@ export default function {self._capitalize(page_name)}() {{
 }}
 '''
 
-# Example usage
+def _legacy_apply(manager: TemplateManager, template_id: str, project_path: str, project_name: str,
+                  custom_requirements: List[str] = None):
+    """Render from the template definition and write every file, as each build used to"""
+    contents = manager._render_direct(manager.templates[template_id], project_name, custom_requirements)
+    for rel_path, content in contents.items():
+        file_path = os.path.join(project_path, rel_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(content)
+
+
+# Benchmark: apply latency per template, per-build rendering vs compiled skeletons
 if __name__ == "__main__":
+    import time
+    import shutil
+    import tempfile
+    import statistics
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    start = time.perf_counter()
     template_mgr = TemplateManager()
-    templates = template_mgr.get_available_templates()
-    print(f"Available templates: {templates}")
+    load_ms = (time.perf_counter() - start) * 1000
+    requirements = ["Custom animation effects", "Dark theme"]
+    runs = 30
+    
+    print(f"=== Template apply latency, median of {runs} builds ===\n")
+    print(f"Loaded and compiled {len(template_mgr.skeletons)} templates in {load_ms:.1f} ms\n")
+    print(f"{'template':<24}{'files':>6}{'render':>10}{'join':>9}"
+          f"{'legacy apply':>14}{'copy':>9}{'hardlink':>10}{'reflink':>9}")
+    
+    root = tempfile.mkdtemp()
+    template_mgr.blob_dir = os.path.join(root, ".template_blobs")
+    totals = {"legacy": 0.0, "copy": 0.0, "hardlink": 0.0}
+    
+    def timed_ms(func) -> float:
+        samples = []
+        for run in range(runs):
+            begin = time.perf_counter()
+            func(run)
+            samples.append((time.perf_counter() - begin) * 1000)
+        return statistics.median(samples)
+    
+    for template_id in sorted(template_mgr.skeletons):
+        name = f"Project {template_id}"
+        direct = template_mgr._render_direct(template_mgr.templates[template_id], name, requirements)
+        assert template_mgr.render_template(template_id, name, requirements) == direct, template_id
+        
+        render_ms = timed_ms(lambda run: template_mgr._render_direct(
+            template_mgr.templates[template_id], name, requirements))
+        join_ms = timed_ms(lambda run: template_mgr.render_template(template_id, name, requirements))
+        legacy_ms = timed_ms(lambda run: _legacy_apply(
+            template_mgr, template_id, os.path.join(root, f"legacy-{template_id}-{run}"), name, requirements))
+        mode_ms = {
+            mode: timed_ms(lambda run: template_mgr.apply_template(
+                template_id, os.path.join(root, f"{mode}-{template_id}-{run}"), name, requirements, link_mode=mode))
+            for mode in LINK_MODES
+        }
+        totals["legacy"] += legacy_ms
+        totals["copy"] += mode_ms["copy"]
+        totals["hardlink"] += mode_ms["hardlink"]
+        
+        print(f"{template_id:<24}{len(direct):>6}{render_ms:>7.3f} ms{join_ms:>6.3f} ms"
+              f"{legacy_ms:>11.2f} ms{mode_ms['copy']:>6.2f} ms{mode_ms['hardlink']:>7.2f} ms"
+              f"{mode_ms['reflink']:>6.2f} ms")
     
-    # Example: Apply template
-    # result = template_mgr.apply_template(
-    #     "portfolio_template", 
-    #     "./generated_projects/example", 
-    #     "My Portfolio",
-    #     ["Custom animation effects", "Dark theme"]
-    # )
-    # print(result)
\ No newline at end of file
+    shutil.rmtree(root)
+    print(f"\nAll templates: legacy {totals['legacy']:.2f} ms, skeleton copy {totals['copy']:.2f} ms, "
+          f"hardlink {totals['hardlink']:.2f} ms")
+    print("reflink falls back to copying on filesystems without FICLONE support")
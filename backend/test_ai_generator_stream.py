@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_ai_generator_stream.py
+# Description: Tests for streamed file extraction in AICodeGenerator
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+pytest.importorskip("requests")
+
+from ai_generator import AICodeGenerator
+
+
+class ChunkedLLM:
+    """Streams scripted chunks"""
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+
+    def stream_completion(self, system_prompt, user_prompt, **options):
+        yield from self.chunks
+
+
+def _generator(*chunks) -> AICodeGenerator:
+    # Skip __init__: no provider, readiness probe or parallel generator is needed
+    generator = AICodeGenerator.__new__(AICodeGenerator)
+    generator.llm = ChunkedLLM(*chunks)
+    generator.last_fallback_artifact = None
+    return generator
+
+
+def test_last_file_closed_without_trailing_newline_is_kept():
+    generator = _generator("FILE: a.js\n```js\nx=1\n```\n\nFILE: b.js\n```js\ny=2\n", "```")
+    received = []
+    files = generator._stream_files_from_llm("system", "web project",
+                                             on_file=lambda name, content: received.append(name))
+    assert files == {"a.js": "x=1", "b.js": "y=2"}
+    assert received == ["a.js", "b.js"]
+
+
+def test_unterminated_last_file_is_dropped_but_earlier_files_kept():
+    generator = _generator("FILE: a.js\n```js\nx=1\n```\nFILE: b.js\n```js\ny=2\n")
+    assert generator._stream_files_from_llm("system", "web project") == {"a.js": "x=1"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
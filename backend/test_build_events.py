@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_build_events.py
+# Description: Tests for build event buffering, live delivery and resume
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from build_events import BuildEventBus, format_sse, parse_last_event_id
+
+
+async def _collect(subscription, count):
+    events = []
+    for _ in range(count):
+        event = await subscription.get(timeout=2)
+        assert event is not None, f"only {len(events)} of {count} events arrived"
+        events.append(event)
+    return events
+
+
+def test_live_delivery_from_other_threads_keeps_order():
+    async def scenario():
+        bus = BuildEventBus()
+        subscription = bus.subscribe("1")
+
+        def build():
+            for i in range(200):
+                bus.publish("1", "log", {"offset": i, "text": f"line {i}\n"})
+
+        publisher = threading.Thread(target=build)
+        publisher.start()
+        events = await _collect(subscription, 200)
+        publisher.join()
+        assert [e["id"] for e in events] == list(range(1, 201))
+        assert not subscription.gap
+
+    asyncio.run(scenario())
+
+
+def test_resume_replays_only_missed_events():
+    async def scenario():
+        bus = BuildEventBus()
+        for i in range(10):
+            bus.publish("1", "log", {"offset": i, "text": "x"})
+        subscription = bus.subscribe("1", last_event_id=7)
+        events = await _collect(subscription, 3)
+        assert [e["id"] for e in events] == [8, 9, 10]
+        assert not subscription.gap
+
+        bus.publish("1", "status", {"status": "complete"})
+        assert (await subscription.get(timeout=2))["id"] == 11
+
+    asyncio.run(scenario())
+
+
+def test_gap_detected_when_history_evicted_or_ids_unknown():
+    async def scenario():
+        bus = BuildEventBus(buffer_size=5)
+        for i in range(20):
+            bus.publish("1", "log", {"offset": i, "text": "x"})
+        # Events 4..15 fell out of the ring buffer
+        assert bus.subscribe("1", last_event_id=3).gap
+        assert not bus.subscribe("1", last_event_id=15).gap
+        # Id from before an API restart
+        assert bus.subscribe("1", last_event_id=99).gap
+        # Never-seen project: nothing to replay, no gap
+        fresh = bus.subscribe("2")
+        assert not fresh.gap and fresh.backlog_size == 0
+
+    asyncio.run(scenario())
+
+
+def test_idle_projects_evicted_but_watched_ones_kept():
+    async def scenario():
+        bus = BuildEventBus(max_projects=2)
+        bus.publish("watched", "log", {})
+        subscription = bus.subscribe("watched")
+        for project_id in ("a", "b", "c"):
+            bus.publish(project_id, "log", {})
+        assert bus.stats()["projects"] == 2
+        assert bus.last_event_id("watched") == 1
+        bus.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_evicted_project_ids_are_dropped_and_resume_as_gap():
+    async def scenario():
+        bus = BuildEventBus(max_projects=2)
+        for _ in range(3):
+            bus.publish("old", "log", {})
+        for project_id in range(50):
+            bus.publish(str(project_id), "log", {})
+        assert len(bus._last_ids) == 2
+        # A client that saw "old" up to id 3 needs a snapshot, even once it publishes again
+        assert bus.subscribe("old", last_event_id=3).gap
+        bus.publish("old", "log", {})
+        assert bus.last_event_id("old") > 3
+        assert bus.subscribe("old", last_event_id=3).gap
+
+    asyncio.run(scenario())
+
+
+def test_sse_format_and_last_event_id_parsing():
+    event = {"id": 3, "type": "status", "data": {"status": "generating"}}
+    assert format_sse(event) == 'id: 3\nevent: status\ndata: {"status": "generating"}\n\n'
+    assert parse_last_event_id("12") == 12
+    assert parse_last_event_id("") is None
+    assert parse_last_event_id("abc") is None
+    assert parse_last_event_id(None) is None
+
+
+if __name__ == "__main__":
+    test_live_delivery_from_other_threads_keeps_order()
+    test_resume_replays_only_missed_events()
+    test_gap_detected_when_history_evicted_or_ids_unknown()
+    test_idle_projects_evicted_but_watched_ones_kept()
+    test_sse_format_and_last_event_id_parsing()
+    print("✅ Build event tests passed")
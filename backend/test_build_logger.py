@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_build_logger.py
+# Description: Tests for the buffered build log writer and the coalesced manifest writer
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+import build_logger
+from build_logger import BuildLogger, ManifestWriter
+
+
+def test_log_buffers_until_milestone_and_reports_offsets(tmp_path):
+    log_path = tmp_path / "build.log"
+    log_path.write_text("Build started\n")
+    seen = []
+    with BuildLogger(str(log_path), listener=lambda text, offset: seen.append((offset, text))) as build_log:
+        build_log.write("Generated: a.js\n")
+        build_log.write("Generated: é.js\n")
+        assert log_path.read_text() == "Build started\n"
+        build_log.milestone("Build completed\n")
+        assert log_path.read_text().endswith("Build completed\n")
+        assert build_log.offset == log_path.stat().st_size
+
+    assert [offset for offset, _ in seen] == [14, 30, 47]
+    assert build_log.records_written == 3 and build_log.flushes == 1
+
+
+def test_log_close_flushes_pending_writes(tmp_path):
+    log_path = tmp_path / "build.log"
+    build_log = BuildLogger(str(log_path), mode="w")
+    build_log.write("line\n")
+    build_log.close()
+    build_log.close()
+    assert log_path.read_text() == "line\n"
+
+
+def test_manifest_writes_are_rate_limited_until_forced(tmp_path):
+    manifest_path = tmp_path / "build_manifest.json"
+    writer = ManifestWriter(str(manifest_path), {"status": "initializing"}, min_interval=60)
+    assert writer.flush() and writer.writes == 1
+    assert not writer.flush()                       # nothing changed
+
+    writer.update(status="generating")
+    writer.manifest.setdefault("files_generated", []).append("a.js")
+    writer.mark_dirty()
+    assert writer.writes == 1
+    assert json.loads(manifest_path.read_text()) == {"status": "initializing"}
+
+    assert writer.flush(force=True) and writer.writes == 2
+    assert json.loads(manifest_path.read_text()) == {"status": "generating", "files_generated": ["a.js"]}
+
+
+def test_manifest_writes_again_after_interval(tmp_path):
+    manifest_path = tmp_path / "build_manifest.json"
+    writer = ManifestWriter(str(manifest_path), {"status": "initializing"}, min_interval=0.05)
+    writer.flush()
+    writer.update(status="generating")
+    assert writer.writes == 1
+    time.sleep(0.06)
+    writer.update(status="complete")
+    assert writer.writes == 2
+    assert ManifestWriter(str(manifest_path)).manifest == {"status": "complete"}
+
+
+def test_manifest_replaced_atomically(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "build_manifest.json"
+    writer = ManifestWriter(str(manifest_path), {"status": "generating"})
+    writer.flush(force=True)
+    inode = manifest_path.stat().st_ino
+
+    real_dump = json.dump
+
+    def dump_then_fail(obj, f, **kwargs):
+        real_dump(obj, f, **kwargs)
+        f.flush()
+        raise OSError("disk full")
+
+    monkeypatch.setattr(build_logger.json, "dump", dump_then_fail)
+    writer.update(status="complete")
+    with pytest.raises(OSError):
+        writer.flush(force=True)
+    # The half-written update never replaced the manifest readers see
+    assert json.loads(manifest_path.read_text()) == {"status": "generating"}
+
+    monkeypatch.setattr(build_logger.json, "dump", real_dump)
+    assert writer.flush(force=True)
+    assert json.loads(manifest_path.read_text()) == {"status": "complete"}
+    assert manifest_path.stat().st_ino != inode
+    assert sorted(os.listdir(tmp_path)) == ["build_manifest.json"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_build_queue.py
+# Description: Tests for the durable SQLite build queue and its worker loop
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from build_queue import BuildQueue, _worker_main, client_address
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def test_claims_by_priority_then_submission_order(db_path):
+    queue = BuildQueue(db_path, per_user_limit=10)
+    queue.enqueue("low-1", "u1")
+    queue.enqueue("high", "u2", priority=5)
+    queue.enqueue("low-2", "u3")
+    claimed = [queue.claim("w")["project_id"] for _ in range(3)]
+    assert claimed == ["high", "low-1", "low-2"]
+    assert queue.claim("w") is None
+
+
+def test_per_user_concurrency_limit(db_path):
+    queue = BuildQueue(db_path, per_user_limit=1)
+    first = queue.enqueue("a1", "alice")
+    queue.enqueue("a2", "alice")
+    queue.enqueue("b1", "bob")
+    assert queue.claim("w")["project_id"] == "a1"
+    # alice is at her limit, so bob's later job goes first
+    assert queue.claim("w")["project_id"] == "b1"
+    assert queue.claim("w") is None
+    assert queue.complete(first["job_id"], "w")
+    assert queue.claim("w")["project_id"] == "a2"
+
+
+def test_failed_attempts_back_off_then_fail(db_path):
+    queue = BuildQueue(db_path, backoff_base=0.1)
+    queue.enqueue("p", max_attempts=2)
+    job = queue.claim("w")
+    assert queue.fail(job["job_id"], "w", "boom") == "queued"
+    waiting = queue.get_job("p")
+    assert waiting["status"] == "queued" and waiting["available_at"] > time.time()
+    assert queue.claim("w") is None
+
+    time.sleep(0.15)
+    retry = queue.claim("w")
+    assert retry["job_id"] == job["job_id"] and retry["attempts"] == 2
+    assert queue.fail(retry["job_id"], "w", "boom again") == "failed"
+    assert queue.get_job("p")["last_error"] == "boom again"
+    assert queue.claim("w") is None
+
+
+def test_expired_lease_is_recovered_and_old_owner_locked_out(db_path):
+    queue = BuildQueue(db_path, lease_seconds=0.1)
+    queue.enqueue("p", max_attempts=3)
+    job = queue.claim("dead-worker")
+    assert queue.claim("other") is None
+
+    time.sleep(0.15)
+    recovered = queue.claim("other")
+    assert recovered["job_id"] == job["job_id"] and recovered["attempts"] == 2
+
+    # The worker that lost the lease can neither renew nor report
+    assert not queue.heartbeat(job["job_id"], "dead-worker")
+    assert not queue.complete(job["job_id"], "dead-worker", {"status": "complete"})
+    assert queue.fail(job["job_id"], "dead-worker", "late error") == "lost"
+    assert queue.get_job("p")["status"] == "running"
+
+    assert queue.heartbeat(job["job_id"], "other")
+    assert queue.complete(job["job_id"], "other", {"status": "complete"})
+    assert queue.get_job("p")["status"] == "succeeded"
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(db_path):
+    queue = BuildQueue(db_path, lease_seconds=0.05)
+    queue.enqueue("crashes", max_attempts=1)
+    queue.claim("w")
+    time.sleep(0.1)
+    assert queue.claim("w") is None
+    job = queue.get_job("crashes")
+    assert job["status"] == "failed" and "lease expired" in job["last_error"]
+
+
+def test_queue_survives_reopen(db_path):
+    BuildQueue(db_path).enqueue("p", "u", priority=2)
+    job = BuildQueue(db_path).claim("w")
+    assert job["project_id"] == "p" and job["priority"] == 2
+
+
+def steal_lease_build(job):
+    """Build target that loses its lease to another worker midway"""
+    conn = sqlite3.connect(job["state"]["db_path"])
+    conn.execute("UPDATE build_jobs SET lease_owner = 'thief' WHERE id = ?", (job["job_id"],))
+    conn.commit()
+    conn.close()
+    time.sleep(0.3)
+    return {"status": "complete"}
+
+
+def test_worker_aborts_and_discards_result_after_losing_lease(db_path, monkeypatch):
+    import build_queue
+    short_lease = build_queue.BuildQueue
+    monkeypatch.setattr(build_queue, "BuildQueue", lambda path: short_lease(path, lease_seconds=0.15))
+    queue = short_lease(db_path)
+    queue.enqueue("p", state={"db_path": db_path})
+    stop, lost = threading.Event(), []
+
+    def on_lease_lost(job, worker_id):
+        lost.append((job["project_id"], worker_id))
+        stop.set()
+
+    worker = threading.Thread(target=_worker_main,
+                              args=(db_path, "w1", "test_build_queue:steal_lease_build", stop, 0.01),
+                              kwargs={"on_lease_lost": on_lease_lost})
+    worker.start()
+    worker.join(5)
+
+    assert lost == [("p", "w1")]
+    # The result was not reported over the new owner's job
+    job = queue.get_job("p")
+    assert job["status"] == "running" and job["lease_owner"] == "thief"
+
+
+def test_client_address_trusts_forwarding_headers_only_from_proxies():
+    behind_nginx = {"x-real-ip": "203.0.113.7", "x-forwarded-for": "198.51.100.1, 203.0.113.7"}
+    assert client_address("172.18.0.5", behind_nginx) == "203.0.113.7"
+    assert client_address("127.0.0.1", {"x-forwarded-for": "198.51.100.1, 203.0.113.9"}) == "203.0.113.9"
+    # A client reaching the API directly cannot pick its own identity
+    assert client_address("203.0.113.50", behind_nginx) == "203.0.113.50"
+    assert client_address("203.0.113.50", {"x-user-id": "someone-else"}) == "203.0.113.50"
+    assert client_address("10.0.0.2", {}) == "10.0.0.2"
+    assert client_address(None, behind_nginx) == "anonymous"
+    assert client_address("172.18.0.5", behind_nginx, trusted_proxies="10.0.0.0/8") == "172.18.0.5"
+
+
+
+class FailingAIGenerator:
+    generation_mode = "fallback"
+    last_prompt_stats = None
+
+    def __init__(self):
+        self.bypass_cache = []
+
+    def generate_project(self, requirements, project_type, on_file=None, bypass_cache=False):
+        self.bypass_cache.append(bypass_cache)
+        raise RuntimeError("LLM backend unavailable")
+
+
+def test_only_the_last_failed_attempt_marks_the_build_failed(tmp_path, monkeypatch):
+    import build_queue
+    import project_generator
+    from project_generator import ProjectGenerator
+    generator = ProjectGenerator.__new__(ProjectGenerator)
+    generator.projects_dir = str(tmp_path)
+    generator.ai_generator = FailingAIGenerator()
+    (tmp_path / "1").mkdir()
+    generator._initialize_build_manifest("1", "Demo", ["Landing page"], template_id=None)
+    statuses = []
+    monkeypatch.setattr(project_generator, "publish_build_event",
+                        lambda project_id, kind, data: statuses.append(data["status"]) if kind == "status" else None)
+    monkeypatch.setattr(build_queue, "_project_generator", generator)
+
+    manifest_path = tmp_path / "1" / "build_manifest.json"
+    for attempt in (1, 2, 3):
+        result = build_queue.run_project_build({"project_id": "1", "attempts": attempt, "max_attempts": 3})
+        assert result["status"] == "failed"
+        manifest = json.loads(manifest_path.read_text())
+        # Each attempt starts over instead of piling onto the previous one
+        assert manifest["attempt"] == attempt and manifest["errors"] == ["AI generation error: LLM backend unavailable"]
+        assert manifest["status"] == ("failed" if attempt == 3 else "retrying")
+
+    assert statuses == ["generating", "retrying"] * 2 + ["generating", "failed"]
+    assert manifest["end_time"] is not None
+
+
+
+def test_bypass_cache_choice_reaches_the_ai_generator(tmp_path, monkeypatch):
+    import build_queue
+    import project_generator
+    from project_generator import ProjectGenerator
+    generator = ProjectGenerator.__new__(ProjectGenerator)
+    generator.projects_dir = str(tmp_path)
+    generator.ai_generator = FailingAIGenerator()
+    monkeypatch.setattr(project_generator, "publish_build_event", lambda *args: None)
+    monkeypatch.setattr(build_queue, "_project_generator", generator)
+    for project_id, bypass_cache in (("1", True), ("2", False)):
+        (tmp_path / project_id).mkdir()
+        generator._initialize_build_manifest(project_id, "Demo", ["Landing page"], bypass_cache=bypass_cache)
+        build_queue.run_project_build({"project_id": project_id, "attempts": 1, "max_attempts": 1})
+    assert generator.ai_generator.bypass_cache == [True, False]
+    assert json.loads((tmp_path / "1" / "build_manifest.json").read_text())["llm"]["bypass_cache"] is True
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_fallback_artifacts.py
+# Description: Tests for precomputed fallback artifacts and their reuse in build finalization
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import io
+import json
+import sys
+import time
+import zipfile
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from fallback_artifacts import FallbackArtifactCache
+from build_finalizer import BuildFinalizer
+from mmry_pack_storage import MMRYPackStorage
+
+FILES = {
+    "index.html": "<!DOCTYPE html>\n<html><body><h1>Generated Project</h1></body></html>\n" * 4,
+    "styles.css": "body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }\n" * 6,
+    "README.md": "# Generated Project\n\nOpen index.html in your browser.\n"
+}
+
+
+class Builder:
+    def __init__(self, files=FILES, delay=0.0):
+        self.files = files
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(self.files)
+
+
+def test_built_once_under_concurrency_and_copies_returned():
+    cache = FallbackArtifactCache()
+    builder = Builder(delay=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.files(("ai", "web"), builder)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert builder.calls == 1 and len(results) == 8
+    assert all(files == FILES for files in results)
+
+    results[0]["extra.txt"] = "changed"
+    assert "extra.txt" not in cache.files(("ai", "web"), builder)
+    assert cache.stats() == {"entries": 1, "hits": 8, "misses": 1}
+
+
+def test_keyed_by_parameters_with_lru_eviction():
+    cache = FallbackArtifactCache(max_entries=2)
+    for name in ("a", "b"):
+        cache.get(("landing", name), Builder({"index.html": name}))
+    cache.get(("landing", "a"), Builder())              # a is now most recent
+    cache.get(("landing", "c"), Builder({"index.html": "c"}))
+    rebuilt = Builder({"index.html": "b"})
+    assert cache.files(("landing", "b"), rebuilt) == {"index.html": "b"} and rebuilt.calls == 1
+    untouched = Builder()
+    cache.get(("landing", "c"), untouched)
+    assert untouched.calls == 0
+
+
+def test_artifact_zip_and_pack_payloads(tmp_path):
+    artifact = FallbackArtifactCache().get("web", Builder())
+    with zipfile.ZipFile(io.BytesIO(artifact.zip_bytes)) as zipf:
+        assert zipf.namelist() == list(FILES)
+        assert zipf.read("styles.css").decode() == FILES["styles.css"]
+    setting, payload, codec = artifact.pack_payloads["styles.css"]
+    assert setting == "zlib-dict" and codec != "raw" and len(payload) < len(FILES["styles.css"])
+    assert artifact.matches(dict(FILES))
+    assert not artifact.matches({**FILES, "extra.txt": ""})
+    assert not artifact.matches(dict(reversed(list(FILES.items()))))
+
+
+def _finalize(tmp_path, name, files, artifact=None):
+    project_path = tmp_path / name
+    project_path.mkdir()
+    (project_path / "build.log").write_text("Build started\n")
+    store = MMRYPackStorage(str(tmp_path / f"{name}-mmry"), pack_threshold=1 << 20)
+
+    def store_func(user_id, project_id, project_files):
+        return {"stored": store.store_files(user_id, project_id, project_files)}
+
+    result = BuildFinalizer(store_func).finalize(str(project_path), str(tmp_path / f"{name}.zip"), files,
+                                                 "user", name, artifact=artifact)
+    return result, store
+
+
+def test_finalize_reuses_artifact_with_same_output(tmp_path):
+    artifact = FallbackArtifactCache().get("web", Builder())
+    plain, plain_store = _finalize(tmp_path, "plain", dict(FILES))
+    reused, reused_store = _finalize(tmp_path, "reused", dict(artifact.files), artifact)
+    assert not plain["stats"]["precomputed_artifact"] and reused["stats"]["precomputed_artifact"]
+
+    with zipfile.ZipFile(tmp_path / "plain.zip") as a, zipfile.ZipFile(tmp_path / "reused.zip") as b:
+        assert a.namelist() == b.namelist() == list(FILES) + ["build.log"]
+        assert all(a.read(name) == b.read(name) for name in a.namelist())
+    assert (tmp_path / "reused" / "index.html").read_text() == FILES["index.html"]
+    for name, content in FILES.items():
+        assert reused_store.retrieve_file("user", "reused", name)["content"] == content
+    assert ([r["compressed_size"] for r in plain["mmry_storage"]["stored"]]
+            == [r["compressed_size"] for r in reused["mmry_storage"]["stored"]])
+
+
+def test_finalize_ignores_artifact_for_other_files(tmp_path):
+    artifact = FallbackArtifactCache().get("web", Builder())
+    files = {"template.js": "export default 1;\n", **FILES}
+    result, _ = _finalize(tmp_path, "merged", files, artifact)
+    assert not result["stats"]["precomputed_artifact"]
+    with zipfile.ZipFile(tmp_path / "merged.zip") as zipf:
+        assert zipf.namelist() == list(files) + ["build.log"]
+
+
+def test_landing_page_template_shared_across_project_names(monkeypatch):
+    import enhanced_ai_generator
+    from enhanced_ai_generator import EnhancedAIGenerator
+    cache = FallbackArtifactCache()
+    monkeypatch.setattr(enhanced_ai_generator, "fallback_artifacts", cache)
+    generator = EnhancedAIGenerator.__new__(EnhancedAIGenerator)
+
+    pages = [generator._generate_fallback_landing_page(name, [f"{name} requirement"])
+             for name in ("Acme", "Globex", "Acme")]
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1}
+    assert list(pages[0]) == ["index.html", "styles.css", "script.js", "README.md", "project_manifest.json"]
+    assert "<title>Globex</title>" in pages[1]["index.html"] and pages[1]["README.md"].startswith("# Globex")
+    assert "Acme" not in pages[1]["index.html"] and pages[0] == pages[2]
+    manifest = json.loads(pages[1]["project_manifest.json"])
+    assert manifest["project_name"] == "Globex" and manifest["requirements"] == ["Globex requirement"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_file_block_parser.py
+# Description: Tests for incremental file extraction from streamed completions
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import json
+import time
+import random
+import http.client
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from file_block_parser import FileBlockParser, extract_file_blocks, iter_file_blocks
+from llm_stub_server import StubOllamaServer, build_stub_response
+from llm_provider import LLMProvider
+
+RESPONSE = build_stub_response(file_count=5, lines_per_file=6) + """
+FILE: "src/utils/format.js"
+```javascript
+export const wrap = (s) => `<${s}>`;
+```
+FILE: README.md
+```
+# Project
+```
+"""
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_chunking_matches_whole_response(seed):
+    rng = random.Random(seed)
+    chunks, pos = [], 0
+    while pos < len(RESPONSE):
+        size = rng.randint(1, 40)
+        chunks.append(RESPONSE[pos:pos + size])
+        pos += size
+    assert dict(iter_file_blocks(chunks)) == extract_file_blocks(RESPONSE)
+
+
+def test_file_emitted_when_its_fence_closes():
+    parser = FileBlockParser()
+    assert parser.feed("FILE: a.js\n```js\nconst a = 1;\n") == []
+    assert parser.feed("``") == []
+    assert parser.feed("`\nFILE: b.js\n```\nlet b") == [("a.js", "const a = 1;")]
+    # A bare fence may still grow into an opener (```bash), so the block closes at its newline
+    assert parser.feed(" = 2;\n```") == []
+    assert parser.feed("\n") == [("b.js", "let b = 2;")]
+    assert parser.files_emitted == 2
+
+
+def test_unterminated_block_left_in_remainder():
+    parser = FileBlockParser()
+    parser.feed("FILE: a.js\n```\nconst a")
+    assert "const a" in parser.close()
+
+
+def test_quoted_and_decorated_headers():
+    files = extract_file_blocks('FILE: "src/a.js"\n```js\na\n```\n**FILE: `b.css`**\n\n```\nb\n```\n'
+                                "### FILE: c.py ```python\nc\n```\n1. FILE: d.md:\n```\nd\n```")
+    assert files == {"src/a.js": "a", "b.css": "b", "c.py": "c", "d.md": "d"}
+
+
+def test_backticks_inside_code_and_nested_fences():
+    readme = "# App\n\n```bash\nnpm install\n```\n\nRun it:\n```js\nstart()\n```"
+    response = ("FILE: src/md.js\n```js\nconst fence = '```';\nconst t = `${a}`;\n```\n"
+                f"FILE: README.md\n```markdown\n{readme}\n```\n"
+                "FILE: doc.md\n````\n```\ninner\n```\n````\n")
+    files = extract_file_blocks(response)
+    assert files["src/md.js"] == "const fence = '```';\nconst t = `${a}`;"
+    assert files["README.md"] == readme
+    assert files["doc.md"] == "```\ninner\n```"
+
+
+def test_malformed_blocks():
+    # Missing closing fence before the next header, fence glued to code, prose instead of a fence
+    response = ("FILE: a.js\n```js\nconst a = 1;\nFILE: b.js\n```\nlet b = 2;```\n"
+                "FILE: c.js\nSorry, I cannot write this file.\nFILE: d.js\r\n```\r\n  indented\r\n```\r\n")
+    assert extract_file_blocks(response) == {"a.js": "const a = 1;", "b.js": "let b = 2;", "d.js": "  indented"}
+
+
+def test_header_like_lines_inside_a_block_are_content():
+    assert extract_file_blocks("FILE: app.py\n```python\n# FILE: app.py\nimport os\n```") == \
+        {"app.py": "# FILE: app.py\nimport os"}
+    readme = "# Layout\n\n1. FILE: src/app.js holds the entry point\n- FILE: styles.css"
+    shell = "#!/bin/sh\nFILE: not a path here\necho done"
+    response = (f"FILE: README.md\n```markdown\n{readme}\n```\n"
+                f"FILE: run.sh\n```sh\n{shell}\n```\n"
+                "FILE: Dockerfile\n```\n# FILE: Dockerfile\nFROM python:3.11\n```\n")
+    expected = {"README.md": readme, "run.sh": shell, "Dockerfile": "# FILE: Dockerfile\nFROM python:3.11"}
+    assert extract_file_blocks(response) == expected
+    assert dict(iter_file_blocks(response[i:i + 3] for i in range(0, len(response), 3))) == expected
+
+
+def test_bare_header_needs_a_fence_to_end_an_unclosed_block():
+    response = ("FILE: a.js\n```js\nconst a = 1;\nFILE: b.js\n\n```js\nlet b;\n```\n"
+                "FILE: c.js\n```js\nc();\nFILE: d.js ```js\nd();\n```\n")
+    assert extract_file_blocks(response) == {"a.js": "const a = 1;", "b.js": "let b;", "c.js": "c();", "d.js": "d();"}
+    # Without a following fence the header line stays in the (unclosed) block
+    parser = FileBlockParser()
+    assert parser.feed("FILE: a.js\n```js\nx\nFILE: b.js\n") == []
+    assert "FILE: b.js" in parser.close()
+
+
+def test_lenient_accepts_missing_colon_and_unfenced_bodies():
+    response = "FILE index.html\n<h1>Hi</h1>\nFILE: app.js\n```js\nrun();\n```\nFILE: notes.txt\nlast"
+    assert extract_file_blocks(response) == {"app.js": "run();"}
+    assert extract_file_blocks(response, lenient=True) == {"index.html": "<h1>Hi</h1>", "app.js": "run();",
+                                                           "notes.txt": "last"}
+
+
+def _fuzz_response(rng: random.Random, target_bytes: int) -> str:
+    pieces = ["FILE: ", "**FILE:** ", "FILE ", "```", "````", "```js", "```bash", "`", "``", "\n", "\r\n",
+              "src/a.js", '"b.css"', "README.md", " ", "const t = `${x}`;", "# Title", "prose text", "FILE:"]
+    parts, size = [], 0
+    while size < target_bytes:
+        if rng.random() < 0.3:
+            part = f"FILE: f{rng.randrange(50)}.js\n```js\n" + "x = 1;\n" * rng.randrange(200) + "```\n"
+        else:
+            part = rng.choice(pieces)
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_fuzz_streaming_matches_whole_response(seed):
+    rng = random.Random(seed)
+    response = _fuzz_response(rng, 300_000)
+    chunks, pos = [], 0
+    while pos < len(response):
+        size = rng.choice([1, 2, 3, 7, 64, 4096])
+        chunks.append(response[pos:pos + size])
+        pos += size
+    for lenient in (False, True):
+        assert dict(iter_file_blocks(chunks, lenient)) == extract_file_blocks(response, lenient)
+
+
+def test_multi_megabyte_inputs_parse_in_linear_time():
+    line = "  const v = items.map((i) => `${i}`).join(', ');\n"
+    well_formed = "".join(f"FILE: c{i}.jsx\n```jsx\n" + line * 60 + "```\n" for i in range(1000))
+    adversarial = [well_formed, "FILE:" * 200_000, "FILE: a.js\n```js\n" + line * 80_000,
+                   "`" * 2_000_000, ("FILE: x\n" + "```js\n" * 5) * 50_000]
+    for response in adversarial:
+        assert len(response) >= 1_000_000
+        start = time.perf_counter()
+        parser = FileBlockParser()
+        for pos in range(0, len(response), 64):
+            parser.feed(response[pos:pos + 64])
+        parser.close()
+        # Linear: a few MB take well under a second; a quadratic rescan takes minutes
+        assert time.perf_counter() - start < 5
+    assert len(extract_file_blocks(well_formed)) == 1000
+
+
+def test_stub_server_streams_ndjson():
+    server = StubOllamaServer(first_token_delay=0, tokens_per_second=1e6).start()
+    try:
+        host, port = server.server_address[:2]
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request("POST", "/api/generate", json.dumps({"prompt": "x", "stream": True}))
+        chunks = [json.loads(line) for line in conn.getresponse()]
+        assert chunks[-1]["done"]
+        text = "".join(chunk["response"] for chunk in chunks)
+        assert text == server.response
+        assert len(extract_file_blocks(text)) == 8
+    finally:
+        server.stop()
+
+
+def test_stub_provider_streams_files():
+    provider = LLMProvider.create("stub", response=RESPONSE)
+    chunks = list(provider.stream_completion("system", "user"))
+    assert len(chunks) > 1 and "".join(chunks) == RESPONSE
+    assert provider.generate_completion("system", "user") == RESPONSE
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_http_caching.py
+# Description: Tests for conditional request and byte-range helpers
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from http_caching import (stat_etag, etag_matches, parse_range, read_byte_range, RangeNotSatisfiable,
+                          ContentHashStore, content_etag, evaluate_conditional, http_date, iter_byte_range)
+
+
+def test_etag_changes_when_log_grows():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "build.log")
+        with open(log_path, "w") as f:
+            f.write("Build started\n")
+        before = stat_etag(os.stat(log_path))
+        with open(log_path, "a") as f:
+            f.write("Generated: src/App.jsx\n")
+        after = stat_etag(os.stat(log_path))
+        assert before != after
+        assert etag_matches(after, after)
+        assert not etag_matches(before, after)
+
+
+def test_if_none_match_lists_weak_tags_and_wildcard():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches(None, '"b"')
+    assert not etag_matches('"c"', '"b"')
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-20", (80, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    (None, None),
+    ("items=0-9", None),
+    ("bytes=0-9,20-29", None),
+    ("bytes=9-0", None),
+    ("bytes=abc", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header,size", [("bytes=100-", 100), ("bytes=-0", 100), ("bytes=-5", 0)])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+def test_read_byte_range_returns_only_new_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "build.log")
+        with open(log_path, "wb") as f:
+            f.write(b"line 1\nline 2\n")
+        assert read_byte_range(log_path, 7, 7) == b"line 2\n"
+        assert read_byte_range(log_path, 14, 0) == b""
+
+
+def test_content_hash_survives_restart_via_sidecar_and_detects_rewrites():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "1.zip")
+        with open(zip_path, "wb") as f:
+            f.write(b"zip v1")
+        digest = ContentHashStore().record(zip_path)
+
+        restarted = ContentHashStore()
+        assert restarted.get(zip_path, os.stat(zip_path)) == digest
+        assert restarted.computed == 0
+
+        with open(zip_path, "wb") as f:
+            f.write(b"zip v2 (rebuild)")
+        assert restarted.get(zip_path, os.stat(zip_path)) != digest
+        assert restarted.computed == 1
+
+
+def test_conditional_get_statuses():
+    etag, mtime, size = content_etag("ab" * 32), 1_700_000_000.0, 1000
+    assert evaluate_conditional({}, etag, mtime, size) == (200, None)
+    assert evaluate_conditional({"if-none-match": etag}, etag, mtime, size) == (304, None)
+    assert evaluate_conditional({"if-none-match": '"stale"'}, etag, mtime, size) == (200, None)
+    assert evaluate_conditional({"if-modified-since": http_date(mtime)}, etag, mtime, size) == (304, None)
+    assert evaluate_conditional({"if-modified-since": http_date(mtime - 60)}, etag, mtime, size) == (200, None)
+
+
+def test_range_requests_guarded_by_if_range():
+    etag, mtime, size = content_etag("cd" * 32), 1_700_000_000.0, 1000
+    assert evaluate_conditional({"range": "bytes=500-"}, etag, mtime, size) == (206, (500, 999))
+    assert evaluate_conditional({"range": "bytes=500-", "if-range": etag}, etag, mtime, size) == (206, (500, 999))
+    # Partial copy of an older build: send the whole new file
+    assert evaluate_conditional({"range": "bytes=500-", "if-range": '"old"'}, etag, mtime, size) == (200, None)
+    assert evaluate_conditional({"range": "bytes=500-", "if-range": http_date(mtime)}, etag, mtime, size) == (206, (500, 999))
+    assert evaluate_conditional({"range": "bytes=500-", "if-range": http_date(mtime - 60)}, etag, mtime, size) == (200, None)
+    assert evaluate_conditional({"range": "bytes=5000-"}, etag, mtime, size) == (416, None)
+
+
+def test_iter_byte_range_streams_exact_slice():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.bin")
+        with open(path, "wb") as f:
+            f.write(bytes(range(256)) * 10)
+        assert b"".join(iter_byte_range(path, 250, 1029, chunk_size=100)) == (bytes(range(256)) * 10)[250:1030]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
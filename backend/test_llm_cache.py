@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_llm_cache.py
+# Description: Tests for the persistent LLM completion cache
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from llm_cache import CompletionCache, CachingLLMProvider, llm_options
+from llm_provider_stub import StubLLMProvider
+
+REQS = "- Add a Header component\n- Add a FAQ component\n- Add a PricingCard component"
+
+
+def _provider(tmp, **cache_kwargs):
+    stub = StubLLMProvider(responder=lambda system, user: f"answer to {user.split()[-1]}")
+    return stub, CachingLLMProvider(stub, CompletionCache(os.path.join(tmp, "cache.db"), **cache_kwargs))
+
+
+def test_exact_hits_ignore_whitespace_but_not_system_prompt():
+    with tempfile.TemporaryDirectory() as tmp:
+        stub, llm = _provider(tmp)
+        first = llm.generate_completion("system", "Build\n    a   site x1")
+        assert llm.generate_completion("system", "Build a site x1  ") == first
+        assert stub.calls == 1
+        llm.generate_completion("other system", "Build a site x1")
+        assert stub.calls == 2
+
+        stats = llm.cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2 and stats["entries"] == 2
+        assert stats["hit_rate"] == round(1 / 3, 4)
+
+
+def test_bypass_refreshes_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        stub, llm = _provider(tmp)
+        llm.generate_completion("system", "prompt p1")
+        llm.generate_completion("system", "prompt p1", bypass_cache=True)
+        assert stub.calls == 2
+        assert llm.cache.stats()["bypassed"] == 1
+
+
+def test_ttl_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CompletionCache(os.path.join(tmp, "cache.db"), ttl_seconds=0.2, max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"
+        cache.put("c", "C")
+        # "b" was least recently used
+        assert cache.get("b") is None and cache.get("a") == "A"
+        time.sleep(0.25)
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["evictions"] == 1 and stats["expirations"] >= 1
+
+
+def test_near_duplicate_requirements_match_only_same_scope():
+    with tempfile.TemporaryDirectory() as tmp:
+        stub, llm = _provider(tmp, similarity_threshold=0.85)
+        llm.generate_completion("system", f"Build:\n{REQS}\nfile=a.js", **llm_options(llm, REQS))
+
+        reordered = "- add a faq component.\n- Add a PricingCard Component\n- Add a Header component"
+        assert llm.generate_completion("system", f"Build:\n{reordered}\nfile=a.js",
+                                       **llm_options(llm, reordered)) == "answer to file=a.js"
+        assert stub.calls == 1 and llm.cache.stats()["semantic_hits"] == 1
+
+        # Same requirements, different file: the rest of the prompt must match exactly
+        llm.generate_completion("system", f"Build:\n{reordered}\nfile=b.js", **llm_options(llm, reordered))
+        # One different component is not a near-duplicate
+        changed = REQS.replace("FAQ", "Gallery")
+        llm.generate_completion("system", f"Build:\n{changed}\nfile=a.js", **llm_options(llm, changed))
+        assert stub.calls == 3
+
+
+def test_abandoned_stream_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        stub, llm = _provider(tmp)
+        stream = llm.stream_completion("system", "a long prompt p2")
+        next(stream)
+        stream.close()
+        assert llm.cache.stats()["entries"] == 0
+
+
+if __name__ == "__main__":
+    test_exact_hits_ignore_whitespace_but_not_system_prompt()
+    test_bypass_refreshes_entry()
+    test_ttl_and_lru_eviction()
+    test_near_duplicate_requirements_match_only_same_scope()
+    test_abandoned_stream_is_not_cached()
+    print("✅ LLM cache tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_llm_provider_async.py
+# Description: Tests for concurrency limits, timeouts and cancellation of async LLM providers
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from llm_provider_async import AsyncLLMProvider, LLMTimeoutError, LLMTimeouts
+
+TIMEOUTS = LLMTimeouts(connect=1, first_token=5, total=10)
+
+
+def _stub(**kwargs):
+    kwargs.setdefault("timeouts", TIMEOUTS)
+    return AsyncLLMProvider.create("stub", response="FILE: a.js\n```\nconst a = 1;\n```\n", **kwargs)
+
+
+def test_concurrency_is_bounded_per_provider():
+    async def run():
+        provider = _stub(first_token_delay=0.05, tokens_per_second=1000, max_concurrency=3)
+        peak = 0
+
+        async def generate():
+            nonlocal peak
+            async for _ in provider.stream_completion("system", "user"):
+                peak = max(peak, provider.in_flight)
+
+        await asyncio.gather(*(generate() for _ in range(10)))
+        return provider, peak
+
+    provider, peak = asyncio.run(run())
+    assert peak == 3
+    assert provider.stats()["completed"] == 10 and provider.stats()["in_flight"] == 0
+
+
+def test_first_token_and_total_timeouts():
+    async def run(provider):
+        return await provider.generate_completion("system", "user")
+
+    slow_start = _stub(first_token_delay=0.5, timeouts=LLMTimeouts(connect=1, first_token=0.1, total=10))
+    with pytest.raises(LLMTimeoutError) as excinfo:
+        asyncio.run(run(slow_start))
+    assert excinfo.value.phase == "first_token"
+
+    slow_stream = _stub(tokens_per_second=20, timeouts=LLMTimeouts(connect=1, first_token=5, total=0.2))
+    with pytest.raises(LLMTimeoutError) as excinfo:
+        asyncio.run(run(slow_stream))
+    assert excinfo.value.phase == "total"
+    assert slow_stream.stats()["in_flight"] == 0
+
+
+def test_cancellation_releases_slot():
+    async def run():
+        provider = _stub(first_token_delay=10, max_concurrency=1)
+        task = asyncio.ensure_future(provider.generate_completion("system", "user"))
+        await asyncio.sleep(0.05)
+        assert provider.in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        provider._sync.first_token_delay = 0
+        return provider, await asyncio.wait_for(provider.generate_completion("system", "user"), 1)
+
+    provider, text = asyncio.run(run())
+    assert text.startswith("FILE: a.js")
+    assert provider.stats() == {"max_concurrency": 1, "in_flight": 0, "waiting": 0, "completed": 1, "failed": 1}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_llm_readiness.py
+# Description: Tests for the background model availability probe
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from llm_readiness import ModelReadiness, STATE_PENDING, STATE_READY, STATE_UNAVAILABLE
+
+
+class Probe:
+    """Probe whose answers are scripted; blocks until released when gated"""
+
+    def __init__(self, *answers, gate: threading.Event = None):
+        self.answers = list(answers)
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate:
+            self.gate.wait()
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def test_start_does_not_wait_for_probe():
+    gate = threading.Event()
+    readiness = ModelReadiness(Probe(True, gate=gate), name="ollama")
+    start = time.perf_counter()
+    readiness.start()
+    assert time.perf_counter() - start < 0.05
+    assert readiness.status()["state"] == STATE_PENDING and readiness.probing
+    assert not readiness.is_ready() and not readiness.is_unavailable()
+
+    gate.set()
+    assert readiness.wait(1)
+    status = readiness.status()
+    assert status["state"] == STATE_READY and status["probes"] == 1 and status["error"] is None
+
+
+def test_success_cached_until_ttl_then_refreshed_in_background():
+    probe = Probe(True)
+    readiness = ModelReadiness(probe, ttl_seconds=0.2, retry_seconds=60)
+    readiness.wait(1)
+    for _ in range(5):
+        assert readiness.is_ready()
+    assert probe.calls == 1
+
+    time.sleep(0.25)
+    # Stale: the last result is returned while a refresh runs
+    assert readiness.is_ready()
+    readiness._thread.join(1)
+    assert probe.calls == 2
+
+
+def test_failure_retried_after_retry_interval():
+    probe = Probe(ConnectionError("connection refused"), True)
+    readiness = ModelReadiness(probe, ttl_seconds=60, retry_seconds=0.1)
+    assert not readiness.wait(1)
+    assert readiness.is_unavailable() and readiness.error == "connection refused"
+
+    time.sleep(0.15)
+    readiness.is_ready()
+    readiness._thread.join(1)
+    assert readiness.is_ready() and readiness.error is None and probe.calls == 2
+
+
+def test_false_probe_is_unavailable():
+    readiness = ModelReadiness(Probe(False))
+    readiness.wait(1)
+    assert readiness.state == STATE_UNAVAILABLE and readiness.error
+
+
+def test_one_probe_at_a_time():
+    gate = threading.Event()
+    probe = Probe(True, gate=gate)
+    readiness = ModelReadiness(probe, ttl_seconds=0, retry_seconds=0)
+    assert readiness.start()
+    assert not readiness.start()
+    for _ in range(10):
+        readiness.status()
+    gate.set()
+    readiness._thread.join(1)
+    assert probe.calls == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
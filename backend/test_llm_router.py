@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_llm_router.py
+# Description: Tests for the multi-backend LLM router (balancing, failover, hedging)
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from llm_router import Backend, RouterLLMProvider, parse_backend_spec
+from llm_provider import LLMProvider
+from llm_provider_stub import StubLLMProvider
+from llm_stub_server import StubOllamaServer, StubServerProvider
+
+RESPONSE = "FILE: a.js\n```\nconst a = 1;\n```\n"
+
+
+def _stub(delay=0.1):
+    return StubLLMProvider(response=RESPONSE, first_token_delay=delay)
+
+
+def _concurrent(router, count):
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(lambda i: router.generate_completion("system", f"prompt {i}"), range(count)))
+
+
+def test_parse_backend_spec():
+    assert parse_backend_spec("ollama:gpt-oss:20b@http://gpu1:11434*2, openai:gpt-4o-mini,stub") == [
+        {"type": "ollama", "model": "gpt-oss:20b", "base_url": "http://gpu1:11434", "weight": 2.0},
+        {"type": "openai", "model": "gpt-4o-mini", "base_url": None, "weight": 1.0},
+        {"type": "stub", "model": None, "base_url": None, "weight": 1.0}]
+    with pytest.raises(ValueError):
+        parse_backend_spec(" , ")
+
+
+def test_least_outstanding_respects_weights():
+    heavy, light = _stub(), _stub()
+    router = RouterLLMProvider([Backend(heavy, "heavy", weight=3), Backend(light, "light")], hedge="off")
+    assert _concurrent(router, 8) == [RESPONSE] * 8
+    assert heavy.calls + light.calls == 8
+    assert heavy.calls == 6 and light.calls == 2
+    assert all(backend["outstanding"] == 0 for backend in router.stats()["backends"])
+
+
+def test_slow_backend_gets_less_traffic():
+    fast, slow = _stub(0.02), _stub(0.3)
+    router = RouterLLMProvider([Backend(fast, "fast"), Backend(slow, "slow")], hedge="off", seed=3)
+    for _ in range(3):
+        _concurrent(router, 4)
+    assert fast.calls > 2 * slow.calls
+
+
+def test_failover_and_ejection_with_failing_server():
+    broken = StubOllamaServer(response=RESPONSE, first_token_delay=0, failure_rate=1.0).start()
+    healthy = StubOllamaServer(response=RESPONSE, first_token_delay=0.05).start()
+    try:
+        router = RouterLLMProvider([Backend(StubServerProvider(broken.url), "broken", weight=10),
+                                    Backend(StubServerProvider(healthy.url), "healthy")],
+                                   hedge="off", eject_after=2, eject_seconds=60)
+        for i in range(6):
+            assert router.generate_completion("system", f"p{i}") == RESPONSE
+        stats = router.stats()
+        # Two failures eject the broken host; later requests skip it
+        assert broken.requests_served == 2 and stats["failovers"] == 2
+        assert stats["backends"][0]["ejected"] and stats["backends"][0]["failures"] == 2
+    finally:
+        broken.stop()
+        healthy.stop()
+
+
+def test_all_backends_failing_raises():
+    server = StubOllamaServer(response=RESPONSE, first_token_delay=0, failure_rate=1.0).start()
+    try:
+        router = RouterLLMProvider([Backend(StubServerProvider(server.url), "a"),
+                                    Backend(StubServerProvider(server.url), "b")], hedge="off")
+        with pytest.raises(RuntimeError):
+            router.generate_completion("system", "user")
+        assert server.requests_served == 2
+    finally:
+        server.stop()
+
+
+def test_hedge_wins_and_cancels_slow_stream():
+    slow = StubOllamaServer(response=RESPONSE * 50, first_token_delay=1.0, tokens_per_second=200).start()
+    fast = StubOllamaServer(response=RESPONSE * 50, first_token_delay=0.02, tokens_per_second=1e6).start()
+    try:
+        router = RouterLLMProvider([Backend(StubServerProvider(slow.url), "slow", weight=10),
+                                    Backend(StubServerProvider(fast.url), "fast")], hedge=0.1)
+        start = time.perf_counter()
+        assert router.generate_completion("system", "user") == RESPONSE * 50
+        assert time.perf_counter() - start < 0.8
+        assert router.stats()["hedges_sent"] == 1 and router.stats()["hedges_won"] == 1
+
+        # The losing generation is closed once it produces its first chunk
+        deadline = time.time() + 5
+        while slow.requests_cancelled == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        assert slow.requests_cancelled == 1
+        assert all(backend["outstanding"] == 0 for backend in router.stats()["backends"])
+    finally:
+        slow.stop()
+        fast.stop()
+
+
+def test_percentile_hedge_needs_samples():
+    backend = Backend(_stub(0), "a")
+    router = RouterLLMProvider([backend, Backend(_stub(0), "b")], hedge="p95", hedge_min_samples=5)
+    assert router._hedge_delay(backend) is None
+    backend.ttft_samples.extend([0.1] * 19 + [2.0])
+    assert router._hedge_delay(backend) == 2.0
+    backend.ttft_samples.extend([0.1] * 20)
+    assert router._hedge_delay(backend) == 0.1
+
+
+def test_abandoned_stream_releases_backend():
+    router = RouterLLMProvider([Backend(StubLLMProvider(response=RESPONSE * 10), "a")], hedge="off")
+    stream = router.stream_completion("system", "user")
+    next(stream)
+    assert router.stats()["backends"][0]["outstanding"] == 1
+    stream.close()
+    assert router.stats()["backends"][0]["outstanding"] == 0
+
+
+def test_create_router_from_env(monkeypatch):
+    server = StubOllamaServer(response=RESPONSE, first_token_delay=0).start()
+    try:
+        monkeypatch.setenv("LLM_ROUTER_BACKENDS", f"stub@{server.url}*2,stub")
+        router = LLMProvider.create("router", cache=False, singleflight=False)
+        assert isinstance(router, RouterLLMProvider)
+        assert [backend.weight for backend in router.backends] == [2.0, 1.0]
+        assert router.generate_completion("system", "user") in (RESPONSE, router.backends[1].provider.response)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
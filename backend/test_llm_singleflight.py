@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_llm_singleflight.py
+# Description: Tests for coalescing identical in-flight LLM generations
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import asyncio
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from llm_singleflight import SingleFlight, SingleFlightLLMProvider, AsyncSingleFlight
+from llm_cache import llm_options
+from llm_provider_stub import StubLLMProvider, AsyncStubLLMProvider
+
+
+def _responder(system_prompt, user_prompt):
+    return f"FILE: a.js\n```\n// {user_prompt}\n```\n" * 3
+
+
+def test_concurrent_identical_calls_share_one_generation():
+    stub = StubLLMProvider(responder=_responder, first_token_delay=0.2)
+    llm = SingleFlightLLMProvider(stub)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda prompt: llm.generate_completion("system", prompt),
+                                ["p1"] * 6 + ["p2"] * 2))
+
+    assert results[:6] == [_responder("system", "p1")] * 6
+    assert results[6:] == [_responder("system", "p2")] * 2
+    assert stub.calls == 2
+    stats = llm.stats()
+    assert stats["leaders"] == 2 and stats["followers"] == 6 and stats["in_flight"] == 0
+
+    # The flight ended with its generation: a later identical call starts a new one
+    llm.generate_completion("system", "p1")
+    assert stub.calls == 3
+
+
+def test_bypass_cache_calls_do_not_join_cached_flights(tmp_path):
+    from llm_cache import CompletionCache, CachingLLMProvider
+    stub = StubLLMProvider(responder=_responder, first_token_delay=0.2)
+    llm = SingleFlightLLMProvider(CachingLLMProvider(stub, CompletionCache(str(tmp_path / "cache.db"))))
+    options = [{"bypass_cache": False, "similarity_text": "a"}, {"bypass_cache": False, "similarity_text": "b"},
+               {"bypass_cache": True, "similarity_text": "a"}, {"bypass_cache": True, "similarity_text": "a"}]
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda kwargs: llm.generate_completion("system", "p1", **kwargs), options))
+    # One flight per bypass_cache value; similarity_text alone does not split them
+    assert stub.calls == 2 and llm.stats()["followers"] == 2
+
+
+def _build_worker(cache_path, prompt, start, results):
+    """One build worker process: its own stub backend and provider chain, the shared cache DB"""
+    from llm_cache import CompletionCache, CachingLLMProvider
+    stub = StubLLMProvider(responder=_responder, first_token_delay=0.5)
+    llm = SingleFlightLLMProvider(CachingLLMProvider(stub, CompletionCache(cache_path)), poll_interval=0.02)
+    start.wait()
+    text = llm.generate_completion("system", prompt, similarity_text=prompt)
+    results.put((prompt, text, stub.calls, llm.stats()["process_waits"]))
+
+
+def test_identical_calls_in_separate_processes_share_one_generation(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    prompts = ["p1"] * 5 + ["p2"] * 2
+    start, results = context.Barrier(len(prompts)), context.Queue()
+    workers = [context.Process(target=_build_worker, args=(str(tmp_path / "cache.db"), prompt, start, results))
+               for prompt in prompts]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    assert all(text == _responder("system", prompt) for prompt, text, _, _ in outcomes)
+    # One upstream generation per distinct prompt; every other process waited and read the cache
+    assert sum(calls for _, _, calls, _ in outcomes) == 2
+    assert sum(waits for _, _, _, waits in outcomes) == 5
+
+
+def test_failed_leader_hands_the_flight_to_a_waiter(tmp_path):
+    from llm_cache import CompletionCache, CachingLLMProvider
+    cache = CompletionCache(str(tmp_path / "cache.db"))
+    key = "k"
+    # Another process claimed the key and died without releasing it
+    assert cache.claim_flight(key, "dead-process", lease_seconds=0.2)
+    assert not cache.claim_flight(key, "other", lease_seconds=0.2) and cache.flight_active(key)
+
+    stub = StubLLMProvider(responder=_responder)
+    llm = SingleFlightLLMProvider(CachingLLMProvider(stub, cache), lease_seconds=5, poll_interval=0.02)
+    llm._key = lambda system_prompt, user_prompt, options: key
+    assert llm.generate_completion("system", "p1") == _responder("system", "p1")
+    assert stub.calls == 1 and llm.stats()["process_waits"] == 1 and not cache.flight_active(key)
+
+
+def test_error_reaches_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        release.wait()
+        raise RuntimeError("backend error")
+
+    errors = []
+
+    def call():
+        try:
+            flights.do("k", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while flights.stats()["followers"] < 3:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["backend error"] * 4 and len(calls) == 1
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 3, "errors": 1}
+
+
+def test_shared_stream_survives_leader_leaving():
+    stub = StubLLMProvider(responder=_responder, first_token_delay=0.05, tokens_per_second=500)
+    llm = SingleFlightLLMProvider(stub)
+    leader = llm.stream_completion("system", "p1")
+    follower = llm.stream_completion("system", "p1")
+    first = next(leader)
+    leader.close()
+
+    assert first + "".join(follower)[len(first):] == _responder("system", "p1")
+    assert stub.calls == 1
+    assert llm.stats()["streams_joined"] == 1 and llm.stats()["streams_in_flight"] == 0
+
+
+def test_abandoned_stream_closes_upstream():
+    closed = threading.Event()
+
+    def upstream():
+        try:
+            while True:
+                yield "chunk"
+        finally:
+            closed.set()
+
+    class EndlessProvider(StubLLMProvider):
+        def stream_completion(self, system_prompt, user_prompt):
+            return upstream()
+
+    llm = SingleFlightLLMProvider(EndlessProvider())
+    first, second = llm.stream_completion("s", "u"), llm.stream_completion("s", "u")
+    next(first), next(second)
+    first.close()
+    assert not closed.is_set()
+    second.close()
+    assert closed.is_set() and llm.stats()["streams_in_flight"] == 0
+
+
+def test_llm_options_look_through_wrapper(tmp_path):
+    from llm_cache import CompletionCache, CachingLLMProvider
+    caching = CachingLLMProvider(StubLLMProvider(), CompletionCache(str(tmp_path / "cache.db")))
+    assert llm_options(SingleFlightLLMProvider(caching), "reqs") == {"similarity_text": "reqs",
+                                                                      "bypass_cache": False}
+    assert llm_options(SingleFlightLLMProvider(StubLLMProvider()), "reqs") == {}
+
+
+def test_async_cancel_one_waiter_keeps_generation():
+    async def scenario():
+        provider = AsyncStubLLMProvider(responder=_responder, first_token_delay=0.1)
+        flights = AsyncSingleFlight()
+        calls = [asyncio.ensure_future(flights.do("k", lambda: provider.generate_completion("system", "p1")))
+                 for _ in range(3)]
+        await asyncio.sleep(0.02)
+        calls[0].cancel()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        return provider.calls, results, flights.stats()
+
+    calls, results, stats = asyncio.run(scenario())
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == [_responder("system", "p1")] * 2
+    assert calls == 1 and stats["cancelled"] == 0 and stats["in_flight"] == 0
+
+
+def test_async_cancel_all_waiters_cancels_generation():
+    async def scenario():
+        started, finished = asyncio.Event(), []
+
+        async def generate():
+            started.set()
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        flights = AsyncSingleFlight()
+        calls = [asyncio.ensure_future(flights.do("k", generate)) for _ in range(2)]
+        await started.wait()
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        await asyncio.sleep(0)
+        return finished, flights.stats()
+
+    finished, stats = asyncio.run(scenario())
+    assert finished == [] and stats["cancelled"] == 1 and stats["in_flight"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
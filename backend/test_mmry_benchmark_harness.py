@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_mmry_benchmark_harness.py
+# Description: Tests for the benchmark corpus, result comparison and the compare CLI
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from mmry_benchmark_harness import BenchmarkCorpus, RESULTS_SCHEMA, compare_results, main
+
+
+def _timing(mean, half_width):
+    return {"mean_s": mean, "stdev_s": half_width, "ci95_s": [mean - half_width, mean + half_width],
+            "min_s": mean - half_width, "mb_s": 1 / mean}
+
+
+def _results(encode=(1.0, 0.01), decode=(1.0, 0.01), ratio=0.5, round_trip=True, digest="abc",
+             category="vault"):
+    return {
+        "schema": RESULTS_SCHEMA,
+        "corpus": {"seed": 1, "source": "git:0", "digest": digest, "entries": 1, "bytes": 100},
+        "results": [{"codec": "zlib", "category": category, "files": 1, "bytes": 100,
+                     "encoded_bytes": int(100 * ratio), "ratio": ratio, "round_trip": round_trip,
+                     "encode": _timing(*encode), "decode": _timing(*decode)}]
+    }
+
+
+def test_slowdown_is_a_regression_only_when_significant():
+    baseline = _results()
+    noisy = compare_results(baseline, _results(encode=(1.2, 0.3)))
+    assert noisy["rows"][0]["encode_change"] == pytest.approx(0.2)
+    assert not noisy["rows"][0]["encode_significant"] and noisy["regressions"] == []
+
+    slower = compare_results(baseline, _results(encode=(1.2, 0.01)))
+    assert slower["rows"][0]["encode_significant"]
+    assert slower["regressions"] == ["zlib/vault encode +20.0%"]
+
+    # Significant but under the threshold, or faster
+    assert compare_results(baseline, _results(decode=(1.03, 0.001)))["regressions"] == []
+    assert compare_results(baseline, _results(decode=(0.5, 0.01)))["regressions"] == []
+
+
+def test_ratio_and_round_trip_regressions():
+    comparison = compare_results(_results(), _results(ratio=0.51, round_trip=False))
+    assert comparison["regressions"] == ["zlib/vault round-trip failed", "zlib/vault ratio 0.5000 → 0.5100"]
+    assert compare_results(_results(), _results(ratio=0.504))["regressions"] == []
+
+
+def test_rows_only_for_results_present_in_both():
+    comparison = compare_results(_results(), _results(category="templates", encode=(5.0, 0.01)))
+    assert comparison["rows"] == [] and comparison["regressions"] == []
+
+
+def _write(tmp_path, name, results):
+    path = tmp_path / name
+    path.write_text(json.dumps(results))
+    return str(path)
+
+
+def test_compare_cli_exit_status_and_corpus_mismatch(tmp_path, capsys):
+    baseline = _write(tmp_path, "baseline.json", _results())
+    assert main(["compare", baseline, _write(tmp_path, "same.json", _results(encode=(1.01, 0.01)))]) == 0
+    out = capsys.readouterr().out
+    assert "No regressions" in out and "corpus digests differ" not in out
+
+    slower = _write(tmp_path, "slower.json", _results(encode=(1.5, 0.01), digest="other"))
+    assert main(["compare", baseline, slower]) == 1
+    out = capsys.readouterr().out
+    assert "Warning: corpus digests differ" in out and "zlib/vault encode +50.0%" in out
+    assert "+50.0%*" in out
+
+    # A higher threshold lets the same slowdown through
+    assert main(["compare", baseline, slower, "--threshold", "0.6"]) == 0
+
+
+def test_compare_cli_rejects_other_files(tmp_path):
+    baseline = _write(tmp_path, "baseline.json", _results())
+    with pytest.raises(SystemExit, match="not a mmry-benchmark/1 result file"):
+        main(["compare", baseline, _write(tmp_path, "other.json", {"results": []})])
+
+
+def test_corpus_is_the_committed_vault_and_templates():
+    corpus = BenchmarkCorpus()
+    manifest = corpus.manifest()
+    categories = {entry["category"] for entry in corpus.entries}
+    assert {"synthetic", "template_specs", "templates", "vault"} <= categories
+    assert manifest["source"].startswith("git:")
+    assert all(not f["name"].startswith("vault/") or f["size"] > 0 for f in manifest["files"])
+    assert BenchmarkCorpus(seed=1).manifest()["digest"] != manifest["digest"]
+
+    # Same commit, same bytes, whatever builds have since written into the vault
+    written = Path(__file__).parent / "mmry_secure_storage" / "test_benchmark_untracked.mmry"
+    written.write_text("written by a build at runtime")
+    try:
+        assert BenchmarkCorpus().manifest()["digest"] == manifest["digest"]
+    finally:
+        written.unlink()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
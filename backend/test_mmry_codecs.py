@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_mmry_codecs.py
+# Description: Round-trip fuzz and throughput benchmark for every MMRY codec and folding strategy
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 90
+
+"""
+Runs every registered codec and every neural folding strategy over random,
+adversarial and real-corpus inputs.
+
+Codecs that declare themselves reversible must round-trip every input exactly.
+Folding strategies are meant to be lossless, so they are held to the same rule.
+Subjects listed in KNOWN_FAILURES, and codecs that declare themselves lossy, are
+measured and reported, and run as strict xfails under pytest so a fix shows up.
+
+Usage:
+    python test_mmry_codecs.py [--seed N] [--report mmry_codec_report.json]
+    python -m pytest test_mmry_codecs.py
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import functools
+import contextlib
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Callable
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from mmry_codec_registry import codec_registry, mmry_vault
+
+DEFAULT_SEED = 1729
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# Strings that collide with markers used by the folding stages and legacy stacks
+ADVERSARIAL_FRAGMENTS = [
+    "§3a", "§", "§255x§", "ƒ", "ç", "ř", "í", "é", "ĉ", "♦", "◊", "đ.", "ẃ.",
+    "HUFFMAN:12:", "ARITHMETIC:4:deadbeef", "⟨3,4⟩", "[65][66]", "RAW:", "LZ:",
+    "function ", "const ", "</div>", "<div>", "document.", "\x00", "\r\n", "\t",
+    "😀", "𝔘𝔫𝔦𝔠𝔬𝔡𝔢", "​", "{\"v\":\"2.0m\"}", "MMRY", "%s%d{}",
+]
+
+# Folding strategies that do not round-trip yet; excluded from "regressions"
+KNOWN_FAILURES = {
+    "folding:text_folding": "RLE § marker collides with § in the input; empty input divides by zero",
+    "folding:code_folding": "pattern substitution symbols collide with the input; lz77/arithmetic do not invert",
+    "folding:binary_folding": "rle_binary, huffman and lzw stages do not invert",
+    "folding:repetitive_folding": "RLE § marker collisions; lz78 stage does not invert",
+    "folding:neural_folding": "neural substitution symbols collide with the input; huffman stage",
+}
+
+
+# Corpus generation
+
+def _random_ascii(rng: random.Random, size: int) -> str:
+    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 \n{}();=<>/\"'.,:"
+    return "".join(rng.choice(alphabet) for _ in range(size))
+
+
+def _random_unicode(rng: random.Random, size: int) -> str:
+    chars = []
+    while len(chars) < size:
+        code_point = rng.choice([rng.randint(0x20, 0x7E), rng.randint(0xA0, 0x2FFF),
+                                 rng.randint(0x1F300, 0x1F64F)])
+        chars.append(chr(code_point))
+    return "".join(chars)
+
+
+def _random_runs(rng: random.Random, size: int) -> str:
+    parts = []
+    while sum(len(p) for p in parts) < size:
+        parts.append(rng.choice("ab §x\n") * rng.randint(1, 600))
+    return "".join(parts)[:size]
+
+
+def _adversarial(rng: random.Random, size: int) -> str:
+    parts = []
+    while sum(len(p) for p in parts) < size:
+        parts.append(rng.choice(ADVERSARIAL_FRAGMENTS))
+        if rng.random() < 0.3:
+            parts.append(_random_ascii(rng, rng.randint(1, 12)))
+    return "".join(parts)
+
+
+def build_corpus(seed: int = DEFAULT_SEED) -> List[Tuple[str, str, str]]:
+    """Return (case_name, category, content) tuples; identical for the same seed"""
+    rng = random.Random(seed)
+    corpus: List[Tuple[str, str, str]] = [
+        ("empty", "adversarial", ""),
+        ("single_char", "adversarial", "a"),
+        ("single_marker", "adversarial", "§"),
+        ("long_run", "adversarial", "z" * 5000),
+        ("rle_lookalike", "adversarial", "§5a§12b plain §text§"),
+        ("huffman_lookalike", "adversarial", "HUFFMAN:400:[105][109][112]"),
+        ("pattern_lookalike", "adversarial", "ƒ ç ř function const return"),
+    ]
+
+    for size in (16, 200, 1024, 8192):
+        corpus.append((f"ascii_{size}", "random", _random_ascii(rng, size)))
+        corpus.append((f"unicode_{size}", "random", _random_unicode(rng, size)))
+        corpus.append((f"runs_{size}", "random", _random_runs(rng, size)))
+        corpus.append((f"adversarial_{size}", "adversarial", _adversarial(rng, size)))
+
+    if TEMPLATES_DIR.exists():
+        for path in sorted(TEMPLATES_DIR.rglob("*")):
+            if path.is_file() and path.stat().st_size <= 64 * 1024:
+                try:
+                    content = path.read_text(encoding="utf-8")
+                except UnicodeDecodeError:
+                    continue
+                corpus.append((str(path.relative_to(TEMPLATES_DIR)), "real", content))
+
+    return corpus
+
+
+# Codec subjects
+
+def _codec_subjects() -> List[Dict[str, Any]]:
+    subjects = []
+    for codec in codec_registry.list_codecs():
+        subjects.append({
+            "name": codec.name,
+            "kind": "codec",
+            "reversible": codec.reversible,
+            "encode": lambda text, c=codec: c.encode(text.encode("utf-8")),
+            "decode": lambda blob, c=codec: c.decode(blob).decode("utf-8")
+        })
+    return subjects
+
+
+def _folding_subjects() -> List[Dict[str, Any]]:
+    """One subject per folding strategy; empty when the folding module cannot be imported"""
+    try:
+        from mmry_neural_folding_v3 import CompressionFoldingEngine, MMRYNeuralFoldingSystem
+    except ImportError:
+        return []
+
+    engine = CompressionFoldingEngine()
+    system = MMRYNeuralFoldingSystem.__new__(MMRYNeuralFoldingSystem)
+
+    def fold(text: str, strategy: str):
+        return engine.fold_compress(text, strategy)
+
+    def unfold(folded) -> str:
+        return system._unfold_content(folded[0], folded[1])
+
+    subjects = []
+    for strategy in engine.folding_strategies:
+        if strategy == "adaptive_folding":
+            continue
+        subjects.append({
+            "name": f"folding:{strategy}",
+            "kind": "folding",
+            "reversible": True,
+            "encode": lambda text, s=strategy: fold(text, s),
+            "decode": unfold,
+            "size": lambda folded: len(folded[0]) if isinstance(folded[0], bytes)
+                    else len(str(folded[0]).encode("utf-8"))
+        })
+    return subjects
+
+
+def _run_subject(subject: Dict[str, Any], corpus: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    size_of: Callable = subject.get("size", len)
+    total_in = total_out = 0
+    encode_s = decode_s = 0.0
+    passed = 0
+    failures = []
+
+    for case_name, category, content in corpus:
+        original_size = len(content.encode("utf-8"))
+        try:
+            # Legacy stages print progress on every call
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                encoded = subject["encode"](content)
+                encode_s += time.perf_counter() - start
+
+                start = time.perf_counter()
+                decoded = subject["decode"](encoded)
+                decode_s += time.perf_counter() - start
+
+            total_in += original_size
+            total_out += size_of(encoded)
+            if decoded == content:
+                passed += 1
+            else:
+                failures.append({"case": case_name, "category": category, "error": "mismatch"})
+        except Exception as e:
+            failures.append({"case": case_name, "category": category, "error": f"{type(e).__name__}: {e}"})
+
+    mb_in = total_in / (1024 * 1024)
+    return {
+        "codec": subject["name"],
+        "kind": subject["kind"],
+        "declared_reversible": subject["reversible"],
+        "cases": len(corpus),
+        "round_trip_passed": passed,
+        "round_trip_failed": len(failures),
+        "failures": failures[:10],
+        "ratio": total_out / total_in if total_in else 1.0,
+        "encode_mb_s": mb_in / encode_s if encode_s else 0.0,
+        "decode_mb_s": mb_in / decode_s if decode_s else 0.0
+    }
+
+
+def _is_known_failure(subject: Dict[str, Any]) -> bool:
+    return not subject["reversible"] or subject["name"] in KNOWN_FAILURES
+
+
+def run_suite(seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """Run every codec and folding strategy over the seeded corpus"""
+    corpus = build_corpus(seed)
+    results = [_run_subject(subject, corpus) for subject in _codec_subjects() + _folding_subjects()]
+    failing = [r for r in results if r["round_trip_failed"]]
+
+    return {
+        "seed": seed,
+        "python": platform.python_version(),
+        "corpus": {
+            "cases": len(corpus),
+            "bytes": sum(len(c.encode("utf-8")) for _, _, c in corpus),
+            "categories": sorted({category for _, category, _ in corpus})
+        },
+        "results": results,
+        "regressions": [r["codec"] for r in failing
+                        if r["declared_reversible"] and r["codec"] not in KNOWN_FAILURES],
+        "known_failures": [r["codec"] for r in failing if r["codec"] in KNOWN_FAILURES]
+    }
+
+
+# pytest entry points
+
+@functools.lru_cache(maxsize=None)
+def _default_corpus() -> List[Tuple[str, str, str]]:
+    return build_corpus()
+
+
+def _subject_params() -> List[Any]:
+    params = []
+    for subject in _codec_subjects() + _folding_subjects():
+        marks = []
+        if _is_known_failure(subject):
+            reason = KNOWN_FAILURES.get(subject["name"], "codec declares itself lossy")
+            marks.append(pytest.mark.xfail(reason=reason, strict=True))
+        params.append(pytest.param(subject, id=subject["name"], marks=marks))
+    return params
+
+
+@pytest.mark.parametrize("subject", _subject_params())
+def test_round_trip(subject):
+    result = _run_subject(subject, _default_corpus())
+    assert result["round_trip_failed"] == 0, result["failures"]
+
+
+def test_vault_container_round_trip():
+    for _, _, content in build_corpus():
+        for codec in codec_registry.list_codecs(reversible_only=True):
+            blob = mmry_vault.encode(content, codec.codec_id, {"case": "fuzz"}, block_size=1024)
+            assert mmry_vault.decode(blob)["content"] == content
+
+
+def test_legacy_stack_payloads_read_through_vault(tmp_path):
+    content = "export default function Card() {\n  return <div className=\"card\">hi</div>;\n}\n" * 8
+    for name in ("complete-v2", "lightweight", "minimal-overhead"):
+        codec = codec_registry.get(name)
+        filepath = tmp_path / f"{name}.mmry"
+        with contextlib.redirect_stdout(io.StringIO()):
+            filepath.write_bytes(codec.encode(content.encode("utf-8")))
+            result = mmry_vault.read(filepath)
+        assert result["content"] == content and result["format"] == name
+
+
+def test_vault_rejects_corruption():
+    blob = bytearray(mmry_vault.encode("const x = 1;\n" * 50, "raw"))
+    blob[-1] ^= 0xFF
+    try:
+        mmry_vault.decode(bytes(blob))
+    except ValueError:
+        return
+    raise AssertionError("corrupted vault decoded without error")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MMRY codec round-trip and throughput suite")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--report", default="mmry_codec_report.json", help="Path of the JSON report")
+    args = parser.parse_args()
+
+    report = run_suite(args.seed)
+
+    print(f"MMRY codec suite: {report['corpus']['cases']} cases, {report['corpus']['bytes']:,} bytes, seed {args.seed}\n")
+    print(f"{'Codec':<30} {'Round-trip':>12} {'Ratio':>7} {'Enc MB/s':>9} {'Dec MB/s':>9}")
+    for r in report["results"]:
+        status = f"{r['round_trip_passed']}/{r['cases']}"
+        if not r["round_trip_failed"]:
+            marker = ""
+        elif r["codec"] in KNOWN_FAILURES:
+            marker = " known failure"
+        else:
+            marker = " REGRESSION" if r["declared_reversible"] else " lossy"
+        print(f"{r['codec']:<30} {status:>12} {r['ratio']:>7.3f} {r['encode_mb_s']:>9.2f} {r['decode_mb_s']:>9.2f}{marker}")
+
+    if not any(r["kind"] == "folding" for r in report["results"]):
+        print("\nFolding strategies skipped: mmry_neural_folding_v3 could not be imported")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.report}")
+
+    sys.exit(1 if report["regressions"] else 0)
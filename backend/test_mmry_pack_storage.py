@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_mmry_pack_storage.py
+# Description: Tests for the per-project small-file pack: random access, tombstones, compaction, crash recovery
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from mmry_pack_storage import MMRYPackStorage
+
+
+def _files(count, prefix="src/File"):
+    return [{"name": f"{prefix}{i}.tsx", "type": "javascript",
+             "content": f"export const Item{i} = () => <div className=\"item\">{i}</div>;\n" * (1 + i % 4)}
+            for i in range(count)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MMRYPackStorage(str(tmp_path / "mmry"), compaction_ratio=0.99)
+
+
+def _index_path(store):
+    return store.storage_path / "u" / "p" / MMRYPackStorage.INDEX_FILE
+
+
+def test_random_access_reads_each_file(store):
+    files = _files(30)
+    results = store.store_files("u", "p", files)
+    assert [r["file_name"] for r in results] == [f["name"] for f in files]
+    assert {r["codec"] for r in results} >= {"zlib-dict"}
+    for file_data in reversed(files):
+        assert store.retrieve_file("u", "p", file_data["name"])["content"] == file_data["content"]
+    assert [f["file_name"] for f in store.list_files("u", "p")] == sorted(f["name"] for f in files)
+    with pytest.raises(FileNotFoundError):
+        store.retrieve_file("u", "p", "missing.js")
+
+
+def test_overwrite_and_tombstone_count_dead_bytes(store):
+    files = _files(4)
+    store.store_files("u", "p", files)
+    store.store_file("u", "p", files[0]["name"], "replaced")
+    assert store.retrieve_file("u", "p", files[0]["name"])["content"] == "replaced"
+
+    assert store.delete_file("u", "p", files[1]["name"])
+    assert not store.delete_file("u", "p", files[1]["name"])
+    with pytest.raises(FileNotFoundError):
+        store.retrieve_file("u", "p", files[1]["name"])
+
+    stats = store.get_pack_stats("u", "p")
+    assert stats["files"] == 3
+    assert stats["dead_bytes"] == stats["pack_size"] - stats["live_bytes"] > 0
+
+
+def test_compaction_reclaims_dead_bytes_and_keeps_live_files(store):
+    files = _files(20)
+    store.store_files("u", "p", files)
+    for file_data in files[::2]:
+        store.delete_file("u", "p", file_data["name"])
+    before = store.get_pack_stats("u", "p")
+
+    report = store.compact("u", "p")
+    after = store.get_pack_stats("u", "p")
+    assert report["reclaimed_bytes"] == before["dead_bytes"] and after["dead_bytes"] == 0
+    assert after["pack_size"] == before["live_bytes"]
+    assert len(_index_path(store).read_text().splitlines()) == 10
+    for file_data in files[1::2]:
+        assert store.retrieve_file("u", "p", file_data["name"])["content"] == file_data["content"]
+
+
+def test_deletes_trigger_compaction_past_ratio(tmp_path):
+    store = MMRYPackStorage(str(tmp_path / "mmry"), compaction_ratio=0.5)
+    files = _files(10)
+    store.store_files("u", "p", files)
+    for file_data in files[:6]:
+        store.delete_file("u", "p", file_data["name"])
+    stats = store.get_pack_stats("u", "p")
+    assert stats["files"] == 4 and stats["dead_bytes"] / stats["pack_size"] < 0.5
+
+
+def test_torn_index_line_does_not_swallow_the_next_record(store):
+    files = _files(3)
+    store.store_files("u", "p", files[:2])
+    # A crash halfway through an index append
+    with open(_index_path(store), "a", encoding="utf-8") as f:
+        f.write('{"op":"put","name":"torn.js","off')
+    store._index_cache.clear()
+
+    store.store_files("u", "p", files[2:])
+    for file_data in files:
+        assert store.retrieve_file("u", "p", file_data["name"])["content"] == file_data["content"]
+    assert [f["file_name"] for f in store.list_files("u", "p")] == sorted(f["name"] for f in files)
+
+
+def test_data_appended_without_index_record_is_dead(store, monkeypatch):
+    store.store_files("u", "p", _files(2))
+
+    def failing_append(index_path, records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_append_index", failing_append)
+    with pytest.raises(OSError):
+        store.store_files("u", "p", _files(5, prefix="lost/File"))
+    monkeypatch.undo()
+
+    stats = store.get_pack_stats("u", "p")
+    assert stats["files"] == 2 and stats["dead_bytes"] > 0
+    assert store.compact("u", "p")["reclaimed_bytes"] == stats["dead_bytes"]
+    assert store.get_pack_stats("u", "p")["dead_bytes"] == 0
+
+
+def test_reads_during_compaction_see_a_consistent_pack(store):
+    files = _files(40)
+    store.store_files("u", "p", files)
+    live = files[1::2]
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            for file_data in live:
+                try:
+                    assert store.retrieve_file("u", "p", file_data["name"])["content"] == file_data["content"]
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for round_number in range(10):
+        for file_data in files[::2]:
+            store.store_file("u", "p", file_data["name"], f"round {round_number}")
+            store.delete_file("u", "p", file_data["name"])
+        store.compact("u", "p")
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
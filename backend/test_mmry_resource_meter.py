@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_mmry_resource_meter.py
+# Description: Tests for ResourceMeter's timed and memory passes
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from mmry_resource_meter import ResourceMeter
+
+
+def test_timed_pass_runs_without_tracemalloc():
+    meter = ResourceMeter(use_perf=False)
+    seen = []
+    result, costs = meter.measure(lambda: seen.append(tracemalloc.is_tracing()) or "done")
+    assert result == "done"
+    assert seen == [False, True]   # timed pass untraced, memory pass traced
+    assert not tracemalloc.is_tracing()
+    assert costs["process_cpu_time_s"] >= 0 and "peak_memory_mb" in costs
+
+
+def test_memory_pass_reports_peak_of_the_call():
+    meter = ResourceMeter(use_perf=False)
+    _, memory = meter.measure_memory(lambda: len(bytearray(8 * 1024 * 1024)))
+    assert memory["peak_memory_mb"] >= 8
+    assert abs(memory["memory_delta_mb"]) < 1
+
+
+def test_start_stop_does_not_trace():
+    meter = ResourceMeter(use_perf=False)
+    token = meter.start()
+    assert not tracemalloc.is_tracing()
+    costs = meter.stop(token)
+    assert "peak_memory_mb" not in costs
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_parallel_generator.py
+# Description: Tests for plan-then-parallel project generation
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from parallel_generator import (ParallelProjectGenerator, PLAN_SYSTEM_PROMPT, parse_plan,
+                                file_content_from_response)
+from llm_provider_stub import StubLLMProvider, AsyncStubLLMProvider
+from llm_cache import CachingLLMProvider, CompletionCache
+
+PATHS = ["package.json", "src/App.jsx", "src/components/Nav.jsx", "src/styles.css", "README.md"]
+
+
+def _responder(fail_path=None):
+    def respond(system_prompt, user_prompt):
+        if system_prompt == PLAN_SYSTEM_PROMPT:
+            return "Here is the plan:\n```json\n" + json.dumps(
+                {"summary": "A React app.", "files": [{"path": p, "spec": f"spec of {p}"} for p in PATHS]}) + "\n```"
+        path = next(p for p in PATHS if f"contents of {p} " in user_prompt)
+        if path == fail_path:
+            raise RuntimeError("backend error")
+        return f"FILE: {path}\n```\n// {path}\n```\n"
+    return respond
+
+
+def test_parse_plan_skips_duplicates_and_escaping_paths():
+    plan = parse_plan('Sure! {"summary": "s", "files": [{"path": "/a.js", "spec": "x"}, "b.js", '
+                      '{"path": "a.js"}, {"path": "../etc/passwd"}]} Done.')
+    assert [entry["path"] for entry in plan["files"]] == ["a.js", "b.js"]
+    with pytest.raises(ValueError):
+        parse_plan("I cannot plan this project.")
+
+
+def test_file_content_from_response_variants():
+    assert file_content_from_response("FILE: a.js\n```js\nx = 1\n```", "a.js") == "x = 1"
+    assert file_content_from_response("Here:\n```css\nbody {}\n```\nEnjoy", "s.css") == "body {}"
+    assert file_content_from_response("# Title\n", "README.md") == "# Title"
+
+
+def test_files_generated_concurrently_in_plan_order():
+    llm = StubLLMProvider(responder=_responder(), first_token_delay=0.1)
+    received = []
+    lock = threading.Lock()
+
+    def on_file(path, content):
+        with lock:
+            received.append(path)
+
+    generator = ParallelProjectGenerator(llm, max_concurrency=5)
+    start = time.perf_counter()
+    files = generator.generate(["Landing page"], "web", "system", on_file=on_file)
+    elapsed = time.perf_counter() - start
+
+    assert list(files) == PATHS
+    assert files["src/App.jsx"] == "// src/App.jsx"
+    assert sorted(received) == sorted(PATHS)
+    # One planning call plus five file calls overlapping
+    assert llm.calls == 6 and elapsed < 0.45
+
+
+def test_failed_file_is_retried_then_omitted():
+    llm = StubLLMProvider(responder=_responder(fail_path="src/styles.css"))
+    generator = ParallelProjectGenerator(llm, max_concurrency=2, retries=1)
+    files = generator.generate(["Landing page"], "web", "system")
+    assert "src/styles.css" not in files and len(files) == 4
+    assert generator.last_stats["failed_files"] == ["src/styles.css"]
+    assert llm.calls == 1 + 4 + 2
+
+
+def _async_factory(providers, **stub_kwargs):
+    def create(max_concurrency):
+        providers.append(AsyncStubLLMProvider(max_concurrency=max_concurrency, **stub_kwargs))
+        return providers[-1]
+    return create
+
+
+def test_async_file_calls_share_one_provider_per_project():
+    llm = StubLLMProvider(responder=_responder())
+    providers = []
+    generator = ParallelProjectGenerator(llm, max_concurrency=5, async_llm_factory=_async_factory(
+        providers, responder=_responder(fail_path="src/styles.css"), first_token_delay=0.1))
+    start = time.perf_counter()
+    files = generator.generate(["Landing page"], "web", "system")
+    elapsed = time.perf_counter() - start
+
+    assert list(files) == [path for path in PATHS if path != "src/styles.css"]
+    assert generator.last_stats["failed_files"] == ["src/styles.css"]
+    # The sync provider only planned; one async provider made every file call, retry included
+    assert llm.calls == 1 and len(providers) == 1
+    assert providers[0].calls == 4 + 2 and providers[0].max_concurrency == 5
+    assert providers[0].stats()["in_flight"] == 0 and elapsed < 0.45
+
+
+def test_async_file_calls_go_through_the_completion_cache(tmp_path):
+    llm = CachingLLMProvider(StubLLMProvider(responder=_responder()), CompletionCache(str(tmp_path / "cache.db")))
+    providers = []
+    generator = ParallelProjectGenerator(llm, async_llm_factory=_async_factory(providers, responder=_responder()))
+    first = generator.generate(["Landing page"], "web", "system")
+    assert generator.generate(["Landing page"], "web", "system") == first
+    assert [provider.calls for provider in providers] == [len(PATHS), 0]
+    generator.generate(["Landing page"], "web", "system", bypass_cache=True)
+    assert providers[-1].calls == len(PATHS)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
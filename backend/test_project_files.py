@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_project_files.py
+# Description: Tests for file manifests and cached project file listings
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from project_files import (ProjectFilesCache, ProjectFileTree, file_entry, write_file_manifest,
+                           FILE_MANIFEST_NAME)
+from build_finalizer import BuildFinalizer
+
+
+def _tree(paths):
+    return ProjectFileTree(write_file_manifest(tempfile.mkdtemp(), [file_entry(p, b"x" * 10, 0.0) for p in paths]))
+
+
+def test_directory_listing_with_totals_and_pages():
+    tree = _tree(["README.md", "src/App.jsx", "src/components/Nav.jsx", "src/components/Footer.jsx",
+                  "node_modules/a/index.js", "node_modules/b/lib/x.js"])
+    root = tree.listing("")
+    assert [(e["type"], e["name"]) for e in root["entries"]] == [
+        ("dir", "node_modules"), ("dir", "src"), ("file", "README.md")]
+    src = root["entries"][1]
+    assert src["file_count"] == 3 and src["size"] == 30
+
+    page = tree.listing("src/components/", page=2, page_size=1)
+    assert [e["name"] for e in page["entries"]] == ["Nav.jsx"]
+    assert page["total_entries"] == 2 and page["total_pages"] == 2
+
+    with pytest.raises(KeyError):
+        tree.listing("../etc")
+
+
+def test_cache_revalidates_on_new_build_version():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        project_path = os.path.join(projects_dir, "1")
+        os.makedirs(project_path)
+        write_file_manifest(project_path, [file_entry("a.js", b"1", 0.0)], build_version=1)
+        cache = ProjectFilesCache(projects_dir)
+        assert cache.get_tree("1").total_files == 1
+        assert cache.get_tree("1") is cache.get_tree("1")
+
+        write_file_manifest(project_path, [file_entry("a.js", b"1", 0.0), file_entry("b.js", b"22", 0.0)],
+                            build_version=2)
+        tree = cache.get_tree("1")
+        assert tree.build_version == 2 and tree.total_files == 2
+        assert cache.get_tree("missing") is None
+
+
+def test_manifest_written_by_scan_for_older_builds():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        project_path = os.path.join(projects_dir, "3")
+        os.makedirs(os.path.join(project_path, "src"))
+        for name, content in (("src/index.js", "console.log(1)"), ("build.log", "log"),
+                              ("build_manifest.json", "{}")):
+            with open(os.path.join(project_path, name), "w") as f:
+                f.write(content)
+
+        tree = ProjectFilesCache(projects_dir).get_tree("3")
+        assert [f["path"] for f in tree.files] == ["src/index.js"]
+        assert tree.files[0]["sha256"] == hashlib.sha256(b"console.log(1)").hexdigest()
+        assert os.path.exists(os.path.join(project_path, FILE_MANIFEST_NAME))
+
+
+def test_building_project_is_listed_without_persisting_a_manifest():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        project_path = os.path.join(projects_dir, "4")
+        os.makedirs(project_path)
+        with open(os.path.join(project_path, "build_manifest.json"), "w") as f:
+            json.dump({"status": "generating"}, f)
+        with open(os.path.join(project_path, "index.html"), "w") as f:
+            f.write("<html></html>")
+
+        cache = ProjectFilesCache(projects_dir)
+        assert [f["path"] for f in cache.get_tree("4").files] == ["index.html"]
+        assert not os.path.exists(os.path.join(project_path, FILE_MANIFEST_NAME))
+
+        with open(os.path.join(project_path, "app.js"), "w") as f:
+            f.write("run()")
+        assert cache.get_tree("4").total_files == 2
+
+        with open(os.path.join(project_path, "build_manifest.json"), "w") as f:
+            json.dump({"status": "complete"}, f)
+        assert cache.get_tree("4").total_files == 2
+        assert os.path.exists(os.path.join(project_path, FILE_MANIFEST_NAME))
+
+
+def test_concurrent_manifest_writers_use_separate_temp_files():
+    with tempfile.TemporaryDirectory() as project_path:
+        barrier = threading.Barrier(8)
+
+        def write(n):
+            barrier.wait()
+            for _ in range(20):
+                write_file_manifest(project_path, [file_entry(f"{n}.js", b"x" * n, 0.0)], build_version=n + 1)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert os.listdir(project_path) == [FILE_MANIFEST_NAME]
+        with open(os.path.join(project_path, FILE_MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        assert manifest["files"][0]["path"] == f"{manifest['build_version'] - 1}.js"
+
+
+def test_finalizer_writes_file_manifest():
+    with tempfile.TemporaryDirectory() as tmp:
+        project_path = os.path.join(tmp, "5")
+        os.makedirs(project_path)
+        files = {"src/App.jsx": "export default 1;\n", "package.json": "{}"}
+        result = BuildFinalizer(store_func=lambda **kwargs: {}).finalize(
+            project_path, os.path.join(tmp, "5.zip"), files, project_id="5")
+
+        with open(os.path.join(project_path, FILE_MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        assert manifest["build_version"] == result["build_version"]
+        assert {e["path"]: e["size"] for e in manifest["files"]} == {"package.json": 2, "src/App.jsx": 18}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
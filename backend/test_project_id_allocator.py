@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_project_id_allocator.py
+# Description: Stress test for concurrent project ID allocation
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from project_id_allocator import ProjectIDAllocator
+
+TOTAL_ALLOCATIONS = 500
+PROCESSES = 10
+
+
+def _allocate_batch(args):
+    projects_dir, count = args
+    allocator = ProjectIDAllocator(projects_dir)
+    # Threads within each process as well, like a threaded uvicorn worker
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(lambda _: allocator.allocate(), range(count)))
+
+
+def legacy_create_project_id(projects_dir: str) -> str:
+    """The previous listdir-and-max implementation, for comparison"""
+    existing = [d for d in os.listdir(projects_dir) if os.path.isdir(os.path.join(projects_dir, d))]
+    numeric_dirs = [int(d) for d in existing if d.isdigit()]
+    return str(max(numeric_dirs) + 1 if numeric_dirs else 0)
+
+
+def test_concurrent_allocations_are_unique():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        for existing in ("0", "1", "41", "notes"):
+            os.makedirs(os.path.join(projects_dir, existing))
+
+        per_process = TOTAL_ALLOCATIONS // PROCESSES
+        with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+            batches = pool.map(_allocate_batch, [(projects_dir, per_process)] * PROCESSES)
+
+        ids = [int(i) for batch in batches for i in batch]
+        assert len(ids) == TOTAL_ALLOCATIONS
+        assert len(set(ids)) == TOTAL_ALLOCATIONS, "duplicate project IDs allocated"
+        # Seeded past the highest existing project, no gaps
+        assert sorted(ids) == list(range(42, 42 + TOTAL_ALLOCATIONS))
+
+
+def test_skips_directories_created_outside_allocator():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        allocator = ProjectIDAllocator(projects_dir)
+        assert allocator.allocate() == "0"
+        os.makedirs(os.path.join(projects_dir, "1"))
+        assert allocator.allocate() == "2"
+
+
+if __name__ == "__main__":
+    print(f"🧪 {TOTAL_ALLOCATIONS} concurrent allocations across {PROCESSES} processes...")
+    start = time.perf_counter()
+    test_concurrent_allocations_are_unique()
+    print(f"✅ All IDs unique and contiguous ({time.perf_counter() - start:.2f}s)")
+
+    test_skips_directories_created_outside_allocator()
+    print("✅ Externally created directories are skipped")
+
+    print("\n📊 Allocation latency vs number of existing projects")
+    for project_count in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as projects_dir:
+            for i in range(project_count):
+                os.mkdir(os.path.join(projects_dir, str(i)))
+            allocator = ProjectIDAllocator(projects_dir)
+            allocator.allocate()  # seed
+
+            start = time.perf_counter()
+            for _ in range(100):
+                legacy_create_project_id(projects_dir)
+            legacy_ms = (time.perf_counter() - start) * 10
+
+            start = time.perf_counter()
+            for _ in range(100):
+                allocator.allocate()
+            allocator_ms = (time.perf_counter() - start) * 10
+
+            print(f"   {project_count:>6} projects: listdir+max {legacy_ms:7.3f} ms   allocator {allocator_ms:7.3f} ms")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_project_index.py
+# Description: Tests for the in-memory project index
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import json
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from project_index import ProjectIndex
+
+
+def _make_project(projects_dir, project_id, status="complete", user_id="alice", name=None, zip_file=False):
+    project_path = os.path.join(projects_dir, str(project_id))
+    os.makedirs(project_path, exist_ok=True)
+    with open(os.path.join(project_path, "build_manifest.json"), "w") as f:
+        json.dump({"project_name": name or f"Project {project_id}", "status": status, "user_id": user_id,
+                   "start_time": 1.0, "end_time": 3.0, "files_generated": ["a.js", "b.js"], "errors": []}, f)
+    if zip_file:
+        with open(os.path.join(projects_dir, f"{project_id}.zip"), "wb") as f:
+            f.write(b"PK")
+
+
+def test_rebuild_and_newest_first_pages():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        for i in range(25):
+            _make_project(projects_dir, i)
+        os.makedirs(os.path.join(projects_dir, "not-a-project"))
+        index = ProjectIndex(projects_dir)
+        index.rebuild()
+
+        page, total = index.query(offset=0, limit=10)
+        assert total == 25
+        assert [p["id"] for p in page] == [str(i) for i in range(24, 14, -1)]
+        page, _ = index.query(offset=20, limit=10)
+        assert [p["id"] for p in page] == ["4", "3", "2", "1", "0"]
+        page, _ = index.query(descending=False, offset=5, limit=2)
+        assert [p["id"] for p in page] == ["5", "6"]
+        assert index.query()[0][0]["file_count"] == 2
+
+
+def test_filters_and_sorting():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        _make_project(projects_dir, 1, status="complete", user_id="alice", name="Zeta")
+        _make_project(projects_dir, 2, status="failed", user_id="bob", name="alpha")
+        _make_project(projects_dir, 3, status="complete", user_id="bob", name="Mid")
+        index = ProjectIndex(projects_dir)
+        index.rebuild()
+
+        assert [p["id"] for p in index.query(status="complete")[0]] == ["3", "1"]
+        assert [p["id"] for p in index.query(user_id="bob")[0]] == ["3", "2"]
+        assert [p["id"] for p in index.query(status="complete", user_id="bob")[0]] == ["3"]
+        assert [p["name"] for p in index.query(sort="name", descending=False)[0]] == ["alpha", "Mid", "Zeta"]
+        assert [p["name"] for p in index.query(sort="name", limit=1)[0]] == ["Zeta"]
+
+
+def test_status_events_keep_index_current():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        index = ProjectIndex(projects_dir)
+        index.rebuild()
+
+        _make_project(projects_dir, 7, status="initializing")
+        index.apply_event({"type": "status", "project_id": "7", "data": {"status": "initializing"}})
+        assert index.query(status="initializing")[1] == 1
+
+        index.apply_event({"type": "status", "project_id": "7",
+                           "data": {"status": "generating", "files_generated": 4, "errors": []}})
+        assert index.query(status="initializing")[1] == 0
+        assert index.get("7")["file_count"] == 4
+
+        _make_project(projects_dir, 7, zip_file=True)
+        index.apply_event({"type": "status", "project_id": "7",
+                           "data": {"status": "complete", "files_generated": 2, "errors": [],
+                                    "end_time": 3.0, "duration": 2.0}})
+        entry = index.get("7")
+        assert entry["status"] == "complete" and entry["has_zip"] and entry["duration"] == 2.0
+        assert index.query(user_id="alice")[1] == 1
+
+        index.remove("7")
+        assert index.query()[1] == 0 and index.query(status="complete")[1] == 0
+
+
+def _build_in_other_process(projects_dir, project_id, status, zip_file=False):
+    process = multiprocessing.get_context("spawn").Process(
+        target=_make_project, args=(projects_dir, project_id), kwargs={"status": status, "zip_file": zip_file})
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+
+def test_builds_by_other_processes_are_picked_up_without_events():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        _make_project(projects_dir, 1)
+        index = ProjectIndex(projects_dir, revalidate_interval=0)
+        index.rebuild()
+
+        # A standalone queue worker (or another API process) starts a build...
+        _build_in_other_process(projects_dir, 2, "initializing")
+        page, total = index.query()
+        assert total == 2 and page[0]["id"] == "2" and page[0]["status"] == "initializing"
+
+        # ...moves it on and finishes it; no event reaches this process
+        _build_in_other_process(projects_dir, 2, "generating")
+        assert [p["id"] for p in index.query(status="generating")[0]] == ["2"]
+        _build_in_other_process(projects_dir, 2, "complete", zip_file=True)
+        assert index.query(status="generating")[1] == 0
+        page, total = index.query(status="complete")
+        assert total == 2 and page[0]["id"] == "2" and page[0]["has_zip"]
+        assert index.get("2")["status"] == "complete"
+
+        # Deleted elsewhere
+        os.remove(os.path.join(projects_dir, "2", "build_manifest.json"))
+        os.rmdir(os.path.join(projects_dir, "2"))
+        assert [p["id"] for p in index.query()[0]] == ["1"]
+
+
+if __name__ == "__main__":
+    test_rebuild_and_newest_first_pages()
+    test_filters_and_sorting()
+    test_status_events_keep_index_current()
+    test_builds_by_other_processes_are_picked_up_without_events()
+    print("✅ Project index tests passed")
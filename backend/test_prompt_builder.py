@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_prompt_builder.py
+# Description: Tests for prompt compaction, token budgets and prompt token accounting
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from prompt_builder import (PromptBuilder, PromptStats, TRUNCATION_MARKER, compact, count_tokens,
+                            dedupe_against, truncate_to_tokens)
+
+SYSTEM = """You are an expert web developer.
+
+            FRONTEND REQUIREMENTS:
+            1. ALWAYS include comprehensive CSS/styling files
+            2. Use modern CSS with flexbox/grid layouts
+            3. Use modern CSS with flexbox/grid layouts
+
+            Format each file with FILE: filename.ext followed by code in triple backticks."""
+
+INSTRUCTIONS = """
+            STYLING:
+            - Always include comprehensive CSS/styling files
+            - Use modern CSS with flexbox/grid layouts
+
+            REQUIRED FILES:
+            - index.html (main entry point)
+            - README.md (setup and usage instructions)
+
+            Each file should be in the format:
+
+            FILE: filename.ext
+            """
+
+
+def test_compact_dedents_and_drops_repeated_instructions():
+    text = compact(SYSTEM)
+    assert text.startswith("You are an expert web developer.\n\nFRONTEND REQUIREMENTS:\n1. ALWAYS")
+    assert text.count("flexbox/grid") == 1
+    assert "  " not in text and "\n\n\n" not in text
+    assert count_tokens(text) <= count_tokens(SYSTEM)
+
+
+def test_dedupe_against_system_drops_given_lines_and_empty_headings():
+    text = dedupe_against(compact(INSTRUCTIONS), compact(SYSTEM))
+    assert "STYLING" not in text and "flexbox" not in text
+    assert "REQUIRED FILES:\n- index.html" in text
+    # A heading followed by prose, not instructions, is kept
+    assert "Each file should be in the format:\n\nFILE: filename.ext" in text
+
+
+def test_static_prefix_is_byte_identical_across_builds():
+    builder = PromptBuilder(budget_tokens=10000)
+    first = builder.build(SYSTEM, INSTRUCTIONS, "Requirements:\n- A blog")
+    second = builder.build(SYSTEM, INSTRUCTIONS, "Requirements:\n- A shop\n- With a cart")
+    assert first.system == second.system
+    assert first.user.startswith(first.instructions) and second.user.startswith(first.instructions)
+    assert first.user.endswith("- A blog") and second.user.endswith("- With a cart")
+    assert first.prefix_tokens == second.prefix_tokens < first.prompt_tokens
+    assert first.raw_tokens > first.prompt_tokens
+
+
+def test_budget_drops_optional_sections_then_truncates_dynamic():
+    optional = ["EXAMPLES:\n" + "".join(f"- example component {n}\n" for n in range(40))]
+    dynamic = "\n".join(f"- requirement number {n}" for n in range(200))
+    roomy = PromptBuilder(budget_tokens=100000).build(SYSTEM, INSTRUCTIONS, dynamic, optional)
+    assert not roomy.dropped and "EXAMPLES" in roomy.user
+
+    tight_budget = roomy.prompt_tokens - 50
+    dropped = PromptBuilder(budget_tokens=tight_budget).build(SYSTEM, INSTRUCTIONS, dynamic, optional)
+    assert dropped.dropped and "EXAMPLES" not in dropped.user
+    assert dropped.user.endswith("- requirement number 199")
+
+    cut = PromptBuilder(budget_tokens=300).build(SYSTEM, INSTRUCTIONS, dynamic, optional)
+    assert cut.prompt_tokens <= 300
+    assert cut.user.startswith(cut.instructions) and cut.user.endswith(TRUNCATION_MARKER)
+
+
+def test_truncate_to_tokens_cuts_at_a_line():
+    text = "\n".join(f"line {n}" for n in range(100))
+    assert truncate_to_tokens(text, 10000) == text
+    cut = truncate_to_tokens(text, 50)
+    assert count_tokens(cut) <= 50
+    assert cut.split("\n")[-2].startswith("line ") and cut.endswith(TRUNCATION_MARKER)
+
+
+def test_stats_count_prefix_reuse_after_first_call():
+    builder = PromptBuilder(budget_tokens=10000)
+    stats = PromptStats()
+    prompts = [builder.build(SYSTEM, INSTRUCTIONS, f"- project {n}") for n in range(3)]
+    for prompt in prompts:
+        stats.record_built(prompt)
+    report = stats.report()
+    assert report["calls"] == 3
+    assert report["prompt_tokens"] == sum(prompt.prompt_tokens for prompt in prompts)
+    assert report["saved_by_compaction"] == sum(p.raw_tokens - p.prompt_tokens for p in prompts) > 0
+    assert report["prefix_cache_reusable"] == 2 * prompts[0].prefix_tokens
+    assert report["prefill_tokens"] == report["prompt_tokens"] - report["prefix_cache_reusable"]
+
+
+def test_stats_prefix_is_per_system_and_context():
+    stats = PromptStats()
+    stats.record("system", "context A\nfile 1", prefix="context A\n")
+    stats.record("system", "context B\nfile 1", prefix="context B\n")
+    assert stats.report()["prefix_cache_reusable"] == 0
+    stats.record("system", "context A\nfile 2", prefix="context A\n")
+    assert stats.report()["prefix_cache_reusable"] == count_tokens("system") + count_tokens("context A\n")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
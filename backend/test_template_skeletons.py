@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: test_template_skeletons.py
+# Description: Tests for compiled template skeletons and linked template files
+# Last modified: 2026-10-18
+# By: AI Assistant
+# Completeness: 100
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from template_manager import TemplateManager
+
+template_mgr = TemplateManager()
+
+
+@pytest.mark.parametrize("template_id", sorted(template_mgr.templates))
+def test_skeleton_matches_direct_render(template_id):
+    assert template_id in template_mgr.skeletons
+    for name, requirements in (("My {{Shop}} [[x]]", ["Dark theme", "Cart"]), ("", None)):
+        expected = template_mgr._render_direct(template_mgr.templates[template_id], name, requirements)
+        assert template_mgr.render_template(template_id, name, requirements) == expected
+
+
+def test_project_name_only_fills_slots():
+    skeleton = template_mgr.skeletons["ecommerce_advanced"]
+    assert any(slots for _, _, slots in skeleton.files)
+    assert skeleton.static_hashes
+    contents = template_mgr.render_template("ecommerce_advanced", "Acme Store", ["Checkout"])
+    assert contents["project_structure.md"].startswith("# Acme Store Structure")
+    assert contents["project_structure.md"].endswith("## Custom Requirements\n\n- Checkout\n")
+
+
+def test_hardlinked_apply_shares_static_files():
+    with tempfile.TemporaryDirectory() as projects_dir:
+        results = [template_mgr.apply_template("landing_page_template", os.path.join(projects_dir, str(i)),
+                                               f"Site {i}", link_mode="hardlink") for i in range(2)]
+        assert all(result["status"] == "success" for result in results)
+
+        static_path = next(iter(template_mgr.skeletons["landing_page_template"].static_hashes))
+        first, second = (os.path.join(projects_dir, str(i), static_path) for i in range(2))
+        assert os.path.samefile(first, second)
+
+        for i, result in enumerate(results):
+            for file_path, content in zip(result["files"], result["contents"].values()):
+                with open(file_path) as f:
+                    assert f.read() == content
+            with open(os.path.join(projects_dir, str(i), "project_structure.md")) as f:
+                assert f.read().startswith(f"# Site {i} Structure")
+
+
+def test_reflink_falls_back_to_copy():
+    with tempfile.TemporaryDirectory() as project_path:
+        result = template_mgr.apply_template("simple_blog_template", project_path, "Blog", link_mode="reflink")
+        assert result["status"] == "success"
+        for file_path, content in zip(result["files"], result["contents"].values()):
+            with open(file_path) as f:
+                assert f.read() == content
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -53,12 +53,20 @@ const AI_AGENTS = [
   }
 ];
 
-export default function AIAgentStatus({ projectId, buildStatus }) {
+export default function AIAgentStatus({ projectId, buildStatus, streaming = false, agentUpdate = null }) {
   const [agentStatuses, setAgentStatuses] = useState({});
   const [overallProgress, setOverallProgress] = useState(0);
 
+  // Agent updates pushed over the build event stream
   useEffect(() => {
-    if (!projectId) return;
+    if (!agentUpdate) return;
+    setAgentStatuses(agentUpdate.agents || {});
+    setOverallProgress(agentUpdate.overall_progress || 0);
+  }, [agentUpdate]);
+
+  useEffect(() => {
+    // Only poll when the parent has no event stream
+    if (!projectId || streaming) return;
 
     const fetchAgentStatus = async () => {
       try {
@@ -79,7 +87,7 @@ export default function AIAgentStatus({ projectId, buildStatus }) {
     // Poll for updates every 2 seconds
     const interval = setInterval(fetchAgentStatus, 2000);
     return () => clearInterval(interval);
-  }, [projectId]);
+  }, [projectId, streaming]);
 
   const getAgentStatus = (agentId) => {
     return agentStatuses[agentId] || {
@@ -1,6 +1,6 @@
 // BuildConsole.jsx
 // Purpose: Display build logs and status for a project
-// Last modified: 2024-11-03
+// Last modified: 2026-10-18
 // By: AI Assistant
 // Completeness: 100
 
@@ -17,9 +17,75 @@ export default function BuildConsole({ src, projectId }) {
   });
   const [autoScroll, setAutoScroll] = useState(true);
   
-  // Fetch logs with verbose feedback
+  // 'connecting' -> 'streaming' over /events, or 'polling' when the stream is unavailable
+  const [mode, setMode] = useState('connecting');
+  const [agentUpdate, setAgentUpdate] = useState(null);
+
+  // Live build events (log lines, status, agents) pushed by the server
   useEffect(() => {
-    if (!src) return;
+    if (!projectId) return;
+    if (typeof window === 'undefined' || !window.EventSource) {
+      setMode('polling');
+      return;
+    }
+
+    const apiBase = (import.meta.env.VITE_API_URL || 'https://api.squadbox.co.uk').replace(/\/$/, '');
+    const source = new EventSource(`${apiBase}/events/${projectId}`);
+    let opened = false;
+    let finished = false;
+    // Byte offset of build.log already shown; replayed lines are skipped
+    let logOffset = 0;
+
+    const applyStatus = (data) => {
+      setStatus(prev => ({
+        ...prev,
+        status: data.status,
+        progress: data.progress,
+        file_count: data.files_generated ?? data.file_count ?? prev.file_count,
+        duration: data.duration ?? prev.duration
+      }));
+      const timestamp = new Date().toLocaleTimeString();
+      setLogs(prev => prev + `[${timestamp}] STATUS UPDATE: ${data.status} (${data.progress}%)\n`);
+      if (data.status === 'complete' || data.status === 'failed') {
+        finished = true;
+        source.close();
+      }
+    };
+
+    source.onopen = () => {
+      opened = true;
+      setMode('streaming');
+    };
+    source.addEventListener('snapshot', (e) => {
+      const data = JSON.parse(e.data);
+      logOffset = data.log_offset;
+      setLogs(data.log);
+      setAgentUpdate(data.agents);
+      applyStatus(data.status);
+    });
+    source.addEventListener('log', (e) => {
+      const data = JSON.parse(e.data);
+      if (data.offset < logOffset) return;
+      logOffset = data.offset + new TextEncoder().encode(data.text).length;
+      setLogs(prev => (prev === 'Loading build logs...' ? '' : prev) + data.text);
+    });
+    source.addEventListener('status', (e) => applyStatus(JSON.parse(e.data)));
+    source.addEventListener('agent', (e) => setAgentUpdate(JSON.parse(e.data)));
+    source.onerror = () => {
+      // EventSource reconnects by itself (resuming via Last-Event-ID); only give up
+      // if the stream never opened, e.g. an older backend without /events
+      if (!opened && !finished) {
+        source.close();
+        setMode('polling');
+      }
+    };
+
+    return () => source.close();
+  }, [projectId]);
+
+  // Fallback: fetch logs with verbose feedback
+  useEffect(() => {
+    if (!src || mode !== 'polling') return;
     
     const fetchLogs = async () => {
       try {
@@ -45,11 +111,11 @@ export default function BuildConsole({ src, projectId }) {
     const interval = setInterval(fetchLogs, 1500); // More frequent updates
     
     return () => clearInterval(interval);
-  }, [src]);
+  }, [src, mode]);
   
-  // Fetch build status with verbose feedback
+  // Fallback: fetch build status with verbose feedback
   useEffect(() => {
-    if (!projectId) return;
+    if (!projectId || mode !== 'polling') return;
     
     const fetchStatus = async () => {
       try {
@@ -76,7 +142,7 @@ export default function BuildConsole({ src, projectId }) {
     const interval = setInterval(fetchStatus, 1500); // More frequent updates
     
     return () => clearInterval(interval);
-  }, [projectId]);
+  }, [projectId, mode]);
   
   // Auto-scroll to bottom effect
   useEffect(() => {
@@ -129,6 +195,8 @@ export default function BuildConsole({ src, projectId }) {
         <AIAgentStatus 
           projectId={projectId} 
           buildStatus={status}
+          streaming={mode !== 'polling'}
+          agentUpdate={agentUpdate}
         />
       )}
 
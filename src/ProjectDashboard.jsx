@@ -31,6 +31,10 @@ function ProjectDashboard() {
   const [selectedProject, setSelectedProject] = useState(null);
   const [projectDetails, setProjectDetails] = useState(null);
   const [detailsLoading, setDetailsLoading] = useState(false);
+  // Build log is fetched on demand rather than inlined in the project details
+  const [buildLog, setBuildLog] = useState(null);
+  const [logOpen, setLogOpen] = useState(false);
+  const [logLoading, setLogLoading] = useState(false);
 
   // Fetch projects on component mount
   useEffect(() => {
@@ -79,6 +83,8 @@ function ProjectDashboard() {
       }
     }
     
+    setBuildLog(null);
+    setLogOpen(false);
     if (selectedProject) {
       fetchProjectDetails(selectedProject);
     } else {
@@ -86,6 +92,27 @@ function ProjectDashboard() {
     }
   }, [selectedProject]);
 
+  const toggleBuildLog = async () => {
+    const opening = !logOpen;
+    setLogOpen(opening);
+    if (!opening || buildLog !== null || !projectDetails?.log_url) return;
+
+    try {
+      setLogLoading(true);
+      const apiBase = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+      const response = await fetch(`${apiBase.replace(/\/$/, '')}${projectDetails.log_url}`);
+      if (!response.ok) {
+        throw new Error(`Failed to fetch build log: ${response.status}`);
+      }
+      setBuildLog(await response.text());
+    } catch (error) {
+      console.error(`Error fetching build log for ${projectDetails.id}:`, error);
+      setBuildLog(`Unable to load build log: ${error.message}`);
+    } finally {
+      setLogLoading(false);
+    }
+  };
+
   const handleProjectSelect = (projectId) => {
     // Toggle selection - if clicking the same project, close it
     if (selectedProject === projectId) {
@@ -214,7 +241,7 @@ function ProjectDashboard() {
             <Box>
               <Group justify="space-between" mb="xs">
                 <Text size="sm" fw={500}>Generated Files:</Text>
-                <Badge size="xs" variant="outline">{projectDetails.files.length} files</Badge>
+                <Badge size="xs" variant="outline">{projectDetails.file_count ?? projectDetails.files.length} files</Badge>
               </Group>
               <ScrollArea h={120}>
                 <Stack gap="xs">
@@ -231,20 +258,24 @@ function ProjectDashboard() {
                       <Text size="xs" c="dimmed">({formatFileSize(file.size)})</Text>
                     </Group>
                   ))}
-                  {projectDetails.files.length > 10 && (
-                    <Text size="xs" c="dimmed">... and {projectDetails.files.length - 10} more files</Text>
+                  {(projectDetails.file_count ?? projectDetails.files.length) > 10 && (
+                    <Text size="xs" c="dimmed">... and {(projectDetails.file_count ?? projectDetails.files.length) - 10} more files</Text>
                   )}
                 </Stack>
               </ScrollArea>
             </Box>
           )}
 
-          {projectDetails.build_log && (
+          {projectDetails.log_url && (
             <Box>
-              <Group gap="xs" mb="xs">
+              <Group gap="xs" mb="xs" style={{ cursor: 'pointer' }} onClick={toggleBuildLog}>
+                {logOpen ? <IconChevronDown size={14} /> : <IconChevronRight size={14} />}
                 <IconTerminal2 size={14} color="var(--mantine-color-brand-6)" />
                 <Text size="sm" fw={500}>Build Console:</Text>
+                <Text size="xs" c="dimmed">({formatFileSize(projectDetails.log_size)})</Text>
+                {logLoading && <Loader size="xs" />}
               </Group>
+              <Collapse in={logOpen && buildLog !== null}>
               <ScrollArea h={150}>
                 <Box 
                   p="sm" 
@@ -265,10 +296,11 @@ function ProjectDashboard() {
                       color: 'rgba(255, 255, 255, 0.9)'
                     }}
                   >
-                    {projectDetails.build_log}
+                    {buildLog}
                   </Code>
                 </Box>
               </ScrollArea>
+              </Collapse>
             </Box>
           )}
 
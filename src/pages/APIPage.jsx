@@ -18,7 +18,7 @@ const APIPage = () => (
         </div>
         <div>
           <Text fw={600} mb={4}>Generate Project</Text>
-          <Code block>{`POST /generate-project\nAuthorization: Bearer <token>\nContent-Type: multipart/form-data\n\nfields:\n- project_name: string\n- requirements: string[]\n- template_id: string (optional)`}</Code>
+          <Code block>{`POST /generate-project\nAuthorization: Bearer <token>\nContent-Type: multipart/form-data\n\nfields:\n- project_name: string\n- requirements: string[]\n- template_id: string (optional)\n- bypass_cache: boolean (optional, skip cached LLM completions)`}</Code>
         </div>
       </Stack>
     </Card>